@@ -0,0 +1,91 @@
+# alembic/versions/008_create_audit_logs.py
+"""create audit_logs table
+
+Revision ID: 008_audit_logs
+Revises: 007_vault_tables
+Create Date: 2025-02-03 10:00:00.000000
+
+Creates:
+- audit_logs table (written in batches by the background audit log writer)
+- Indexes for user/entity/time lookups used by audit reports
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008_audit_logs'
+down_revision = '007_vault_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create audit_logs table"""
+
+    op.create_table(
+        'audit_logs',
+
+        # Primary Key
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+
+        # Actor
+        sa.Column('user_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', ondelete='SET NULL'),
+                  nullable=True,
+                  comment='User who performed the action'),
+
+        # Action details
+        sa.Column('action', sa.String(100), nullable=False,
+                  comment="Type of action performed (e.g., 'create', 'update', 'access')"),
+        sa.Column('entity_type', sa.String(50), nullable=False,
+                  comment="Type of entity affected (e.g., 'transaction', 'http_request')"),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=True,
+                  comment='ID of the affected entity'),
+        sa.Column('changes', postgresql.JSONB, nullable=True,
+                  comment='JSON object containing the changes made'),
+
+        # Request metadata
+        sa.Column('ip_address', sa.String(45), nullable=True,
+                  comment='IP address of the client (supports IPv6)'),
+        sa.Column('user_agent', sa.String(255), nullable=True,
+                  comment='User agent string from the request'),
+        sa.Column('description', sa.Text, nullable=True,
+                  comment='Human-readable description of the action'),
+        sa.Column('timestamp', sa.DateTime, nullable=False, server_default=sa.text('CURRENT_TIMESTAMP'),
+                  comment='When the action occurred'),
+
+        # Status
+        sa.Column('is_active', sa.Boolean, nullable=False, server_default='true'),
+
+        # Timestamps
+        sa.Column('created_at', sa.DateTime, nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime, nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+
+        comment='Audit trail of system activity'
+    )
+
+    # Indexes
+    op.create_index('ix_audit_logs_user_id', 'audit_logs', ['user_id'])
+    op.create_index('ix_audit_logs_action', 'audit_logs', ['action'])
+    op.create_index('ix_audit_logs_entity_type', 'audit_logs', ['entity_type'])
+    op.create_index('ix_audit_logs_entity_id', 'audit_logs', ['entity_id'])
+    op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'])
+    op.create_index('ix_audit_logs_is_active', 'audit_logs', ['is_active'])
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', ['created_at'])
+    op.create_index('idx_audit_entity_timestamp', 'audit_logs', ['entity_type', 'entity_id', 'timestamp'])
+
+
+def downgrade() -> None:
+    """Drop audit_logs table"""
+
+    op.drop_index('idx_audit_entity_timestamp', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_is_active', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_entity_id', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_entity_type', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_action', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_user_id', table_name='audit_logs')
+    op.drop_table('audit_logs')
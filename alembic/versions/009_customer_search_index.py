@@ -0,0 +1,59 @@
+# alembic/versions/009_customer_search_index.py
+"""customer trigram search index
+
+Revision ID: 009_customer_search
+Revises: 008_audit_logs
+Create Date: 2025-02-05 10:00:00.000000
+
+Creates:
+- pg_trgm extension
+- customers.search_document generated column (normalized names incl. name_ar,
+  email, phone digits, national ID, passport and customer number)
+- GIN trigram index on customers.search_document
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_customer_search'
+down_revision = '008_audit_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add customer search document and trigram index"""
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Must match CUSTOMER_SEARCH_DOCUMENT_SQL in app/db/models/customer.py
+    op.execute("""
+        ALTER TABLE customers
+        ADD COLUMN search_document TEXT
+        GENERATED ALWAYS AS (
+            translate(lower(coalesce(first_name, '') || ' '
+            || coalesce(last_name, '') || ' '
+            || coalesce(name_ar, '') || ' '
+            || coalesce(email, '') || ' '
+            || regexp_replace(coalesce(phone_number, ''), '[^0-9]', '', 'g') || ' '
+            || coalesce(national_id, '') || ' '
+            || coalesce(passport_number, '') || ' '
+            || coalesce(customer_number, '')), 'أإآٱىةًٌٍَُِّْـ', 'اااايه')
+        ) STORED
+    """)
+    op.execute("""
+        COMMENT ON COLUMN customers.search_document IS
+        'Normalized names, contact and identification numbers for trigram search'
+    """)
+
+    op.execute("""
+        CREATE INDEX idx_customer_search_trgm
+        ON customers USING gin (search_document gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    """Drop customer search document and trigram index"""
+
+    op.execute("DROP INDEX IF EXISTS idx_customer_search_trgm")
+    op.execute("ALTER TABLE customers DROP COLUMN IF EXISTS search_document")
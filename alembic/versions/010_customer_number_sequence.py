@@ -0,0 +1,31 @@
+# alembic/versions/010_customer_number_sequence.py
+"""customer number sequence
+
+Revision ID: 010_customer_number_seq
+Revises: 009_customer_search
+Create Date: 2025-02-07 10:00:00.000000
+
+Creates:
+- customer_number_seq (customer numbers are allocated from it in blocks by
+  the bulk customer import)
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010_customer_number_seq'
+down_revision = '009_customer_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create customer number sequence"""
+
+    op.execute("CREATE SEQUENCE IF NOT EXISTS customer_number_seq")
+
+
+def downgrade() -> None:
+    """Drop customer number sequence"""
+
+    op.execute("DROP SEQUENCE IF EXISTS customer_number_seq")
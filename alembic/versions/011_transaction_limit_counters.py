@@ -0,0 +1,73 @@
+# alembic/versions/011_transaction_limit_counters.py
+"""transaction limit counters
+
+Revision ID: 011_limit_counters
+Revises: 010_customer_number_seq
+Create Date: 2025-02-09 10:00:00.000000
+
+Creates:
+- transaction_limit_counters table (running totals of completed
+  transactions per branch/customer, transaction type and UTC hour, kept up
+  to date by the transaction service and read by the daily limit checks)
+- Backfill of the last 48 hours of completed transactions
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011_limit_counters'
+down_revision = '010_customer_number_seq'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create and backfill transaction limit counters"""
+
+    op.execute("""
+        CREATE TABLE transaction_limit_counters (
+            scope VARCHAR(20) NOT NULL,
+            scope_id UUID NOT NULL,
+            transaction_type transactiontype NOT NULL,
+            bucket_start TIMESTAMP NOT NULL,
+            total_amount NUMERIC(20, 2) NOT NULL DEFAULT 0,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (scope, scope_id, transaction_type, bucket_start),
+            CONSTRAINT check_limit_counter_scope CHECK (scope IN ('branch', 'customer'))
+        )
+    """)
+    op.execute("""
+        COMMENT ON COLUMN transaction_limit_counters.bucket_start IS
+        'Start of the UTC hour the transactions fall into'
+    """)
+
+    # Longest limit window is 24h (+1 bucket); older history is not needed.
+    # transaction_date is naive UTC, so it is bucketed as is and compared
+    # with the UTC wall clock, whatever the session TimeZone
+    op.execute("""
+        INSERT INTO transaction_limit_counters
+            (scope, scope_id, transaction_type, bucket_start, total_amount, transaction_count)
+        SELECT 'branch', branch_id, transaction_type,
+               date_trunc('hour', transaction_date),
+               SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE status = 'completed'
+          AND transaction_date >= (now() AT TIME ZONE 'UTC') - interval '48 hours'
+        GROUP BY 1, 2, 3, 4
+        UNION ALL
+        SELECT 'customer', customer_id, transaction_type,
+               date_trunc('hour', transaction_date),
+               SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE status = 'completed'
+          AND customer_id IS NOT NULL
+          AND transaction_date >= (now() AT TIME ZONE 'UTC') - interval '48 hours'
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Drop transaction limit counters"""
+
+    op.execute("DROP TABLE IF EXISTS transaction_limit_counters")
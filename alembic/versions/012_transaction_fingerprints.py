@@ -0,0 +1,59 @@
+# alembic/versions/012_transaction_fingerprints.py
+"""transaction duplicate fingerprints and idempotency keys
+
+Revision ID: 012_txn_fingerprints
+Revises: 011_limit_counters
+Create Date: 2025-02-10 10:00:00.000000
+
+Creates:
+- transactions.fingerprint (hash of branch, currency, amount, customer and
+  UTC minute, computed by the application) with an index
+- transactions.idempotency_key with a unique (user_id, idempotency_key)
+  partial index
+- Index on transactions.reference_number
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012_txn_fingerprints'
+down_revision = '011_limit_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add fingerprint and idempotency key columns"""
+
+    op.execute("ALTER TABLE transactions ADD COLUMN fingerprint VARCHAR(32)")
+    op.execute("ALTER TABLE transactions ADD COLUMN idempotency_key VARCHAR(100)")
+    op.execute("""
+        COMMENT ON COLUMN transactions.fingerprint IS
+        'Hash of branch, currency, amount, customer and minute bucket'
+    """)
+    op.execute("""
+        COMMENT ON COLUMN transactions.idempotency_key IS
+        'Client request key; a retried request returns the original transaction'
+    """)
+
+    # Existing rows keep a NULL fingerprint: duplicate windows are minutes long
+    op.execute("CREATE INDEX ix_transactions_fingerprint ON transactions (fingerprint)")
+    op.execute("""
+        CREATE UNIQUE INDEX uq_transaction_user_idempotency_key
+        ON transactions (user_id, idempotency_key)
+        WHERE idempotency_key IS NOT NULL
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_transaction_reference_number "
+        "ON transactions (reference_number)"
+    )
+
+
+def downgrade() -> None:
+    """Drop fingerprint and idempotency key columns"""
+
+    op.execute("DROP INDEX IF EXISTS idx_transaction_reference_number")
+    op.execute("DROP INDEX IF EXISTS uq_transaction_user_idempotency_key")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_fingerprint")
+    op.execute("ALTER TABLE transactions DROP COLUMN IF EXISTS idempotency_key")
+    op.execute("ALTER TABLE transactions DROP COLUMN IF EXISTS fingerprint")
@@ -0,0 +1,56 @@
+# alembic/versions/013_idempotency_records.py
+"""create idempotency_records table
+
+Revision ID: 013_idempotency_records
+Revises: 012_txn_fingerprints
+Create Date: 2025-02-11 10:00:00.000000
+
+Creates:
+- idempotency_records table (stored responses of money-moving POSTs by
+  user and Idempotency-Key, with expiry)
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '013_idempotency_records'
+down_revision = '012_txn_fingerprints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create idempotency_records table"""
+
+    op.create_table(
+        'idempotency_records',
+
+        sa.Column('user_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', ondelete='CASCADE'),
+                  primary_key=True),
+        sa.Column('idempotency_key', sa.String(100), primary_key=True),
+
+        sa.Column('scope', sa.String(100), nullable=False,
+                  comment="Endpoint the key was used for (e.g., 'transactions.exchange')"),
+        sa.Column('request_hash', sa.String(64), nullable=False,
+                  comment='SHA-256 of scope and canonical request body'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='in_progress'),
+        sa.Column('response_body', postgresql.JSONB, nullable=True,
+                  comment='Serialized response replayed on retry'),
+
+        sa.Column('created_at', sa.DateTime, nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+
+        comment='Idempotency-Key records for money-moving requests'
+    )
+
+    op.create_index('idx_idempotency_expires_at', 'idempotency_records', ['expires_at'])
+
+
+def downgrade() -> None:
+    """Drop idempotency_records table"""
+
+    op.drop_index('idx_idempotency_expires_at', table_name='idempotency_records')
+    op.drop_table('idempotency_records')
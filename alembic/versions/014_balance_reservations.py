@@ -0,0 +1,79 @@
+# alembic/versions/014_balance_reservations.py
+"""balance reservations (expiring holds)
+
+Revision ID: 014_balance_reservations
+Revises: 013_idempotency_records
+Create Date: 2025-02-12 10:00:00.000000
+
+Creates:
+- reservationstatus enum type
+- balance_reservations table with a partial index on the expiry of active
+  holds (scanned by the hold sweeper)
+- Active holds for pending / in-transit transfers, whose amounts are
+  already part of branch_balances.reserved_balance
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '014_balance_reservations'
+down_revision = '013_idempotency_records'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create balance_reservations and hold existing transfer reservations"""
+
+    op.execute("CREATE TYPE reservationstatus AS ENUM ('active', 'committed', 'released', 'expired')")
+
+    op.execute("""
+        CREATE TABLE balance_reservations (
+            id UUID PRIMARY KEY,
+            branch_id UUID NOT NULL REFERENCES branches(id) ON DELETE CASCADE,
+            currency_id UUID NOT NULL REFERENCES currencies(id) ON DELETE RESTRICT,
+            amount NUMERIC(15, 2) NOT NULL,
+            status reservationstatus NOT NULL DEFAULT 'active',
+            reference_id UUID,
+            reference_type VARCHAR(50) NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            resolved_at TIMESTAMP,
+            created_by UUID REFERENCES users(id) ON DELETE SET NULL,
+            is_active BOOLEAN NOT NULL DEFAULT TRUE,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            CONSTRAINT reservation_amount_positive CHECK (amount > 0)
+        )
+    """)
+    op.execute("CREATE INDEX ix_balance_reservations_is_active ON balance_reservations (is_active)")
+    op.execute("CREATE INDEX ix_balance_reservations_created_at ON balance_reservations (created_at)")
+    op.execute("""
+        CREATE INDEX idx_balance_reservations_active_expiry
+        ON balance_reservations (expires_at)
+        WHERE status = 'active'
+    """)
+    op.execute("""
+        CREATE INDEX idx_balance_reservations_reference
+        ON balance_reservations (reference_id, reference_type)
+    """)
+
+    # Pending transfers reserved balance before holds existed
+    op.execute("""
+        INSERT INTO balance_reservations (
+            id, branch_id, currency_id, amount, status, reference_id,
+            reference_type, expires_at, created_by
+        )
+        SELECT gen_random_uuid(), from_branch_id, currency_id, amount, 'active', id,
+               'transfer', NOW() + INTERVAL '72 hours', user_id
+        FROM transactions
+        WHERE transaction_type = 'transfer'
+          AND status IN ('pending', 'in_transit')
+          AND amount > 0
+    """)
+
+
+def downgrade() -> None:
+    """Drop balance_reservations (reserved balances are left as they are)"""
+
+    op.execute("DROP TABLE IF EXISTS balance_reservations")
+    op.execute("DROP TYPE IF EXISTS reservationstatus")
@@ -0,0 +1,41 @@
+# alembic/versions/015_outbox_events.py
+"""transactional outbox
+
+Revision ID: 015_outbox_events
+Revises: 014_balance_reservations
+Create Date: 2025-02-13 10:00:00.000000
+
+Creates:
+- outbox_events table (BIGSERIAL id gives the order events are applied in)
+- Index on created_at for retention purging
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '015_outbox_events'
+down_revision = '014_balance_reservations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create outbox_events"""
+
+    op.execute("""
+        CREATE TABLE outbox_events (
+            id BIGSERIAL PRIMARY KEY,
+            event_type VARCHAR(100) NOT NULL,
+            aggregate_id UUID,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+    op.execute("COMMENT ON COLUMN outbox_events.event_type IS 'Event name (e.g., ''balance.changed'')'")
+    op.execute("CREATE INDEX idx_outbox_events_created_at ON outbox_events (created_at)")
+
+
+def downgrade() -> None:
+    """Drop outbox_events"""
+
+    op.execute("DROP TABLE IF EXISTS outbox_events")
@@ -0,0 +1,42 @@
+# alembic/versions/016_outbox_published_at.py
+"""outbox stream publishing
+
+Revision ID: 016_outbox_published_at
+Revises: 015_outbox_events
+Create Date: 2025-02-14 10:00:00.000000
+
+Creates:
+- outbox_events.published_at (set once an event reached the Redis stream)
+- Partial index over unpublished event ids
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '016_outbox_published_at'
+down_revision = '015_outbox_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add published_at to outbox_events"""
+
+    op.execute("ALTER TABLE outbox_events ADD COLUMN published_at TIMESTAMP")
+    op.execute("COMMENT ON COLUMN outbox_events.published_at IS 'When the event reached the Redis stream'")
+
+    # Events written before the stream existed are not replayed to it
+    op.execute("UPDATE outbox_events SET published_at = created_at")
+
+    op.execute("""
+        CREATE INDEX idx_outbox_events_unpublished
+        ON outbox_events (id)
+        WHERE published_at IS NULL
+    """)
+
+
+def downgrade() -> None:
+    """Remove published_at from outbox_events"""
+
+    op.execute("DROP INDEX IF EXISTS idx_outbox_events_unpublished")
+    op.execute("ALTER TABLE outbox_events DROP COLUMN IF EXISTS published_at")
@@ -0,0 +1,41 @@
+# alembic/versions/017_vault_transfer_from_branch.py
+"""vault transfer source branch (cash sweeps)
+
+Revision ID: 017_vault_transfer_from_branch
+Revises: 016_outbox_published_at
+Create Date: 2025-02-17 10:00:00.000000
+
+Creates:
+- vault_transfers.from_branch_id: when set, the transfer moves the branch's
+  cash balance (branch_balances) back to the destination vault, instead of
+  the balance of from_vault_id
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '017_vault_transfer_from_branch'
+down_revision = '016_outbox_published_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add from_branch_id to vault_transfers"""
+
+    op.execute("""
+        ALTER TABLE vault_transfers
+        ADD COLUMN from_branch_id UUID REFERENCES branches(id) ON DELETE RESTRICT
+    """)
+    op.execute(
+        "COMMENT ON COLUMN vault_transfers.from_branch_id IS "
+        "'Source branch whose cash balance is swept (NULL if the vault balance moves)'"
+    )
+    op.execute("CREATE INDEX ix_vault_transfers_from_branch_id ON vault_transfers (from_branch_id)")
+
+
+def downgrade() -> None:
+    """Remove from_branch_id from vault_transfers"""
+
+    op.execute("DROP INDEX IF EXISTS ix_vault_transfers_from_branch_id")
+    op.execute("ALTER TABLE vault_transfers DROP COLUMN IF EXISTS from_branch_id")
@@ -0,0 +1,48 @@
+# alembic/versions/018_daily_balance_snapshots.py
+"""daily balance snapshots
+
+Revision ID: 018_daily_balance_snapshots
+Revises: 017_vault_transfer_from_branch
+Create Date: 2025-02-18 10:00:00.000000
+
+Creates:
+- daily_balance_snapshots table: one closing balance per
+  (date, branch or vault, currency), keyed for "all balances on a date"
+- Index on (holder, currency, date) for the nearest snapshot of a position
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '018_daily_balance_snapshots'
+down_revision = '017_vault_transfer_from_branch'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create daily_balance_snapshots"""
+
+    op.execute("""
+        CREATE TABLE daily_balance_snapshots (
+            snapshot_date DATE NOT NULL,
+            holder_type VARCHAR(10) NOT NULL,
+            holder_id UUID NOT NULL,
+            currency_id UUID NOT NULL,
+            balance NUMERIC(15, 2) NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (snapshot_date, holder_type, holder_id, currency_id),
+            CONSTRAINT snapshot_holder_type_check CHECK (holder_type IN ('branch', 'vault'))
+        )
+    """)
+    op.execute("COMMENT ON COLUMN daily_balance_snapshots.balance IS 'Closing balance'")
+    op.execute("""
+        CREATE INDEX idx_daily_balance_snapshots_holder
+        ON daily_balance_snapshots (holder_id, currency_id, snapshot_date)
+    """)
+
+
+def downgrade() -> None:
+    """Drop daily_balance_snapshots"""
+
+    op.execute("DROP TABLE IF EXISTS daily_balance_snapshots")
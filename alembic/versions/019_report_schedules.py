@@ -0,0 +1,63 @@
+# alembic/versions/019_report_schedules.py
+"""report schedules
+
+Revision ID: 019_report_schedules
+Revises: 018_daily_balance_snapshots
+Create Date: 2025-02-19 10:00:00.000000
+
+Creates:
+- report_schedules table: cron-scheduled report definitions with delivery
+  settings and the outcome of the last run
+- Partial index on next_run_at of active schedules (polled by the scheduler)
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '019_report_schedules'
+down_revision = '018_daily_balance_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create report_schedules"""
+
+    op.execute("""
+        CREATE TABLE report_schedules (
+            id UUID PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            report_type VARCHAR(50) NOT NULL,
+            params JSONB NOT NULL DEFAULT '{}'::jsonb,
+            branch_id UUID REFERENCES branches(id) ON DELETE CASCADE,
+            cron_expression VARCHAR(100) NOT NULL,
+            output_format VARCHAR(10) NOT NULL DEFAULT 'pdf',
+            delivery_method VARCHAR(10) NOT NULL DEFAULT 'file',
+            recipients JSONB NOT NULL DEFAULT '[]'::jsonb,
+            next_run_at TIMESTAMP,
+            last_run_at TIMESTAMP,
+            last_status VARCHAR(20),
+            last_error TEXT,
+            last_output_path VARCHAR(500),
+            created_by UUID REFERENCES users(id) ON DELETE SET NULL,
+            is_active BOOLEAN NOT NULL DEFAULT TRUE,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            CONSTRAINT report_schedule_format_check CHECK (output_format IN ('json', 'excel', 'pdf')),
+            CONSTRAINT report_schedule_delivery_check CHECK (delivery_method IN ('file', 'email'))
+        )
+    """)
+    op.execute("COMMENT ON COLUMN report_schedules.cron_expression IS 'Five-field cron schedule, UTC'")
+    op.execute("CREATE INDEX ix_report_schedules_is_active ON report_schedules (is_active)")
+    op.execute("CREATE INDEX ix_report_schedules_created_at ON report_schedules (created_at)")
+    op.execute("""
+        CREATE INDEX idx_report_schedules_due
+        ON report_schedules (next_run_at)
+        WHERE is_active = TRUE
+    """)
+
+
+def downgrade() -> None:
+    """Drop report_schedules"""
+
+    op.execute("DROP TABLE IF EXISTS report_schedules")
@@ -8,14 +8,15 @@ Merged from two versions with naming priority to the second version.
 from typing import AsyncGenerator, Optional, List
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.db.base import get_async_db as get_db  # Import async version as get_db for backward compatibility
 from app.db.models.user import User
+from app.repositories.user_repo import UserRepository
 from app.core.security import decode_token
+from app.core.permissions import permission_bit, permission_mask
 from app.core.exceptions import (
     InvalidTokenError,
     TokenExpiredError,
@@ -83,9 +84,11 @@ async def get_token_from_header_optional(
 async def get_current_user(
     token: str = Depends(get_token_from_header),
     db: AsyncSession = Depends(get_db),
+    request: Request = None,
 ) -> User:
     """
     Main authentication dependency (second version naming retained).
+    The authenticated user is attached to request.state for the audit middleware.
     """
     try:
         payload = decode_token(token)
@@ -107,8 +110,7 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await UserRepository(db).get_auth_principal(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -116,6 +118,9 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        if request is not None:
+            request.state.user = user
+
         return user
 
     except TokenExpiredError:
@@ -165,6 +170,7 @@ async def get_current_superuser(
 async def get_current_user_optional(
     token: Optional[str] = Depends(get_token_from_header_optional),
     db: AsyncSession = Depends(get_db),
+    request: Request = None,
 ) -> Optional[User]:
     """
     Return current user if authenticated; otherwise None.
@@ -173,27 +179,34 @@ async def get_current_user_optional(
     if not token:
         return None
     try:
-        return await get_current_user(token, db)  # reuse strict logic
+        return await get_current_user(token, db, request)  # reuse strict logic
     except HTTPException:
         return None
 
 # ==================== Permission Checks ====================
 
+# Required permissions are compiled to bitsets when the dependency is
+# declared; each request then checks them with a single AND against
+# current_user.permission_mask.
+
 def require_permissions(required_permissions: List[str]):
     """
     Require ALL specified permissions (second version naming retained).
     """
+    required_mask = permission_mask(required_permissions)
+
     async def check_permissions(
         current_user: User = Depends(get_current_active_user),
     ) -> User:
         if current_user.is_superuser:
             return current_user
-        for permission in required_permissions:
-            if not current_user.has_permission(permission):
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Permission denied: {permission} required",
-                )
+        missing_mask = required_mask & ~current_user.permission_mask
+        if missing_mask:
+            missing = next(p for p in required_permissions if missing_mask & permission_bit(p))
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission denied: {missing} required",
+            )
         return current_user
     return check_permissions
 
@@ -201,12 +214,14 @@ def require_permission(permission: str):
     """
     Require a SINGLE permission (from first version).
     """
+    required_bit = permission_bit(permission)
+
     async def checker(
         current_user: User = Depends(get_current_active_user),
     ) -> User:
         if current_user.is_superuser:
             return current_user
-        if not current_user.has_permission(permission):
+        if not current_user.permission_mask & required_bit:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Missing required permission: {permission}",
@@ -218,14 +233,15 @@ def require_any_permission(permissions: List[str]):
     """
     Require at least ONE of the specified permissions (from first version).
     """
+    any_mask = permission_mask(permissions)
+
     async def checker(
         current_user: User = Depends(get_current_active_user),
     ) -> User:
         if current_user.is_superuser:
             return current_user
-        for permission in permissions:
-            if current_user.has_permission(permission):
-                return current_user
+        if current_user.permission_mask & any_mask:
+            return current_user
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"This action requires one of these permissions: {', '.join(permissions)}",
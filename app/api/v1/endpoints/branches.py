@@ -417,10 +417,10 @@ async def get_branch_balances(
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all currency balances for a branch"""
+    """Get all currency balances for a branch (served from the balance read model)"""
     try:
         balance_service = BalanceService(db)
-        balances = await balance_service.get_branch_balances(branch_id)
+        balances = await balance_service.get_branch_balance_views(branch_id)
         currency_service = CurrencyService(db)
 
         balance_responses, total_in_usd, base_code = await serialize_branch_balances(
@@ -5,7 +5,7 @@ RESTful API for customer management, KYC, and document handling
 
 Phase 5.2: Customer Service & API
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
@@ -21,9 +21,10 @@ from app.schemas.customer import (
     CustomerDetailResponse,  # ⬅️ حذفنا CustomerListResponse
     CustomerDocumentCreate, CustomerDocumentResponse,
     CustomerNoteCreate, CustomerNoteResponse,
-    CustomerKYCVerification
+    CustomerKYCVerification, CustomerSearchResult
 )
 from app.schemas.common import PaginatedResponse, paginated, BulkOperationResponse
+from app.core.config import settings
 from app.core.exceptions import NotFoundError, ValidationError, DuplicateError
 from app.utils.logger import get_logger
 
@@ -179,6 +180,10 @@ async def bulk_create_customers(
 
     except HTTPException:
         raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except DuplicateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         logger.error(f"Error in bulk customer creation: {str(e)}")
         raise HTTPException(
@@ -187,6 +192,73 @@ async def bulk_create_customers(
         )
 
 
+@router.post(
+    "/import",
+    response_model=BulkOperationResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Import Customers"
+)
+async def import_customers(
+    rows: List[Dict[str, Any]],
+    branch_id: UUID = Query(..., description="Branch ID where all customers will be registered"),
+    all_or_nothing: bool = Query(False, description="Load nothing if any row is invalid"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Import a large batch of customers
+
+    Rows are validated individually (same rules as customer creation), checked
+    for duplicate national_id / passport_number with a single query, and all
+    valid rows are loaded in one transaction using COPY.
+
+    **Response:**
+    Returns totals and a per-row error report (`index`, `name`, `error`)
+
+    **Permissions:** Authenticated user with customer:create permission
+    """
+    try:
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Import rows cannot be empty"
+            )
+
+        if len(rows) > settings.CUSTOMER_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot import more than {settings.CUSTOMER_IMPORT_MAX_ROWS} customers at once"
+            )
+
+        logger.info(f"Importing {len(rows)} customers at branch {branch_id} by user {current_user.id}")
+
+        service = CustomerService(db)
+        results = await service.import_customers(
+            rows, current_user, branch_id, all_or_nothing=all_or_nothing
+        )
+
+        return BulkOperationResponse(
+            success=results["successful"] > 0 or results["total"] == 0,
+            total=results["total"],
+            successful=results["successful"],
+            failed=results["failed"],
+            errors=results["errors"]
+        )
+
+    except HTTPException:
+        raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except DuplicateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing customers: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to import customers"
+        )
+
+
 @router.get(
     "",
     response_model=PaginatedResponse[CustomerResponse],  # ⬅️ هنا
@@ -253,6 +325,63 @@ async def search_customers(
         )
 
 
+@router.get(
+    "/search",
+    response_model=PaginatedResponse[CustomerSearchResult],
+    summary="Ranked Customer Search"
+)
+async def ranked_customer_search(
+    q: str = Query(..., min_length=1, description="Name (Latin or Arabic), phone, email, ID, passport or customer number"),
+    branch_id: Optional[UUID] = Query(None, description="Filter by branch"),
+    customer_type: Optional[CustomerType] = Query(None, description="Filter by type"),
+    risk_level: Optional[RiskLevel] = Query(None, description="Filter by risk level"),
+    is_verified: Optional[bool] = Query(None, description="Filter by verification status"),
+    is_active: bool = Query(True, description="Filter by active status"),
+    skip: int = Query(0, ge=0, description="Pagination offset"),
+    limit: int = Query(20, ge=1, le=100, description="Pagination limit"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Ranked customer search for counter lookups
+    
+    **Matching:**
+    - Exact national_id / passport_number / customer_number returns that customer (score 1.0)
+    - Otherwise a trigram search over names (including Arabic name), phone, email and IDs,
+      ordered by similarity, tolerant of typos and Arabic letter variants
+    
+    **Returns:** Paginated list of `{customer, score}`
+    
+    **Permissions:** Any authenticated user
+    """
+    try:
+        service = CustomerService(db)
+        results, total = await service.search_customers_ranked(
+            query=q,
+            branch_id=branch_id,
+            customer_type=customer_type,
+            risk_level=risk_level,
+            is_verified=is_verified,
+            is_active=is_active,
+            skip=skip,
+            limit=limit
+        )
+        
+        return paginated(results, total, skip, limit)
+        
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in ranked customer search: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search customers"
+        )
+
+
 @router.get(
     "/{customer_id}",
     response_model=CustomerDetailResponse,
@@ -13,9 +13,10 @@ from sqlalchemy import func, and_
 from app.api.deps import get_current_user, check_permission
 from app.db.base import get_db
 from app.services.report_service import ReportService
+from app.services.balance_alert_service import balance_alert_monitor
 from app.db.models.user import User
 from app.db.models.transaction import Transaction, TransactionStatus, TransactionType
-from app.db.models.branch import Branch, BranchBalance
+from app.db.models.branch import Branch, BranchBalance, BalanceAlertType
 from app.db.models.currency import Currency
 
 router = APIRouter()
@@ -69,9 +70,12 @@ def get_dashboard_overview(
     else:
         active_branches = db.query(Branch).filter(Branch.is_active == True).count()
     
-    # Low balance alerts
-    report_service = ReportService(db)
-    low_balance_alerts = report_service.low_balance_alert_report().get('alert_count', 0)
+    # Low balance alerts (positions below their minimum threshold)
+    if balance_alert_monitor.ready:
+        low_balance_alerts = balance_alert_monitor.count(BalanceAlertType.LOW_BALANCE, branch_id)
+    else:
+        report_service = ReportService(db)
+        low_balance_alerts = report_service.low_balance_alert_report().get('alert_count', 0)
     
     # Pending approvals (transactions requiring approval)
     pending_approvals = db.query(Transaction).filter(
@@ -415,14 +419,17 @@ def get_dashboard_alerts(
     }
     
     # Low balance alerts
-    low_balances = report_service.low_balance_alert_report()
-    for alert in low_balances.get('alerts', []):
-        severity = alert.get('severity', 'warning')
-        alerts[severity].append({
-            "type": "low_balance",
-            "message": f"Low balance in {alert['branch']['name']} - {alert['currency']['code']}: {alert['current_balance']}",
-            "timestamp": datetime.now().isoformat()
-        })
+    if balance_alert_monitor.ready:
+        alerts["warning"].extend(_low_balance_breach_alerts(db))
+    else:
+        low_balances = report_service.low_balance_alert_report()
+        for alert in low_balances.get('alerts', []):
+            severity = 'critical' if alert.get('severity') == 'high' else 'warning'
+            alerts[severity].append({
+                "type": "low_balance",
+                "message": f"Low balance in {alert['branch']['name']} - {alert['currency']['code']}: {alert['current_balance']}",
+                "timestamp": datetime.now().isoformat()
+            })
     
     # Pending approvals
     pending_count = db.query(Transaction).filter(
@@ -455,6 +462,32 @@ def get_dashboard_alerts(
 
 # ==================== HELPER FUNCTIONS ====================
 
+def _low_balance_breach_alerts(db: Session) -> List[Dict[str, Any]]:
+    """Low balance alerts from the balance alert monitor (names looked up for breaches only)"""
+    breaches = balance_alert_monitor.breaches(alert_type=BalanceAlertType.LOW_BALANCE)
+    if not breaches:
+        return []
+    
+    branch_names = dict(db.query(Branch.id, Branch.name).filter(
+        Branch.id.in_({breach.branch_id for breach in breaches})
+    ).all())
+    currency_codes = dict(db.query(Currency.id, Currency.code).filter(
+        Currency.id.in_({breach.currency_id for breach in breaches})
+    ).all())
+    
+    return [
+        {
+            "type": "low_balance",
+            "message": (
+                f"Low balance in {branch_names.get(breach.branch_id, breach.branch_id)} - "
+                f"{currency_codes.get(breach.currency_id, 'UNK')}: {float(breach.balance)}"
+            ),
+            "timestamp": breach.since.isoformat()
+        }
+        for breach in breaches
+    ]
+
+
 def _get_busiest_hour(transactions: List[Transaction]) -> str:
     """Find the hour with most transactions"""
     hour_counts = {}
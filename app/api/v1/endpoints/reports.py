@@ -5,11 +5,14 @@ Phase 8.2: Complete Report API with Export & Dashboard
 """
 
 from datetime import date, datetime, timedelta
-from typing import Optional, List
+from typing import Iterator, Optional, List
+from uuid import UUID
 from io import BytesIO
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 import io
 import os
 
@@ -20,9 +23,14 @@ from app.api.deps import (
     check_permission,
     require_roles
 )
-from app.db.base import get_db
+from app.core.exceptions import ResourceNotFoundError
+from app.db.base import get_db, SessionLocal
 from app.services.report_service import ReportService
 from app.services.report_export_service import ReportExportService
+from app.services.pdf_render_service import render_pdf_file
+from app.services.report_cache_service import report_result_cache
+from app.services.data_export_service import DataExportService, EXPORT_DATASETS, parquet_available
+from app.services.report_schedule_service import ReportScheduleService
 from app.schemas.report import (
     DailySummaryResponse,
     MonthlyRevenueResponse,
@@ -34,7 +42,10 @@ from app.schemas.report import (
     UserActivityResponse,
     AuditTrailResponse,
     ReportExportRequest,
-    ReportExportResponse
+    ReportExportResponse,
+    ReportScheduleCreate,
+    ReportScheduleUpdate,
+    ReportScheduleResponse
 )
 from app.db.models.user import User
 
@@ -47,6 +58,7 @@ router = APIRouter()
 def get_daily_summary(
     branch_id: Optional[str] = Query(None, description="Branch ID (optional)"),
     target_date: Optional[date] = Query(None, description="Target date (default: today)"),
+    fresh: bool = Query(False, description="Bypass the report cache"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -57,11 +69,19 @@ def get_daily_summary(
         branch_id = current_user.branch_id
     
     report_service = ReportService(db)
+    target_date = target_date or date.today()
     
     try:
-        summary = report_service.daily_transaction_summary(
+        summary = report_result_cache.get_or_compute(
+            db, "daily_summary", {"target_date": target_date},
+            lambda: report_service.daily_transaction_summary(
+                branch_id=branch_id,
+                target_date=target_date
+            ),
+            period_start=target_date,
+            period_end=target_date + timedelta(days=1),
             branch_id=branch_id,
-            target_date=target_date or date.today()
+            fresh=fresh
         )
         return summary
     except Exception as e:
@@ -73,6 +93,7 @@ def get_monthly_revenue(
     branch_id: Optional[str] = Query(None),
     year: int = Query(..., description="Year (e.g., 2025)"),
     month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
+    fresh: bool = Query(False, description="Bypass the report cache"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -83,12 +104,20 @@ def get_monthly_revenue(
         branch_id = current_user.branch_id
     
     report_service = ReportService(db)
+    month_start = date(year, month, 1)
     
     try:
-        revenue = report_service.monthly_revenue_report(
+        revenue = report_result_cache.get_or_compute(
+            db, "monthly_revenue", {"year": year, "month": month},
+            lambda: report_service.monthly_revenue_report(
+                branch_id=branch_id,
+                year=year,
+                month=month
+            ),
+            period_start=month_start,
+            period_end=(month_start + timedelta(days=32)).replace(day=1),
             branch_id=branch_id,
-            year=year,
-            month=month
+            fresh=fresh
         )
         return revenue
     except Exception as e:
@@ -99,6 +128,7 @@ def get_monthly_revenue(
 def get_branch_performance(
     start_date: date = Query(..., description="Start date"),
     end_date: date = Query(..., description="End date"),
+    fresh: bool = Query(False, description="Bypass the report cache"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -108,9 +138,16 @@ def get_branch_performance(
     report_service = ReportService(db)
 
     try:
-        performance = report_service.branch_performance_comparison(
-            start_date=start_date,
-            end_date=end_date
+        performance = report_result_cache.get_or_compute(
+            db, "branch_performance", {"start_date": start_date, "end_date": end_date},
+            lambda: report_service.branch_performance_comparison(
+                start_date=start_date,
+                end_date=end_date
+            ),
+            period_start=start_date,
+            period_end=end_date + timedelta(days=1),
+            include_branches=True,
+            fresh=fresh
         )
         return performance
     except Exception as e:
@@ -142,12 +179,56 @@ def get_exchange_trends(
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
 
+@router.get("/rate-volatility")
+def get_rate_volatility(
+    from_currency: str = Query(..., description="From currency code (e.g., USD)"),
+    to_currency: str = Query(..., description="To currency code (e.g., YER)"),
+    period_days: int = Query(30, ge=2, le=3660, description="Days of rate history"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """📈 Exchange Rate Volatility (returns, rolling volatility, percentiles)"""
+    check_permission(current_user, "view_reports")
+
+    report_service = ReportService(db)
+
+    try:
+        return report_service.exchange_rate_volatility_analysis(
+            currency_pair=(from_currency, to_currency),
+            period_days=period_days
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
+
+
+@router.get("/rate-volatility/pairs")
+def get_pair_volatility_summary(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """📈 Rate Volatility of All Currency Pairs"""
+    check_permission(current_user, "view_reports")
+
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+
+    report_service = ReportService(db)
+
+    try:
+        return report_service.currency_pair_volatility_summary(start_date, end_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
+
+
 # ==================== BALANCE REPORTS ====================
 
 @router.get("/balance-snapshot")
 def get_balance_snapshot(
     branch_id: Optional[str] = Query(None),
-    snapshot_date: Optional[date] = Query(None, description="Snapshot date (default: today)"),
+    snapshot_date: Optional[date] = Query(None, description="Snapshot date (default: today, UTC)"),
+    at: Optional[datetime] = Query(None, description="Point in time for branch balances (overrides snapshot_date)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -163,13 +244,16 @@ def get_balance_snapshot(
         if branch_id:
             snapshot = report_service.branch_balance_snapshot(
                 branch_id=branch_id,
-                snapshot_date=snapshot_date or date.today(),
+                snapshot_date=snapshot_date,
+                at=at,
             )
         else:
             snapshot = report_service.vault_balance_summary(
-                snapshot_date=snapshot_date or date.today(),
+                snapshot_date=snapshot_date,
             )
         return snapshot
+    except ResourceNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
@@ -205,6 +289,53 @@ def get_balance_movement(
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
 
+@router.get("/balance-movement/stream")
+def stream_balance_movement(
+    branch_id: Optional[str] = Query(None),
+    currency_code: str = Query(...),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_user),
+):
+    """📊 Balance Movement Report (streamed NDJSON/CSV)"""
+    check_permission(current_user, "view_balances")
+
+    if current_user.role and current_user.role.name == "branch_manager":
+        if branch_id and branch_id != current_user.branch_id:
+            raise HTTPException(status_code=403, detail="Access denied to this branch")
+        branch_id = branch_id or current_user.branch_id
+
+    # The stream outlives request-scoped dependencies, so it owns its session
+    db = SessionLocal()
+    try:
+        chunks = ReportService(db).stream_balance_movement(
+            branch_id=branch_id,
+            currency_code=currency_code,
+            start_date=start_date,
+            end_date=end_date,
+            output_format=format
+        )
+    except Exception as e:
+        db.close()
+        raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
+
+    filename = f"balance_movement_{currency_code}_{start_date}_{end_date}.{format}"
+    return StreamingResponse(
+        _closing_stream(chunks, db),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+def _closing_stream(chunks: Iterator[str], db: Session) -> Iterator[str]:
+    """Yield report chunks, closing the session once the stream ends"""
+    try:
+        yield from chunks
+    finally:
+        db.close()
+
+
 @router.get("/low-balance-alerts")
 def get_low_balance_alerts(
     current_user: User = Depends(get_current_user),
@@ -275,6 +406,58 @@ def get_audit_trail(
 
 # ==================== REPORT EXPORT ====================
 
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    branch_id: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """📥 Dataset Extract (transactions, balance_history, audit) as CSV or Parquet"""
+    check_permission(current_user, "export_reports")
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+    if dataset == "audit":
+        check_permission(current_user, "view_audit_logs")
+
+    if current_user.role and current_user.role.name == "branch_manager":
+        if dataset == "audit" or (branch_id and branch_id != current_user.branch_id):
+            raise HTTPException(status_code=403, detail="Access denied to this branch")
+        branch_id = branch_id or current_user.branch_id
+
+    filename = f"{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+
+    if format == "parquet":
+        if not parquet_available():
+            raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+        try:
+            path = DataExportService(db).write_parquet(dataset, start_date, end_date, branch_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+        return FileResponse(
+            path,
+            media_type="application/vnd.apache.parquet",
+            filename=filename,
+            background=BackgroundTask(os.remove, path)
+        )
+
+    # The stream outlives request-scoped dependencies, so it owns its session
+    stream_db = SessionLocal()
+    try:
+        chunks = DataExportService(stream_db).stream_csv(dataset, start_date, end_date, branch_id)
+    except Exception as e:
+        stream_db.close()
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    return StreamingResponse(
+        _closing_stream(chunks, stream_db),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @router.post("/export")
 def export_report(
     report_type: str,
@@ -330,9 +513,14 @@ def export_report(
             media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             
         elif format == "pdf":
-            content = export_service.export_to_pdf(report_data)
-            filename += ".pdf"
-            media_type = "application/pdf"
+            # Rendered by a worker process into a temp file, removed once sent
+            path = render_pdf_file(report_data)
+            return FileResponse(
+                path,
+                media_type="application/pdf",
+                filename=filename + ".pdf",
+                background=BackgroundTask(os.remove, path)
+            )
             
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
@@ -353,3 +541,100 @@ def export_report(
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+
+# ==================== REPORT SCHEDULES ====================
+
+def _check_schedule_branch(current_user: User, branch_id: Optional[UUID]) -> None:
+    """Branch managers only manage schedules of their own branch"""
+    if current_user.role and current_user.role.name == "branch_manager":
+        if branch_id is None or str(branch_id) != str(current_user.branch_id):
+            raise HTTPException(status_code=403, detail="Access denied to this branch")
+
+
+@router.post("/schedules", response_model=ReportScheduleResponse, status_code=201)
+async def create_report_schedule(
+    data: ReportScheduleCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """⏰ Schedule a report (cron, UTC) for file drop or email delivery"""
+    check_permission(current_user, "reports:schedule")
+
+    if current_user.role and current_user.role.name == "branch_manager":
+        data.branch_id = data.branch_id or current_user.branch_id
+    _check_schedule_branch(current_user, data.branch_id)
+
+    return await ReportScheduleService(db).create_schedule(data, current_user)
+
+
+@router.get("/schedules", response_model=List[ReportScheduleResponse])
+async def list_report_schedules(
+    branch_id: Optional[UUID] = Query(None, description="Branch ID (optional)"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """⏰ List report schedules"""
+    check_permission(current_user, "reports:schedule")
+
+    if current_user.role and current_user.role.name == "branch_manager":
+        branch_id = current_user.branch_id
+
+    return await ReportScheduleService(db).list_schedules(branch_id)
+
+
+@router.get("/schedules/{schedule_id}", response_model=ReportScheduleResponse)
+async def get_report_schedule(
+    schedule_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """⏰ Report schedule with the outcome of its last run"""
+    check_permission(current_user, "reports:schedule")
+
+    schedule = await ReportScheduleService(db).get_schedule(schedule_id)
+    _check_schedule_branch(current_user, schedule.branch_id)
+    return schedule
+
+
+@router.patch("/schedules/{schedule_id}", response_model=ReportScheduleResponse)
+async def update_report_schedule(
+    schedule_id: UUID,
+    data: ReportScheduleUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """⏰ Update a report schedule (a new cron expression reschedules it)"""
+    check_permission(current_user, "reports:schedule")
+
+    service = ReportScheduleService(db)
+    _check_schedule_branch(current_user, (await service.get_schedule(schedule_id)).branch_id)
+    return await service.update_schedule(schedule_id, data)
+
+
+@router.delete("/schedules/{schedule_id}", status_code=204)
+async def delete_report_schedule(
+    schedule_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """⏰ Delete a report schedule"""
+    check_permission(current_user, "reports:schedule")
+
+    service = ReportScheduleService(db)
+    _check_schedule_branch(current_user, (await service.get_schedule(schedule_id)).branch_id)
+    await service.delete_schedule(schedule_id)
+
+
+@router.post("/schedules/{schedule_id}/run", response_model=ReportScheduleResponse)
+async def run_report_schedule_now(
+    schedule_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """⏰ Run a schedule on the scheduler's next poll"""
+    check_permission(current_user, "reports:schedule")
+
+    service = ReportScheduleService(db)
+    _check_schedule_branch(current_user, (await service.get_schedule(schedule_id)).branch_id)
+    return await service.run_now(schedule_id)
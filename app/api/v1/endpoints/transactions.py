@@ -23,13 +23,14 @@ from decimal import Decimal
 from typing import Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_active_user, get_async_db as get_db
 from app.db.models.user import User
 from app.db.models.transaction import TransactionStatus, TransactionType, Transaction
 from app.services.transaction_service import TransactionService
+from app.services.idempotency_service import IdempotencyService
 from app.schemas.transaction import (
     # Income
     IncomeTransactionCreate,
@@ -45,12 +46,17 @@ from app.schemas.transaction import (
     ExchangeTransactionResponse,
     ExchangeCalculationRequest,
     ExchangeCalculationResponse,
+    ExchangeQuoteResponse,
 
     # Transfer
     TransferTransactionCreate,
     TransferTransactionResponse,
     TransferReceiptRequest,
 
+    # Batch
+    TransactionBatchCreate,
+    TransactionBatchResponse,
+
     # Common
     TransactionCancelRequest,
     TransactionFilter,
@@ -61,7 +67,8 @@ from app.schemas.transaction import (
 from app.schemas.common import SuccessResponse, PaginationParams
 from app.utils.logger import get_logger
 from app.schemas.common import PaginatedResponse, paginated
-from app.core.exceptions import ValidationError
+from app.core.config import settings
+from app.core.exceptions import ValidationError, ResourceConflictError
 
 logger = get_logger(__name__)
 
@@ -199,7 +206,13 @@ def _serialize_transaction(transaction: Transaction) -> dict:
 async def create_income_transaction(
     transaction: IncomeTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original transaction"
+    )
 ):
     """
     Create a new income transaction.
@@ -234,18 +247,30 @@ async def create_income_transaction(
 
     try:
         service = TransactionService(db)
-        result = await service.create_income_transaction(
-            transaction=transaction,
-            user_id=current_user.id
-        )
 
-        logger.info(
-            f"Income transaction created: {result.transaction_number}",
-            extra={"transaction_id": str(result.id)}
-        )
+        async def create():
+            result = await service.create_income_transaction(
+                transaction=transaction,
+                user_id=current_user.id,
+                idempotency_key=idempotency_key
+            )
 
-        return _serialize_transaction(result)
+            logger.info(
+                f"Income transaction created: {result.transaction_number}",
+                extra={"transaction_id": str(result.id)}
+            )
+
+            return _serialize_transaction(result)
 
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "transactions.income", transaction, create
+        )
+
+    except ResourceConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValidationError as e:
         logger.error(f"Validation error creating income transaction: {str(e)}")
         raise HTTPException(
@@ -368,7 +393,13 @@ async def get_income_transaction(
 async def create_expense_transaction(
     transaction: ExpenseTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original transaction"
+    )
 ):
     """
     Create a new expense transaction (pending approval).
@@ -395,18 +426,30 @@ async def create_expense_transaction(
     
     try:
         service = TransactionService(db)
-        result = await service.create_expense_transaction(
-            transaction=transaction,
-            user_id=current_user.id
-        )
-        
-        logger.info(
-            f"Expense transaction created: {result.transaction_number} (pending approval)",
-            extra={"transaction_id": str(result.id)}
+
+        async def create():
+            result = await service.create_expense_transaction(
+                transaction=transaction,
+                user_id=current_user.id,
+                idempotency_key=idempotency_key
+            )
+
+            logger.info(
+                f"Expense transaction created: {result.transaction_number} (pending approval)",
+                extra={"transaction_id": str(result.id)}
+            )
+
+            return _serialize_transaction(result)
+
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "transactions.expense", transaction, create
         )
 
-        return _serialize_transaction(result)
-        
+    except ResourceConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error creating expense transaction: {str(e)}")
         raise HTTPException(
@@ -565,6 +608,70 @@ async def get_expense_transaction(
         )
 
 
+# ==================== BATCH POSTING ====================
+
+@router.post(
+    "/batch",
+    response_model=TransactionBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Post Transaction Batch",
+    description="Post many income/expense transactions in one request (back-office batch)"
+)
+async def create_transaction_batch(
+    batch: TransactionBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Post a batch of income and expense transactions.
+    
+    **Permissions Required:** transactions.create
+    
+    Each item carries `transaction_type` ("income" or "expense") plus the
+    fields of the matching single-transaction endpoint. The batch is validated
+    with set-based lookups and written in one database transaction.
+    
+    - `all_or_nothing: true` (default): nothing is posted if any item fails
+    - `all_or_nothing: false`: valid items are posted, failed items reported
+    
+    Errors are reported per item as `{"index": ..., "error": ...}`.
+    """
+    if len(batch.items) > settings.TRANSACTION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot post more than {settings.TRANSACTION_BATCH_MAX_ITEMS} transactions at once"
+        )
+
+    logger.info(
+        f"Posting transaction batch by user {current_user.id}",
+        extra={"user_id": str(current_user.id), "items": len(batch.items)}
+    )
+
+    try:
+        service = TransactionService(db)
+        results = await service.create_transactions_batch(
+            items=batch.items,
+            user_id=current_user.id,
+            all_or_nothing=batch.all_or_nothing
+        )
+
+        return TransactionBatchResponse(
+            success=results["failed"] == 0,
+            total=results["total"],
+            successful=results["successful"],
+            failed=results["failed"],
+            errors=results["errors"],
+            created=results["created"]
+        )
+
+    except Exception as e:
+        logger.error(f"Error posting transaction batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 # ==================== EXCHANGE TRANSACTIONS ====================
 
 @router.post(
@@ -619,6 +726,39 @@ async def preview_exchange_rate(
         )
 
 
+@router.post(
+    "/exchange/quote",
+    response_model=ExchangeQuoteResponse,
+    summary="Get Exchange Quote",
+    description="Calculate an exchange and lock its rate for a short time"
+)
+async def get_exchange_quote(
+    calculation: ExchangeCalculationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Quote an exchange with a locked rate.
+    
+    Returns the same amounts as the rate preview plus a `quote_id` and
+    `expires_at`. Send the `quote_id` with the exchange transaction before
+    it expires to execute at the quoted rate; the currencies, amount and
+    commission must match the quote.
+    """
+    try:
+        service = TransactionService(db)
+        quote = await service.create_exchange_quote(calculation, current_user.id)
+        
+        return quote.to_dict()
+        
+    except Exception as e:
+        logger.error(f"Error creating exchange quote: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.post(
     "/exchange",
     response_model=ExchangeTransactionResponse,
@@ -629,7 +769,13 @@ async def preview_exchange_rate(
 async def create_exchange_transaction(
     transaction: ExchangeTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original transaction"
+    )
 ):
     """
     Execute a currency exchange transaction.
@@ -666,18 +812,30 @@ async def create_exchange_transaction(
     
     try:
         service = TransactionService(db)
-        result = await service.create_exchange_transaction(
-            transaction=transaction,
-            user_id=current_user.id
-        )
-        
-        logger.info(
-            f"Exchange transaction created: {result.transaction_number}",
-            extra={"transaction_id": str(result.id)}
+
+        async def create():
+            result = await service.create_exchange_transaction(
+                transaction=transaction,
+                user_id=current_user.id,
+                idempotency_key=idempotency_key
+            )
+
+            logger.info(
+                f"Exchange transaction created: {result.transaction_number}",
+                extra={"transaction_id": str(result.id)}
+            )
+
+            return _serialize_transaction(result)
+
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "transactions.exchange", transaction, create
         )
 
-        return _serialize_transaction(result)
-        
+    except ResourceConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error creating exchange transaction: {str(e)}")
         raise HTTPException(
@@ -796,7 +954,13 @@ async def get_exchange_transaction(
 async def create_transfer_transaction(
     transaction: TransferTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original transaction"
+    )
 ):
     """
     Initiate a transfer transaction.
@@ -836,18 +1000,30 @@ async def create_transfer_transaction(
     
     try:
         service = TransactionService(db)
-        result = await service.create_transfer_transaction(
-            transaction=transaction,
-            user_id=current_user.id
-        )
-        
-        logger.info(
-            f"Transfer initiated: {result.transaction_number}",
-            extra={"transaction_id": str(result.id)}
+
+        async def create():
+            result = await service.create_transfer_transaction(
+                transaction=transaction,
+                user_id=current_user.id,
+                idempotency_key=idempotency_key
+            )
+
+            logger.info(
+                f"Transfer initiated: {result.transaction_number}",
+                extra={"transaction_id": str(result.id)}
+            )
+
+            return _serialize_transaction(result)
+
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "transactions.transfer", transaction, create
         )
 
-        return _serialize_transaction(result)
-        
+    except ResourceConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error creating transfer transaction: {str(e)}")
         raise HTTPException(
@@ -51,6 +51,7 @@ from app.schemas.user import (
     AdminPasswordReset
 )
 from app.schemas.common import BulkOperationResponse, PaginatedResponse, paginated
+from app.core.config import settings
 from app.core.exceptions import (
     ResourceNotFoundError,
     ValidationError,
@@ -219,10 +220,10 @@ async def bulk_create_users(
                 detail="Users list cannot be empty"
             )
 
-        if len(users) > 100:
+        if len(users) > settings.USER_BULK_MAX_ROWS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot create more than 100 users at once"
+                detail=f"Cannot create more than {settings.USER_BULK_MAX_ROWS} users at once"
             )
 
         logger.info(f"Bulk creating {len(users)} users by {current_user.email}")
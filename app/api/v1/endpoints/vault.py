@@ -8,6 +8,7 @@ Complete vault management endpoints:
 - Vault-to-branch transfers
 - Branch-to-vault transfers
 - Transfer approval workflow
+- Threshold-based cash distribution to branches
 - Balance reconciliation
 - Vault statistics and reports
 
@@ -29,7 +30,7 @@ Business Rules:
 from typing import List, Optional
 from datetime import datetime, timedelta
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_async_db, get_current_user, require_permissions
@@ -37,6 +38,8 @@ from app.db.models.user import User
 from app.db.models.vault import VaultTransferStatus, VaultTransferType
 from app.services.currency_service import CurrencyService
 from app.services.vault_service import VaultService
+from app.services.idempotency_service import IdempotencyService
+from app.core.exceptions import ResourceConflictError
 from app.schemas.vault import (
     VaultCreate, VaultUpdate, VaultResponse, VaultListResponse,
     VaultBalanceResponse, VaultBalanceUpdate,
@@ -44,7 +47,8 @@ from app.schemas.vault import (
     BranchToVaultTransferCreate, TransferApproval,
     VaultTransferResponse, VaultTransferListResponse, TransferQuery,
     VaultReconciliationRequest, VaultReconciliationReport,
-    VaultStatistics, VaultTransferSummary
+    VaultStatistics, VaultTransferSummary,
+    CashDistributionRequest, CashDistributionPlan
 )
 from app.schemas.common import PaginatedResponse, paginated
 
@@ -360,7 +364,13 @@ async def adjust_vault_balance(
 async def transfer_vault_to_vault(
     transfer_data: VaultToVaultTransferCreate,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original response"
+    )
 ):
     """
     Transfer funds between two vaults
@@ -369,26 +379,36 @@ async def transfer_vault_to_vault(
     **Approval:** Required if amount >= threshold
     """
     vault_service = VaultService(db)
-    transfer = await vault_service.transfer_vault_to_vault(transfer_data, current_user)
-    
-    return VaultTransferResponse(
-        id=transfer.id,
-        transfer_number=transfer.transfer_number,
-        from_vault_id=transfer.from_vault_id,
-        to_vault_id=transfer.to_vault_id,
-        to_branch_id=transfer.to_branch_id,
-        currency_id=transfer.currency_id,
-        amount=transfer.amount,
-        transfer_type=transfer.transfer_type,
-        status=transfer.status,
-        initiated_by=transfer.initiated_by,
-        approved_by=transfer.approved_by,
-        received_by=transfer.received_by,
-        initiated_at=transfer.initiated_at,
-        approved_at=transfer.approved_at,
-        completed_at=transfer.completed_at,
-        notes=transfer.notes
-    )
+
+    async def execute():
+        transfer = await vault_service.transfer_vault_to_vault(transfer_data, current_user)
+
+        return VaultTransferResponse(
+            id=transfer.id,
+            transfer_number=transfer.transfer_number,
+            from_vault_id=transfer.from_vault_id,
+            to_vault_id=transfer.to_vault_id,
+            to_branch_id=transfer.to_branch_id,
+            from_branch_id=transfer.from_branch_id,
+            currency_id=transfer.currency_id,
+            amount=transfer.amount,
+            transfer_type=transfer.transfer_type,
+            status=transfer.status,
+            initiated_by=transfer.initiated_by,
+            approved_by=transfer.approved_by,
+            received_by=transfer.received_by,
+            initiated_at=transfer.initiated_at,
+            approved_at=transfer.approved_at,
+            completed_at=transfer.completed_at,
+            notes=transfer.notes
+        )
+
+    try:
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "vault.transfer_vault_to_vault", transfer_data, execute
+        )
+    except ResourceConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @router.post(
@@ -401,7 +421,13 @@ async def transfer_vault_to_vault(
 async def transfer_to_branch(
     transfer_data: VaultToBranchTransferCreate,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original response"
+    )
 ):
     """
     Transfer funds from vault to branch
@@ -410,26 +436,36 @@ async def transfer_to_branch(
     **Approval:** Required if amount >= threshold
     """
     vault_service = VaultService(db)
-    transfer = await vault_service.transfer_to_branch(transfer_data, current_user)
-    
-    return VaultTransferResponse(
-        id=transfer.id,
-        transfer_number=transfer.transfer_number,
-        from_vault_id=transfer.from_vault_id,
-        to_vault_id=transfer.to_vault_id,
-        to_branch_id=transfer.to_branch_id,
-        currency_id=transfer.currency_id,
-        amount=transfer.amount,
-        transfer_type=transfer.transfer_type,
-        status=transfer.status,
-        initiated_by=transfer.initiated_by,
-        approved_by=transfer.approved_by,
-        received_by=transfer.received_by,
-        initiated_at=transfer.initiated_at,
-        approved_at=transfer.approved_at,
-        completed_at=transfer.completed_at,
-        notes=transfer.notes
-    )
+
+    async def execute():
+        transfer = await vault_service.transfer_to_branch(transfer_data, current_user)
+
+        return VaultTransferResponse(
+            id=transfer.id,
+            transfer_number=transfer.transfer_number,
+            from_vault_id=transfer.from_vault_id,
+            to_vault_id=transfer.to_vault_id,
+            to_branch_id=transfer.to_branch_id,
+            from_branch_id=transfer.from_branch_id,
+            currency_id=transfer.currency_id,
+            amount=transfer.amount,
+            transfer_type=transfer.transfer_type,
+            status=transfer.status,
+            initiated_by=transfer.initiated_by,
+            approved_by=transfer.approved_by,
+            received_by=transfer.received_by,
+            initiated_at=transfer.initiated_at,
+            approved_at=transfer.approved_at,
+            completed_at=transfer.completed_at,
+            notes=transfer.notes
+        )
+
+    try:
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "vault.transfer_to_branch", transfer_data, execute
+        )
+    except ResourceConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @router.post(
@@ -442,7 +478,13 @@ async def transfer_to_branch(
 async def transfer_from_branch(
     transfer_data: BranchToVaultTransferCreate,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original response"
+    )
 ):
     """
     Transfer funds from branch to vault
@@ -450,26 +492,36 @@ async def transfer_from_branch(
     **Permissions:** Manager or Admin
     """
     vault_service = VaultService(db)
-    transfer = await vault_service.transfer_from_branch(transfer_data, current_user)
-    
-    return VaultTransferResponse(
-        id=transfer.id,
-        transfer_number=transfer.transfer_number,
-        from_vault_id=transfer.from_vault_id,
-        to_vault_id=transfer.to_vault_id,
-        to_branch_id=transfer.to_branch_id,
-        currency_id=transfer.currency_id,
-        amount=transfer.amount,
-        transfer_type=transfer.transfer_type,
-        status=transfer.status,
-        initiated_by=transfer.initiated_by,
-        approved_by=transfer.approved_by,
-        received_by=transfer.received_by,
-        initiated_at=transfer.initiated_at,
-        approved_at=transfer.approved_at,
-        completed_at=transfer.completed_at,
-        notes=transfer.notes
-    )
+
+    async def execute():
+        transfer = await vault_service.transfer_from_branch(transfer_data, current_user)
+
+        return VaultTransferResponse(
+            id=transfer.id,
+            transfer_number=transfer.transfer_number,
+            from_vault_id=transfer.from_vault_id,
+            to_vault_id=transfer.to_vault_id,
+            to_branch_id=transfer.to_branch_id,
+            from_branch_id=transfer.from_branch_id,
+            currency_id=transfer.currency_id,
+            amount=transfer.amount,
+            transfer_type=transfer.transfer_type,
+            status=transfer.status,
+            initiated_by=transfer.initiated_by,
+            approved_by=transfer.approved_by,
+            received_by=transfer.received_by,
+            initiated_at=transfer.initiated_at,
+            approved_at=transfer.approved_at,
+            completed_at=transfer.completed_at,
+            notes=transfer.notes
+        )
+
+    try:
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "vault.transfer_from_branch", transfer_data, execute
+        )
+    except ResourceConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 # ==================== TRANSFER WORKFLOW ====================
@@ -500,6 +552,7 @@ async def approve_transfer(
         from_vault_id=transfer.from_vault_id,
         to_vault_id=transfer.to_vault_id,
         to_branch_id=transfer.to_branch_id,
+        from_branch_id=transfer.from_branch_id,
         currency_id=transfer.currency_id,
         amount=transfer.amount,
         transfer_type=transfer.transfer_type,
@@ -540,6 +593,7 @@ async def complete_transfer(
         from_vault_id=transfer.from_vault_id,
         to_vault_id=transfer.to_vault_id,
         to_branch_id=transfer.to_branch_id,
+        from_branch_id=transfer.from_branch_id,
         currency_id=transfer.currency_id,
         amount=transfer.amount,
         transfer_type=transfer.transfer_type,
@@ -580,6 +634,7 @@ async def cancel_transfer(
         from_vault_id=transfer.from_vault_id,
         to_vault_id=transfer.to_vault_id,
         to_branch_id=transfer.to_branch_id,
+        from_branch_id=transfer.from_branch_id,
         currency_id=transfer.currency_id,
         amount=transfer.amount,
         transfer_type=transfer.transfer_type,
@@ -677,6 +732,7 @@ async def get_transfer(
         from_vault_id=transfer.from_vault_id,
         to_vault_id=transfer.to_vault_id,
         to_branch_id=transfer.to_branch_id,
+        from_branch_id=transfer.from_branch_id,
         currency_id=transfer.currency_id,
         amount=transfer.amount,
         transfer_type=transfer.transfer_type,
@@ -692,6 +748,49 @@ async def get_transfer(
     )
 
 
+# ==================== CASH DISTRIBUTION ====================
+
+@router.post(
+    "/distribution",
+    response_model=CashDistributionPlan,
+    summary="Plan or run a cash distribution to branches",
+    dependencies=[Depends(require_permissions(["vault:transfer"]))]
+)
+async def distribute_cash(
+    distribution_data: CashDistributionRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=100,
+        description="Client request key; retries with the same key return the original response"
+    )
+):
+    """
+    Plan top-ups and sweeps of every branch against its balance thresholds
+
+    Branches below their minimum threshold are topped up from the vault and
+    branches above their maximum are swept back to it. With `execute=false`
+    (default) only the plan is returned; with `execute=true` all planned
+    transfers are created, approved and applied as one run.
+
+    **Permissions:** Manager or Admin (approval rights required to execute)
+    """
+    vault_service = VaultService(db)
+
+    async def execute():
+        plan = await vault_service.distribute_cash(distribution_data, current_user)
+        return CashDistributionPlan(**plan)
+
+    try:
+        return await IdempotencyService(db).execute(
+            current_user.id, idempotency_key, "vault.distribute_cash", distribution_data, execute
+        )
+    except ResourceConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
 # ==================== RECONCILIATION ====================
 
 @router.post(
@@ -788,22 +887,25 @@ async def get_reconciliation(
 )
 async def get_vault_statistics(
     vault_id: Optional[UUID] = Query(None),
+    fresh: bool = Query(False, description="Bypass the cached statistics snapshot"),
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get comprehensive vault statistics
+
+    Served from a short-lived per-vault snapshot unless `fresh=true`.
     
     **Permissions:** Any authenticated user
     """
     vault_service = VaultService(db)
 
     if vault_id:
-        stats = await vault_service.get_vault_statistics(vault_id)
+        stats = await vault_service.get_vault_statistics(vault_id, use_cache=not fresh)
     else:
         # Get main vault stats
         main_vault = await vault_service.get_main_vault()
-        stats = await vault_service.get_vault_statistics(main_vault.id)
+        stats = await vault_service.get_vault_statistics(main_vault.id, use_cache=not fresh)
     
     return VaultStatistics(**stats)
 
@@ -150,6 +150,13 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
     
+    # Audit Log Pipeline
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_QUEUE_MAX_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: int = 1000
+    AUDIT_SPILL_DIR: str = "logs/audit_spill"
+    
     # Transaction Settings
     TRANSACTION_NUMBER_PREFIX: str = "TRX"
     VAULT_TRANSFER_PREFIX: str = "VTR"
@@ -160,6 +167,84 @@ class Settings(BaseSettings):
     DEFAULT_BASE_CURRENCY: str = "USD"
     COMMISSION_RATE: float = 0.01
     LARGE_TRANSFER_THRESHOLD: float = 10000.0
+    CUSTOMER_IMPORT_MAX_ROWS: int = 50000
+    USER_BULK_MAX_ROWS: int = 1000
+    TRANSACTION_BATCH_MAX_ITEMS: int = 5000
+
+    # Window for fingerprint-based duplicate transaction detection
+    DUPLICATE_TRANSACTION_WINDOW_MINUTES: int = 5
+
+    # Idempotency-Key handling for money-moving endpoints
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_IN_FLIGHT_TIMEOUT_SECONDS: int = 120
+
+    # Exchange quotes: how long a quoted rate is honoured, and store size
+    EXCHANGE_QUOTE_TTL_SECONDS: int = 30
+    EXCHANGE_QUOTE_MAX_ENTRIES: int = 10000
+
+    # Balance holds: pending transfer hold lifetime and expired-hold sweeper
+    BALANCE_TRANSFER_HOLD_TTL_HOURS: int = 72
+    BALANCE_HOLD_SWEEP_INTERVAL_SECONDS: int = 60
+    BALANCE_HOLD_SWEEP_BATCH_SIZE: int = 500
+
+    # Transactional outbox relay and the balance read model it feeds
+    OUTBOX_POLL_INTERVAL_MS: int = 500
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_RETENTION_HOURS: int = 24
+    BALANCE_READ_MODEL_MAX_STALENESS_SECONDS: float = 5.0
+
+    # Balance alerts: full resync of the breached-position index
+    BALANCE_ALERT_RESYNC_SECONDS: int = 300
+
+    # Outbox events published to a Redis stream (REDIS_* connection settings)
+    OUTBOX_REDIS_STREAM_ENABLED: bool = False
+    OUTBOX_REDIS_STREAM: str = "cems:events"
+    OUTBOX_REDIS_STREAM_MAXLEN: int = 100000
+
+    # End-of-day balance snapshots: job on/off and how often it checks
+    BALANCE_SNAPSHOT_ENABLED: bool = True
+    BALANCE_SNAPSHOT_CHECK_SECONDS: int = 300
+
+    # Cached vault statistics snapshot per vault (0 = always query)
+    VAULT_STATISTICS_CACHE_SECONDS: int = 60
+
+    # PDF report rendering (0 workers = render in the API process)
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_TIMEOUT_SECONDS: int = 120
+    PDF_TABLE_CHUNK_ROWS: int = 500
+    PDF_MAX_ROWS: int = 20000
+    # TTF fonts with Arabic coverage (empty = built-in Helvetica)
+    PDF_FONT_PATH: str = ""
+    PDF_BOLD_FONT_PATH: str = ""
+
+    # Report result cache: entry lifetime, size, and how long closed-period
+    # results are served before their watermark is checked again (0 TTL = off)
+    REPORT_CACHE_TTL_SECONDS: int = 3600
+    REPORT_CACHE_MAX_ENTRIES: int = 500
+    REPORT_CACHE_CLOSED_RECHECK_SECONDS: int = 300
+
+    # Dataset exports: rows per cursor batch / Parquet row group, Parquet codec
+    EXPORT_BATCH_ROWS: int = 10000
+    EXPORT_PARQUET_COMPRESSION: str = "zstd"
+
+    # Scheduled reports: due-schedule poll interval, worker threads, file drop
+    REPORT_SCHEDULER_ENABLED: bool = True
+    REPORT_SCHEDULER_POLL_SECONDS: int = 60
+    REPORT_SCHEDULER_WORKERS: int = 2
+    REPORT_OUTPUT_DIR: str = "reports_output"
+
+    # Daily transaction limit window: "calendar_day" (UTC) or "rolling_24h"
+    TRANSACTION_LIMIT_WINDOW: str = "calendar_day"
+
+    @field_validator("TRANSACTION_LIMIT_WINDOW")
+    def validate_limit_window(cls, v: str) -> str:
+        """Only the two supported limit windows are accepted"""
+        if v not in ("calendar_day", "rolling_24h"):
+            raise ValueError("TRANSACTION_LIMIT_WINDOW must be 'calendar_day' or 'rolling_24h'")
+        return v
+    
+    # Bulk password hashing (0 = one worker process per CPU)
+    PASSWORD_HASH_WORKERS: int = 0
     
     # Model Config
     model_config = SettingsConfigDict(
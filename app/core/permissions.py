@@ -3,7 +3,8 @@ Permission System
 Centralized permission definitions and management
 """
 
-from typing import List, Dict, Set
+from functools import lru_cache
+from typing import List, Dict, Set, FrozenSet, Iterable
 from enum import Enum
 
 
@@ -142,12 +143,20 @@ ALL_PERMISSIONS: Dict[str, List[str]] = {
         "restore",         # Restore from backup
         "maintenance",     # System maintenance mode
     ],
-    "reports": [
-        "view_branch",      # View own branch reports
-        "view_all",         # View all branch reports
-        "export",           # Export reports
-        "generate",         # Generate custom reports
-    ]
+}
+
+
+# ==================== Permission Hierarchy ====================
+
+# Higher-level actions imply these actions within the same category
+PERMISSION_HIERARCHY: Dict[str, List[str]] = {
+    "read": [],  # Read is base level
+    "create": ["read"],
+    "update": ["read"],
+    "delete": ["read", "update"],
+    "approve": ["read", "update"],
+    "manage": ["read", "create", "update", "delete"],
+    "view_all": ["read", "view_branch", "view_own"],
 }
 
 
@@ -352,17 +361,6 @@ def check_permission_hierarchy(user_permissions: List[str], required_permission:
     # Parse required permission
     category, action = parse_permission(required_permission)
     
-    # Define permission hierarchies
-    hierarchies = {
-        "read": [],  # Read is base level
-        "create": ["read"],
-        "update": ["read"],
-        "delete": ["read", "update"],
-        "approve": ["read", "update"],
-        "manage": ["read", "create", "update", "delete"],
-        "view_all": ["read", "view_branch", "view_own"],
-    }
-    
     # Check if user has higher-level permissions
     for user_permission in user_permissions:
         user_category, user_action = parse_permission(user_permission)
@@ -370,12 +368,108 @@ def check_permission_hierarchy(user_permissions: List[str], required_permission:
         # Same category check
         if user_category == category:
             # Check if user's action implies required action
-            if action in hierarchies.get(user_action, []):
+            if action in PERMISSION_HIERARCHY.get(user_action, []):
                 return True
     
     return False
 
 
+# ==================== Compiled Permissions ====================
+#
+# Every permission string gets a small integer ID (catalog permissions
+# first, any other string on first use). A set of permissions compiles to
+# an int bitset with hierarchy and wildcards already expanded, so a check
+# is a single AND:
+#
+#     compile_permissions(role_permissions) & permission_bit("users:read")
+#
+# Wildcards: "*" grants every catalog permission, "users:*" every catalog
+# permission of the "users" category.
+
+WILDCARD = "*"
+
+_permission_ids: Dict[str, int] = {
+    permission: index
+    for index, permission in enumerate(get_all_permissions_list())
+}
+
+
+def permission_id(permission: str) -> int:
+    """
+    Get the integer ID of a permission (assigned on first use if not in catalog)
+    
+    Args:
+        permission: Permission string
+        
+    Returns:
+        int: Stable ID for the lifetime of the process
+    """
+    pid = _permission_ids.get(permission)
+    if pid is None:
+        pid = _permission_ids.setdefault(permission, len(_permission_ids))
+    return pid
+
+
+def permission_bit(permission: str) -> int:
+    """Get the single-bit mask of a permission"""
+    return 1 << permission_id(permission)
+
+
+def permission_mask(permissions: Iterable[str]) -> int:
+    """Combine permissions into a mask without hierarchy expansion (for requirements)"""
+    mask = 0
+    for permission in permissions:
+        mask |= permission_bit(permission)
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def compile_permissions(permissions: FrozenSet[str]) -> int:
+    """
+    Compile granted permissions into an effective permission bitset
+    
+    Expands wildcards and PERMISSION_HIERARCHY (e.g. 'users:update' also
+    grants 'users:read'). Cached per distinct permission set, so each role
+    version is compiled once.
+    
+    Args:
+        permissions: Permissions granted (e.g. a role's permission list)
+        
+    Returns:
+        int: Effective permission bitset
+    """
+    effective: Set[str] = set()
+    
+    for permission in permissions:
+        if permission == WILDCARD:
+            effective.update(get_all_permissions_list())
+            continue
+        
+        effective.add(permission)
+        if ":" not in permission:
+            continue
+        
+        category, action = permission.split(":", 1)
+        if action == WILDCARD:
+            effective.update(get_permissions_by_category(category))
+    
+    # Hierarchy is applied after wildcard expansion so 'users:*' also grants
+    # the actions implied by its members
+    for permission in list(effective):
+        if ":" not in permission:
+            continue
+        category, action = permission.split(":", 1)
+        for implied in PERMISSION_HIERARCHY.get(action, []):
+            effective.add(format_permission(category, implied))
+    
+    return permission_mask(effective)
+
+
+def has_compiled_permission(mask: int, permission: str) -> bool:
+    """Check one permission against a compiled bitset"""
+    return bool(mask & permission_bit(permission))
+
+
 # ==================== Permission Groups ====================
 
 class PermissionGroup:
@@ -445,6 +539,13 @@ __all__ = [
     "validate_permission",
     "get_role_permissions",
     "check_permission_hierarchy",
+    "PERMISSION_HIERARCHY",
+    "WILDCARD",
+    "permission_id",
+    "permission_bit",
+    "permission_mask",
+    "compile_permissions",
+    "has_compiled_permission",
     "PermissionGroup",
     "MIN_PERMISSIONS",
 ]
\ No newline at end of file
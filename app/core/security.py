@@ -3,8 +3,11 @@ Security Utilities
 Password hashing and JWT token management
 """
 
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -45,6 +48,57 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# ==================== Bulk Password Hashing ====================
+
+# Worker processes for bulk hashing (bcrypt is CPU-bound), created on first use
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    """Return the shared password hashing process pool"""
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS or None)
+    return _hash_pool
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords in parallel without blocking the event loop
+    
+    Hashes run in a process pool; if the pool is unavailable they fall back
+    to the default thread executor.
+    
+    Args:
+        passwords: Plain text passwords
+        
+    Returns:
+        List[str]: Hashes in the same order as the input
+    """
+    if not passwords:
+        return []
+
+    loop = asyncio.get_running_loop()
+    try:
+        pool = _get_hash_pool()
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(pool, get_password_hash, password) for password in passwords)
+        ))
+    except (BrokenProcessPool, OSError, RuntimeError):
+        shutdown_password_hash_pool()
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(None, get_password_hash, password) for password in passwords)
+        ))
+
+
+def shutdown_password_hash_pool() -> None:
+    """Stop the password hashing worker processes (application shutdown)"""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
 # ==================== JWT Token Management ====================
 
 def create_access_token(
@@ -15,8 +15,8 @@ from app.db.models.rate_update_request import RateUpdateRequest, UpdateRequestSt
 # Phase 4: Branch Management
 # from app.db.models.branch import Branch, BranchBalance, BranchBalanceHistory
 from app.db.models.branch import (
-    Branch, BranchBalance, BranchBalanceHistory, BranchAlert,
-    RegionEnum, BalanceAlertType, AlertSeverity, BalanceChangeType
+    Branch, BranchBalance, BranchBalanceHistory, BranchAlert, BalanceReservation,
+    RegionEnum, BalanceAlertType, AlertSeverity, BalanceChangeType, ReservationStatus
 )
 
 # Phase 5: Customer Management
@@ -42,6 +42,7 @@ from app.db.models.transaction import (
     IncomeCategory,
     ExpenseCategory,
     TransferType,
+    TransactionLimitCounter,
     TransactionNumberGenerator
 )
 # Phase 7: Vault Management
@@ -61,6 +62,10 @@ from app.db.models.vault import (
 
 # Phase 9: Audit & Logging
 from app.db.models.audit import AuditLog
+from app.db.models.idempotency import IdempotencyRecord
+from app.db.models.outbox import OutboxEvent
+from app.db.models.balance_snapshot import DailyBalanceSnapshot, SnapshotHolderType
+from app.db.models.report_schedule import ReportSchedule, ReportDeliveryMethod, ReportRunStatus
 
 # ==================== Export All Models ====================
 __all__ = [
@@ -86,10 +91,12 @@ __all__ = [
     "BranchBalance", 
     "BranchBalanceHistory",
     "BranchAlert",
+    "BalanceReservation",
     "RegionEnum",
     "BalanceAlertType",
     "AlertSeverity",
     "BalanceChangeType",
+    "ReservationStatus",
     # Customer Management
     # "Customer",
     # "CustomerDocument",
@@ -114,6 +121,7 @@ __all__ = [
     "IncomeCategory",
     "ExpenseCategory",
     "TransferType",
+    "TransactionLimitCounter",
     "TransactionNumberGenerator",
     # Vault Management
     # "Vault",
@@ -131,6 +139,13 @@ __all__ = [
     
     # Audit & Logging
     "AuditLog",
+    "IdempotencyRecord",
+    "OutboxEvent",
+    "DailyBalanceSnapshot",
+    "SnapshotHolderType",
+    "ReportSchedule",
+    "ReportDeliveryMethod",
+    "ReportRunStatus",
 ]
 
 
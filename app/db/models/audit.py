@@ -4,7 +4,7 @@ Tracks all system activities and changes for audit trail
 """
 
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -89,7 +89,13 @@ class AuditLog(BaseModel):
     )
 
     # Relationships
-    user = relationship("User", foreign_keys=[user_id], lazy="joined")
+    # Not joined by default: audit queries return many rows and rarely need
+    # the user object (use joinedload(AuditLog.user) where they do)
+    user = relationship("User", foreign_keys=[user_id])
+
+    __table_args__ = (
+        Index('idx_audit_entity_timestamp', 'entity_type', 'entity_id', 'timestamp'),
+    )
 
     def __repr__(self):
         return f"<AuditLog(action={self.action}, entity_type={self.entity_type}, user_id={self.user_id})>"
@@ -0,0 +1,49 @@
+"""
+Daily Balance Snapshot Model
+End-of-day balance of every branch and vault position
+"""
+
+from datetime import datetime
+from enum import Enum as PyEnum
+from sqlalchemy import Column, Date, DateTime, Numeric, String, Index, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+
+from app.db.base import Base
+
+
+class SnapshotHolderType(str, PyEnum):
+    """Kind of balance holder a snapshot row belongs to"""
+    BRANCH = "branch"
+    VAULT = "vault"
+
+
+class DailyBalanceSnapshot(Base):
+    """
+    Daily Balance Snapshot Model
+
+    One compact row per (date, holder, currency), written once a day by the
+    snapshot job. A branch balance at any later point is the nearest
+    snapshot plus the branch_balance_history movements since; vault
+    balances have no history and are read from the snapshot directly.
+    """
+
+    __tablename__ = "daily_balance_snapshots"
+
+    snapshot_date = Column(Date, primary_key=True, comment="Day the balance closed")
+    holder_type = Column(String(10), primary_key=True, comment="'branch' or 'vault'")
+    holder_id = Column(PGUUID(as_uuid=True), primary_key=True, comment="Branch or vault ID")
+    currency_id = Column(PGUUID(as_uuid=True), primary_key=True)
+
+    balance = Column(Numeric(precision=15, scale=2), nullable=False, comment="Closing balance")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        CheckConstraint("holder_type IN ('branch', 'vault')", name='snapshot_holder_type_check'),
+        Index('idx_daily_balance_snapshots_holder', 'holder_id', 'currency_id', 'snapshot_date'),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<DailyBalanceSnapshot(date={self.snapshot_date}, {self.holder_type}={self.holder_id}, "
+            f"balance={self.balance})>"
+        )
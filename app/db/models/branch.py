@@ -62,6 +62,14 @@ class BalanceChangeType(str, PyEnum):
     INITIAL_BALANCE = "initial_balance"
 
 
+class ReservationStatus(str, PyEnum):
+    """Lifecycle of a balance reservation (hold)"""
+    ACTIVE = "active"
+    COMMITTED = "committed"
+    RELEASED = "released"
+    EXPIRED = "expired"
+
+
 # ==================== Models ====================
 
 class Branch(BaseModel, UserTrackingMixin):
@@ -447,6 +455,92 @@ class BranchBalanceHistory(BaseModel):
         return f"<BranchBalanceHistory(branch_id={self.branch_id}, amount={self.amount}, type={self.change_type})>"
 
 
+class BalanceReservation(BaseModel):
+    """
+    Balance Reservation model
+    A hold on part of a branch balance (pending transfer, exchange quote)
+    
+    While ACTIVE, `amount` is included in BranchBalance.reserved_balance.
+    Committing a hold deducts it from the balance; releasing or expiring
+    it returns it to the available balance.
+    """
+    
+    __tablename__ = "balance_reservations"
+    
+    branch_id = Column(
+        PGUUID(as_uuid=True),
+        ForeignKey('branches.id', ondelete='CASCADE'),
+        nullable=False,
+        comment="Reference to branch"
+    )
+    
+    currency_id = Column(
+        PGUUID(as_uuid=True),
+        ForeignKey('currencies.id', ondelete='RESTRICT'),
+        nullable=False,
+        comment="Reference to currency"
+    )
+    
+    amount = Column(
+        Numeric(precision=15, scale=2),
+        nullable=False,
+        comment="Amount held"
+    )
+    
+    status = Column(
+        Enum(ReservationStatus, values_callable=lambda x: [e.value for e in x]),
+        default=ReservationStatus.ACTIVE,
+        nullable=False,
+        comment="Hold status"
+    )
+    
+    reference_id = Column(
+        PGUUID(as_uuid=True),
+        nullable=True,
+        comment="Transaction the hold belongs to (set once known)"
+    )
+    
+    reference_type = Column(
+        String(50),
+        nullable=False,
+        comment="What the hold is for (transfer, exchange_quote, ...)"
+    )
+    
+    expires_at = Column(
+        DateTime,
+        nullable=False,
+        comment="Active holds past this time are released by the sweeper"
+    )
+    
+    resolved_at = Column(
+        DateTime,
+        nullable=True,
+        comment="When the hold was committed, released or expired"
+    )
+    
+    created_by = Column(
+        PGUUID(as_uuid=True),
+        ForeignKey('users.id', ondelete='SET NULL'),
+        nullable=True,
+        comment="User who placed the hold"
+    )
+    
+    __table_args__ = (
+        CheckConstraint('amount > 0', name='reservation_amount_positive'),
+        Index(
+            'idx_balance_reservations_active_expiry', 'expires_at',
+            postgresql_where=text("status = 'active'")
+        ),
+        Index('idx_balance_reservations_reference', 'reference_id', 'reference_type'),
+    )
+    
+    def __repr__(self) -> str:
+        return (
+            f"<BalanceReservation(branch_id={self.branch_id}, amount={self.amount}, "
+            f"status={self.status})>"
+        )
+
+
 class BranchAlert(BaseModel):
     """
     Branch Alert model
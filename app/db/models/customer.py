@@ -10,7 +10,8 @@ FIXES:
 """
 from sqlalchemy import (
     Column, String, Date, DateTime, Boolean, Enum as SQLEnum,
-    ForeignKey, Text, Index, CheckConstraint, UniqueConstraint
+    ForeignKey, Text, Index, CheckConstraint, UniqueConstraint,
+    Computed, DDL, Sequence, event
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
@@ -53,6 +54,47 @@ def utcnow():
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
+# ==================== Search Normalization ====================
+
+# Arabic letter variants folded to one form (أ إ آ ٱ -> ا, ى -> ي, ة -> ه);
+# harakat and tatweel are removed
+ARABIC_FOLD_FROM = "أإآٱىة"
+ARABIC_FOLD_TO = "اااايه"
+ARABIC_STRIP = "\u064b\u064c\u064d\u064e\u064f\u0650\u0651\u0652\u0640"
+
+_SEARCH_TRANSLATION = str.maketrans(ARABIC_FOLD_FROM, ARABIC_FOLD_TO, ARABIC_STRIP)
+
+# Normalized search document (kept in sync with normalize_search_text).
+# Phone numbers are reduced to digits so "+966 50-123" matches "96650123".
+CUSTOMER_SEARCH_DOCUMENT_SQL = (
+    "translate(lower("
+    "coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || "
+    "coalesce(name_ar, '') || ' ' || coalesce(email, '') || ' ' || "
+    "regexp_replace(coalesce(phone_number, ''), '[^0-9]', '', 'g') || ' ' || "
+    "coalesce(national_id, '') || ' ' || coalesce(passport_number, '') || ' ' || "
+    "coalesce(customer_number, '')"
+    f"), '{ARABIC_FOLD_FROM}{ARABIC_STRIP}', '{ARABIC_FOLD_TO}')"
+)
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Normalize user search input the same way as Customer.search_document
+
+    Lower-cases, folds Arabic letter variants, strips harakat and collapses
+    whitespace. Phone-like input (digits, spaces, +, -, parentheses) is
+    reduced to digits only.
+    """
+    text = " ".join(text.lower().translate(_SEARCH_TRANSLATION).split())
+    if text and all(ch.isdigit() or ch in "+-() " for ch in text):
+        return "".join(ch for ch in text if ch.isdigit())
+    return text
+
+
+# Block allocation of customer numbers for bulk imports
+customer_number_seq = Sequence("customer_number_seq", metadata=Base.metadata)
+
+
 class Customer(Base):
     """
     Customer Model - العملاء
@@ -186,6 +228,13 @@ class Customer(Base):
         comment="Additional customer information (occupation, income, etc.)"
     )
     
+    # Search document (generated, trigram indexed)
+    search_document = Column(
+        Text,
+        Computed(CUSTOMER_SEARCH_DOCUMENT_SQL, persisted=True),
+        comment="Normalized names, contact and identification numbers for trigram search"
+    )
+    
     # Relationships
     branch = relationship("Branch", back_populates="customers")
     registered_by = relationship("User", foreign_keys=[registered_by_id])
@@ -211,6 +260,12 @@ class Customer(Base):
         Index("idx_customer_name", "first_name", "last_name"),
         Index("idx_customer_contact", "phone_number", "email"),
         Index("idx_customer_verification", "is_verified", "risk_level"),
+        Index(
+            "idx_customer_search_trgm",
+            "search_document",
+            postgresql_using="gin",
+            postgresql_ops={"search_document": "gin_trgm_ops"},
+        ),
         UniqueConstraint("national_id", name="uq_customer_national_id"),
         UniqueConstraint("passport_number", name="uq_customer_passport"),
         {"comment": "Customer master data with KYC compliance"}
@@ -238,6 +293,14 @@ class Customer(Base):
         return self.national_id or self.passport_number or "N/A"
 
 
+# pg_trgm must exist before the trigram index is created (create_all / tests)
+event.listen(
+    Customer.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 class CustomerDocument(Base):
     """
     Customer Document Model - وثائق العميل
@@ -0,0 +1,60 @@
+"""
+Idempotency Record Model
+Stores responses of money-moving requests by client Idempotency-Key
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB
+
+from app.db.base import Base
+
+
+class IdempotencyRecord(Base):
+    """
+    Idempotency Record Model
+
+    One row per (user, Idempotency-Key). The row is claimed as
+    'in_progress' before the request runs, marked 'executed' in the same
+    database transaction as the request's business changes, and holds the
+    serialized response once it completes, until expires_at.
+    """
+
+    __tablename__ = "idempotency_records"
+
+    STATUS_IN_PROGRESS = "in_progress"
+    STATUS_EXECUTED = "executed"    # Business changes committed, response not stored yet
+    STATUS_COMPLETED = "completed"
+
+    user_id = Column(
+        PGUUID(as_uuid=True),
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    idempotency_key = Column(String(100), primary_key=True)
+
+    scope = Column(
+        String(100),
+        nullable=False,
+        comment="Endpoint the key was used for (e.g., 'transactions.exchange')"
+    )
+    request_hash = Column(
+        String(64),
+        nullable=False,
+        comment="SHA-256 of scope and canonical request body"
+    )
+    status = Column(String(20), nullable=False, default=STATUS_IN_PROGRESS)
+    response_body = Column(JSONB, nullable=True, comment="Serialized response replayed on retry")
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_idempotency_expires_at', 'expires_at'),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<IdempotencyRecord(key='{self.idempotency_key}', "
+            f"scope='{self.scope}', status='{self.status}')>"
+        )
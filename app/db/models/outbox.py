@@ -0,0 +1,51 @@
+"""
+Outbox Event Model
+Domain events written in the same transaction as the change they describe
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, String, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB
+
+from app.db.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Outbox Event Model
+
+    Rows are only ever inserted by the transaction making the change, so an
+    event exists exactly when its change committed. The ever-increasing id
+    is the order consumers apply events in. published_at is set once the
+    relay has delivered the event to the Redis stream.
+    """
+
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    event_type = Column(
+        String(100),
+        nullable=False,
+        comment="Event name (e.g., 'balance.changed')"
+    )
+    aggregate_id = Column(
+        PGUUID(as_uuid=True),
+        nullable=True,
+        comment="Entity the event is about (e.g., branch ID)"
+    )
+    payload = Column(JSONB, nullable=False, comment="JSON-serializable event data")
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    published_at = Column(DateTime, nullable=True, comment="When the event reached the Redis stream")
+
+    __table_args__ = (
+        Index('idx_outbox_events_created_at', 'created_at'),
+        Index(
+            'idx_outbox_events_unpublished', 'id',
+            postgresql_where=text('published_at IS NULL')
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxEvent(id={self.id}, type='{self.event_type}')>"
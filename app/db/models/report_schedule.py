@@ -0,0 +1,93 @@
+"""
+Report Schedule Model
+Cron-scheduled report generation and delivery
+"""
+
+from enum import Enum as PyEnum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB
+
+from app.db.base_class import BaseModel
+
+
+class ReportDeliveryMethod(str, PyEnum):
+    """Where a scheduled report is delivered"""
+    FILE = "file"      # Written to the report output directory (file drop)
+    EMAIL = "email"    # Also mailed to the recipients over SMTP
+
+
+class ReportRunStatus(str, PyEnum):
+    """Outcome of the last scheduled run"""
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
+class ReportSchedule(BaseModel):
+    """
+    Report Schedule Model
+
+    A report definition run by the report scheduler whenever its cron
+    expression (UTC) comes due: the report is generated in the scheduler's
+    worker pool, written to the output directory and optionally mailed.
+    """
+
+    __tablename__ = "report_schedules"
+
+    name = Column(String(100), nullable=False, comment="Schedule name (report title)")
+
+    report_type = Column(
+        String(50),
+        nullable=False,
+        comment="daily_summary, monthly_revenue or branch_performance"
+    )
+
+    params = Column(
+        JSONB,
+        nullable=False,
+        default=dict,
+        comment="Fixed report parameters (default: the period before each run)"
+    )
+
+    branch_id = Column(
+        PGUUID(as_uuid=True),
+        ForeignKey('branches.id', ondelete='CASCADE'),
+        nullable=True,
+        comment="Branch scope (NULL = all branches)"
+    )
+
+    cron_expression = Column(String(100), nullable=False, comment="Five-field cron schedule, UTC")
+
+    output_format = Column(String(10), nullable=False, default="pdf", comment="json, excel or pdf")
+
+    delivery_method = Column(
+        String(10),
+        nullable=False,
+        default=ReportDeliveryMethod.FILE.value,
+        comment="file or email"
+    )
+
+    recipients = Column(JSONB, nullable=False, default=list, comment="Email recipients")
+
+    next_run_at = Column(DateTime, nullable=True, comment="Next due run (UTC)")
+    last_run_at = Column(DateTime, nullable=True)
+    last_status = Column(String(20), nullable=True)
+    last_error = Column(Text, nullable=True)
+    last_output_path = Column(String(500), nullable=True, comment="File written by the last run")
+
+    created_by = Column(
+        PGUUID(as_uuid=True),
+        ForeignKey('users.id', ondelete='SET NULL'),
+        nullable=True
+    )
+
+    __table_args__ = (
+        CheckConstraint("output_format IN ('json', 'excel', 'pdf')", name='report_schedule_format_check'),
+        CheckConstraint("delivery_method IN ('file', 'email')", name='report_schedule_delivery_check'),
+        Index(
+            'idx_report_schedules_due', 'next_run_at',
+            postgresql_where="is_active = TRUE"
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ReportSchedule(name='{self.name}', type={self.report_type}, cron='{self.cron_expression}')>"
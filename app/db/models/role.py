@@ -8,6 +8,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app.db.base_class import BaseModel
+from app.core.permissions import compile_permissions, has_compiled_permission
 
 
 class Role(BaseModel):
@@ -48,28 +49,37 @@ class Role(BaseModel):
     )
     
     # Relationships
+    # Never loaded implicitly: User.roles is eager, so an eager Role.users
+    # would pull every member of every role (and their roles) with each user.
+    # Query user_roles explicitly when membership is needed.
     users = relationship(
         "User",
         secondary="user_roles",
         primaryjoin="Role.id == user_roles.c.role_id",  # ← تحديد واضح
         secondaryjoin="User.id == user_roles.c.user_id",
         back_populates="roles",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
     
     def __repr__(self) -> str:
         return f"<Role(name='{self.name}', display_name_ar='{self.display_name_ar}')>"
     
+    @property
+    def permission_mask(self) -> int:
+        """Compiled permission bitset (hierarchy and wildcards expanded)"""
+        return compile_permissions(frozenset(self.permissions or ()))
+    
     def has_permission(self, permission: str) -> bool:
         """Check if this role has a specific permission"""
-        return permission in self.permissions
+        return has_compiled_permission(self.permission_mask, permission)
     
     def add_permission(self, permission: str) -> None:
         """Add a permission to this role"""
         if permission not in self.permissions:
-            self.permissions.append(permission)
+            # Assign a new list so the JSONB change is tracked
+            self.permissions = [*self.permissions, permission]
     
     def remove_permission(self, permission: str) -> None:
         """Remove a permission from this role"""
         if permission in self.permissions:
-            self.permissions.remove(permission)
\ No newline at end of file
+            self.permissions = [p for p in self.permissions if p != permission]
\ No newline at end of file
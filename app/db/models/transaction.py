@@ -16,15 +16,16 @@ Features:
 - Comprehensive validation
 """
 
-from datetime import datetime
+import hashlib
+from datetime import datetime, timezone
 from decimal import Decimal
 from enum import Enum
 from typing import Optional, List
-from uuid import uuid4
+from uuid import UUID as PyUUID, uuid4
 
 from sqlalchemy import (
-    Column, String, DateTime, Numeric, Boolean, Text,
-    ForeignKey, CheckConstraint, Index, event, Enum as SQLEnum
+    Column, String, DateTime, Numeric, Integer, Boolean, Text,
+    ForeignKey, CheckConstraint, Index, event, text, Enum as SQLEnum
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, validates, Session
@@ -132,6 +133,19 @@ class Transaction(Base):
     )
     notes = Column(Text, nullable=True)
 
+    # ========== Duplicate Detection ==========
+    fingerprint = Column(
+        String(32),
+        nullable=True,
+        index=True,
+        comment="Hash of branch, currency, amount, customer and minute bucket"
+    )
+    idempotency_key = Column(
+        String(100),
+        nullable=True,
+        comment="Client request key; a retried request returns the original transaction"
+    )
+
     # ========== Commission (primarily for Exchange transactions) ==========
     commission_amount = Column(
         Numeric(15, 2),
@@ -198,6 +212,13 @@ class Transaction(Base):
         ),
         Index("idx_transaction_date_status", "transaction_date", "status"),
         Index("idx_branch_currency_date", "branch_id", "currency_id", "transaction_date"),
+        Index("idx_transaction_reference_number", "reference_number"),
+        Index(
+            "uq_transaction_user_idempotency_key",
+            "user_id", "idempotency_key",
+            unique=True,
+            postgresql_where=text("idempotency_key IS NOT NULL")
+        ),
     )
     
     # ========== Properties ==========
@@ -263,6 +284,32 @@ class Transaction(Base):
         """Alias for commission_amount for backward compatibility"""
         return self.commission_amount or Decimal("0.00")
 
+    # ========== Duplicate Fingerprint ==========
+    @staticmethod
+    def compute_fingerprint(
+        branch_id: PyUUID,
+        currency_id: PyUUID,
+        amount: Decimal,
+        customer_id: Optional[PyUUID],
+        moment: datetime
+    ) -> str:
+        """
+        Fingerprint of a transaction for duplicate detection
+
+        Transactions with the same branch, currency, amount and customer in
+        the same UTC minute share a fingerprint.
+        """
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        key = "|".join((
+            str(branch_id),
+            str(currency_id),
+            str(Decimal(str(amount)).quantize(Decimal("0.01"))),
+            str(customer_id or ""),
+            moment.strftime("%Y%m%d%H%M"),
+        ))
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
     # ========== Validation ==========
     @validates("status")
     def validate_status_transition(self, key, new_status):
@@ -654,6 +701,60 @@ class TransferTransaction(Transaction):
         )
 
 
+# ==================== Transaction Limit Counters ====================
+
+class TransactionLimitCounter(Base):
+    """
+    Running totals of completed transactions per hour bucket
+
+    Maintained in the same database transaction that completes a
+    transaction, so daily limit checks read a handful of primary-key rows
+    instead of aggregating the transactions table. Scopes:
+    - 'branch': per (branch, transaction type)
+    - 'customer': per (customer, transaction type)
+    """
+
+    __tablename__ = "transaction_limit_counters"
+
+    SCOPE_BRANCH = "branch"
+    SCOPE_CUSTOMER = "customer"
+
+    scope = Column(String(20), primary_key=True)
+    scope_id = Column(UUID(as_uuid=True), primary_key=True)
+    transaction_type = Column(
+        SQLEnum(TransactionType, values_callable=lambda x: [e.value for e in x]),
+        primary_key=True
+    )
+    bucket_start = Column(
+        DateTime,
+        primary_key=True,
+        comment="Start of the UTC hour the transactions fall into"
+    )
+
+    total_amount = Column(Numeric(20, 2), nullable=False, default=Decimal("0.00"))
+    transaction_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "scope IN ('branch', 'customer')",
+            name="check_limit_counter_scope"
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<TransactionLimitCounter(scope='{self.scope}', "
+            f"bucket='{self.bucket_start}', total={self.total_amount}, "
+            f"count={self.transaction_count})>"
+        )
+
+
 # ==================== Transaction Number Generator ====================
 
 class TransactionNumberGenerator:
@@ -669,6 +770,9 @@ class TransactionNumberGenerator:
         """
         Generate unique transaction number (async)
 
+        Shares the locked allocator of generate_block, so a single number can
+        never fall inside a block reserved by a concurrent batch.
+
         Args:
             session: Async database session
             transaction_date: Transaction date (default: now)
@@ -676,32 +780,49 @@ class TransactionNumberGenerator:
         Returns:
             Unique transaction number (e.g., TRX-20250109-00001)
         """
-        from sqlalchemy import select
+        numbers = await TransactionNumberGenerator.generate_block(session, 1, transaction_date)
+        return numbers[0]
+
+    @staticmethod
+    async def generate_block(
+        session: 'AsyncSession',
+        count: int,
+        transaction_date: datetime = None
+    ) -> List[str]:
+        """
+        Allocate a block of consecutive transaction numbers (async)
+
+        Takes a transaction-scoped advisory lock on the day's prefix so that
+        concurrent batches get disjoint blocks; the lock is released on
+        commit/rollback.
+
+        Args:
+            session: Async database session
+            count: Number of transaction numbers needed
+            transaction_date: Transaction date (default: now)
+
+        Returns:
+            List of unique transaction numbers in ascending order
+        """
+        from sqlalchemy import select, func
+
+        if count <= 0:
+            return []
 
         if transaction_date is None:
             transaction_date = datetime.utcnow()
 
-        date_str = transaction_date.strftime("%Y%m%d")
-        prefix = f"TRX-{date_str}-"
+        prefix = f"TRX-{transaction_date.strftime('%Y%m%d')}-"
 
-        # Get the last transaction number for today using async query
-        stmt = (
-            select(Transaction)
-            .where(Transaction.transaction_number.like(f"{prefix}%"))
-            .order_by(Transaction.transaction_number.desc())
-            .limit(1)
-        )
-        result = await session.execute(stmt)
-        last_transaction = result.scalar_one_or_none()
+        await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(prefix))))
 
-        if last_transaction:
-            # Extract sequence number and increment
-            last_number = int(last_transaction.transaction_number.split("-")[-1])
-            next_number = last_number + 1
-        else:
-            next_number = 1
+        stmt = select(func.max(Transaction.transaction_number)).where(
+            Transaction.transaction_number.like(f"{prefix}%")
+        )
+        last_number = (await session.execute(stmt)).scalar_one_or_none()
+        start = int(last_number.split("-")[-1]) + 1 if last_number else 1
 
-        return f"{prefix}{next_number:05d}"
+        return [f"{prefix}{number:05d}" for number in range(start, start + count)]
 
 
 # ==================== Events & Triggers ====================
@@ -715,6 +836,19 @@ def generate_transaction_number(mapper, connection, target):
         pass
 
 
+@event.listens_for(Transaction, "before_insert", propagate=True)
+def set_transaction_fingerprint(mapper, connection, target):
+    """Fingerprint transactions for indexed duplicate detection"""
+    if not target.fingerprint:
+        target.fingerprint = Transaction.compute_fingerprint(
+            target.branch_id,
+            target.currency_id,
+            target.amount,
+            target.customer_id,
+            target.transaction_date or datetime.utcnow()
+        )
+
+
 @event.listens_for(Transaction, "before_insert")
 def ensure_completed_timestamp_on_insert(mapper, connection, target):
     """Ensure completed transactions always have a completion timestamp"""
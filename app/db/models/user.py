@@ -11,6 +11,7 @@ from sqlalchemy.dialects.postgresql import UUID as PGUUID
 import uuid
 
 from app.db.base_class import BaseModel
+from app.core.permissions import has_compiled_permission
 
 
 # Association table for User-Branch many-to-many relationship
@@ -135,6 +136,8 @@ class User(BaseModel):
     #     lazy="selectin"
     # )
     
+    # Roles are needed for every permission check, so they are loaded with
+    # one extra SELECT ... IN per batch of users (Role.users is never eager)
     roles = relationship(
         "Role",
         secondary=user_roles,
@@ -144,10 +147,11 @@ class User(BaseModel):
         lazy="selectin"
     )
 
+    # Loaded on request only (previously joined into every user query)
     primary_branch = relationship(
         "Branch",
         foreign_keys=[primary_branch_id],
-        lazy="joined"
+        lazy="select"
     )
 
     # Add these relationships
@@ -201,16 +205,32 @@ class User(BaseModel):
         """Check if user has a specific role"""
         return any(role.name == role_name for role in self.roles)
     
+    @property
+    def permission_mask(self) -> int:
+        """
+        Effective permission bitset of all roles (see app.core.permissions)
+        
+        Computed once per loaded instance and recomputed if the roles or
+        their permission lists are replaced.
+        """
+        roles = self.roles
+        key = tuple((id(role), id(role.permissions)) for role in roles)
+        cached = self.__dict__.get("_permission_mask_cache")
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        mask = 0
+        for role in roles:
+            mask |= role.permission_mask
+        self.__dict__["_permission_mask_cache"] = (key, mask)
+        return mask
+    
     def has_permission(self, permission: str) -> bool:
         """Check if user has a specific permission through any of their roles"""
         if self.is_superuser:
             return True
         
-        for role in self.roles:
-            if permission in role.permissions:
-                return True
-        
-        return False
+        return has_compiled_permission(self.permission_mask, permission)
     
     # def get_primary_branch(self):
     #     """Get user's primary branch"""
@@ -15,7 +15,7 @@ Business Rules:
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum as PyEnum
-from typing import Optional
+from typing import List, Optional
 
 from sqlalchemy import (
     Column, String, Boolean, Numeric, DateTime, ForeignKey,
@@ -264,6 +264,14 @@ class VaultTransfer(BaseModel):
         index=True,
         comment="Destination branch (NULL if transfer to vault)"
     )
+
+    from_branch_id = Column(
+        PGUUID(as_uuid=True),
+        ForeignKey('branches.id', ondelete='RESTRICT'),
+        nullable=True,
+        index=True,
+        comment="Source branch whose cash balance is swept (NULL if the vault balance moves)"
+    )
     
     # Transfer Details
     currency_id = Column(
@@ -377,6 +385,12 @@ class VaultTransfer(BaseModel):
         backref="vault_transfers_received",
         foreign_keys=[to_branch_id]
     )
+
+    from_branch = relationship(
+        "Branch",
+        backref="vault_transfers_sent",
+        foreign_keys=[from_branch_id]
+    )
     
     currency = relationship("Currency", backref="vault_transfers")
     
@@ -430,6 +444,9 @@ class VaultTransferNumberGenerator:
         """
         Generate next transfer number for the given date
 
+        Shares the locked allocator of generate_block, so ordinary transfers
+        never collide with a block reserved by cash distribution.
+
         Args:
             session: Async database session
             date: Date for transfer (default: today)
@@ -437,27 +454,43 @@ class VaultTransferNumberGenerator:
         Returns:
             Unique transfer number
         """
-        from sqlalchemy import select
+        numbers = await VaultTransferNumberGenerator.generate_block(session, 1, date)
+        return numbers[0]
+
+    @staticmethod
+    async def generate_block(session, count: int, date: Optional[datetime] = None) -> List[str]:
+        """
+        Allocate a block of consecutive transfer numbers
+
+        Takes a transaction-scoped advisory lock on the day's prefix so that
+        concurrent runs get disjoint blocks; the lock is released on
+        commit/rollback.
+
+        Args:
+            session: Async database session
+            count: Number of transfer numbers needed
+            date: Date for transfers (default: today)
+
+        Returns:
+            List of unique transfer numbers in ascending order
+        """
+        from sqlalchemy import select, func
+
+        if count <= 0:
+            return []
 
         if date is None:
             date = datetime.utcnow()
 
-        date_str = date.strftime("%Y%m%d")
-        prefix = f"VTR-{date_str}-"
+        prefix = f"VTR-{date.strftime('%Y%m%d')}-"
 
-        # Get last transfer number for today
-        result = await session.execute(
-            select(VaultTransfer).filter(
+        await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(prefix))))
+
+        last_number = (await session.execute(
+            select(func.max(VaultTransfer.transfer_number)).where(
                 VaultTransfer.transfer_number.like(f"{prefix}%")
-            ).order_by(VaultTransfer.transfer_number.desc()).limit(1)
-        )
-        last_transfer = result.scalar_one_or_none()
-
-        if last_transfer:
-            # Extract sequence number and increment
-            last_seq = int(last_transfer.transfer_number.split('-')[-1])
-            next_seq = last_seq + 1
-        else:
-            next_seq = 1
-
-        return f"{prefix}{next_seq:05d}"
+            )
+        )).scalar_one_or_none()
+        start = int(last_number.split('-')[-1]) + 1 if last_number else 1
+
+        return [f"{prefix}{number:05d}" for number in range(start, start + count)]
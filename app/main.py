@@ -13,6 +13,15 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.config import settings
 from app.core.exceptions import CEMSException, handle_exception
+from app.middleware.rbac import RBACMiddleware
+from app.services.audit_service import audit_log_writer
+from app.services.balance_reservation_service import balance_hold_sweeper
+from app.services.outbox_service import outbox_relay
+from app.services.balance_alert_service import balance_alert_monitor
+from app.services.balance_snapshot_service import balance_snapshot_job
+from app.core.security import shutdown_password_hash_pool
+from app.services.pdf_render_service import warm_pdf_render_pool, shutdown_pdf_render_pool
+from app.services.report_schedule_service import report_scheduler
 
 from app.api.v1 import api_router
 
@@ -35,10 +44,47 @@ async def lifespan(app: FastAPI):
     # async with engine.begin() as conn:
     #     print("✅ Database connected")
     
+    # Start background audit log writer
+    if settings.AUDIT_LOG_ENABLED:
+        await audit_log_writer.start()
+        print("📝 Audit log writer started")
+    
+    # Release expired balance holds in the background
+    await balance_hold_sweeper.start()
+    
+    # Feed outbox events to in-process subscribers (and the Redis stream, if enabled)
+    await outbox_relay.start()
+    
+    # Evaluate balance thresholds as balances change
+    await balance_alert_monitor.start()
+    
+    # Write end-of-day balance snapshots for point-in-time reports
+    if settings.BALANCE_SNAPSHOT_ENABLED:
+        await balance_snapshot_job.start()
+    
+    # Spawn the PDF rendering workers ahead of the first export
+    warm_pdf_render_pool()
+    
+    # Run due report schedules
+    if settings.REPORT_SCHEDULER_ENABLED:
+        await report_scheduler.start()
+    
     yield
     
     # Shutdown
     print("🛑 Shutting down CEMS Application...")
+    # Flush queued audit entries
+    await audit_log_writer.stop()
+    # Stop releasing expired balance holds
+    await balance_hold_sweeper.stop()
+    await balance_alert_monitor.stop()
+    await balance_snapshot_job.stop()
+    await report_scheduler.stop()
+    await outbox_relay.stop()
+    # Stop bulk password hashing workers
+    shutdown_password_hash_pool()
+    # Stop PDF rendering workers
+    shutdown_pdf_render_pool()
     # Close database connections
     # await engine.dispose()
     print("✅ Cleanup completed")
@@ -68,6 +114,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# RBAC Middleware (queues an audit entry per authenticated request)
+app.add_middleware(RBACMiddleware)
+
 # Trusted Host Middleware (security)
 if not settings.DEBUG:
     app.add_middleware(
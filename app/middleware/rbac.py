@@ -12,11 +12,13 @@ from starlette.types import ASGIApp
 
 from app.core.permissions import (
     validate_permission,
-    check_permission_hierarchy,
-    parse_permission,
+    compile_permissions,
+    has_compiled_permission,
 )
+from app.core.config import settings
 from app.core.exceptions import PermissionDeniedError
 from app.db.models.user import User
+from app.services.audit_service import audit_log_writer
 
 
 # ==================== Permission Cache ====================
@@ -88,13 +90,19 @@ class RBACMiddleware(BaseHTTPMiddleware):
         self, request: Request, call_next: Callable
     ) -> Response:
         """
-        Process request and check permissions
+        Process request and queue an audit entry for authenticated users
         """
         # Skip permission check for excluded paths
         if self._should_skip_check(request):
             return await call_next(request)
         
-        # Get user from request state (set by auth dependency)
+        started = time.perf_counter()
+        
+        # Continue processing request
+        response = await call_next(request)
+        
+        # User is attached to request state by the auth dependency,
+        # which runs inside call_next
         user = getattr(request.state, "user", None)
         
         if user:
@@ -102,11 +110,13 @@ class RBACMiddleware(BaseHTTPMiddleware):
             request.state.user_id = user.id
             request.state.username = user.username
             
-            # Log permission check
-            await self._log_access(request, user)
-        
-        # Continue processing request
-        response = await call_next(request)
+            # Log access (queued, never awaits the database)
+            await self._log_access(
+                request,
+                user,
+                status_code=response.status_code,
+                duration_ms=(time.perf_counter() - started) * 1000,
+            )
         
         return response
     
@@ -118,38 +128,48 @@ class RBACMiddleware(BaseHTTPMiddleware):
         if path in self.exclude_paths:
             return True
         
-        # Check path prefixes
+        # Check path prefixes ("/" only matches exactly, otherwise it
+        # would exclude every path)
         for exclude_path in self.exclude_paths:
-            if path.startswith(exclude_path):
+            if exclude_path != "/" and path.startswith(exclude_path):
                 return True
         
         return False
     
-    async def _log_access(self, request: Request, user: User) -> None:
+    async def _log_access(
+        self,
+        request: Request,
+        user: User,
+        status_code: Optional[int] = None,
+        duration_ms: Optional[float] = None,
+    ) -> None:
         """
         Log access attempt for audit trail
         
         Args:
             request: FastAPI request
             user: Current user
+            status_code: Response status code
+            duration_ms: Request processing time
         """
-        # TODO: Implement audit logging
-        # In production, log to database or external service
-        
-        log_data = {
-            "timestamp": time.time(),
-            "user_id": str(user.id),
-            "username": user.username,
-            "method": request.method,
-            "path": request.url.path,
-            "ip_address": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-        }
-        
-        # Log to console for development
-        # In production: save to database
-        # await save_audit_log(log_data)
-        pass
+        if not settings.AUDIT_LOG_ENABLED:
+            return
+        
+        audit_log_writer.log(
+            action="access",
+            entity_type="http_request",
+            user_id=user.id,
+            changes={
+                "method": request.method,
+                "path": request.url.path,
+                "query": request.url.query or None,
+                "status_code": status_code,
+                "duration_ms": round(duration_ms, 2) if duration_ms is not None else None,
+            },
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            description=f"{request.method} {request.url.path}",
+        )
 
 
 # ==================== Permission Checker ====================
@@ -182,15 +202,16 @@ class PermissionChecker:
         if user.is_superuser:
             return True
         
-        # Get user permissions (cached)
+        # Get user permissions (cached) as a compiled bitset
         user_permissions = await PermissionChecker.get_user_permissions(user)
+        user_mask = compile_permissions(frozenset(user_permissions))
         
         if require_all:
             # User must have ALL required permissions
-            missing_permissions = []
-            for required_perm in required_permissions:
-                if not PermissionChecker._has_permission(user_permissions, required_perm):
-                    missing_permissions.append(required_perm)
+            missing_permissions = [
+                required_perm for required_perm in required_permissions
+                if not has_compiled_permission(user_mask, required_perm)
+            ]
             
             if missing_permissions:
                 raise PermissionDeniedError(
@@ -200,7 +221,7 @@ class PermissionChecker:
         else:
             # User needs at least ONE permission
             has_any = any(
-                PermissionChecker._has_permission(user_permissions, perm)
+                has_compiled_permission(user_mask, perm)
                 for perm in required_permissions
             )
             
@@ -254,12 +275,10 @@ class PermissionChecker:
         Returns:
             bool: True if user has permission
         """
-        # Direct check
-        if required_permission in user_permissions:
-            return True
-        
-        # Check with hierarchy
-        return check_permission_hierarchy(user_permissions, required_permission)
+        return has_compiled_permission(
+            compile_permissions(frozenset(user_permissions)),
+            required_permission
+        )
     
     @staticmethod
     def invalidate_user_cache(user_id: UUID) -> None:
@@ -362,20 +381,18 @@ class AuditLogger:
             resource_id: ID of resource accessed
             ip_address: User's IP address
         """
-        # TODO: Implement actual audit logging to database
-        log_entry = {
-            "timestamp": time.time(),
-            "user_id": str(user_id),
-            "permission": permission,
-            "granted": granted,
-            "resource_type": resource_type,
-            "resource_id": str(resource_id) if resource_id else None,
-            "ip_address": ip_address,
-        }
-        
-        # In production: save to audit_log table
-        # await save_to_audit_log(log_entry)
-        pass
+        if not settings.AUDIT_LOG_ENABLED:
+            return
+        
+        audit_log_writer.log(
+            action="permission_granted" if granted else "permission_denied",
+            entity_type=resource_type or "permission",
+            user_id=user_id,
+            entity_id=resource_id,
+            changes={"permission": permission, "granted": granted},
+            ip_address=ip_address,
+            description=f"Permission check: {permission}",
+        )
     
     @staticmethod
     async def log_security_event(
@@ -393,19 +410,16 @@ class AuditLogger:
             details: Additional event details
             severity: Event severity (info, warning, critical)
         """
-        # TODO: Implement security event logging
-        log_entry = {
-            "timestamp": time.time(),
-            "event_type": event_type,
-            "user_id": str(user_id) if user_id else None,
-            "details": details or {},
-            "severity": severity,
-        }
-        
-        # In production: save to security_log table
-        # and potentially alert on critical events
-        # await save_to_security_log(log_entry)
-        pass
+        if not settings.AUDIT_LOG_ENABLED:
+            return
+        
+        audit_log_writer.log(
+            action=event_type,
+            entity_type="security",
+            user_id=user_id,
+            changes={"severity": severity, **(details or {})},
+            description=f"Security event: {event_type} ({severity})",
+        )
 
 
 # ==================== Utility Functions ====================
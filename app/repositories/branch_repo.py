@@ -3,10 +3,10 @@ Branch Repository - FIXED VERSION
 Data access layer for branch operations
 """
 
-from typing import List, Optional, Dict, Any
-from uuid import UUID
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+from uuid import UUID, uuid4
 from datetime import datetime
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, insert, and_, or_, func, desc, tuple_
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -402,6 +402,62 @@ class BranchRepository:
             logger.error(f"Failed to create balance history: {str(e)}")
             raise DatabaseOperationError(f"Balance history creation failed: {str(e)}")
     
+    async def lock_branch_balances(
+        self,
+        pairs: Iterable[Tuple[UUID, UUID]]
+    ) -> Dict[Tuple[UUID, UUID], BranchBalance]:
+        """
+        Load and lock balances for many (branch, currency) pairs in one query
+        
+        Rows are locked in (branch_id, currency_id) order so concurrent
+        batches touching the same balances cannot deadlock.
+        
+        Args:
+            pairs: (branch_id, currency_id) tuples
+            
+        Returns:
+            Dict mapping (branch_id, currency_id) to the locked balance
+        """
+        pairs = list(set(pairs))
+        if not pairs:
+            return {}
+        
+        stmt = (
+            select(BranchBalance)
+            .where(
+                and_(
+                    tuple_(BranchBalance.branch_id, BranchBalance.currency_id).in_(pairs),
+                    BranchBalance.is_active == True
+                )
+            )
+            .order_by(BranchBalance.branch_id, BranchBalance.currency_id)
+            .with_for_update()
+        )
+        
+        result = await self.db.execute(stmt)
+        return {
+            (balance.branch_id, balance.currency_id): balance
+            for balance in result.scalars().all()
+        }
+    
+    async def create_balance_history_batch(
+        self,
+        history_rows: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Insert many balance history records with one multi-row INSERT
+        
+        Args:
+            history_rows: History record data (same keys in every row)
+            
+        Returns:
+            Number of rows inserted
+        """
+        if not history_rows:
+            return 0
+        await self.db.execute(insert(BranchBalanceHistory.__table__), history_rows)
+        return len(history_rows)
+    
     async def get_balance_history(
         self,
         branch_id: UUID,
@@ -645,7 +701,7 @@ class BranchRepository:
         if not alert:
             # Create new alert
             alert = BranchAlert(
-                id=uuid.uuid4(),
+                id=uuid4(),
                 branch_id=branch_id,
                 currency_id=currency_id,
                 alert_type=alert_type,
@@ -215,8 +215,8 @@ class CurrencyRepository:
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
-    async def create_exchange_rate(self, rate_data: dict) -> ExchangeRate:
-        """Create new exchange rate"""
+    async def create_exchange_rate(self, rate_data: dict, commit: bool = True) -> ExchangeRate:
+        """Create new exchange rate (flush only with commit=False, for the caller to commit)"""
         try:
             # Validate currencies exist
             from_curr = await self.get_currency_by_id(rate_data['from_currency_id'])
@@ -241,8 +241,11 @@ class CurrencyRepository:
             # Create new rate
             rate = ExchangeRate(**rate_data)
             self.db.add(rate)
-            await self.db.commit()
-            await self.db.refresh(rate)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(rate)
+            else:
+                await self.db.flush()
             
             # Reload with relationships
             query = select(ExchangeRate).where(
@@ -5,16 +5,22 @@ Data access layer for customer operations
 
 Phase 5.2: Customer Service & API
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 
+import json
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, insert, and_, or_, func, desc, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import selectinload, joinedload
 
-from app.db.models.customer import Customer, CustomerDocument, CustomerNote, CustomerType, RiskLevel, DocumentType
+from app.db.models.customer import (
+    Customer, CustomerDocument, CustomerNote, CustomerType, RiskLevel, DocumentType,
+    normalize_search_text, customer_number_seq
+)
 from app.core.exceptions import NotFoundError, ValidationError
 
 
@@ -83,8 +89,262 @@ class CustomerRepository:
         customer.is_active = False
         await self.db.flush()
     
+    # ==================== Bulk Import ====================
+    
+    # Columns loaded by COPY (search_document is generated by PostgreSQL)
+    COPY_COLUMNS = (
+        "id", "customer_number", "first_name", "last_name", "name_ar",
+        "national_id", "passport_number", "phone_number", "email",
+        "date_of_birth", "nationality", "address", "city", "country",
+        "customer_type", "risk_level", "is_active", "is_verified",
+        "registered_at", "created_at", "updated_at",
+        "registered_by_id", "branch_id", "additional_info",
+    )
+    
+    async def find_existing_identifiers(
+        self,
+        national_ids: List[str],
+        passport_numbers: List[str]
+    ) -> Tuple[set, set]:
+        """
+        Find which national IDs / passports already exist, in one query
+        
+        Both lists are sent as single array parameters (= ANY(...)), so the
+        statement size does not grow with the batch.
+        
+        Returns:
+            Tuple of (existing national IDs, existing passport numbers)
+        """
+        if not national_ids and not passport_numbers:
+            return set(), set()
+        
+        stmt = select(Customer.national_id, Customer.passport_number).where(
+            or_(
+                Customer.national_id == any_(bindparam("national_ids", type_=ARRAY(String))),
+                Customer.passport_number == any_(bindparam("passport_numbers", type_=ARRAY(String)))
+            )
+        )
+        result = await self.db.execute(
+            stmt,
+            {"national_ids": list(national_ids), "passport_numbers": list(passport_numbers)}
+        )
+        
+        national_id_set = set(national_ids)
+        passport_set = set(passport_numbers)
+        existing_ids, existing_passports = set(), set()
+        for national_id, passport_number in result.all():
+            if national_id in national_id_set:
+                existing_ids.add(national_id)
+            if passport_number in passport_set:
+                existing_passports.add(passport_number)
+        
+        return existing_ids, existing_passports
+    
+    async def allocate_customer_number_block(self, count: int) -> List[int]:
+        """Reserve `count` values from customer_number_seq in one round trip"""
+        if count <= 0:
+            return []
+        stmt = select(customer_number_seq.next_value()).select_from(
+            func.generate_series(1, count)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+    
+    async def copy_customers(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Load customer rows with COPY inside the session's transaction
+        
+        Falls back to a multi-row INSERT when the driver is not asyncpg.
+        The caller is responsible for commit/rollback.
+        """
+        if not rows:
+            return 0
+        
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        driver_connection = raw.driver_connection
+        
+        if hasattr(driver_connection, "copy_records_to_table"):
+            records = [self._to_copy_record(row) for row in rows]
+            await driver_connection.copy_records_to_table(
+                Customer.__tablename__,
+                records=records,
+                columns=list(self.COPY_COLUMNS)
+            )
+        else:
+            await self.db.execute(insert(Customer.__table__), rows)
+        
+        return len(rows)
+    
+    def _to_copy_record(self, row: Dict[str, Any]) -> tuple:
+        """Convert a row dict into a COPY record in COPY_COLUMNS order"""
+        record = []
+        for column in self.COPY_COLUMNS:
+            value = row.get(column)
+            if column in ("customer_type", "risk_level") and hasattr(value, "value"):
+                value = value.value
+            elif column == "additional_info" and value is not None:
+                value = json.dumps(value, default=str)
+            record.append(value)
+        return tuple(record)
+    
     # ==================== Search & Filtering ====================
     
+    # Shortest input the trigram index can serve (pg_trgm needs 3 characters)
+    MIN_TRIGRAM_QUERY_LENGTH = 3
+    
+    def _build_filters(
+        self,
+        query: Optional[str] = None,
+        branch_id: Optional[UUID] = None,
+        customer_type: Optional[CustomerType] = None,
+        risk_level: Optional[RiskLevel] = None,
+        is_verified: Optional[bool] = None,
+        is_active: Optional[bool] = True
+    ) -> List[Any]:
+        """Build WHERE clauses shared by search and count"""
+        filters = []
+        
+        if is_active is not None:
+            filters.append(Customer.is_active == is_active)
+        if branch_id:
+            filters.append(Customer.branch_id == branch_id)
+        if customer_type:
+            filters.append(Customer.customer_type == customer_type)
+        if risk_level:
+            filters.append(Customer.risk_level == risk_level)
+        if is_verified is not None:
+            filters.append(Customer.is_verified == is_verified)
+        
+        if query:
+            term = normalize_search_text(query)
+            if term:
+                filters.append(self._search_predicate(term))
+        
+        return filters
+    
+    def _search_predicate(self, term: str):
+        """
+        Text match against the normalized search document
+        
+        Substring match (LIKE) is served by the GIN trigram index; for
+        inputs of 3+ characters a word-similarity match also catches typos.
+        """
+        predicate = Customer.search_document.contains(term, autoescape=True)
+        if len(term) >= self.MIN_TRIGRAM_QUERY_LENGTH:
+            predicate = or_(predicate, Customer.search_document.op("%>")(term))
+        return predicate
+    
+    async def find_exact_identifier(
+        self,
+        identifier: str,
+        is_active: Optional[bool] = True
+    ) -> Optional[Customer]:
+        """
+        Exact-match fast path for national ID, passport or customer number
+        
+        Each column has a unique btree index, so this is a single index probe
+        per column instead of a text search.
+        """
+        identifier = identifier.strip()
+        if not identifier or " " in identifier:
+            return None
+        
+        candidates = {identifier, identifier.upper()}
+        stmt = select(Customer).where(
+            or_(
+                Customer.national_id.in_(candidates),
+                Customer.passport_number.in_(candidates),
+                Customer.customer_number.in_(candidates)
+            )
+        )
+        if is_active is not None:
+            stmt = stmt.where(Customer.is_active == is_active)
+        
+        result = await self.db.execute(stmt.limit(1))
+        return result.scalar_one_or_none()
+    
+    async def search_customers_ranked(
+        self,
+        query: str,
+        branch_id: Optional[UUID] = None,
+        customer_type: Optional[CustomerType] = None,
+        risk_level: Optional[RiskLevel] = None,
+        is_verified: Optional[bool] = None,
+        is_active: Optional[bool] = True,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Tuple[Customer, float]], int]:
+        """
+        Ranked customer search
+        
+        Tries an exact identifier match first; otherwise runs one trigram
+        query ordered by word similarity, with the total count computed by a
+        window function in the same round trip.
+        
+        Returns:
+            Tuple of ([(customer, score)], total)
+        """
+        exact = await self.find_exact_identifier(query, is_active=is_active)
+        if exact and self._matches_filters(exact, branch_id, customer_type, risk_level, is_verified):
+            return ([(exact, 1.0)] if skip == 0 else []), 1
+        
+        term = normalize_search_text(query)
+        if not term:
+            return [], 0
+        
+        score = func.word_similarity(term, Customer.search_document).label("score")
+        total = func.count().over().label("total")
+        
+        stmt = select(Customer, score, total).where(
+            and_(*self._build_filters(
+                query=query,
+                branch_id=branch_id,
+                customer_type=customer_type,
+                risk_level=risk_level,
+                is_verified=is_verified,
+                is_active=is_active
+            ))
+        )
+        stmt = stmt.order_by(desc(score), desc(Customer.registered_at))
+        stmt = stmt.offset(skip).limit(limit)
+        
+        rows = (await self.db.execute(stmt)).all()
+        if not rows:
+            # Page past the end: fall back to a plain count
+            count = 0
+            if skip:
+                count = await self.count_customers(
+                    query=query,
+                    branch_id=branch_id,
+                    customer_type=customer_type,
+                    risk_level=risk_level,
+                    is_verified=is_verified,
+                    is_active=is_active
+                )
+            return [], count
+        
+        return [(row[0], float(row[1] or 0)) for row in rows], rows[0][2]
+    
+    @staticmethod
+    def _matches_filters(
+        customer: Customer,
+        branch_id: Optional[UUID],
+        customer_type: Optional[CustomerType],
+        risk_level: Optional[RiskLevel],
+        is_verified: Optional[bool]
+    ) -> bool:
+        """Check an exact-match hit against the optional search filters"""
+        if branch_id and customer.branch_id != branch_id:
+            return False
+        if customer_type and customer.customer_type != customer_type:
+            return False
+        if risk_level and customer.risk_level != risk_level:
+            return False
+        if is_verified is not None and customer.is_verified != is_verified:
+            return False
+        return True
+    
     async def search_customers(
         self,
         query: Optional[str] = None,
@@ -111,39 +371,14 @@ class CustomerRepository:
         """
         stmt = select(Customer)
         
-        # Build filters
-        filters = []
-        
-        if is_active is not None:
-            filters.append(Customer.is_active == is_active)
-        
-        if branch_id:
-            filters.append(Customer.branch_id == branch_id)
-        
-        if customer_type:
-            filters.append(Customer.customer_type == customer_type)
-        
-        if risk_level:
-            filters.append(Customer.risk_level == risk_level)
-        
-        if is_verified is not None:
-            filters.append(Customer.is_verified == is_verified)
-        
-        # Text search across multiple fields
-        if query:
-            search_term = f"%{query}%"
-            filters.append(
-                or_(
-                    Customer.first_name.ilike(search_term),
-                    Customer.last_name.ilike(search_term),
-                    Customer.name_ar.ilike(search_term),
-                    Customer.phone_number.ilike(search_term),
-                    Customer.email.ilike(search_term),
-                    Customer.national_id.ilike(search_term),
-                    Customer.passport_number.ilike(search_term),
-                    Customer.customer_number.ilike(search_term)
-                )
-            )
+        filters = self._build_filters(
+            query=query,
+            branch_id=branch_id,
+            customer_type=customer_type,
+            risk_level=risk_level,
+            is_verified=is_verified,
+            is_active=is_active
+        )
         
         # Apply all filters
         if filters:
@@ -168,32 +403,14 @@ class CustomerRepository:
         """Count customers matching search criteria"""
         stmt = select(func.count(Customer.id))
         
-        filters = []
-        
-        if is_active is not None:
-            filters.append(Customer.is_active == is_active)
-        if branch_id:
-            filters.append(Customer.branch_id == branch_id)
-        if customer_type:
-            filters.append(Customer.customer_type == customer_type)
-        if risk_level:
-            filters.append(Customer.risk_level == risk_level)
-        if is_verified is not None:
-            filters.append(Customer.is_verified == is_verified)
-        
-        if query:
-            search_term = f"%{query}%"
-            filters.append(
-                or_(
-                    Customer.first_name.ilike(search_term),
-                    Customer.last_name.ilike(search_term),
-                    Customer.name_ar.ilike(search_term),
-                    Customer.phone_number.ilike(search_term),
-                    Customer.email.ilike(search_term),
-                    Customer.national_id.ilike(search_term),
-                    Customer.passport_number.ilike(search_term)
-                )
-            )
+        filters = self._build_filters(
+            query=query,
+            branch_id=branch_id,
+            customer_type=customer_type,
+            risk_level=risk_level,
+            is_verified=is_verified,
+            is_active=is_active
+        )
         
         if filters:
             stmt = stmt.where(and_(*filters))
@@ -6,7 +6,7 @@ Data access layer for user operations
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 from sqlalchemy import select, and_, or_, update, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
@@ -23,6 +23,13 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+# Loader options for the authentication projection (see get_auth_principal)
+AUTH_PRINCIPAL_OPTIONS = (
+    selectinload(User.roles).raiseload("*", sql_only=True),
+    raiseload("*", sql_only=True),
+)
+
+
 class UserRepository:
     """Repository for user data access"""
     
@@ -56,6 +63,25 @@ class UserRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
     
+    async def get_auth_principal(self, user_id: UUID) -> Optional[User]:
+        """
+        Load the user for request authentication
+
+        Lean projection used on every authenticated request: the user row
+        plus its roles (two statements). All other relationships raise
+        instead of loading, so a new eager relationship cannot silently
+        widen the auth query.
+
+        Args:
+            user_id: User UUID
+
+        Returns:
+            User object with roles loaded, or None
+        """
+        stmt = select(User).where(User.id == user_id).options(*AUTH_PRINCIPAL_OPTIONS)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
         stmt = select(User).where(User.username == username)
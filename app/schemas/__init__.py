@@ -123,6 +123,7 @@ from app.schemas.transaction import (
     ExchangeTransactionResponse,
     ExchangeCalculationRequest,
     ExchangeCalculationResponse,
+    ExchangeQuoteResponse,
     
     # Transfer
     TransferTransactionCreate,
@@ -302,6 +303,7 @@ __all__ = [
     "ExchangeTransactionResponse",
     "ExchangeCalculationRequest",
     "ExchangeCalculationResponse",
+    "ExchangeQuoteResponse",
     "TransferTransactionCreate",
     "TransferTransactionResponse",
     "TransferReceiptRequest",
@@ -229,6 +229,12 @@ class CustomerResponse(BaseModel):
 
 
 
+class CustomerSearchResult(BaseModel):
+    """Ranked customer search hit"""
+    customer: CustomerResponse
+    score: float = Field(..., description="Match score (1.0 = exact ID/passport/customer number)")
+
+
 class CustomerSearchQuery(BaseModel):
     """Schema for customer search"""
     query: Optional[str] = Field(None, description="Search by name, phone, or ID")
@@ -5,9 +5,13 @@ Phase 8.2: Pydantic schemas for all report types
 """
 
 from datetime import date, datetime
+from enum import Enum
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
-from pydantic import BaseModel, Field
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
+
+from app.utils.cron import CronExpression
 
 
 # ==================== FINANCIAL REPORT SCHEMAS ====================
@@ -355,6 +359,105 @@ class ReportExportResponse(BaseModel):
         }
 
 
+# ==================== REPORT SCHEDULE SCHEMAS ====================
+
+class ScheduledReportTypeEnum(str, Enum):
+    """Reports that can be scheduled"""
+    DAILY_SUMMARY = "daily_summary"
+    MONTHLY_REVENUE = "monthly_revenue"
+    BRANCH_PERFORMANCE = "branch_performance"
+
+
+class ReportOutputFormatEnum(str, Enum):
+    """File format of a scheduled report"""
+    JSON = "json"
+    EXCEL = "excel"
+    PDF = "pdf"
+
+
+class ReportDeliveryMethodEnum(str, Enum):
+    """Delivery of a scheduled report"""
+    FILE = "file"
+    EMAIL = "email"
+
+
+def _validate_cron(value: Optional[str]) -> Optional[str]:
+    if value is not None:
+        try:
+            CronExpression(value)
+        except ValueError as e:
+            raise ValueError(str(e))
+    return value
+
+
+class ReportScheduleCreate(BaseModel):
+    """
+    Create Report Schedule
+
+    params fix report parameters (target_date, year/month, start_date/
+    end_date); when omitted each run reports the period before it (the
+    previous day or month).
+    """
+    name: str = Field(..., min_length=3, max_length=100)
+    report_type: ScheduledReportTypeEnum
+    params: Dict[str, Any] = Field(default_factory=dict)
+    branch_id: Optional[UUID] = None  # If None, all branches
+    cron_expression: str = Field(..., max_length=100, description="Five-field cron, UTC (e.g. '0 2 1 * *')")
+    output_format: ReportOutputFormatEnum = ReportOutputFormatEnum.PDF
+    delivery_method: ReportDeliveryMethodEnum = ReportDeliveryMethodEnum.FILE
+    recipients: List[EmailStr] = Field(default_factory=list)
+
+    model_config = ConfigDict(use_enum_values=True, validate_default=True)
+
+    _cron = field_validator('cron_expression')(_validate_cron)
+
+    @model_validator(mode='after')
+    def email_needs_recipients(self):
+        if self.delivery_method == ReportDeliveryMethodEnum.EMAIL and not self.recipients:
+            raise ValueError("Email delivery requires at least one recipient")
+        return self
+
+
+class ReportScheduleUpdate(BaseModel):
+    """Update Report Schedule (only provided fields change)"""
+    name: Optional[str] = Field(None, min_length=3, max_length=100)
+    params: Optional[Dict[str, Any]] = None
+    cron_expression: Optional[str] = Field(None, max_length=100)
+    output_format: Optional[ReportOutputFormatEnum] = None
+    delivery_method: Optional[ReportDeliveryMethodEnum] = None
+    recipients: Optional[List[EmailStr]] = None
+    is_active: Optional[bool] = None
+
+    model_config = ConfigDict(use_enum_values=True)
+
+    _cron = field_validator('cron_expression')(_validate_cron)
+
+
+class ReportScheduleResponse(BaseModel):
+    """Report Schedule"""
+    id: UUID
+    name: str
+    report_type: str
+    params: Dict[str, Any]
+    branch_id: Optional[UUID]
+    cron_expression: str
+    output_format: str
+    delivery_method: str
+    recipients: List[str]
+    is_active: bool
+
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
+    last_status: Optional[str]
+    last_error: Optional[str]
+    last_output_path: Optional[str]
+
+    created_by: Optional[UUID]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # ==================== DASHBOARD SCHEMAS ====================
 
 class DashboardOverviewResponse(BaseModel):
@@ -16,7 +16,7 @@ Features:
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, Annotated, Literal
+from typing import Optional, List, Annotated, Literal, Union
 from uuid import UUID
 from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 
@@ -304,6 +304,11 @@ class ExchangeTransactionCreate(BaseModel):
         le=100,
         description="Commission percentage (if not provided, uses default)"
     )
+    quote_id: Optional[str] = Field(
+        None,
+        max_length=100,
+        description="Quote from /transactions/exchange/quote; locks its rate"
+    )
     
     reference_number: Optional[str] = Field(None, max_length=100)
     description: Optional[str] = Field(
@@ -398,6 +403,10 @@ class ExchangeCalculationRequest(BaseModel):
     to_currency_id: UUID
     from_amount: Decimal = Field(..., gt=0)
     commission_percentage: Optional[Decimal] = Field(None, ge=0, le=100)
+    branch_id: Optional[UUID] = Field(
+        None,
+        description="Quotes only: hold the total cost at this branch until the quote expires"
+    )
 
 
 class ExchangeCalculationResponse(BaseModel):
@@ -416,6 +425,15 @@ class ExchangeCalculationResponse(BaseModel):
     effective_rate: Decimal
 
 
+class ExchangeQuoteResponse(ExchangeCalculationResponse):
+    """Schema for an exchange quote (calculation with a locked rate)"""
+    
+    quote_id: str
+    expires_at: datetime
+    branch_id: Optional[UUID] = None
+    hold_id: Optional[UUID] = None
+
+
 # ==================== Transfer Transaction Schemas ====================
 
 class TransferTransactionCreate(BaseModel):
@@ -606,6 +624,76 @@ class TransactionListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# ==================== Batch Posting ====================
+
+class BatchIncomeItem(IncomeTransactionCreate):
+    """Income entry in a back-office batch"""
+
+    transaction_type: Literal[TransactionTypeEnum.INCOME]
+
+
+class BatchExpenseItem(ExpenseTransactionCreate):
+    """Expense entry in a back-office batch"""
+
+    transaction_type: Literal[TransactionTypeEnum.EXPENSE]
+
+
+BatchTransactionItem = Annotated[
+    Union[BatchIncomeItem, BatchExpenseItem],
+    Field(discriminator="transaction_type")
+]
+
+
+class TransactionBatchCreate(BaseModel):
+    """Schema for posting a batch of income/expense transactions"""
+
+    items: List[BatchTransactionItem] = Field(..., min_length=1)
+    all_or_nothing: bool = Field(
+        True,
+        description="Post nothing if any item fails validation"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "all_or_nothing": True,
+                "items": [
+                    {
+                        "transaction_type": "expense",
+                        "amount": 5000.00,
+                        "currency_id": "123e4567-e89b-12d3-a456-426614174000",
+                        "branch_id": "223e4567-e89b-12d3-a456-426614174001",
+                        "expense_category": "rent",
+                        "expense_to": "Property Owner LLC",
+                        "reference_number": "RENT-JAN-2025-BR001"
+                    },
+                    {
+                        "transaction_type": "income",
+                        "amount": 150.50,
+                        "currency_id": "123e4567-e89b-12d3-a456-426614174000",
+                        "branch_id": "223e4567-e89b-12d3-a456-426614174001",
+                        "income_category": "service_fee"
+                    }
+                ]
+            }
+        }
+    )
+
+
+class TransactionBatchResponse(BaseModel):
+    """Result of a batch posting"""
+
+    success: bool
+    total: int
+    successful: int
+    failed: int
+    errors: List[dict] = Field(default_factory=list)
+    created: List[dict] = Field(
+        default_factory=list,
+        description="index, id and transaction_number of each posted item"
+    )
+
+
 # ==================== Statistics & Summary ====================
 
 class TransactionSummary(BaseModel):
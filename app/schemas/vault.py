@@ -230,6 +230,8 @@ class VaultTransferResponse(BaseModel):
     
     to_branch_id: Optional[UUID] = None
     to_branch_code: Optional[str] = None
+
+    from_branch_id: Optional[UUID] = None  # Set for branch cash sweeps
     
     currency_id: UUID
     currency_code: Optional[str] = None
@@ -313,6 +315,81 @@ class VaultReconciliationReport(BaseModel):
     notes: Optional[str]
 
 
+# ==================== CASH DISTRIBUTION SCHEMAS ====================
+
+class DistributionTargetEnum(str, Enum):
+    """Level a planned top-up or sweep brings a branch balance to"""
+    THRESHOLD = "threshold"  # Top up to minimum, sweep down to maximum
+    MIDPOINT = "midpoint"    # Halfway between minimum and maximum
+
+
+class DistributionDirectionEnum(str, Enum):
+    """Direction of a planned cash movement"""
+    TOP_UP = "top_up"  # Vault to branch
+    SWEEP = "sweep"    # Branch to vault
+
+
+class CashDistributionRequest(BaseModel):
+    """Plan (and optionally execute) branch top-ups and sweeps from a vault"""
+    vault_id: Optional[UUID] = None  # If None, the main vault
+    currency_ids: Optional[List[UUID]] = None  # If None, all currencies
+    branch_ids: Optional[List[UUID]] = None  # If None, all active branches
+    target: DistributionTargetEnum = DistributionTargetEnum.THRESHOLD
+    include_sweeps: bool = True
+    execute: bool = False  # False: dry run, only return the plan
+    notes: Optional[str] = Field(None, max_length=500)
+
+
+class CashDistributionLine(BaseModel):
+    """One planned branch top-up or sweep"""
+    branch_id: UUID
+    branch_code: str
+    currency_id: UUID
+    currency_code: str
+    direction: DistributionDirectionEnum
+
+    available_balance: Decimal
+    minimum_threshold: Optional[Decimal] = None
+    maximum_threshold: Optional[Decimal] = None
+    required_amount: Decimal
+    planned_amount: Decimal
+
+    transfer_id: Optional[UUID] = None
+    transfer_number: Optional[str] = None
+    skipped_reason: Optional[str] = None
+
+    model_config = ConfigDict(use_enum_values=True)
+
+
+class CashDistributionCurrencyTotal(BaseModel):
+    """Vault position of one currency before and after a distribution run"""
+    currency_id: UUID
+    currency_code: str
+    opening_vault_balance: Decimal
+    total_top_ups: Decimal
+    total_sweeps: Decimal
+    shortfall: Decimal  # Top-ups the vault could not fund
+    closing_vault_balance: Decimal
+
+
+class CashDistributionPlan(BaseModel):
+    """Distribution plan document (and run result when executed)"""
+    plan_id: UUID
+    vault_id: UUID
+    vault_code: str
+    target: DistributionTargetEnum
+    executed: bool
+    created_by: UUID
+    created_at: datetime
+
+    transfer_count: int
+    lines: List[CashDistributionLine]
+    currencies: List[CashDistributionCurrencyTotal]
+    notes: Optional[str] = None
+
+    model_config = ConfigDict(use_enum_values=True)
+
+
 # ==================== STATISTICS SCHEMAS ====================
 
 class VaultStatistics(BaseModel):
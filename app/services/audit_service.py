@@ -0,0 +1,333 @@
+"""
+Audit Service
+Batched, asynchronous writer for the audit_logs table
+
+Request handlers push audit entries onto a bounded in-memory queue and
+return immediately. A single background task drains the queue and writes
+batches with one multi-row INSERT, either every AUDIT_FLUSH_INTERVAL_MS or
+as soon as AUDIT_BATCH_SIZE entries are waiting. When the queue is full or
+the database is unreachable, entries are spilled to disk (JSON lines) and
+replayed when the writer is idle, so auditing never blocks a request.
+
+When the database rejects a batch because of its content, the batch is
+retried row by row; rows that still fail on their own are moved to a
+quarantine file instead of being spilled, so one bad entry cannot hold
+back the rest of the batch or be replayed for ever.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, StatementError
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.db.models.audit import AuditLog
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Columns written to the audit_logs table
+AUDIT_COLUMNS = (
+    "user_id",
+    "action",
+    "entity_type",
+    "entity_id",
+    "changes",
+    "ip_address",
+    "user_agent",
+    "description",
+    "timestamp",
+)
+
+
+class AuditLogWriter:
+    """
+    Background audit log writer
+
+    Usage:
+        audit_log_writer.log(action="create", entity_type="transaction", ...)
+
+    The writer is started and stopped from the application lifespan.
+    Before `start()` is called (e.g. in scripts or tests) entries are still
+    queued and can be flushed manually with `flush()`.
+    """
+
+    # Wait this long after a failed batch before replaying the spill file
+    SPILL_RETRY_SECONDS = 30
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        max_queue_size: int = settings.AUDIT_QUEUE_MAX_SIZE,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval_ms: int = settings.AUDIT_FLUSH_INTERVAL_MS,
+        spill_dir: str = settings.AUDIT_SPILL_DIR,
+    ):
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._spill_file = Path(spill_dir) / "audit_spill.jsonl"
+        self._quarantine_file = Path(spill_dir) / "audit_quarantine.jsonl"
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._retry_after = 0.0
+
+        # Counters exposed through stats()
+        self._written = 0
+        self._spilled = 0
+        self._failed_batches = 0
+        self._quarantined = 0
+
+    # ==================== Producer API ====================
+
+    def log(
+        self,
+        action: str,
+        entity_type: str,
+        user_id: Optional[UUID] = None,
+        entity_id: Optional[UUID] = None,
+        changes: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue an audit entry without awaiting the database
+
+        Returns:
+            True if the entry was queued, False if it was spilled to disk
+        """
+        return self.enqueue({
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "changes": changes,
+            "ip_address": ip_address,
+            "user_agent": user_agent[:255] if user_agent else None,
+            "description": description,
+            "timestamp": datetime.utcnow(),
+        })
+
+    def enqueue(self, entry: Dict[str, Any]) -> bool:
+        """Queue a raw audit row; spill to disk when the queue is full"""
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except asyncio.QueueFull:
+            self._spill([entry])
+            return False
+
+    # ==================== Lifecycle ====================
+
+    async def start(self) -> None:
+        """Start the background flush task"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+        logger.info("Audit log writer started")
+
+    async def stop(self) -> None:
+        """Stop the background task and flush everything still queued"""
+        if not self._running:
+            return
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+        logger.info("Audit log writer stopped")
+
+    async def flush(self) -> int:
+        """Write all currently queued entries; returns rows written"""
+        written = 0
+        while not self._queue.empty():
+            batch = self._drain(self._batch_size)
+            written += await self._write_batch(batch)
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Return writer counters for health/monitoring endpoints"""
+        return {
+            "running": self._running,
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "spilled": self._spilled,
+            "failed_batches": self._failed_batches,
+            "quarantined": self._quarantined,
+            "spill_pending": self._spill_file.exists(),
+        }
+
+    # ==================== Background Loop ====================
+
+    async def _run(self) -> None:
+        """Collect batches by size or time and write them"""
+        while self._running:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self._flush_interval
+
+            while len(batch) < self._batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                batch.extend(self._drain(self._batch_size - len(batch)))
+
+            if batch:
+                await self._write_batch(batch)
+            elif self._spill_file.exists() and time.monotonic() >= self._retry_after:
+                await self._replay_spill()
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        """Take up to `limit` entries that are already queued"""
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert a batch in one statement; spill it if the database is unreachable"""
+        if not batch:
+            return 0
+
+        try:
+            rows = [self._to_row(entry) for entry in batch]
+            await self._insert(rows)
+        except Exception as e:
+            self._failed_batches += 1
+            if self._is_row_error(e):
+                logger.error(f"Audit batch of {len(batch)} rows rejected, retrying row by row: {str(e)}")
+                return await self._write_rows(batch)
+            self._retry_after = time.monotonic() + self.SPILL_RETRY_SECONDS
+            logger.error(f"Audit batch of {len(batch)} rows failed, spilling to disk: {str(e)}")
+            self._spill(batch)
+            return 0
+
+        self._written += len(rows)
+        return len(rows)
+
+    async def _write_rows(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert entries one by one, quarantining those the database rejects"""
+        written = 0
+        for index, entry in enumerate(batch):
+            try:
+                await self._insert([self._to_row(entry)])
+            except Exception as e:
+                if not self._is_row_error(e):
+                    # Lost the database mid-way: keep the rest for replay
+                    self._retry_after = time.monotonic() + self.SPILL_RETRY_SECONDS
+                    logger.error(f"Audit row insert failed, spilling {len(batch) - index} rows: {str(e)}")
+                    self._spill(batch[index:])
+                    break
+                logger.error(f"Audit entry rejected, quarantined: {str(e)}")
+                self._quarantine(entry)
+                continue
+            written += 1
+        self._written += written
+        return written
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        async with self._session_factory() as session:
+            await session.execute(insert(AuditLog.__table__), rows)
+            await session.commit()
+
+    @staticmethod
+    def _is_row_error(error: Exception) -> bool:
+        """Whether a failure is caused by the rows (not by the database being down)"""
+        if isinstance(error, (DataError, IntegrityError)):
+            return True
+        if isinstance(error, DBAPIError):
+            return False
+        # Parameter processing errors (e.g. unserialisable JSON) and bad entries
+        return isinstance(error, (StatementError, TypeError, ValueError, KeyError, AttributeError))
+
+    # ==================== Spill-to-disk ====================
+
+    def _spill(self, entries: List[Dict[str, Any]]) -> None:
+        """Append entries to the spill file as JSON lines"""
+        try:
+            self._spill_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._spill_file.open("a", encoding="utf-8") as fh:
+                for entry in entries:
+                    fh.write(json.dumps(entry, default=str) + "\n")
+            self._spilled += len(entries)
+        except OSError as e:
+            logger.critical(f"Audit spill failed, {len(entries)} entries lost: {str(e)}")
+
+    def _quarantine(self, entry: Dict[str, Any]) -> None:
+        """Set aside an entry the database will never accept"""
+        try:
+            self._quarantine_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._quarantine_file.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, default=str) + "\n")
+            self._quarantined += 1
+        except (OSError, TypeError, ValueError) as e:
+            logger.critical(f"Audit quarantine failed, entry lost: {str(e)}")
+
+    async def _replay_spill(self) -> None:
+        """Move spilled entries back to the database once it is reachable"""
+        replay_file = self._spill_file.with_suffix(".replay")
+        try:
+            self._spill_file.rename(replay_file)
+        except OSError:
+            return
+
+        entries = []
+        with replay_file.open(encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(self._from_spill(json.loads(line)))
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Unreadable spilled audit entry, quarantined: {str(e)}")
+                    self._quarantine({"raw": line.rstrip("\n")})
+        replay_file.unlink()
+
+        for start in range(0, len(entries), self._batch_size):
+            await self._write_batch(entries[start:start + self._batch_size])
+
+        logger.info(f"Replayed {len(entries)} spilled audit entries")
+
+    @staticmethod
+    def _from_spill(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Restore types that were stringified by json.dumps"""
+        for key in ("user_id", "entity_id"):
+            if entry.get(key):
+                entry[key] = UUID(entry[key])
+        if entry.get("timestamp"):
+            entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+        return entry
+
+    @staticmethod
+    def _to_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a queued entry onto audit_logs columns"""
+        row = {column: entry.get(column) for column in AUDIT_COLUMNS}
+        row["timestamp"] = row["timestamp"] or datetime.utcnow()
+        row["entity_type"] = row["entity_type"] or "system"
+        return row
+
+
+# Global audit log writer
+audit_log_writer = AuditLogWriter()
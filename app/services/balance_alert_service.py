@@ -0,0 +1,360 @@
+"""
+Balance Alert Service
+Event-driven evaluation of branch balance thresholds
+
+Thresholds are checked when a balance changes, for that (branch, currency)
+only, from the 'balance.changed' outbox events. The monitor keeps an index
+of the positions currently below their minimum or above their maximum
+threshold, so dashboard alert counts are dictionary lookups instead of
+scans of branch_balances.
+
+When a position enters a breach, its BranchAlert is written by a background
+task. Alerts are deduplicated twice: the index only reports a position once
+per breach, and the write holds an advisory lock per (branch, currency,
+alert type) around get_or_create_alert so several workers never create two
+unresolved alerts for one breach.
+
+A periodic resync (one query over breached rows) repairs the index for
+events the outbox tail did not see.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.db.models.branch import BranchAlert, BranchBalance, BalanceAlertType, AlertSeverity
+from app.db.models.currency import Currency
+from app.repositories.branch_repo import BranchRepository
+from app.services.outbox_service import BALANCE_CHANGED, outbox_relay
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Severity of the alert raised for each threshold breach
+ALERT_SEVERITY = {
+    BalanceAlertType.LOW_BALANCE: AlertSeverity.WARNING,
+    BalanceAlertType.HIGH_BALANCE: AlertSeverity.INFO,
+}
+
+Position = Tuple[UUID, UUID]
+
+
+class BalanceBreach:
+    """A (branch, currency) balance outside one of its thresholds"""
+
+    __slots__ = ("branch_id", "currency_id", "alert_type", "balance", "threshold", "since")
+
+    def __init__(
+        self,
+        branch_id: UUID,
+        currency_id: UUID,
+        alert_type: BalanceAlertType,
+        balance: Decimal,
+        threshold: Decimal
+    ):
+        self.branch_id = branch_id
+        self.currency_id = currency_id
+        self.alert_type = alert_type
+        self.balance = balance
+        self.threshold = threshold
+        self.since = datetime.utcnow()
+
+    @property
+    def key(self) -> Tuple[UUID, UUID, BalanceAlertType]:
+        return (self.branch_id, self.currency_id, self.alert_type)
+
+    @property
+    def severity(self) -> AlertSeverity:
+        return ALERT_SEVERITY[self.alert_type]
+
+    def describe(self, currency_code: str) -> Tuple[str, str]:
+        """Alert title and message, worded like BranchService.check_balance_alerts"""
+        if self.alert_type == BalanceAlertType.LOW_BALANCE:
+            return (
+                f"Low Balance Alert - {currency_code}",
+                f"Balance ({self.balance}) is below minimum threshold ({self.threshold})"
+            )
+        return (
+            f"High Balance Alert - {currency_code}",
+            f"Balance ({self.balance}) is above maximum threshold ({self.threshold})"
+        )
+
+
+def evaluate_thresholds(
+    branch_id: UUID,
+    currency_id: UUID,
+    balance: Decimal,
+    minimum_threshold: Optional[Decimal],
+    maximum_threshold: Optional[Decimal]
+) -> Dict[BalanceAlertType, Optional[BalanceBreach]]:
+    """Breach (or None) per threshold alert type for one balance"""
+    low = minimum_threshold is not None and balance < minimum_threshold
+    high = maximum_threshold is not None and balance > maximum_threshold
+    return {
+        BalanceAlertType.LOW_BALANCE: BalanceBreach(
+            branch_id, currency_id, BalanceAlertType.LOW_BALANCE, balance, minimum_threshold
+        ) if low else None,
+        BalanceAlertType.HIGH_BALANCE: BalanceBreach(
+            branch_id, currency_id, BalanceAlertType.HIGH_BALANCE, balance, maximum_threshold
+        ) if high else None,
+    }
+
+
+async def ensure_breach_alerts(db: AsyncSession, breaches: Iterable[BalanceBreach]) -> List[BranchAlert]:
+    """
+    Get or create the unresolved BranchAlert of each breach (caller commits)
+
+    Each get_or_create_alert runs under a transaction-scoped advisory lock
+    on its (branch, currency, alert type), taken in a fixed order.
+    """
+    breaches = sorted(breaches, key=lambda b: (str(b.branch_id), str(b.currency_id), b.alert_type.value))
+    if not breaches:
+        return []
+
+    codes = dict((await db.execute(
+        select(Currency.id, Currency.code).where(Currency.id.in_({b.currency_id for b in breaches}))
+    )).all())
+
+    repo = BranchRepository(db)
+    alerts = []
+    for breach in breaches:
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(
+            f"branch_alert:{breach.branch_id}:{breach.currency_id}:{breach.alert_type.value}"
+        ))))
+        title, message = breach.describe(codes.get(breach.currency_id, "UNK"))
+        alerts.append(await repo.get_or_create_alert(
+            branch_id=breach.branch_id,
+            currency_id=breach.currency_id,
+            alert_type=breach.alert_type,
+            severity=breach.severity,
+            title=title,
+            message=message
+        ))
+    return alerts
+
+
+class BalanceAlertMonitor:
+    """
+    Index of breached balance positions, fed by outbox events
+
+    Started and stopped from the application lifespan. Until the first
+    resync has run, ready is False and callers fall back to scanning.
+    Breaches present at startup already had their alerts raised (or are
+    raised by check_balance_alerts); only breaches entered while running
+    are queued for the alert writer.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        resync_seconds: int = settings.BALANCE_ALERT_RESYNC_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self._resync_seconds = resync_seconds
+        self._breaches: Dict[Tuple[UUID, UUID, BalanceAlertType], BalanceBreach] = {}
+        # Guards the index: it is updated on the event loop and read from
+        # sync endpoints running in threadpool threads
+        self._lock = threading.Lock()
+        # Outbox id of the last event applied per position
+        self._versions: Dict[Position, int] = {}
+        self._counts: Counter = Counter()
+        self._branch_counts: Counter = Counter()
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._alerts_written = 0
+        self.ready = False
+
+    # ==================== Reads ====================
+
+    def count(self, alert_type: BalanceAlertType, branch_id: Optional[UUID] = None) -> int:
+        """Number of positions currently in breach, optionally for one branch"""
+        with self._lock:
+            if branch_id is None:
+                return self._counts[alert_type]
+            return self._branch_counts[(UUID(str(branch_id)), alert_type)]
+
+    def breaches(
+        self,
+        branch_id: Optional[UUID] = None,
+        alert_type: Optional[BalanceAlertType] = None
+    ) -> List[BalanceBreach]:
+        """Current breaches, optionally filtered by branch and alert type"""
+        with self._lock:
+            current = list(self._breaches.values())
+        return [
+            breach for breach in current
+            if (branch_id is None or breach.branch_id == branch_id)
+            and (alert_type is None or breach.alert_type == alert_type)
+        ]
+
+    # ==================== Events ====================
+
+    def apply_event(self, event_id: int, payload: Dict[str, Any]) -> None:
+        """Re-evaluate the thresholds of the balance a 'balance.changed' event describes"""
+        if "minimum_threshold" not in payload:
+            return
+        position = (UUID(payload["branch_id"]), UUID(payload["currency_id"]))
+        if event_id <= self._versions.get(position, 0):
+            return
+        self._versions[position] = event_id
+
+        evaluated = evaluate_thresholds(
+            *position,
+            Decimal(payload["balance"]),
+            _optional_decimal(payload["minimum_threshold"]),
+            _optional_decimal(payload["maximum_threshold"])
+        )
+        for alert_type, breach in evaluated.items():
+            self._set((*position, alert_type), breach)
+
+    # ==================== Resync ====================
+
+    async def resync(self) -> int:
+        """Rebuild the index from breached branch_balances rows; returns breaches"""
+        version = outbox_relay.last_id
+        async with self._session_factory() as session:
+            rows = (await session.execute(
+                select(
+                    BranchBalance.branch_id, BranchBalance.currency_id, BranchBalance.balance,
+                    BranchBalance.minimum_threshold, BranchBalance.maximum_threshold
+                ).where(
+                    and_(
+                        BranchBalance.is_active == True,
+                        or_(
+                            BranchBalance.balance < BranchBalance.minimum_threshold,
+                            BranchBalance.balance > BranchBalance.maximum_threshold
+                        )
+                    )
+                )
+            )).all()
+
+        scanned = {}
+        for row in rows:
+            for breach in evaluate_thresholds(*row).values():
+                if breach is not None:
+                    scanned[breach.key] = breach
+
+        # Positions changed by an event newer than the scan keep their state
+        newer = {position for position, seen in self._versions.items() if seen > version}
+        for key in set(self._breaches) | set(scanned):
+            if key[:2] not in newer:
+                self._set(key, scanned.get(key))
+
+        self.ready = True
+        return len(self._breaches)
+
+    # ==================== Lifecycle ====================
+
+    async def start(self) -> None:
+        """Load the index and start writing alerts for new breaches"""
+        if self._task is not None:
+            return
+        try:
+            await self.resync()
+        except Exception as e:
+            logger.error(f"Balance alert index load failed: {str(e)}")
+        self._task = asyncio.create_task(self._run(), name="balance-alert-monitor")
+        logger.info(f"Balance alert monitor started ({len(self._breaches)} breaches)")
+
+    async def stop(self) -> None:
+        """Stop the alert writer"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Balance alert monitor stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return monitor counters for health/monitoring endpoints"""
+        return {
+            "running": self._task is not None,
+            "ready": self.ready,
+            "breaches": self._breach_counts(),
+            "pending_alerts": self._pending.qsize(),
+            "alerts_written": self._alerts_written,
+        }
+
+    def _breach_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {alert_type.value: count for alert_type, count in self._counts.items()}
+
+    async def write_pending(self, *breaches: BalanceBreach) -> int:
+        """Write alerts for the given and all queued new breaches still in breach"""
+        queued = list(breaches)
+        while not self._pending.empty():
+            queued.append(self._pending.get_nowait())
+        breaches = [breach for breach in queued if self._breaches.get(breach.key) is breach]
+        if not breaches:
+            return 0
+
+        async with self._session_factory() as session:
+            await ensure_breach_alerts(session, breaches)
+            await session.commit()
+        self._alerts_written += len(breaches)
+        return len(breaches)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_resync = loop.time() + self._resync_seconds
+        while True:
+            try:
+                breach = await asyncio.wait_for(
+                    self._pending.get(), timeout=max(next_resync - loop.time(), 0)
+                )
+                await self.write_pending(breach)
+            except asyncio.TimeoutError:
+                pass
+            except Exception as e:
+                logger.error(f"Balance alert write failed: {str(e)}")
+                await asyncio.sleep(1)
+            if loop.time() >= next_resync:
+                try:
+                    await self.resync()
+                except Exception as e:
+                    logger.error(f"Balance alert resync failed: {str(e)}")
+                next_resync = loop.time() + self._resync_seconds
+
+    # ==================== Index ====================
+
+    def _set(self, key: Tuple[UUID, UUID, BalanceAlertType], breach: Optional[BalanceBreach]) -> None:
+        """Record the breach state of one position and alert type, keeping counts"""
+        with self._lock:
+            branch_id, _, alert_type = key
+            current = self._breaches.get(key)
+            if breach is None:
+                if current is not None:
+                    del self._breaches[key]
+                    self._counts[alert_type] -= 1
+                    self._branch_counts[(branch_id, alert_type)] -= 1
+            elif current is None:
+                self._breaches[key] = breach
+                self._counts[alert_type] += 1
+                self._branch_counts[(branch_id, alert_type)] += 1
+                if self._task is not None:
+                    self._pending.put_nowait(breach)
+            else:
+                # Still breached: refresh the figures, no new alert
+                current.balance = breach.balance
+                current.threshold = breach.threshold
+
+
+def _optional_decimal(value: Optional[str]) -> Optional[Decimal]:
+    return None if value is None else Decimal(value)
+
+
+# Global monitor, fed by the outbox
+balance_alert_monitor = BalanceAlertMonitor()
+outbox_relay.subscribe(BALANCE_CHANGED, balance_alert_monitor.apply_event)
@@ -0,0 +1,207 @@
+"""
+Branch Balance Read Model
+In-memory copy of branch balances for high-frequency reads
+
+Balance screens, GET /branches/{id}/balances and check_sufficient_balance
+read from here instead of querying branch_balances (with its currency)
+on every call. The model is filled on demand from the database and kept
+current by 'balance.changed' outbox events:
+
+- Read-your-writes: the worker that commits a balance change applies its
+  own events right after commit
+- Bounded staleness: other workers apply the events as the outbox relay
+  tails them, and any entry not confirmed by a load or an event within
+  BALANCE_READ_MODEL_MAX_STALENESS_SECONDS is reloaded from the database
+
+Each entry remembers the outbox id it reflects, so duplicate or late
+events never move a balance backwards.
+"""
+
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.outbox_service import BALANCE_CHANGED, outbox_relay
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CurrencyRef:
+    """Currency fields shown with a balance"""
+
+    __slots__ = ("id", "code", "name_en")
+
+    def __init__(self, id: UUID, code: str, name_en: str):
+        self.id = id
+        self.code = code
+        self.name_en = name_en
+
+
+class BalanceSnapshot:
+    """
+    Read-only view of one branch balance
+
+    Has the BranchBalance attributes the balance serializers use, so it can
+    be passed wherever a loaded BranchBalance is only read.
+    """
+
+    __slots__ = (
+        "id", "branch_id", "currency_id", "currency", "balance", "reserved_balance",
+        "minimum_threshold", "maximum_threshold", "last_updated", "updated_at",
+        "last_reconciled_at", "version", "confirmed_at",
+    )
+
+    @property
+    def available_balance(self) -> Decimal:
+        return self.balance - self.reserved_balance
+
+    @classmethod
+    def from_model(cls, balance, version: int) -> "BalanceSnapshot":
+        """Snapshot a BranchBalance loaded with its currency"""
+        snapshot = cls()
+        snapshot.id = balance.id
+        snapshot.branch_id = balance.branch_id
+        snapshot.currency_id = balance.currency_id
+        currency = balance.currency
+        snapshot.currency = CurrencyRef(currency.id, currency.code, currency.name_en) if currency else None
+        snapshot.balance = balance.balance or Decimal("0")
+        snapshot.reserved_balance = balance.reserved_balance or Decimal("0")
+        snapshot.minimum_threshold = balance.minimum_threshold
+        snapshot.maximum_threshold = balance.maximum_threshold
+        snapshot.last_updated = balance.last_updated
+        snapshot.updated_at = balance.updated_at
+        snapshot.last_reconciled_at = getattr(balance, "last_reconciled_at", None)
+        snapshot.version = version
+        snapshot.confirmed_at = time.monotonic()
+        return snapshot
+
+
+def balance_event_payload(balance) -> Dict[str, Any]:
+    """
+    'balance.changed' payload for a BranchBalance or a RETURNING row
+
+    Thresholds are included only when the source has them.
+    """
+
+    def amount(value):
+        return None if value is None else str(value)
+
+    payload = {
+        "branch_id": str(balance.branch_id),
+        "currency_id": str(balance.currency_id),
+        "balance": amount(balance.balance),
+        "reserved_balance": amount(balance.reserved_balance),
+        "last_updated": (balance.last_updated or datetime.utcnow()).isoformat(),
+    }
+    if hasattr(balance, "minimum_threshold"):
+        payload["minimum_threshold"] = amount(balance.minimum_threshold)
+        payload["maximum_threshold"] = amount(balance.maximum_threshold)
+    return payload
+
+
+class BranchBalanceReadModel:
+    """Per-process balance snapshots keyed by branch_id, then currency_id"""
+
+    def __init__(self, max_staleness_seconds: float = settings.BALANCE_READ_MODEL_MAX_STALENESS_SECONDS):
+        self.max_staleness = max_staleness_seconds
+        self._balances: Dict[UUID, Dict[UUID, BalanceSnapshot]] = {}
+        # branch_id -> monotonic time its full currency list was loaded
+        self._branches: Dict[UUID, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ==================== Reads ====================
+
+    def get(self, branch_id: UUID, currency_id: UUID) -> Optional[BalanceSnapshot]:
+        """Fresh snapshot of one balance, or None if it must be loaded"""
+        snapshot = self._balances.get(branch_id, {}).get(currency_id)
+        if snapshot is None or not self._is_fresh(snapshot.confirmed_at):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def get_branch(self, branch_id: UUID) -> Optional[List[BalanceSnapshot]]:
+        """Fresh snapshots of all balances of a branch, or None if they must be loaded"""
+        loaded_at = self._branches.get(branch_id)
+        if loaded_at is None or not self._is_fresh(loaded_at):
+            self.misses += 1
+            return None
+
+        snapshots = list(self._balances.get(branch_id, {}).values())
+        if any(not self._is_fresh(s.confirmed_at) for s in snapshots):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshots
+
+    # ==================== Loads ====================
+
+    def load(self, balances: Iterable) -> List[BalanceSnapshot]:
+        """Store BranchBalance rows (with currency) just read from the database"""
+        version = outbox_relay.last_id
+        snapshots = []
+        for balance in balances:
+            snapshot = BalanceSnapshot.from_model(balance, version)
+            branch = self._balances.setdefault(snapshot.branch_id, {})
+            current = branch.get(snapshot.currency_id)
+            if current is not None and current.version > version:
+                # An event newer than the tail position was applied meanwhile
+                current.confirmed_at = snapshot.confirmed_at
+                snapshot = current
+            branch[snapshot.currency_id] = snapshot
+            snapshots.append(snapshot)
+        return snapshots
+
+    def load_branch(self, branch_id: UUID, balances: Iterable) -> List[BalanceSnapshot]:
+        """Replace the snapshots of a branch with its full balance list"""
+        snapshots = self.load(balances)
+        self._balances[branch_id] = {s.currency_id: s for s in snapshots}
+        self._branches[branch_id] = time.monotonic()
+        return snapshots
+
+    # ==================== Events ====================
+
+    def apply_event(self, event_id: int, payload: Dict[str, Any]) -> None:
+        """Apply a 'balance.changed' event to a loaded snapshot"""
+        branch_id = UUID(payload["branch_id"])
+        snapshot = self._balances.get(branch_id, {}).get(UUID(payload["currency_id"]))
+
+        if snapshot is None:
+            # Balance not cached (or new for this branch): reload the branch list
+            self._branches.pop(branch_id, None)
+            return
+        if event_id <= snapshot.version:
+            return
+
+        snapshot.balance = Decimal(payload["balance"])
+        snapshot.reserved_balance = Decimal(payload["reserved_balance"])
+        if "minimum_threshold" in payload:
+            snapshot.minimum_threshold = _optional_decimal(payload["minimum_threshold"])
+            snapshot.maximum_threshold = _optional_decimal(payload["maximum_threshold"])
+        snapshot.last_updated = snapshot.updated_at = datetime.fromisoformat(payload["last_updated"])
+        snapshot.version = event_id
+        snapshot.confirmed_at = time.monotonic()
+
+    def clear(self) -> None:
+        self._balances.clear()
+        self._branches.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"balances": sum(map(len, self._balances.values())), "hits": self.hits, "misses": self.misses}
+
+    def _is_fresh(self, confirmed_at: float) -> bool:
+        return time.monotonic() - confirmed_at <= self.max_staleness
+
+
+def _optional_decimal(value: Optional[str]) -> Optional[Decimal]:
+    return None if value is None else Decimal(value)
+
+
+# Global read model, fed by the outbox
+balance_read_model = BranchBalanceReadModel()
+outbox_relay.subscribe(BALANCE_CHANGED, balance_read_model.apply_event)
@@ -0,0 +1,467 @@
+"""
+Balance Reservation Service
+Expiring holds on branch balances
+
+A hold moves an amount from available to reserved balance with a single
+conditional UPDATE (only if enough is available) and records it in
+balance_reservations with an expiry time. The holder later either commits
+the hold, which deducts it from the balance, or releases it. Both are one
+statement that flips the reservation from 'active' and adjusts the balance
+row in the same query, so committing needs no re-validation under lock:
+the funds were set aside when the hold was placed.
+
+Active holds past their expiry are released in batches by the background
+sweeper started from the application lifespan. Committing a hold that has
+lapsed but not been swept yet releases it in the same statement, so the
+caller's fallback sees the funds as available again.
+
+Every statement that changes a balance row records a 'balance.changed'
+outbox event from its RETURNING values.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update, func, and_, case, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import InsufficientBalanceError, ValidationError
+from app.db.base import AsyncSessionLocal
+from app.db.models.branch import (
+    BranchBalance, BalanceReservation, ReservationStatus, BalanceChangeType
+)
+from app.repositories.branch_repo import BranchRepository
+from app.services.outbox_service import OutboxService
+from app.services.balance_read_model import BALANCE_CHANGED, balance_event_payload
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BalanceReservationService:
+    """Places, commits and releases balance holds"""
+
+    # What a hold is for (BalanceReservation.reference_type)
+    TRANSFER = "transfer"
+    EXCHANGE_QUOTE = "exchange_quote"
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = BranchRepository(db)
+
+    # ==================== Hold ====================
+
+    async def hold(
+        self,
+        branch_id: UUID,
+        currency_id: UUID,
+        amount: Decimal,
+        reference_type: str,
+        ttl: timedelta,
+        reference_id: Optional[UUID] = None,
+        created_by: Optional[UUID] = None
+    ) -> BalanceReservation:
+        """
+        Reserve amount of the available balance until now + ttl
+
+        Args:
+            branch_id: Branch UUID
+            currency_id: Currency UUID
+            amount: Amount to hold
+            reference_type: What the hold is for (TRANSFER, EXCHANGE_QUOTE)
+            ttl: How long the hold lasts before the sweeper releases it
+            reference_id: Transaction the hold belongs to, if known
+            created_by: User placing the hold
+
+        Returns:
+            The active BalanceReservation (flushed, id assigned)
+
+        Raises:
+            ValidationError: Non-positive amount
+            InsufficientBalanceError: Available balance is lower than amount
+        """
+        if amount <= 0:
+            raise ValidationError("Hold amount must be positive")
+
+        now = datetime.utcnow()
+        reserved = await self.db.execute(
+            update(BranchBalance)
+            .where(
+                and_(
+                    BranchBalance.branch_id == branch_id,
+                    BranchBalance.currency_id == currency_id,
+                    BranchBalance.is_active == True,
+                    BranchBalance.balance - BranchBalance.reserved_balance >= amount
+                )
+            )
+            .values(
+                reserved_balance=BranchBalance.reserved_balance + amount,
+                last_updated=now
+            )
+            .returning(*self._balance_columns())
+        )
+        balance_row = reserved.one_or_none()
+        if balance_row is None:
+            raise InsufficientBalanceError(
+                f"Insufficient available balance to hold {amount} "
+                f"(branch {branch_id}, currency {currency_id})"
+            )
+
+        reservation = BalanceReservation(
+            branch_id=branch_id,
+            currency_id=currency_id,
+            amount=amount,
+            status=ReservationStatus.ACTIVE,
+            reference_id=reference_id,
+            reference_type=reference_type,
+            expires_at=now + ttl,
+            created_by=created_by
+        )
+        self.db.add(reservation)
+        await self.db.flush()
+        await self._publish(balance_row)
+
+        logger.info(
+            f"Balance hold placed: {reservation.id}, Branch {branch_id}, "
+            f"Currency {currency_id}, Amount {amount}, Expires {reservation.expires_at}"
+        )
+        return reservation
+
+    async def get_for_reference(
+        self,
+        reference_id: UUID,
+        reference_type: str
+    ) -> Optional[BalanceReservation]:
+        """Latest hold placed for a transaction, in any status"""
+        result = await self.db.execute(
+            select(BalanceReservation)
+            .where(
+                and_(
+                    BalanceReservation.reference_id == reference_id,
+                    BalanceReservation.reference_type == reference_type
+                )
+            )
+            .order_by(BalanceReservation.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    # ==================== Commit / Release ====================
+
+    async def commit(
+        self,
+        reservation_id: UUID,
+        change_type: BalanceChangeType,
+        reference_id: Optional[UUID] = None,
+        reference_type: str = "transaction",
+        performed_by: Optional[UUID] = None,
+        notes: Optional[str] = None
+    ) -> Optional[Decimal]:
+        """
+        Deduct an active, unexpired hold from its balance
+
+        The reservation status change and the balance update are one
+        statement; a balance history record is written for the deduction.
+        Balance objects already loaded in the session are not refreshed.
+
+        Args:
+            reservation_id: Hold to commit
+            change_type: Balance change type for history
+            reference_id: Transaction the deduction belongs to
+            reference_type: Type of reference for history
+            performed_by: User performing the operation
+            notes: History notes
+
+        Returns:
+            New balance, or None if the hold is no longer active (released,
+            committed or expired); the caller must then fall back to a
+            validated update_balance. A hold past its expiry is released
+            (marked expired) before None is returned.
+        """
+        now = datetime.utcnow()
+        held = self._resolve_hold(
+            reservation_id, ReservationStatus.COMMITTED, now,
+            lapsed_status=ReservationStatus.EXPIRED
+        ).cte("held")
+        committed = held.c.status == ReservationStatus.COMMITTED
+        row = (await self.db.execute(
+            update(BranchBalance)
+            .where(
+                and_(
+                    BranchBalance.branch_id == held.c.branch_id,
+                    BranchBalance.currency_id == held.c.currency_id
+                )
+            )
+            .values(
+                balance=BranchBalance.balance - case((committed, held.c.amount), else_=0),
+                reserved_balance=BranchBalance.reserved_balance - held.c.amount,
+                last_updated=now,
+                updated_at=now
+            )
+            .returning(*self._balance_columns(), held.c.amount, held.c.status)
+            .execution_options(synchronize_session=False)
+        )).one_or_none()
+
+        if row is None:
+            logger.info(f"Balance hold {reservation_id} is no longer active")
+            return None
+        if row.status != ReservationStatus.COMMITTED:
+            await self._publish(row)
+            logger.info(f"Balance hold {reservation_id} had expired and was released")
+            return None
+
+        await self.repo.create_balance_history_batch([{
+            'branch_id': row.branch_id,
+            'currency_id': row.currency_id,
+            'change_type': change_type,
+            'amount': -row.amount,
+            'balance_before': row.balance + row.amount,
+            'balance_after': row.balance,
+            'reference_id': reference_id,
+            'reference_type': reference_type,
+            'performed_by': performed_by,
+            'performed_at': now,
+            'notes': notes or "Reserved balance committed"
+        }])
+        await self._publish(row)
+
+        logger.info(
+            f"Balance hold committed: {reservation_id}, Amount {row.amount}, "
+            f"New Balance {row.balance}"
+        )
+        return row.balance
+
+    async def release(self, reservation_id: UUID) -> bool:
+        """
+        Return an active hold to the available balance
+
+        Returns:
+            True if the hold was active and is now released
+        """
+        now = datetime.utcnow()
+        held = self._resolve_hold(reservation_id, ReservationStatus.RELEASED, now).cte("held")
+        row = (await self.db.execute(
+            update(BranchBalance)
+            .where(
+                and_(
+                    BranchBalance.branch_id == held.c.branch_id,
+                    BranchBalance.currency_id == held.c.currency_id
+                )
+            )
+            .values(
+                reserved_balance=BranchBalance.reserved_balance - held.c.amount,
+                last_updated=now,
+                updated_at=now
+            )
+            .returning(*self._balance_columns(), held.c.amount)
+            .execution_options(synchronize_session=False)
+        )).one_or_none()
+
+        if row is None:
+            return False
+
+        await self._publish(row)
+        logger.info(f"Balance hold released: {reservation_id}, Amount {row.amount}")
+        return True
+
+    async def release_expired(self, batch_size: int = 500) -> int:
+        """
+        Expire up to batch_size overdue holds in one statement
+
+        Holds are picked oldest expiry first with SKIP LOCKED, so several
+        workers can sweep at once; reserved balances are reduced by the
+        per-balance sum of the expired holds.
+
+        Returns:
+            Number of holds expired
+        """
+        now = datetime.utcnow()
+        overdue = (
+            select(BalanceReservation.id)
+            .where(
+                and_(
+                    BalanceReservation.status == ReservationStatus.ACTIVE,
+                    BalanceReservation.expires_at <= now
+                )
+            )
+            .order_by(BalanceReservation.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        expired = (
+            update(BalanceReservation)
+            .where(BalanceReservation.id.in_(overdue))
+            .values(status=ReservationStatus.EXPIRED, resolved_at=now, updated_at=now)
+            .returning(
+                BalanceReservation.branch_id,
+                BalanceReservation.currency_id,
+                BalanceReservation.amount
+            )
+            .cte("expired")
+        )
+        totals = (
+            select(
+                expired.c.branch_id,
+                expired.c.currency_id,
+                func.sum(expired.c.amount).label("amount"),
+                func.count().label("holds")
+            )
+            .group_by(expired.c.branch_id, expired.c.currency_id)
+            .cte("totals")
+        )
+        result = await self.db.execute(
+            update(BranchBalance)
+            .where(
+                and_(
+                    BranchBalance.branch_id == totals.c.branch_id,
+                    BranchBalance.currency_id == totals.c.currency_id
+                )
+            )
+            .values(
+                reserved_balance=BranchBalance.reserved_balance - totals.c.amount,
+                last_updated=now,
+                updated_at=now
+            )
+            .returning(*self._balance_columns(), totals.c.holds)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        for row in rows:
+            await self._publish(row)
+        count = sum(row.holds for row in rows)
+        await self.db.commit()
+
+        if count:
+            logger.info(f"Expired {count} balance holds")
+        return count
+
+    async def _publish(self, row) -> None:
+        """Record a 'balance.changed' outbox event for a RETURNING row"""
+        await OutboxService(self.db).add(
+            BALANCE_CHANGED, balance_event_payload(row), aggregate_id=row.branch_id
+        )
+
+    @staticmethod
+    def _balance_columns():
+        """Balance columns returned by statements that change a balance"""
+        return (
+            BranchBalance.branch_id,
+            BranchBalance.currency_id,
+            BranchBalance.balance,
+            BranchBalance.reserved_balance,
+            BranchBalance.last_updated,
+            BranchBalance.minimum_threshold,
+            BranchBalance.maximum_threshold,
+        )
+
+    @staticmethod
+    def _resolve_hold(
+        reservation_id: UUID,
+        status: ReservationStatus,
+        now: datetime,
+        lapsed_status: Optional[ReservationStatus] = None
+    ):
+        """
+        UPDATE moving an active hold to status, returning its balance key
+
+        Only unexpired holds match, unless lapsed_status is given: a hold
+        past its expiry then moves to lapsed_status instead (the returned
+        status tells which).
+        """
+        conditions = [
+            BalanceReservation.id == reservation_id,
+            BalanceReservation.status == ReservationStatus.ACTIVE,
+        ]
+        new_status = status
+        if lapsed_status is None:
+            conditions.append(BalanceReservation.expires_at > now)
+        else:
+            status_type = BalanceReservation.status.type
+            new_status = case(
+                (BalanceReservation.expires_at > now, literal(status, status_type)),
+                else_=literal(lapsed_status, status_type)
+            )
+        return (
+            update(BalanceReservation)
+            .where(and_(*conditions))
+            .values(status=new_status, resolved_at=now, updated_at=now)
+            .returning(
+                BalanceReservation.branch_id,
+                BalanceReservation.currency_id,
+                BalanceReservation.amount,
+                BalanceReservation.status
+            )
+        )
+
+
+class BalanceHoldSweeper:
+    """
+    Background task releasing expired balance holds
+
+    Started and stopped from the application lifespan, like the audit log
+    writer. Each pass releases batches until fewer than a full batch expire.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        interval_seconds: int = settings.BALANCE_HOLD_SWEEP_INTERVAL_SECONDS,
+        batch_size: int = settings.BALANCE_HOLD_SWEEP_BATCH_SIZE,
+    ):
+        self._session_factory = session_factory
+        self._interval = interval_seconds
+        self._batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._released = 0
+
+    async def start(self) -> None:
+        """Start the background sweep task"""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="balance-hold-sweeper")
+        logger.info("Balance hold sweeper started")
+
+    async def stop(self) -> None:
+        """Stop the background sweep task"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Balance hold sweeper stopped")
+
+    async def sweep(self) -> int:
+        """Release all currently expired holds; returns holds released"""
+        released = 0
+        async with self._session_factory() as session:
+            service = BalanceReservationService(session)
+            while True:
+                count = await service.release_expired(self._batch_size)
+                released += count
+                if count < self._batch_size:
+                    break
+        self._released += released
+        return released
+
+    def stats(self) -> dict:
+        """Return sweeper counters for health/monitoring endpoints"""
+        return {"running": self._task is not None, "released": self._released}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Balance hold sweep failed: {str(e)}")
+            await asyncio.sleep(self._interval)
+
+
+# Global sweeper instance
+balance_hold_sweeper = BalanceHoldSweeper()
@@ -4,7 +4,7 @@ Critical financial operations for branch balances
 All operations are ATOMIC and maintain data consistency
 """
 
-from typing import Dict, Any, Optional,List
+from typing import Dict, Any, Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime
 from decimal import Decimal
@@ -14,6 +14,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.repositories.branch_repo import BranchRepository
+from app.services.outbox_service import OutboxService
+from app.services.balance_read_model import (
+    BALANCE_CHANGED, BalanceSnapshot, balance_event_payload, balance_read_model
+)
 from app.db.models.branch import (
     BranchBalance, BranchBalanceHistory, BalanceChangeType
 )
@@ -186,6 +190,7 @@ class BalanceService:
                 performed_by=performed_by,
                 notes=notes
             )
+            await self._publish_balance(balance)
             
             logger.info(
                 f"Balance updated: Branch {branch_id}, Currency {currency_id}, "
@@ -198,6 +203,110 @@ class BalanceService:
             logger.error(f"Database error updating balance: {str(e)}")
             raise DatabaseOperationError(f"Failed to update balance: {str(e)}")
     
+    async def apply_balance_changes(
+        self,
+        changes: List[Dict[str, Any]],
+        balances: Optional[Dict[Tuple[UUID, UUID], BranchBalance]] = None
+    ) -> Dict[Tuple[UUID, UUID], BranchBalance]:
+        """
+        Apply many balance changes at once (ATOMIC OPERATION)
+        
+        Batch counterpart of update_balance: each (branch, currency) row is
+        updated once with the sum of its deltas, and one history record per
+        change is written with a single multi-row INSERT. Changes are applied
+        in list order, so history shows the running balance.
+        
+        Args:
+            changes: Dicts with update_balance arguments (branch_id,
+                currency_id, amount, change_type, reference_id,
+                reference_type, performed_by, notes)
+            balances: Balances already locked by the caller (see
+                BranchRepository.lock_branch_balances); locked here if omitted
+            
+        Returns:
+            Updated balances keyed by (branch_id, currency_id)
+            
+        Raises:
+            InsufficientBalanceError: If any balance would become negative
+            BusinessRuleViolationError: If reserved would exceed total balance
+            DatabaseOperationError: If database operation fails
+        """
+        if not changes:
+            return {}
+        
+        try:
+            pairs = {(change['branch_id'], change['currency_id']) for change in changes}
+            if balances is None:
+                balances = await self.repo.lock_branch_balances(pairs)
+            
+            now = datetime.utcnow()
+            for branch_id, currency_id in pairs - set(balances):
+                balance = BranchBalance(
+                    branch_id=branch_id,
+                    currency_id=currency_id,
+                    balance=Decimal("0"),
+                    reserved_balance=Decimal("0"),
+                    is_active=True,
+                    last_updated=now
+                )
+                self.db.add(balance)
+                balances[(branch_id, currency_id)] = balance
+            
+            running = {pair: balances[pair].balance or Decimal("0") for pair in pairs}
+            history_rows = []
+            
+            for change in changes:
+                pair = (change['branch_id'], change['currency_id'])
+                balance_before = running[pair]
+                new_balance = balance_before + change['amount']
+                
+                if new_balance < 0:
+                    raise InsufficientBalanceError(
+                        f"Insufficient balance. Current: {balance_before}, "
+                        f"Requested: {change['amount']}, Result would be: {new_balance}"
+                    )
+                
+                running[pair] = new_balance
+                history_rows.append({
+                    'branch_id': pair[0],
+                    'currency_id': pair[1],
+                    'change_type': change['change_type'],
+                    'amount': change['amount'],
+                    'balance_before': balance_before,
+                    'balance_after': new_balance,
+                    'reference_id': change.get('reference_id'),
+                    'reference_type': change.get('reference_type'),
+                    'performed_by': change.get('performed_by'),
+                    'performed_at': now,
+                    'notes': change.get('notes')
+                })
+            
+            for pair, new_balance in running.items():
+                balance = balances[pair]
+                if (balance.reserved_balance or Decimal("0")) > new_balance:
+                    raise BusinessRuleViolationError(
+                        f"Reserved balance ({balance.reserved_balance}) would exceed "
+                        f"total balance ({new_balance})"
+                    )
+                balance.balance = new_balance
+                balance.last_updated = now
+            
+            await self.db.flush()
+            await self.repo.create_balance_history_batch(history_rows)
+            for pair in sorted(running):
+                await self._publish_balance(balances[pair])
+            
+            logger.info(
+                f"Balance batch applied: {len(changes)} changes "
+                f"across {len(pairs)} balances"
+            )
+            
+            return balances
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error applying balance batch: {str(e)}")
+            raise DatabaseOperationError(f"Failed to apply balance batch: {str(e)}")
+    
     async def reserve_balance(
         self,
         branch_id: UUID,
@@ -249,6 +358,7 @@ class BalanceService:
             balance.last_updated = datetime.utcnow()
             
             await self.db.flush()
+            await self._publish_balance(balance)
             
             logger.info(
                 f"Balance reserved: Branch {branch_id}, Currency {currency_id}, "
@@ -306,6 +416,7 @@ class BalanceService:
             balance.last_updated = datetime.utcnow()
             
             await self.db.flush()
+            await self._publish_balance(balance)
             
             logger.info(
                 f"Reserved balance released: Branch {branch_id}, "
@@ -392,6 +503,7 @@ class BalanceService:
                 performed_by=performed_by,
                 notes=notes or "Reserved balance committed"
             )
+            await self._publish_balance(balance)
             
             logger.info(
                 f"Reserved balance committed: Branch {branch_id}, "
@@ -527,6 +639,14 @@ class BalanceService:
         
         return summary
     
+    async def _publish_balance(self, balance: BranchBalance) -> None:
+        """Record a 'balance.changed' outbox event in the current transaction"""
+        await OutboxService(self.db).add(
+            BALANCE_CHANGED,
+            balance_event_payload(balance),
+            aggregate_id=balance.branch_id
+        )
+    
     async def _create_history_record(
         self,
         branch_id: UUID,
@@ -582,13 +702,14 @@ class BalanceService:
         Returns:
             True if sufficient balance exists
         """
-        balance = await self.repo.get_branch_balance(branch_id, currency_id)
+        balance = balance_read_model.get(branch_id, currency_id)
+        if balance is None:
+            loaded = await self.repo.get_branch_balance(branch_id, currency_id)
+            if not loaded:
+                return False
+            balance = balance_read_model.load([loaded])[0]
         
-        if not balance:
-            return False
-        
-        available = balance.balance - balance.reserved_balance
-        return available >= required_amount
+        return balance.available_balance >= required_amount
     
     # أضف هذه الدوال في app/services/balance_service.py
     # بعد دالة check_sufficient_balance
@@ -613,6 +734,29 @@ class BalanceService:
             logger.error(f"Error getting balances for branch {branch_id}: {str(e)}")
             raise DatabaseOperationError(f"Failed to retrieve branch balances: {str(e)}")
     
+    async def get_branch_balance_views(
+        self,
+        branch_id: UUID
+    ) -> List[BalanceSnapshot]:
+        """
+        Get all currency balances for a branch from the read model
+        
+        Snapshots are at most BALANCE_READ_MODEL_MAX_STALENESS_SECONDS old
+        (this worker's own changes are visible at once); the database is
+        read only when the branch is not cached or has gone stale.
+        
+        Args:
+            branch_id: Branch UUID
+            
+        Returns:
+            List of BalanceSnapshot objects
+        """
+        snapshots = balance_read_model.get_branch(branch_id)
+        if snapshots is None:
+            balances = await self.get_branch_balances(branch_id)
+            snapshots = balance_read_model.load_branch(branch_id, balances)
+        return snapshots
+    
     async def get_branch_currency_balance(
         self,
         branch_id: UUID,
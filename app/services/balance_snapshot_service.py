@@ -0,0 +1,313 @@
+"""
+Balance Snapshot Service
+End-of-day balance snapshots for point-in-time reporting
+
+Once a day the snapshot job writes one compact (date, holder, currency,
+balance) row for every branch balance and vault balance with a single
+INSERT ... SELECT, so reports for past dates read those rows instead of
+replaying months of movements.
+
+Branch balances are closed exactly: movements recorded in
+branch_balance_history after the end of the snapshot date are subtracted
+from the current balance. Vault balances have no history and are taken as
+they are when the job runs (shortly after midnight UTC).
+
+Any point inside a day is the nearest earlier snapshot plus the history
+delta since (branch_balances_at). The statement builders are plain
+functions so the sync ReportService can run them too.
+"""
+
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import select, func, and_, or_, literal, union_all, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.db.models.balance_snapshot import DailyBalanceSnapshot, SnapshotHolderType
+from app.db.models.branch import BranchBalance, BranchBalanceHistory
+from app.db.models.vault import VaultBalance
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_COLUMNS = ['snapshot_date', 'holder_type', 'holder_id', 'currency_id', 'balance', 'created_at']
+
+
+# ==================== Statements ====================
+
+def utc_today() -> date:
+    """Current UTC date, the calendar snapshots are dated in"""
+    return datetime.utcnow().date()
+
+
+def snapshot_insert(snapshot_date: date):
+    """
+    INSERT ... SELECT of the closing balances of snapshot_date
+
+    Rows already present for the date are kept (re-runs are no-ops).
+    """
+    day_end = datetime.combine(snapshot_date + timedelta(days=1), time.min)
+    now = datetime.utcnow()
+
+    since_close = (
+        select(
+            BranchBalanceHistory.branch_id,
+            BranchBalanceHistory.currency_id,
+            func.sum(BranchBalanceHistory.amount).label('amount')
+        )
+        .where(BranchBalanceHistory.performed_at >= day_end)
+        .group_by(BranchBalanceHistory.branch_id, BranchBalanceHistory.currency_id)
+        .subquery()
+    )
+    branches = select(
+        literal(snapshot_date),
+        literal(SnapshotHolderType.BRANCH.value),
+        BranchBalance.branch_id,
+        BranchBalance.currency_id,
+        BranchBalance.balance - func.coalesce(since_close.c.amount, 0),
+        literal(now)
+    ).outerjoin(since_close, and_(
+        since_close.c.branch_id == BranchBalance.branch_id,
+        since_close.c.currency_id == BranchBalance.currency_id
+    ))
+    vaults = select(
+        literal(snapshot_date),
+        literal(SnapshotHolderType.VAULT.value),
+        VaultBalance.vault_id,
+        VaultBalance.currency_id,
+        VaultBalance.balance,
+        literal(now)
+    )
+
+    return pg_insert(DailyBalanceSnapshot).from_select(
+        SNAPSHOT_COLUMNS, union_all(branches, vaults)
+    ).on_conflict_do_nothing()
+
+
+def nearest_snapshots(
+    holder_type: SnapshotHolderType,
+    before: date,
+    holder_id: Optional[UUID] = None,
+    currency_id: Optional[UUID] = None
+) -> Select:
+    """Latest snapshot row per (holder, currency) dated before `before`"""
+    stmt = (
+        select(
+            DailyBalanceSnapshot.holder_id,
+            DailyBalanceSnapshot.currency_id,
+            DailyBalanceSnapshot.snapshot_date,
+            DailyBalanceSnapshot.balance
+        )
+        .where(
+            DailyBalanceSnapshot.holder_type == holder_type.value,
+            DailyBalanceSnapshot.snapshot_date < before
+        )
+        .distinct(DailyBalanceSnapshot.holder_id, DailyBalanceSnapshot.currency_id)
+        .order_by(
+            DailyBalanceSnapshot.holder_id,
+            DailyBalanceSnapshot.currency_id,
+            DailyBalanceSnapshot.snapshot_date.desc()
+        )
+    )
+    if holder_id is not None:
+        stmt = stmt.where(DailyBalanceSnapshot.holder_id == holder_id)
+    if currency_id is not None:
+        stmt = stmt.where(DailyBalanceSnapshot.currency_id == currency_id)
+    return stmt
+
+
+def branch_balances_at(
+    at: datetime,
+    branch_id: Optional[UUID] = None,
+    currency_id: Optional[UUID] = None
+) -> Select:
+    """
+    (branch_id, currency_id, balance) of branch positions at a point in time
+
+    Nearest snapshot closed before `at`'s day, plus the history movements
+    from the end of that snapshot day up to `at`. Positions without any
+    earlier snapshot are summed from their full history.
+    """
+    close = nearest_snapshots(
+        SnapshotHolderType.BRANCH, at.date(), branch_id, currency_id
+    ).cte('branch_close')
+
+    movements = (
+        select(
+            BranchBalanceHistory.branch_id,
+            BranchBalanceHistory.currency_id,
+            func.sum(BranchBalanceHistory.amount).label('amount')
+        )
+        .outerjoin(close, and_(
+            close.c.holder_id == BranchBalanceHistory.branch_id,
+            close.c.currency_id == BranchBalanceHistory.currency_id
+        ))
+        .where(
+            BranchBalanceHistory.performed_at < at,
+            or_(
+                close.c.snapshot_date.is_(None),
+                BranchBalanceHistory.performed_at >= close.c.snapshot_date + 1
+            )
+        )
+        .group_by(BranchBalanceHistory.branch_id, BranchBalanceHistory.currency_id)
+    )
+    if branch_id is not None:
+        movements = movements.where(BranchBalanceHistory.branch_id == branch_id)
+    if currency_id is not None:
+        movements = movements.where(BranchBalanceHistory.currency_id == currency_id)
+    movements = movements.subquery()
+
+    return select(
+        func.coalesce(close.c.holder_id, movements.c.branch_id).label('branch_id'),
+        func.coalesce(close.c.currency_id, movements.c.currency_id).label('currency_id'),
+        (
+            func.coalesce(close.c.balance, 0) + func.coalesce(movements.c.amount, 0)
+        ).label('balance')
+    ).select_from(
+        close.join(
+            movements,
+            and_(
+                movements.c.branch_id == close.c.holder_id,
+                movements.c.currency_id == close.c.currency_id
+            ),
+            full=True
+        )
+    )
+
+
+def vault_balances_on(
+    snapshot_date: date,
+    vault_id: Optional[UUID] = None,
+    currency_id: Optional[UUID] = None
+) -> Select:
+    """(vault_id, currency_id, balance, snapshot_date) of the nearest snapshot on or before a date"""
+    close = nearest_snapshots(
+        SnapshotHolderType.VAULT, snapshot_date + timedelta(days=1), vault_id, currency_id
+    ).subquery()
+    return select(
+        close.c.holder_id.label('vault_id'),
+        close.c.currency_id,
+        close.c.balance,
+        close.c.snapshot_date
+    )
+
+
+# ==================== Service ====================
+
+class BalanceSnapshotService:
+    """Writes daily balance snapshots"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def has_snapshot(self, snapshot_date: date) -> bool:
+        """Whether snapshot rows exist for the date"""
+        return bool((await self.db.execute(
+            select(exists().where(DailyBalanceSnapshot.snapshot_date == snapshot_date))
+        )).scalar())
+
+    async def take_snapshot(self, snapshot_date: Optional[date] = None) -> int:
+        """
+        Write the closing balances of a day (default: yesterday, UTC)
+
+        Runs under a transaction-scoped advisory lock on the date, so
+        several workers never snapshot the same day concurrently.
+
+        Returns:
+            Number of snapshot rows written
+        """
+        if snapshot_date is None:
+            snapshot_date = utc_today() - timedelta(days=1)
+
+        await self.db.execute(select(func.pg_advisory_xact_lock(
+            func.hashtext(f"balance_snapshot:{snapshot_date.isoformat()}")
+        )))
+        result = await self.db.execute(snapshot_insert(snapshot_date))
+        await self.db.commit()
+
+        logger.info(f"Balance snapshot {snapshot_date}: {result.rowcount} rows")
+        return result.rowcount
+
+
+# ==================== Job ====================
+
+class BalanceSnapshotJob:
+    """
+    Background task writing yesterday's snapshot once the day has closed
+
+    Started and stopped from the application lifespan. Every check
+    interval it looks for yesterday's rows and writes them if missing, so a
+    restart around midnight still snapshots the day.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        check_seconds: int = settings.BALANCE_SNAPSHOT_CHECK_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self._check_seconds = check_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._last_snapshot: Optional[date] = None
+        self._rows_written = 0
+
+    async def start(self) -> None:
+        """Start the background snapshot task"""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="balance-snapshot-job")
+        logger.info("Balance snapshot job started")
+
+    async def stop(self) -> None:
+        """Stop the background snapshot task"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Balance snapshot job stopped")
+
+    async def run_once(self) -> int:
+        """Snapshot yesterday if not done yet; returns rows written"""
+        yesterday = utc_today() - timedelta(days=1)
+        if self._last_snapshot == yesterday:
+            return 0
+
+        async with self._session_factory() as session:
+            service = BalanceSnapshotService(session)
+            written = 0
+            if not await service.has_snapshot(yesterday):
+                written = await service.take_snapshot(yesterday)
+
+        self._last_snapshot = yesterday
+        self._rows_written += written
+        return written
+
+    def stats(self) -> Dict:
+        """Return job counters for health/monitoring endpoints"""
+        return {
+            "running": self._task is not None,
+            "last_snapshot": self._last_snapshot.isoformat() if self._last_snapshot else None,
+            "rows_written": self._rows_written,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Balance snapshot failed: {str(e)}")
+            await asyncio.sleep(self._check_seconds)
+
+
+# Global snapshot job
+balance_snapshot_job = BalanceSnapshotJob()
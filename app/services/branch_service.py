@@ -11,6 +11,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.branch_repo import BranchRepository
 from app.services.balance_service import BalanceService
+from app.services.balance_alert_service import balance_alert_monitor, ensure_breach_alerts
+from app.services.balance_read_model import balance_event_payload
+from app.services.outbox_service import OutboxService, BALANCE_CHANGED
 from app.db.models.branch import (
     Branch, BranchAlert, RegionEnum,
     BalanceAlertType, AlertSeverity
@@ -294,6 +297,10 @@ class BranchService:
             balance.minimum_threshold = minimum_threshold
             balance.maximum_threshold = maximum_threshold
             await self.db.flush()
+            # Alert evaluation and the balance read model pick up new thresholds
+            await OutboxService(self.db).add(
+                BALANCE_CHANGED, balance_event_payload(balance), aggregate_id=branch_id
+            )
             await self.db.commit()
             
             logger.info(f"Thresholds set successfully")
@@ -506,6 +513,10 @@ class BranchService:
         """
         Check and return active balance alerts for a branch
         
+        Breached positions come from the balance alert monitor, so only
+        those are touched; all balances are scanned only before the
+        monitor has loaded.
+        
         Args:
             branch_id: Branch UUID
             
@@ -518,6 +529,11 @@ class BranchService:
         if not branch:
             raise ResourceNotFoundError("Branch", branch_id)
         
+        if balance_alert_monitor.ready:
+            return await ensure_breach_alerts(
+                self.db, balance_alert_monitor.breaches(branch_id)
+            )
+        
         # Get all branch balances
         balances = await self.balance_service.get_branch_balances(branch_id)
         
@@ -10,6 +10,7 @@ from decimal import Decimal, ROUND_HALF_UP
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.currency_repo import CurrencyRepository
+from app.services.outbox_service import OutboxService, EXCHANGE_RATE_CHANGED
 from app.schemas.currency import (
     CurrencyCreate,
     CurrencyUpdate,
@@ -237,8 +238,24 @@ class CurrencyService:
         rate_dict = rate_data.model_dump()
         rate_dict['set_by'] = UUID(current_user['id'])
         
-        # Create new rate
-        new_rate = await self.repo.create_exchange_rate(rate_dict)
+        # Create new rate; it commits together with its history entry and
+        # outbox event
+        new_rate = await self.repo.create_exchange_rate(rate_dict, commit=False)
+        await OutboxService(self.db).add(
+            EXCHANGE_RATE_CHANGED,
+            {
+                'rate_id': str(new_rate.id),
+                'from_currency_id': str(from_currency.id),
+                'to_currency_id': str(to_currency.id),
+                'from_currency_code': from_currency.code,
+                'to_currency_code': to_currency.code,
+                'rate': str(new_rate.rate),
+                'buy_rate': None if new_rate.buy_rate is None else str(new_rate.buy_rate),
+                'sell_rate': None if new_rate.sell_rate is None else str(new_rate.sell_rate),
+                'effective_from': new_rate.effective_from.isoformat() if new_rate.effective_from else None,
+            },
+            aggregate_id=new_rate.id
+        )
         
         # Create history entry
         if existing_rate:
@@ -10,7 +10,9 @@ from uuid import UUID
 from datetime import datetime, date
 from decimal import Decimal
 import re
+import uuid
 
+from pydantic import ValidationError as PydanticValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
@@ -20,13 +22,15 @@ from app.db.models.customer import (
     CustomerType, RiskLevel, DocumentType
 )
 from app.db.models.user import User
+from app.db.models.branch import Branch
 from app.core.exceptions import (
     NotFoundError, ValidationError, DuplicateError,
     PermissionDeniedError
 )
 from app.utils.logger import get_logger
-from app.utils.generators import generate_customer_number
+from app.utils.generators import generate_customer_number, format_customer_number
 from app.schemas.transaction import TransactionFilter
+from app.schemas.customer import CustomerBase
 
 logger = get_logger(__name__)
 
@@ -240,9 +244,25 @@ class CustomerService:
         """
         Search customers with pagination
         
+        Text queries go through the ranked (trigram) search, which returns
+        the page and the total in one round trip.
+        
         Returns:
             Tuple of (customers list, total count)
         """
+        if query and query.strip():
+            ranked, total = await self.repo.search_customers_ranked(
+                query=query,
+                branch_id=branch_id,
+                customer_type=customer_type,
+                risk_level=risk_level,
+                is_verified=is_verified,
+                is_active=is_active,
+                skip=skip,
+                limit=limit
+            )
+            return [customer for customer, _ in ranked], total
+        
         customers = await self.repo.search_customers(
             query=query,
             branch_id=branch_id,
@@ -265,6 +285,45 @@ class CustomerService:
         
         return customers, total
     
+    async def search_customers_ranked(
+        self,
+        query: str,
+        branch_id: Optional[UUID] = None,
+        customer_type: Optional[CustomerType] = None,
+        risk_level: Optional[RiskLevel] = None,
+        is_verified: Optional[bool] = None,
+        is_active: bool = True,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Ranked search for counter lookups
+        
+        Exact national ID / passport / customer number matches are returned
+        first with score 1.0; otherwise results are ordered by similarity.
+        
+        Returns:
+            Tuple of ([{"customer": Customer, "score": float}], total count)
+        """
+        if not query or not query.strip():
+            raise ValidationError("Search query cannot be empty")
+        
+        ranked, total = await self.repo.search_customers_ranked(
+            query=query,
+            branch_id=branch_id,
+            customer_type=customer_type,
+            risk_level=risk_level,
+            is_verified=is_verified,
+            is_active=is_active,
+            skip=skip,
+            limit=limit
+        )
+        
+        return [
+            {"customer": customer, "score": round(score, 4)}
+            for customer, score in ranked
+        ], total
+    
     # ==================== KYC Verification ====================
     
     async def verify_customer_kyc(
@@ -608,6 +667,8 @@ class CustomerService:
         """
         Create multiple customers in bulk
 
+        Delegates to the set-based import pipeline (see import_customers).
+
         Args:
             customers_data: List of customer creation data
             current_user: User performing the operation
@@ -616,7 +677,39 @@ class CustomerService:
         Returns:
             Dictionary with results: total, successful, failed, errors
         """
-        logger.info(f"Bulk creating {len(customers_data)} customers at branch {branch_id}")
+        return await self.import_customers(customers_data, current_user, branch_id)
+
+    async def import_customers(
+        self,
+        customers_data: List[Dict[str, Any]],
+        current_user: User,
+        branch_id: UUID,
+        all_or_nothing: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Set-based bulk customer import
+
+        1. Validate every row in memory (CustomerBase schema)
+        2. Detect duplicates inside the file and against the database with
+           a single query on national_id / passport_number
+        3. Allocate a block of customer numbers from customer_number_seq
+        4. Load all valid rows with COPY and commit once
+
+        Args:
+            customers_data: Raw customer rows
+            current_user: User performing the import
+            branch_id: Branch where customers are registered
+            all_or_nothing: If True, nothing is loaded when any row fails
+
+        Returns:
+            Dictionary with results: total, successful, failed, errors,
+            created_customers
+
+        Raises:
+            NotFoundError: If branch does not exist
+            DuplicateError: If a concurrent insert conflicts during COPY
+        """
+        logger.info(f"Importing {len(customers_data)} customers at branch {branch_id}")
 
         results = {
             "total": len(customers_data),
@@ -626,31 +719,129 @@ class CustomerService:
             "created_customers": []
         }
 
-        for idx, customer_data in enumerate(customers_data):
+        if not customers_data:
+            return results
+
+        if not await self.db.get(Branch, branch_id):
+            raise NotFoundError(f"Branch {branch_id} not found")
+
+        def reject(idx: int, row: Dict[str, Any], error: str) -> None:
+            results["failed"] += 1
+            results["errors"].append({
+                "index": idx,
+                "name": f"{row.get('first_name', '')} {row.get('last_name', '')}".strip(),
+                "error": error
+            })
+
+        # 1. In-memory validation + in-file duplicate detection
+        valid: List[Tuple[int, CustomerBase, RiskLevel]] = []
+        seen_ids: Dict[str, int] = {}
+        seen_passports: Dict[str, int] = {}
+
+        for idx, row in enumerate(customers_data):
             try:
-                # Create customer
-                customer = await self.create_customer(customer_data, current_user, branch_id)
-                results["successful"] += 1
-                results["created_customers"].append({
-                    "index": idx,
-                    "customer_number": customer.customer_number,
-                    "name": f"{customer.first_name} {customer.last_name}",
-                    "id": str(customer.id)
-                })
-
-            except (ValidationError, DuplicateError) as e:
-                results["failed"] += 1
-                results["errors"].append({
-                    "index": idx,
-                    "name": f"{customer_data.get('first_name', '')} {customer_data.get('last_name', '')}",
-                    "error": str(e)
-                })
-                logger.warning(f"Failed to create customer at index {idx}: {str(e)}")
+                item = CustomerBase(**row)
+                risk_level = RiskLevel(row.get("risk_level") or RiskLevel.LOW)
+            except PydanticValidationError as e:
+                reject(idx, row, "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}"
+                    for err in e.errors()
+                ))
+                continue
+            except ValueError:
+                reject(idx, row, f"Invalid risk_level: {row.get('risk_level')}")
+                continue
+
+            if item.national_id and item.national_id in seen_ids:
+                reject(idx, row, f"Duplicate national_id {item.national_id} (row {seen_ids[item.national_id]})")
+                continue
+            if item.passport_number and item.passport_number in seen_passports:
+                reject(idx, row, f"Duplicate passport {item.passport_number} (row {seen_passports[item.passport_number]})")
                 continue
 
+            if item.national_id:
+                seen_ids[item.national_id] = idx
+            if item.passport_number:
+                seen_passports[item.passport_number] = idx
+            valid.append((idx, item, risk_level))
+
+        # 2. Duplicates against existing customers (one query)
+        existing_ids, existing_passports = await self.repo.find_existing_identifiers(
+            list(seen_ids), list(seen_passports)
+        )
+        if existing_ids or existing_passports:
+            remaining = []
+            for idx, item, risk_level in valid:
+                if item.national_id in existing_ids:
+                    reject(idx, customers_data[idx], f"Customer with national_id {item.national_id} already exists")
+                elif item.passport_number in existing_passports:
+                    reject(idx, customers_data[idx], f"Customer with passport {item.passport_number} already exists")
+                else:
+                    remaining.append((idx, item, risk_level))
+            valid = remaining
+
+        results["errors"].sort(key=lambda error: error["index"])
+
+        if not valid or (all_or_nothing and results["failed"]):
+            logger.warning(f"Customer import loaded nothing: {results['failed']} rows rejected")
+            return results
+
+        # 3. Customer number block
+        sequence_values = await self.repo.allocate_customer_number_block(len(valid))
+
+        # 4. COPY in a single transaction
+        now = datetime.utcnow()
+        rows = []
+        for (idx, item, risk_level), sequence_value in zip(valid, sequence_values):
+            rows.append({
+                "id": uuid.uuid4(),
+                "customer_number": format_customer_number(sequence_value, now),
+                "first_name": item.first_name,
+                "last_name": item.last_name,
+                "name_ar": item.name_ar,
+                "national_id": item.national_id,
+                "passport_number": item.passport_number,
+                "phone_number": item.phone_number,
+                "email": item.email,
+                "date_of_birth": item.date_of_birth,
+                "nationality": item.nationality,
+                "address": item.address,
+                "city": item.city,
+                "country": item.country,
+                "customer_type": item.customer_type,
+                "risk_level": risk_level,
+                "is_active": True,
+                "is_verified": False,
+                "registered_at": now,
+                "created_at": now,
+                "updated_at": now,
+                "registered_by_id": current_user.id,
+                "branch_id": branch_id,
+                "additional_info": item.additional_info,
+            })
+
+        try:
+            await self.repo.copy_customers(rows)
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            logger.error(f"Integrity error during customer import: {str(e)}")
+            raise DuplicateError("Customer import conflicted with existing data; nothing was loaded")
+
+        results["successful"] = len(rows)
+        results["created_customers"] = [
+            {
+                "index": idx,
+                "customer_number": row["customer_number"],
+                "name": f"{row['first_name']} {row['last_name']}",
+                "id": str(row["id"])
+            }
+            for (idx, _, _), row in zip(valid, rows)
+        ]
+
         logger.info(
-            f"Bulk customer creation completed: "
-            f"{results['successful']} successful, {results['failed']} failed"
+            f"Customer import completed: "
+            f"{results['successful']} loaded, {results['failed']} rejected"
         )
 
         return results
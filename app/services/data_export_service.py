@@ -0,0 +1,278 @@
+"""
+Data Export Service
+Row-level dataset extracts (transactions, balance history, audit trail)
+
+Extracts are read through a server-side cursor in batches of
+EXPORT_BATCH_ROWS and written as they arrive, so memory stays flat however
+many rows match:
+- CSV is streamed to the client batch by batch
+- Parquet is written to a temp file, one compressed row group per batch,
+  with column types taken from the selected model columns
+
+Parquet needs pyarrow; without it only CSV is available.
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.db.models.audit import AuditLog
+from app.db.models.branch import BranchBalanceHistory
+from app.db.models.currency import Currency
+from app.db.models.transaction import Transaction
+from app.utils.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet exports are unavailable
+    pa = None
+    pq = None
+
+logger = get_logger(__name__)
+
+
+# ==================== Datasets ====================
+
+def _date_window(column, start_date: Optional[date], end_date: Optional[date]) -> List:
+    """Half-open [start_date, end_date + 1 day) criteria on a timestamp column"""
+    criteria = []
+    if start_date:
+        criteria.append(column >= datetime.combine(start_date, time.min))
+    if end_date:
+        criteria.append(column < datetime.combine(end_date + timedelta(days=1), time.min))
+    return criteria
+
+
+def transactions_query(start_date=None, end_date=None, branch_id=None) -> Select:
+    """All transactions, oldest first"""
+    stmt = (
+        select(
+            Transaction.id,
+            Transaction.transaction_number,
+            Transaction.transaction_type,
+            Transaction.status,
+            Currency.code.label('currency_code'),
+            Transaction.amount,
+            Transaction.commission_amount,
+            Transaction.branch_id,
+            Transaction.user_id,
+            Transaction.customer_id,
+            Transaction.reference_number,
+            Transaction.transaction_date,
+            Transaction.completed_at
+        )
+        .join(Currency, Transaction.currency_id == Currency.id)
+        .where(*_date_window(Transaction.transaction_date, start_date, end_date))
+        .order_by(Transaction.transaction_date, Transaction.id)
+    )
+    if branch_id:
+        stmt = stmt.where(Transaction.branch_id == branch_id)
+    return stmt
+
+
+def balance_history_query(start_date=None, end_date=None, branch_id=None) -> Select:
+    """Branch balance changes, oldest first"""
+    stmt = (
+        select(
+            BranchBalanceHistory.id,
+            BranchBalanceHistory.branch_id,
+            Currency.code.label('currency_code'),
+            BranchBalanceHistory.change_type,
+            BranchBalanceHistory.amount,
+            BranchBalanceHistory.balance_before,
+            BranchBalanceHistory.balance_after,
+            BranchBalanceHistory.reference_type,
+            BranchBalanceHistory.reference_id,
+            BranchBalanceHistory.performed_by,
+            BranchBalanceHistory.performed_at,
+            BranchBalanceHistory.notes
+        )
+        .join(Currency, BranchBalanceHistory.currency_id == Currency.id)
+        .where(*_date_window(BranchBalanceHistory.performed_at, start_date, end_date))
+        .order_by(BranchBalanceHistory.performed_at, BranchBalanceHistory.id)
+    )
+    if branch_id:
+        stmt = stmt.where(BranchBalanceHistory.branch_id == branch_id)
+    return stmt
+
+
+def audit_query(start_date=None, end_date=None, branch_id=None) -> Select:
+    """Audit log entries, oldest first (not branch-scoped)"""
+    return (
+        select(
+            AuditLog.id,
+            AuditLog.timestamp,
+            AuditLog.user_id,
+            AuditLog.action,
+            AuditLog.entity_type,
+            AuditLog.entity_id,
+            AuditLog.ip_address,
+            AuditLog.description,
+            AuditLog.changes
+        )
+        .where(*_date_window(AuditLog.timestamp, start_date, end_date))
+        .order_by(AuditLog.timestamp, AuditLog.id)
+    )
+
+
+EXPORT_DATASETS: Dict[str, Callable[..., Select]] = {
+    'transactions': transactions_query,
+    'balance_history': balance_history_query,
+    'audit': audit_query,
+}
+
+
+# ==================== Value Conversion ====================
+
+def export_value(value: Any) -> Any:
+    """Database value as written to an export (enums, UUIDs and JSON as text)"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    value = export_value(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return '' if value is None else value
+
+
+def arrow_type(column_type):
+    """pyarrow type of a selected column's SQL type (text for anything else)"""
+    if isinstance(column_type, Numeric) and column_type.scale is not None:
+        return pa.decimal128(column_type.precision or 38, column_type.scale)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp('us', tz='UTC' if column_type.timezone else None)
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed"""
+    return pq is not None
+
+
+# ==================== Service ====================
+
+class DataExportService:
+    """Batched CSV/Parquet extracts of row-level datasets"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _execute(self, dataset: str, start_date, end_date, branch_id):
+        """Run a dataset query through a server-side cursor"""
+        query = EXPORT_DATASETS.get(dataset)
+        if query is None:
+            raise ValidationError(
+                f"Unknown dataset: {dataset} (one of: {', '.join(EXPORT_DATASETS)})"
+            )
+        statement = query(start_date, end_date, branch_id)
+        result = self.db.execute(
+            statement.execution_options(yield_per=settings.EXPORT_BATCH_ROWS)
+        )
+        return statement, result
+
+    def stream_csv(
+        self,
+        dataset: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        branch_id: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Dataset as CSV chunks: the header, then one chunk per batch
+
+        The query is executed before the first chunk, so an unknown dataset
+        or a failing query raises here rather than mid-stream.
+        """
+        statement, result = self._execute(dataset, start_date, end_date, branch_id)
+        return self._csv_chunks([column.name for column in statement.selected_columns], result)
+
+    def _csv_chunks(self, columns: List[str], result) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def drain() -> str:
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        try:
+            writer.writerow(columns)
+            yield drain()
+            for rows in result.partitions():
+                writer.writerows([_csv_value(value) for value in row] for row in rows)
+                yield drain()
+        finally:
+            result.close()
+
+    def write_parquet(
+        self,
+        dataset: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        branch_id: Optional[str] = None
+    ) -> str:
+        """
+        Write a dataset to a Parquet temp file, one row group per batch
+
+        Returns:
+            Path of the file; the caller owns it and must delete it
+        """
+        if not parquet_available():
+            raise ValidationError("Parquet export requires pyarrow")
+
+        statement, result = self._execute(dataset, start_date, end_date, branch_id)
+        schema = pa.schema([
+            pa.field(column.name, arrow_type(column.type))
+            for column in statement.selected_columns
+        ])
+
+        fd, path = tempfile.mkstemp(prefix=f'cems_{dataset}_', suffix='.parquet')
+        os.close(fd)
+        row_count = 0
+        try:
+            with pq.ParquetWriter(path, schema, compression=settings.EXPORT_PARQUET_COMPRESSION) as writer:
+                for rows in result.partitions():
+                    columns = list(zip(*rows))
+                    writer.write_table(pa.Table.from_arrays(
+                        [
+                            pa.array([export_value(value) for value in values], type=field.type)
+                            for values, field in zip(columns, schema)
+                        ],
+                        schema=schema
+                    ))
+                    row_count += len(rows)
+        except Exception:
+            os.remove(path)
+            raise
+        finally:
+            result.close()
+
+        logger.info(f"Parquet export {dataset}: {row_count} rows")
+        return path
@@ -0,0 +1,375 @@
+"""
+Exchange Analytics Service
+Vectorized rate and volume statistics for the analytics reports
+
+Each analysis reads the columns it needs in one filtered query (both
+currencies of a pair are matched in SQL) and computes its statistics on
+NumPy arrays instead of Python loops over Decimal lists. The all-pairs
+summary reduces every pair in the same array pass, so multi-year
+analyses stay interactive.
+
+Rates and amounts are converted to float64, which is ample for statistics
+(money itself is never computed here).
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.db.models.currency import Currency, ExchangeRate
+from app.db.models.transaction import ExchangeTransaction, Transaction, TransactionStatus
+
+# Percentiles reported for rate distributions
+RATE_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Observations per rolling volatility window
+DEFAULT_VOLATILITY_WINDOW = 7
+
+
+# ==================== Array Helpers ====================
+
+def to_float_array(values: Sequence) -> np.ndarray:
+    """Decimals/None to float64 (None becomes NaN)"""
+    return np.array(values, dtype=np.float64)
+
+
+def columns(rows: Sequence, count: int) -> List[tuple]:
+    """Result rows to a list of column tuples"""
+    return list(zip(*rows)) if rows else [()] * count
+
+
+def log_returns(rates: np.ndarray) -> np.ndarray:
+    """Log returns between consecutive rates"""
+    return np.diff(np.log(rates))
+
+
+def percent_changes(rates: np.ndarray) -> np.ndarray:
+    """Percent change between consecutive rates"""
+    return np.diff(rates) / rates[:-1] * 100
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Sample standard deviation of each full window (empty if too short)"""
+    if window < 2 or len(values) < window:
+        return np.empty(0)
+    return np.lib.stride_tricks.sliding_window_view(values, window).std(axis=1, ddof=1)
+
+
+def vwap(prices: np.ndarray, volumes: np.ndarray) -> float:
+    """Volume-weighted average price, ignoring rows without a price"""
+    valid = ~np.isnan(prices) & ~np.isnan(volumes)
+    total = volumes[valid].sum()
+    return float((prices[valid] * volumes[valid]).sum() / total) if total else 0.0
+
+
+def rate_percentiles(rates: np.ndarray) -> Dict[str, float]:
+    """Percentiles of a rate series, keyed p5..p95"""
+    if not len(rates):
+        return {}
+    values = np.percentile(rates, RATE_PERCENTILES)
+    return {f"p{p}": float(v) for p, v in zip(RATE_PERCENTILES, values)}
+
+
+def daily_aggregate(
+    days: np.ndarray,
+    rates: np.ndarray,
+    volumes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-day transaction count, volume, average rate and VWAP
+
+    Days without a single rate get NaN rates.
+    """
+    unique_days, index, counts = np.unique(days, return_inverse=True, return_counts=True)
+    size = len(unique_days)
+    volume = np.bincount(index, weights=np.nan_to_num(volumes), minlength=size)
+
+    priced = ~np.isnan(rates)
+    rated = np.bincount(index[priced], minlength=size)
+    rate_sum = np.bincount(index[priced], weights=rates[priced], minlength=size)
+
+    weighted = priced & ~np.isnan(volumes)
+    weighted_volume = np.bincount(index[weighted], weights=volumes[weighted], minlength=size)
+    weighted_sum = np.bincount(index[weighted], weights=rates[weighted] * volumes[weighted], minlength=size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average_rate = np.where(rated > 0, rate_sum / rated, np.nan)
+        day_vwap = np.where(weighted_volume > 0, weighted_sum / weighted_volume, np.nan)
+    return unique_days, counts, volume, average_rate, day_vwap
+
+
+def grouped_rate_statistics(keys: np.ndarray, rates: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Rate statistics of every group in one pass
+
+    Args:
+        keys: Group key per rate, rows of a group contiguous and in time order
+        rates: Rate series of all groups
+
+    Returns:
+        Per-group arrays: key, count, mean, std, min, max, first, last,
+        return_std (sample std of log returns, NaN with fewer than two)
+    """
+    n = len(rates)
+    boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    counts = np.diff(np.concatenate((starts, [n])))
+    groups = len(starts)
+
+    means = np.add.reduceat(rates, starts) / counts
+    deviations = rates - np.repeat(means, counts)
+    stds = np.sqrt(np.add.reduceat(deviations ** 2, starts) / counts)
+
+    # Returns crossing from one group into the next are dropped
+    returns = log_returns(rates)
+    within = np.ones(len(returns), dtype=bool)
+    within[boundaries - 1] = False
+    owner = np.repeat(np.arange(groups), counts)[1:][within]
+    returns = returns[within]
+    return_count = np.bincount(owner, minlength=groups)
+    return_sum = np.bincount(owner, weights=returns, minlength=groups)
+    return_sq = np.bincount(owner, weights=returns ** 2, minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return_var = (return_sq - return_sum ** 2 / return_count) / (return_count - 1)
+    return_std = np.where(return_count > 1, np.sqrt(np.maximum(return_var, 0)), np.nan)
+
+    return {
+        'key': keys[starts],
+        'count': counts,
+        'mean': means,
+        'std': stds,
+        'min': np.minimum.reduceat(rates, starts),
+        'max': np.maximum.reduceat(rates, starts),
+        'first': rates[starts],
+        'last': rates[starts + counts - 1],
+        'return_std': return_std,
+    }
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+# ==================== Service ====================
+
+class ExchangeAnalyticsService:
+    """Columnar rate and volume analytics"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _pair_filter(self, stmt, model, from_code: str, to_code: str):
+        """Match both currencies of a pair in SQL"""
+        from_currency, to_currency = aliased(Currency), aliased(Currency)
+        return stmt.join(
+            from_currency, model.from_currency_id == from_currency.id
+        ).join(
+            to_currency, model.to_currency_id == to_currency.id
+        ).where(
+            from_currency.code == from_code,
+            to_currency.code == to_code
+        )
+
+    def exchange_trends(
+        self,
+        from_code: str,
+        to_code: str,
+        start_date: date,
+        end_date: date
+    ) -> Dict[str, Any]:
+        """Daily volume, average rate and VWAP of a pair's completed exchanges"""
+        stmt = self._pair_filter(
+            select(
+                cast(ExchangeTransaction.transaction_date, Date),
+                ExchangeTransaction.exchange_rate_used,
+                ExchangeTransaction.from_amount,
+            ),
+            ExchangeTransaction, from_code, to_code
+        ).where(
+            ExchangeTransaction.transaction_date >= start_date,
+            ExchangeTransaction.transaction_date < end_date + timedelta(days=1),
+            ExchangeTransaction.status == TransactionStatus.COMPLETED
+        )
+        day_column, rate_column, amount_column = columns(self.db.execute(stmt).all(), 3)
+
+        pair = f"{from_code}/{to_code}"
+        if not day_column:
+            return {'currency_pair': pair, 'message': 'No data available for this period'}
+
+        rates = to_float_array(rate_column)
+        volumes = to_float_array(amount_column)
+        days, counts, day_volume, day_rate, day_vwap = daily_aggregate(
+            np.array(day_column, dtype='datetime64[D]'), rates, volumes
+        )
+        priced = rates[~np.isnan(rates)]
+
+        return {
+            'currency_pair': pair,
+            'date_range': {
+                'start': start_date.isoformat(),
+                'end': end_date.isoformat()
+            },
+            'total_transactions': len(rates),
+            'total_volume': float(np.nansum(volumes)),
+            'average_rate': float(priced.mean()) if len(priced) else 0,
+            'min_rate': float(priced.min()) if len(priced) else 0,
+            'max_rate': float(priced.max()) if len(priced) else 0,
+            'vwap': vwap(rates, volumes),
+            'percentiles': rate_percentiles(priced),
+            'daily_trends': [
+                {
+                    'date': str(day),
+                    'transaction_count': int(count),
+                    'total_volume': float(volume),
+                    'average_rate': _optional(rate) or 0.0,
+                    'vwap': _optional(weighted)
+                }
+                for day, count, volume, rate, weighted in zip(
+                    days, counts, day_volume, day_rate, day_vwap
+                )
+            ]
+        }
+
+    def rate_volatility(
+        self,
+        from_code: str,
+        to_code: str,
+        start: datetime,
+        window: int = DEFAULT_VOLATILITY_WINDOW
+    ) -> Dict[str, Any]:
+        """Rate statistics, returns and rolling volatility of a pair since `start`"""
+        stmt = self._pair_filter(
+            select(ExchangeRate.effective_from, ExchangeRate.rate),
+            ExchangeRate, from_code, to_code
+        ).where(
+            ExchangeRate.effective_from >= start
+        ).order_by(ExchangeRate.effective_from)
+        time_column, rate_column = columns(self.db.execute(stmt).all(), 2)
+
+        pair = f"{from_code}/{to_code}"
+        if not time_column:
+            return {'currency_pair': pair, 'message': 'No rate data available'}
+
+        rates = to_float_array(rate_column)
+        average = rates.mean()
+        std_dev = rates.std()
+        returns = log_returns(rates)
+        changes = percent_changes(rates)
+        rolling = rolling_std(returns, window) * 100
+
+        return {
+            'currency_pair': pair,
+            'statistics': {
+                'average_rate': float(average),
+                'max_rate': float(rates.max()),
+                'min_rate': float(rates.min()),
+                'standard_deviation': float(std_dev),
+                'volatility_percent': float(std_dev / average * 100) if average else 0,
+                'return_volatility_percent': float(returns.std(ddof=1) * 100) if len(returns) > 1 else 0,
+                'percentiles': rate_percentiles(rates)
+            },
+            'daily_changes': [
+                {
+                    'date': moment.isoformat(),
+                    'rate': float(rate),
+                    'change_percent': float(change),
+                    'log_return': float(log_return)
+                }
+                for moment, rate, change, log_return in zip(time_column[1:], rates[1:], changes, returns)
+            ],
+            'rolling_volatility': {
+                'window': window,
+                'points': [
+                    {'date': moment.isoformat(), 'volatility_percent': float(value)}
+                    for moment, value in zip(time_column[window:], rolling)
+                ]
+            }
+        }
+
+    def all_pairs_volatility(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Rate statistics of every pair with rates in [start, end), most volatile first"""
+        from_currency, to_currency = aliased(Currency), aliased(Currency)
+        stmt = select(
+            from_currency.code, to_currency.code, ExchangeRate.rate
+        ).join(
+            from_currency, ExchangeRate.from_currency_id == from_currency.id
+        ).join(
+            to_currency, ExchangeRate.to_currency_id == to_currency.id
+        ).where(
+            ExchangeRate.effective_from >= start,
+            ExchangeRate.effective_from < end
+        ).order_by(from_currency.code, to_currency.code, ExchangeRate.effective_from)
+        from_column, to_column, rate_column = columns(self.db.execute(stmt).all(), 3)
+        if not rate_column:
+            return []
+
+        keys = np.char.add(np.char.add(np.array(from_column, dtype=str), '/'), np.array(to_column, dtype=str))
+        stats = grouped_rate_statistics(keys, to_float_array(rate_column))
+        order = np.argsort(-np.nan_to_num(stats['return_std'], nan=-1.0), kind='stable')
+
+        return [
+            {
+                'currency_pair': str(stats['key'][i]),
+                'observations': int(stats['count'][i]),
+                'average_rate': float(stats['mean'][i]),
+                'min_rate': float(stats['min'][i]),
+                'max_rate': float(stats['max'][i]),
+                'standard_deviation': float(stats['std'][i]),
+                'change_percent': float((stats['last'][i] - stats['first'][i]) / stats['first'][i] * 100),
+                'return_volatility_percent': _optional(stats['return_std'][i] * 100)
+            }
+            for i in order
+        ]
+
+    def volume_trends(
+        self,
+        start: date,
+        period: str,
+        branch_id: Optional[str] = None,
+        moving_average_periods: int = 3
+    ) -> List[Dict[str, Any]]:
+        """Per-period transaction count and volume with growth and moving average"""
+        if period == 'daily':
+            bucket = func.date(Transaction.transaction_date)
+        else:
+            bucket = func.date_trunc('week' if period == 'weekly' else 'month', Transaction.transaction_date)
+
+        stmt = select(
+            bucket.label('period'),
+            func.count(Transaction.id),
+            func.sum(Transaction.amount)
+        ).where(
+            Transaction.transaction_date >= start,
+            Transaction.status == TransactionStatus.COMPLETED
+        )
+        if branch_id:
+            stmt = stmt.where(Transaction.branch_id == branch_id)
+        stmt = stmt.group_by('period').order_by('period')
+        period_column, count_column, volume_column = columns(self.db.execute(stmt).all(), 3)
+        if not period_column:
+            return []
+
+        volumes = np.nan_to_num(to_float_array(volume_column))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = np.concatenate(([np.nan], np.diff(volumes) / volumes[:-1] * 100))
+        growth[~np.isfinite(growth)] = np.nan
+        window = moving_average_periods
+        moving = np.full(len(volumes), np.nan)
+        if window >= 1 and len(volumes) >= window:
+            moving[window - 1:] = np.convolve(volumes, np.ones(window) / window, mode='valid')
+
+        return [
+            {
+                'period': moment.isoformat() if isinstance(moment, (date, datetime)) else str(moment),
+                'transaction_count': int(count),
+                'total_volume': float(volume),
+                'growth_percent': _optional(change),
+                'moving_average_volume': _optional(average)
+            }
+            for moment, count, volume, change, average in zip(
+                period_column, count_column, volumes, growth, moving
+            )
+        ]
@@ -0,0 +1,250 @@
+"""
+Exchange Quote Service
+Locks an exchange rate snapshot for a short time under a signed quote ID
+
+A teller asks for a quote, shows the customer the amounts and then creates
+the exchange with the quote ID. The exchange uses the quoted rate without
+looking the rate up again, as long as the quote has not expired and the
+request matches what was quoted (user, currencies, amount, commission).
+A quote books one exchange: the exchange redeems it, which removes it from
+the store. A quote issued for a branch also carries the ID of a balance
+hold on the total cost, which the exchange commits instead of re-checking
+the balance.
+
+Quotes live in a bounded in-process store: entries are kept in issue order,
+so expired quotes are evicted from the front and the oldest quotes go first
+when the store is full. The quote ID carries an HMAC of the snapshot, so a
+tampered or guessed ID is rejected without trusting the store contents.
+"""
+
+import hashlib
+import hmac
+import secrets
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExchangeQuote:
+    """Rate snapshot reserved for one user"""
+
+    __slots__ = (
+        "token", "user_id", "from_currency_id", "from_currency_code",
+        "to_currency_id", "to_currency_code", "from_amount", "to_amount",
+        "exchange_rate", "commission_percentage", "commission_amount",
+        "total_cost", "effective_rate", "expires_at", "branch_id", "hold_id",
+    )
+
+    def __init__(
+        self,
+        token: str,
+        user_id: UUID,
+        expires_at: datetime,
+        calculation: Dict[str, Any],
+        branch_id: Optional[UUID] = None,
+        hold_id: Optional[UUID] = None
+    ):
+        self.token = token
+        self.user_id = user_id
+        self.expires_at = expires_at
+        self.branch_id = branch_id
+        self.hold_id = hold_id
+        self.from_currency_id = calculation["from_currency_id"]
+        self.from_currency_code = calculation["from_currency_code"]
+        self.to_currency_id = calculation["to_currency_id"]
+        self.to_currency_code = calculation["to_currency_code"]
+        self.from_amount = Decimal(str(calculation["from_amount"]))
+        self.to_amount = Decimal(str(calculation["to_amount"]))
+        self.exchange_rate = Decimal(str(calculation["exchange_rate"]))
+        self.commission_percentage = Decimal(str(calculation["commission_percentage"]))
+        self.commission_amount = Decimal(str(calculation["commission_amount"]))
+        self.total_cost = Decimal(str(calculation["total_cost"]))
+        self.effective_rate = Decimal(str(calculation["effective_rate"]))
+
+    @property
+    def quote_id(self) -> str:
+        return f"{self.token}.{self.signature()}"
+
+    def signature(self) -> str:
+        """HMAC-SHA256 (truncated) over the token and the locked snapshot"""
+        message = "|".join((
+            self.token,
+            str(self.user_id),
+            str(self.from_currency_id),
+            str(self.to_currency_id),
+            format(self.from_amount.normalize(), "f"),
+            format(self.exchange_rate.normalize(), "f"),
+            format(self.commission_percentage.normalize(), "f"),
+            self.expires_at.isoformat(),
+            str(self.branch_id),
+            str(self.hold_id),
+        ))
+        digest = hmac.new(settings.SECRET_KEY.encode(), message.encode(), hashlib.sha256)
+        return digest.hexdigest()[:32]
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return (now or datetime.utcnow()) >= self.expires_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ExchangeQuoteResponse dict"""
+        return {
+            "quote_id": self.quote_id,
+            "expires_at": self.expires_at,
+            "branch_id": self.branch_id,
+            "hold_id": self.hold_id,
+            "from_currency_id": self.from_currency_id,
+            "from_currency_code": self.from_currency_code,
+            "to_currency_id": self.to_currency_id,
+            "to_currency_code": self.to_currency_code,
+            "from_amount": self.from_amount,
+            "to_amount": self.to_amount,
+            "exchange_rate": self.exchange_rate,
+            "commission_percentage": self.commission_percentage,
+            "commission_amount": self.commission_amount,
+            "total_cost": self.total_cost,
+            "effective_rate": self.effective_rate,
+        }
+
+
+class ExchangeQuoteService:
+    """Issues and resolves exchange quotes held in a per-process store"""
+
+    # token -> ExchangeQuote, in issue (and therefore expiry) order
+    _quotes: "OrderedDict[str, ExchangeQuote]" = OrderedDict()
+
+    # ==================== Public API ====================
+
+    def issue(
+        self,
+        user_id: UUID,
+        calculation: Dict[str, Any],
+        branch_id: Optional[UUID] = None,
+        hold_id: Optional[UUID] = None,
+        expires_at: Optional[datetime] = None
+    ) -> ExchangeQuote:
+        """
+        Lock a calculated exchange for EXCHANGE_QUOTE_TTL_SECONDS
+
+        Args:
+            user_id: User the quote is reserved for
+            calculation: TransactionService.calculate_exchange result
+            branch_id: Branch the quote is limited to
+            hold_id: Balance hold on the total cost at branch_id
+            expires_at: Expiry (defaults to now + EXCHANGE_QUOTE_TTL_SECONDS)
+
+        Returns:
+            Stored ExchangeQuote
+        """
+        now = datetime.utcnow()
+        self._evict(now)
+
+        quote = ExchangeQuote(
+            token=secrets.token_urlsafe(12),
+            user_id=user_id,
+            expires_at=expires_at or self.expiry(now),
+            calculation=calculation,
+            branch_id=branch_id,
+            hold_id=hold_id,
+        )
+        self._quotes[quote.token] = quote
+
+        logger.info(
+            f"Exchange quote issued: {quote.from_amount} {quote.from_currency_code} -> "
+            f"{quote.to_currency_code} @ {quote.exchange_rate}, expires {quote.expires_at}"
+        )
+        return quote
+
+    @staticmethod
+    def expiry(now: Optional[datetime] = None) -> datetime:
+        """Expiry of a quote issued now (whole seconds)"""
+        now = now or datetime.utcnow()
+        return (now + timedelta(seconds=settings.EXCHANGE_QUOTE_TTL_SECONDS)).replace(microsecond=0)
+
+    def resolve(
+        self,
+        quote_id: str,
+        user_id: UUID,
+        from_currency_id: UUID,
+        to_currency_id: UUID,
+        from_amount: Decimal,
+        commission_percentage: Optional[Decimal] = None,
+        branch_id: Optional[UUID] = None
+    ) -> ExchangeQuote:
+        """
+        Return the quote for an exchange request
+
+        Args:
+            quote_id: ID returned when the quote was issued
+            user_id: User creating the exchange
+            from_currency_id: Requested source currency
+            to_currency_id: Requested target currency
+            from_amount: Requested amount
+            commission_percentage: Requested commission; None accepts the quoted one
+            branch_id: Branch executing the exchange
+
+        Returns:
+            Matching ExchangeQuote
+
+        Raises:
+            ValidationError: Unknown, tampered or expired quote, or a request
+                that does not match the quote
+        """
+        token, _, signature = quote_id.partition(".")
+        quote = self._quotes.get(token)
+
+        if quote is None or not hmac.compare_digest(signature, quote.signature()):
+            raise ValidationError("Exchange quote not found or expired")
+        if quote.is_expired():
+            self._quotes.pop(token, None)
+            raise ValidationError("Exchange quote not found or expired")
+
+        if (
+            quote.user_id != user_id
+            or quote.from_currency_id != from_currency_id
+            or quote.to_currency_id != to_currency_id
+            or quote.from_amount != Decimal(str(from_amount))
+            or (quote.branch_id is not None and quote.branch_id != branch_id)
+        ):
+            raise ValidationError("Exchange request does not match the quote")
+        if (
+            commission_percentage is not None
+            and Decimal(str(commission_percentage)) != quote.commission_percentage
+        ):
+            raise ValidationError("Commission percentage does not match the quote")
+
+        return quote
+
+    def redeem(self, quote: ExchangeQuote) -> None:
+        """
+        Use up a resolved quote
+
+        Removes the quote from the store, so its ID cannot book another
+        exchange. Call it in the transaction that books the exchange.
+
+        Raises:
+            ValidationError: The quote was already redeemed or evicted
+        """
+        if self._quotes.pop(quote.token, None) is not quote:
+            raise ValidationError("Exchange quote has already been used")
+
+    # ==================== Eviction ====================
+
+    def _evict(self, now: datetime) -> None:
+        """Drop expired quotes, then the oldest ones beyond EXCHANGE_QUOTE_MAX_ENTRIES"""
+        quotes = self._quotes
+        while quotes:
+            oldest = next(iter(quotes.values()))
+            if not oldest.is_expired(now):
+                break
+            quotes.popitem(last=False)
+
+        while len(quotes) >= settings.EXCHANGE_QUOTE_MAX_ENTRIES:
+            quotes.popitem(last=False)
@@ -0,0 +1,300 @@
+"""
+Idempotency Service
+Replays stored responses for retried money-moving requests
+
+Clients send an Idempotency-Key header with POST requests that move money
+(exchange, branch transfer, vault transfers). The first request with a key
+claims an idempotency_records row, runs, and stores its serialized
+response. A retry with the same key and body gets the stored response
+without running validation or touching balances. Concurrent duplicates in
+the same process wait for the first request and share its result;
+duplicates in other worker processes see the 'in_progress' claim and get a
+409 until it completes.
+
+While the handler runs, every commit it makes also marks the claim
+'executed' (a before_commit hook), so the marker commits (or rolls back)
+together with the handler's business changes. A claim abandoned by a crashed worker is only
+taken over while it is still 'in_progress', i.e. when nothing was
+committed; an 'executed' claim without a stored response is never run
+again.
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, select, delete, update, or_, and_, null
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ResourceConflictError
+from app.db.models.idempotency import IdempotencyRecord
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IdempotencyService:
+    """Runs a request handler at most once per (user, Idempotency-Key)"""
+
+    # Requests currently running in this process: (user_id, key) -> future
+    # resolving to (request_hash, response)
+    _in_flight: Dict[Tuple[UUID, str], asyncio.Future] = {}
+
+    # Expired records are purged once every this many claims per process
+    PURGE_EVERY = 1000
+    _claims_since_purge = 0
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ==================== Public API ====================
+
+    async def execute(
+        self,
+        user_id: UUID,
+        idempotency_key: Optional[str],
+        scope: str,
+        payload: Any,
+        handler: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run handler once for the key and return its (stored) response
+
+        Args:
+            user_id: Requesting user
+            idempotency_key: Client key; without one the handler just runs
+            scope: Endpoint name, part of the request hash
+            payload: Request body (schema or dict)
+            handler: Coroutine factory producing the JSON-serializable response
+
+        Returns:
+            Handler response, or the stored response for a retry
+
+        Raises:
+            ResourceConflictError: Key reused with a different request, or
+                the original request is still running in another process
+        """
+        if not idempotency_key:
+            return await handler()
+
+        request_hash = self.request_hash(scope, payload)
+        slot = (user_id, idempotency_key)
+
+        pending = self._in_flight.get(slot)
+        if pending is not None:
+            # Coalesce with the request already running in this process
+            original_hash, response = await asyncio.shield(pending)
+            self._ensure_same_request(idempotency_key, original_hash, request_hash)
+            logger.info(f"Coalesced duplicate request for idempotency key {idempotency_key}")
+            return response
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; mark a failure as retrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[slot] = future
+        try:
+            response = await self._execute_claimed(
+                user_id, idempotency_key, scope, request_hash, handler
+            )
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._in_flight.pop(slot, None)
+
+        future.set_result((request_hash, response))
+        return response
+
+    @staticmethod
+    def request_hash(scope: str, payload: Any) -> str:
+        """SHA-256 of the scope and canonical JSON of the request body"""
+        body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{scope}\n{body}".encode()).hexdigest()
+
+    async def purge_expired(self) -> int:
+        """Delete expired records; returns rows removed"""
+        result = await self.db.execute(
+            delete(IdempotencyRecord).where(IdempotencyRecord.expires_at < datetime.utcnow())
+        )
+        await self.db.commit()
+        return result.rowcount or 0
+
+    # ==================== Claim / Store ====================
+
+    async def _execute_claimed(
+        self,
+        user_id: UUID,
+        idempotency_key: str,
+        scope: str,
+        request_hash: str,
+        handler: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Claim the key in the database, run the handler and store the response"""
+        if not await self._claim(user_id, idempotency_key, scope, request_hash):
+            return await self._replay(user_id, idempotency_key, request_hash)
+
+        mark_executed = self._executed_marker(user_id, idempotency_key)
+        event.listen(self.db.sync_session, "before_commit", mark_executed)
+        try:
+            try:
+                response = jsonable_encoder(await handler())
+            finally:
+                event.remove(self.db.sync_session, "before_commit", mark_executed)
+        except BaseException:
+            # Only an uncommitted (still in-progress) claim is released
+            await self.db.rollback()
+            await self._release(user_id, idempotency_key)
+            raise
+
+        await self._set_status(
+            user_id, idempotency_key, IdempotencyRecord.STATUS_COMPLETED, response_body=response
+        )
+        await self.db.commit()
+        return response
+
+    async def _set_status(self, user_id: UUID, idempotency_key: str, status: str, **values) -> None:
+        """Update the key's record in the current transaction (not committed)"""
+        await self.db.execute(self._status_update(user_id, idempotency_key, status, **values))
+
+    def _executed_marker(self, user_id: UUID, idempotency_key: str) -> Callable:
+        """
+        before_commit hook marking the claim 'executed'
+
+        Runs inside each commit the handler makes, so the marker is committed
+        atomically with the business changes (including `async with
+        db.begin()` blocks, which a pre-opened transaction would break).
+        """
+        statement = self._status_update(
+            user_id, idempotency_key, IdempotencyRecord.STATUS_EXECUTED,
+            only_status=IdempotencyRecord.STATUS_IN_PROGRESS
+        )
+
+        def mark_executed(session) -> None:
+            session.execute(statement)
+
+        return mark_executed
+
+    @staticmethod
+    def _status_update(
+        user_id: UUID,
+        idempotency_key: str,
+        status: str,
+        only_status: Optional[str] = None,
+        **values
+    ):
+        conditions = [
+            IdempotencyRecord.user_id == user_id,
+            IdempotencyRecord.idempotency_key == idempotency_key
+        ]
+        if only_status:
+            conditions.append(IdempotencyRecord.status == only_status)
+        return update(IdempotencyRecord).where(and_(*conditions)).values(status=status, **values)
+
+    async def _claim(
+        self,
+        user_id: UUID,
+        idempotency_key: str,
+        scope: str,
+        request_hash: str
+    ) -> bool:
+        """
+        Insert an in-progress record for the key
+
+        Expired records and in-progress claims older than
+        IDEMPOTENCY_IN_FLIGHT_TIMEOUT_SECONDS are taken over. Executed
+        claims are not: their business changes are already committed.
+
+        Returns:
+            True if this request owns the key
+        """
+        now = datetime.utcnow()
+        values = {
+            "user_id": user_id,
+            "idempotency_key": idempotency_key,
+            "scope": scope,
+            "request_hash": request_hash,
+            "status": IdempotencyRecord.STATUS_IN_PROGRESS,
+            "created_at": now,
+            "expires_at": now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+        }
+        stale_before = now - timedelta(seconds=settings.IDEMPOTENCY_IN_FLIGHT_TIMEOUT_SECONDS)
+
+        stmt = pg_insert(IdempotencyRecord).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "idempotency_key"],
+            set_={
+                **{key: stmt.excluded[key] for key in values if key not in ("user_id", "idempotency_key")},
+                "response_body": null(),
+            },
+            where=or_(
+                IdempotencyRecord.expires_at < now,
+                and_(
+                    IdempotencyRecord.status == IdempotencyRecord.STATUS_IN_PROGRESS,
+                    IdempotencyRecord.created_at < stale_before
+                )
+            )
+        ).returning(IdempotencyRecord.request_hash)
+
+        claimed = (await self.db.execute(stmt)).scalar_one_or_none() is not None
+        await self.db.commit()
+
+        IdempotencyService._claims_since_purge += 1
+        if IdempotencyService._claims_since_purge >= self.PURGE_EVERY:
+            IdempotencyService._claims_since_purge = 0
+            await self.purge_expired()
+
+        return claimed
+
+    async def _replay(self, user_id: UUID, idempotency_key: str, request_hash: str) -> Any:
+        """Return the stored response for a key owned by an earlier request"""
+        record = (await self.db.execute(
+            select(IdempotencyRecord).where(
+                and_(
+                    IdempotencyRecord.user_id == user_id,
+                    IdempotencyRecord.idempotency_key == idempotency_key
+                )
+            )
+        )).scalar_one()
+
+        self._ensure_same_request(idempotency_key, record.request_hash, request_hash)
+
+        if record.status == IdempotencyRecord.STATUS_EXECUTED:
+            raise ResourceConflictError(
+                f"The request with Idempotency-Key {idempotency_key} was already executed; "
+                f"its response is not available, check the result before retrying with a new key"
+            )
+
+        if record.status != IdempotencyRecord.STATUS_COMPLETED:
+            raise ResourceConflictError(
+                f"A request with Idempotency-Key {idempotency_key} is still being processed"
+            )
+
+        logger.info(f"Replaying stored response for idempotency key {idempotency_key}")
+        return record.response_body
+
+    async def _release(self, user_id: UUID, idempotency_key: str) -> None:
+        """Drop an in-progress claim after the handler failed"""
+        await self.db.execute(
+            delete(IdempotencyRecord).where(
+                and_(
+                    IdempotencyRecord.user_id == user_id,
+                    IdempotencyRecord.idempotency_key == idempotency_key,
+                    IdempotencyRecord.status == IdempotencyRecord.STATUS_IN_PROGRESS
+                )
+            )
+        )
+        await self.db.commit()
+
+    @staticmethod
+    def _ensure_same_request(idempotency_key: str, original_hash: str, request_hash: str) -> None:
+        """Reject reuse of a key for a different request body or endpoint"""
+        if original_hash != request_hash:
+            raise ResourceConflictError(
+                f"Idempotency-Key {idempotency_key} was already used for a different request"
+            )
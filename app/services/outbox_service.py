@@ -0,0 +1,378 @@
+"""
+Outbox Service
+Transactional outbox for domain events
+
+Services record events with OutboxService(db).add() inside the transaction
+that makes the change; the event row commits or rolls back with it.
+
+Events reach in-process subscribers two ways:
+- The writing session hands its own events to subscribers right after
+  commit, so the worker that made a change sees it immediately
+- OutboxRelay, a background task in every worker, tails outbox_events and
+  dispatches events written by other workers in id order
+
+The tail follows ids, so an event whose transaction commits after a later
+id has already been read is not seen by other workers. Subscribers must
+therefore treat events as hints with bounded lifetime (see the balance
+read model) rather than as a complete log.
+
+With OUTBOX_REDIS_STREAM_ENABLED the relay also publishes every event to
+one Redis stream for out-of-process consumers. Publishing goes by
+published_at rather than by id, so late commits are not lost, and runs in
+one worker at a time. Delivery is at-least-once: consumers skip events
+whose outbox id they have already applied.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import redis.asyncio as redis
+from sqlalchemy import event, select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.db.models.outbox import OutboxEvent
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# session.info key holding events written in the current transaction
+_PENDING_KEY = "outbox_pending"
+
+# Transaction-scoped advisory lock held by the worker publishing to Redis
+_PUBLISH_LOCK = "outbox_events.publish"
+
+Subscriber = Callable[[int, Dict[str, Any]], None]
+
+# ==================== Event Types ====================
+
+BALANCE_CHANGED = "balance.changed"
+TRANSACTION_CREATED = "transaction.created"
+TRANSACTION_STATUS_CHANGED = "transaction.status_changed"
+EXCHANGE_RATE_CHANGED = "exchange_rate.changed"
+
+
+class OutboxService:
+    """Writes outbox events within the caller's transaction"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        aggregate_id: Optional[UUID] = None
+    ) -> OutboxEvent:
+        """
+        Record an event in the current transaction
+
+        Args:
+            event_type: Event name subscribers register for
+            payload: JSON-serializable event data
+            aggregate_id: Entity the event is about
+
+        Returns:
+            The flushed OutboxEvent (id assigned)
+        """
+        outbox_event = OutboxEvent(
+            event_type=event_type,
+            aggregate_id=aggregate_id,
+            payload=payload,
+            created_at=datetime.utcnow()
+        )
+        self.db.add(outbox_event)
+        await self.db.flush()
+
+        self.db.info.setdefault(_PENDING_KEY, []).append(
+            (outbox_event.id, event_type, payload)
+        )
+        return outbox_event
+
+    async def add_many(
+        self,
+        event_type: str,
+        events: Iterable[Tuple[Optional[UUID], Dict[str, Any]]]
+    ) -> List[OutboxEvent]:
+        """
+        Record several events of one type with a single flush
+
+        Args:
+            event_type: Event name subscribers register for
+            events: (aggregate_id, payload) pairs
+
+        Returns:
+            The flushed OutboxEvents, in input order
+        """
+        now = datetime.utcnow()
+        outbox_events = [
+            OutboxEvent(event_type=event_type, aggregate_id=aggregate_id, payload=payload, created_at=now)
+            for aggregate_id, payload in events
+        ]
+        if not outbox_events:
+            return []
+
+        self.db.add_all(outbox_events)
+        await self.db.flush()
+
+        self.db.info.setdefault(_PENDING_KEY, []).extend(
+            (outbox_event.id, event_type, outbox_event.payload) for outbox_event in outbox_events
+        )
+        return outbox_events
+
+
+class RedisStreamPublisher:
+    """Appends outbox events to a capped Redis stream"""
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        stream: str = settings.OUTBOX_REDIS_STREAM,
+        maxlen: int = settings.OUTBOX_REDIS_STREAM_MAXLEN,
+    ):
+        self._client = client
+        self.stream = stream
+        self.maxlen = maxlen
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD,
+            )
+        return self._client
+
+    async def publish(self, events: List[Any]) -> None:
+        """XADD a batch of outbox rows in one round trip, in the given order"""
+        pipeline = self.client.pipeline(transaction=False)
+        for outbox_event in events:
+            pipeline.xadd(
+                self.stream,
+                {
+                    "id": str(outbox_event.id),
+                    "type": outbox_event.event_type,
+                    "aggregate_id": str(outbox_event.aggregate_id or ""),
+                    "payload": json.dumps(outbox_event.payload),
+                },
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        await pipeline.execute()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OutboxRelay:
+    """
+    Dispatches outbox events to in-process subscribers
+
+    Started and stopped from the application lifespan. Subscribers are
+    plain callables taking (event_id, payload); they run on the event loop
+    and must not block.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        poll_interval_ms: int = settings.OUTBOX_POLL_INTERVAL_MS,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        retention_hours: int = settings.OUTBOX_RETENTION_HOURS,
+        publisher: Optional[RedisStreamPublisher] = None,
+    ):
+        self._session_factory = session_factory
+        self._publisher = publisher
+        self._poll_interval = poll_interval_ms / 1000
+        self._batch_size = batch_size
+        self._retention = timedelta(hours=retention_hours)
+        self._subscribers: Dict[str, List[Subscriber]] = defaultdict(list)
+        self._task: Optional[asyncio.Task] = None
+        self._last_id: Optional[int] = None
+        self._dispatched = 0
+        self._published = 0
+
+    # ==================== Subscribers ====================
+
+    def subscribe(self, event_type: str, handler: Subscriber) -> None:
+        """Call handler(event_id, payload) for every event of event_type"""
+        self._subscribers[event_type].append(handler)
+
+    def dispatch(self, event_id: int, event_type: str, payload: Dict[str, Any]) -> None:
+        """Hand one event to its subscribers; failures are logged, not raised"""
+        for handler in self._subscribers.get(event_type, ()):
+            try:
+                handler(event_id, payload)
+            except Exception as e:
+                logger.error(f"Outbox subscriber failed for {event_type} #{event_id}: {str(e)}")
+        self._dispatched += 1
+
+    @property
+    def last_id(self) -> int:
+        """Highest event id dispatched by the tail (0 before the first poll)"""
+        return self._last_id or 0
+
+    # ==================== Lifecycle ====================
+
+    async def start(self) -> None:
+        """Start tailing from the current end of the outbox"""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="outbox-relay")
+        logger.info("Outbox relay started")
+
+    async def stop(self) -> None:
+        """Stop the tail task"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._publisher is not None:
+            await self._publisher.close()
+        logger.info("Outbox relay stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return relay counters for health/monitoring endpoints"""
+        return {
+            "running": self._task is not None,
+            "last_id": self.last_id,
+            "dispatched": self._dispatched,
+            "publishing": self._publisher is not None,
+            "published": self._published,
+        }
+
+    # ==================== Tail ====================
+
+    async def poll(self) -> int:
+        """Dispatch events written since the last poll; returns events dispatched"""
+        async with self._session_factory() as session:
+            if self._last_id is None:
+                # Start at the end: consumers load current state on demand
+                self._last_id = (await session.execute(
+                    select(func.coalesce(func.max(OutboxEvent.id), 0))
+                )).scalar_one()
+                return 0
+
+            rows = (await session.execute(
+                select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload)
+                .where(OutboxEvent.id > self._last_id)
+                .order_by(OutboxEvent.id)
+                .limit(self._batch_size)
+            )).all()
+
+        for row in rows:
+            self.dispatch(row.id, row.event_type, row.payload)
+            self._last_id = row.id
+        return len(rows)
+
+    # ==================== Stream ====================
+
+    async def publish_pending(self) -> int:
+        """
+        Publish the oldest unpublished events to the Redis stream
+
+        Only the worker holding the publish lock publishes, so the stream
+        receives batches in id order. If Redis fails the batch stays
+        unpublished and is sent again by a later call.
+
+        Returns:
+            Number of events published (0 when another worker holds the lock)
+        """
+        if self._publisher is None:
+            return 0
+
+        async with self._session_factory() as session:
+            locked = (await session.execute(
+                select(func.pg_try_advisory_xact_lock(func.hashtext(_PUBLISH_LOCK)))
+            )).scalar_one()
+            if not locked:
+                return 0
+
+            events = (await session.execute(
+                select(
+                    OutboxEvent.id, OutboxEvent.event_type,
+                    OutboxEvent.aggregate_id, OutboxEvent.payload
+                )
+                .where(OutboxEvent.published_at.is_(None))
+                .order_by(OutboxEvent.id)
+                .limit(self._batch_size)
+            )).all()
+            if not events:
+                return 0
+
+            await self._publisher.publish(events)
+            await session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_([e.id for e in events]))
+                .values(published_at=datetime.utcnow())
+            )
+            await session.commit()
+
+        self._published += len(events)
+        return len(events)
+
+    async def purge(self) -> int:
+        """Delete events older than OUTBOX_RETENTION_HOURS (once published, if publishing)"""
+        condition = OutboxEvent.created_at < datetime.utcnow() - self._retention
+        if self._publisher is not None:
+            condition = condition & OutboxEvent.published_at.isnot(None)
+
+        async with self._session_factory() as session:
+            result = await session.execute(delete(OutboxEvent).where(condition))
+            await session.commit()
+        return result.rowcount or 0
+
+    async def _run(self) -> None:
+        next_purge = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                dispatched = await self.poll()
+            except Exception as e:
+                dispatched = 0
+                logger.error(f"Outbox relay poll failed: {str(e)}")
+            try:
+                published = await self.publish_pending()
+            except Exception as e:
+                published = 0
+                logger.error(f"Outbox stream publish failed: {str(e)}")
+            try:
+                if loop.time() >= next_purge:
+                    await self.purge()
+                    next_purge = loop.time() + 3600
+            except Exception as e:
+                logger.error(f"Outbox purge failed: {str(e)}")
+            if max(dispatched, published) < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+
+# Global relay instance
+outbox_relay = OutboxRelay(
+    publisher=RedisStreamPublisher() if settings.OUTBOX_REDIS_STREAM_ENABLED else None
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_events(session: Session) -> None:
+    """Give subscribers in this worker the events of a committed transaction"""
+    for event_id, event_type, payload in session.info.pop(_PENDING_KEY, ()):
+        outbox_relay.dispatch(event_id, event_type, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_events(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,387 @@
+"""
+PDF Render Service
+Report PDF rendering off the API workers
+
+Reportlab layout is CPU-bound and holds the GIL, so large exports run in a
+small process pool. Each worker builds the stylesheet and registers fonts
+once (pool initializer) and then renders reports straight into a temp file,
+so the PDF bytes never pass through the API process.
+
+Detail tables are split into chunks of PDF_TABLE_CHUNK_ROWS rows, each
+repeating the header: reportlab splits one huge Table across pages in
+quadratic time, while many small tables lay out linearly.
+
+Arabic text is shaped (arabic_reshaper + python-bidi) when those packages
+are installed; glyphs need a TTF font with Arabic coverage (PDF_FONT_PATH).
+Without them text is rendered as is, with the built-in Helvetica.
+"""
+
+import multiprocessing
+import os
+import re
+import signal
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Union
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import registerFontFamily
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+try:
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+except ImportError:  # optional: Arabic text is rendered unshaped
+    arabic_reshaper = None
+    get_display = None
+
+logger = get_logger(__name__)
+
+ARABIC_PATTERN = re.compile('[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]')
+REPORT_FONT = 'ReportFont'
+REPORT_FONT_BOLD = 'ReportFont-Bold'
+
+
+# ==================== Fonts & Styles (cached per process) ====================
+
+@lru_cache(maxsize=1)
+def report_fonts() -> Dict[str, str]:
+    """
+    Register the configured TTF fonts once; returns regular/bold font names
+
+    Falls back to Helvetica when no font is configured or it can't be loaded.
+    """
+    fonts = {'regular': 'Helvetica', 'bold': 'Helvetica-Bold'}
+    if not settings.PDF_FONT_PATH:
+        return fonts
+    try:
+        pdfmetrics.registerFont(TTFont(REPORT_FONT, settings.PDF_FONT_PATH))
+        fonts = {'regular': REPORT_FONT, 'bold': REPORT_FONT}
+        if settings.PDF_BOLD_FONT_PATH:
+            pdfmetrics.registerFont(TTFont(REPORT_FONT_BOLD, settings.PDF_BOLD_FONT_PATH))
+            fonts['bold'] = REPORT_FONT_BOLD
+        # <b>/<i> markup in paragraphs maps through the font family
+        registerFontFamily(
+            REPORT_FONT, normal=REPORT_FONT, bold=fonts['bold'],
+            italic=REPORT_FONT, boldItalic=fonts['bold']
+        )
+    except Exception as e:
+        logger.warning(f"PDF font not loaded, using Helvetica: {str(e)}")
+    return fonts
+
+
+@lru_cache(maxsize=1)
+def report_styles() -> Dict[str, ParagraphStyle]:
+    """Paragraph styles of report PDFs, built once per process"""
+    fonts = report_fonts()
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontName=fonts['bold'],
+            fontSize=24,
+            textColor=colors.HexColor('#1F4E78'),
+            spaceAfter=30,
+            alignment=1  # Center
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontName=fonts['bold'],
+            fontSize=16,
+            textColor=colors.HexColor('#366092'),
+            spaceAfter=12
+        ),
+        'normal': ParagraphStyle('CustomNormal', parent=styles['Normal'], fontName=fonts['regular']),
+    }
+
+
+def shape_text(text: Any) -> str:
+    """Shape and reorder Arabic text for left-to-right PDF drawing"""
+    text = str(text)
+    if arabic_reshaper is None or not ARABIC_PATTERN.search(text):
+        return text
+    return get_display(arabic_reshaper.reshape(text))
+
+
+# ==================== Rendering ====================
+
+def _detail_rows(report_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Tabular section of a report (data, transactions or branches)"""
+    for key in ('data', 'transactions', 'branches'):
+        if key in report_data:
+            data = report_data[key]
+            return data if data and isinstance(data, list) else None
+    return None
+
+
+def _detail_tables(headers: List[str], rows: List[Dict[str, Any]]) -> List[Table]:
+    """Detail rows as tables of PDF_TABLE_CHUNK_ROWS rows, each with the header"""
+    fonts = report_fonts()
+    header_row = [shape_text(h.replace('_', ' ').title()) for h in headers]
+    col_widths = [1.5 * inch] * len(headers)
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), fonts['bold']),
+        ('FONTNAME', (0, 1), (-1, -1), fonts['regular']),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+    ])
+
+    chunk_rows = max(settings.PDF_TABLE_CHUNK_ROWS, 1)
+    tables = []
+    for start in range(0, len(rows), chunk_rows):
+        table_data = [header_row]
+        for item in rows[start:start + chunk_rows]:
+            row = []
+            for header in headers:
+                value = item.get(header, '')
+                if isinstance(value, (int, float)):
+                    row.append(f"{value:,.2f}")
+                else:
+                    row.append(shape_text(str(value)[:30]))  # Truncate long text
+            table_data.append(row)
+        table = Table(table_data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(table_style)
+        tables.append(table)
+    return tables
+
+
+def build_pdf(report_data: Dict[str, Any], target: Union[str, BytesIO]) -> None:
+    """
+    Lay out a report PDF into a file path or buffer
+
+    Args:
+        report_data: Dictionary containing report data
+        target: Output file path or BytesIO
+    """
+    fonts = report_fonts()
+    styles = report_styles()
+    doc = SimpleDocTemplate(
+        target,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=72
+    )
+    story = []
+
+    # Title and metadata
+    story.append(Paragraph(shape_text(report_data.get('title', 'Report')), styles['title']))
+    story.append(Spacer(1, 12))
+
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    story.append(Paragraph(f"<b>Generated:</b> {generated_at}", styles['normal']))
+
+    if 'date_range' in report_data:
+        date_range = report_data['date_range']
+        period = f"{date_range.get('start', '')} to {date_range.get('end', '')}"
+        story.append(Paragraph(f"<b>Period:</b> {period}", styles['normal']))
+
+    story.append(Spacer(1, 20))
+
+    # Summary section
+    if 'summary' in report_data:
+        story.append(Paragraph("Summary", styles['heading']))
+
+        summary_data = [
+            [shape_text(key.replace('_', ' ').title()), shape_text(value)]
+            for key, value in report_data['summary'].items()
+        ]
+        summary_table = Table(summary_data, colWidths=[3 * inch, 2 * inch])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (0, -1), fonts['bold']),
+            ('FONTNAME', (1, 0), (1, -1), fonts['regular']),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.lightgrey, colors.white])
+        ]))
+
+        story.append(summary_table)
+        story.append(Spacer(1, 20))
+
+    # Detailed data
+    data = _detail_rows(report_data)
+    if data:
+        story.append(Paragraph("Detailed Data", styles['heading']))
+
+        max_rows = settings.PDF_MAX_ROWS
+        story.extend(_detail_tables(list(data[0].keys()), data[:max_rows]))
+
+        if len(data) > max_rows:
+            story.append(Spacer(1, 12))
+            story.append(Paragraph(
+                f"<i>Showing {max_rows} of {len(data)} records</i>",
+                styles['normal']
+            ))
+
+    doc.build(story)
+
+
+def _warm_worker() -> None:
+    """Pool initializer: load fonts and styles before the first report"""
+    report_styles()
+
+
+def _init_worker(pid_queue) -> None:
+    """Pool initializer: report this worker's PID, then warm it up"""
+    pid_queue.put(os.getpid())
+    _warm_worker()
+
+
+def _render_to_path(report_data: Dict[str, Any], path: str) -> str:
+    """Worker entry point: render a report into `path`"""
+    build_pdf(report_data, path)
+    return path
+
+
+# ==================== Process Pool ====================
+
+class PdfRenderPool(ProcessPoolExecutor):
+    """
+    Process pool whose workers can be stopped while busy
+
+    shutdown() waits for running renders, so a hung render would keep its
+    worker for ever. Each worker posts its PID from the initializer; the
+    pool keeps them itself rather than reading executor internals (checked
+    on CPython 3.10-3.13, Linux).
+    """
+
+    def __init__(self, max_workers: int):
+        context = multiprocessing.get_context()
+        self._pid_queue = context.SimpleQueue()
+        self._worker_pids = set()
+        super().__init__(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._pid_queue,)
+        )
+
+    def worker_pids(self) -> Set[int]:
+        """PIDs of the workers started so far"""
+        while not self._pid_queue.empty():
+            self._worker_pids.add(self._pid_queue.get())
+        return set(self._worker_pids)
+
+    def terminate_workers(self) -> None:
+        """Shut the pool down and stop its worker processes"""
+        self.shutdown(wait=False, cancel_futures=True)
+        for pid in self.worker_pids():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+# Worker processes for PDF layout, created on first use (or at startup)
+_pdf_pool: Optional[PdfRenderPool] = None
+
+
+def _get_pdf_pool() -> PdfRenderPool:
+    """Return the shared PDF rendering process pool"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = PdfRenderPool(max_workers=settings.PDF_RENDER_WORKERS)
+    return _pdf_pool
+
+
+def warm_pdf_render_pool() -> None:
+    """Start the PDF workers ahead of the first export (application startup)"""
+    if settings.PDF_RENDER_WORKERS <= 0:
+        return
+    pool = _get_pdf_pool()
+    for _ in range(settings.PDF_RENDER_WORKERS):
+        pool.submit(_warm_worker)
+
+
+def render_pdf_file(report_data: Dict[str, Any]) -> str:
+    """
+    Render a report PDF into a new temp file
+
+    Blocks the calling (threadpool) thread while a worker process lays the
+    report out; with PDF_RENDER_WORKERS=0, or if the pool is broken, the
+    report is rendered in this process instead. A render that exceeds
+    PDF_RENDER_TIMEOUT_SECONDS is cancelled, or its hung worker is stopped
+    by recycling the pool. The caller owns the returned file and must
+    delete it.
+
+    Returns:
+        Path of the rendered PDF
+    """
+    fd, path = tempfile.mkstemp(prefix='cems_report_', suffix='.pdf')
+    os.close(fd)
+    try:
+        if settings.PDF_RENDER_WORKERS > 0:
+            pool = _get_pdf_pool()
+            try:
+                future = pool.submit(_render_to_path, report_data, path)
+                return future.result(timeout=settings.PDF_RENDER_TIMEOUT_SECONDS)
+            except TimeoutError:
+                if not future.cancel():
+                    logger.error("PDF render timed out, recycling the render pool")
+                    _discard_pdf_pool(pool, terminate=True)
+                # The worker may still write the file until it is stopped
+                future.add_done_callback(lambda _, path=path: _remove_file(path))
+                path = None
+                raise
+            except (BrokenProcessPool, OSError, RuntimeError):
+                _discard_pdf_pool(pool)
+        return _render_to_path(report_data, path)
+    except Exception:
+        if path is not None:
+            _remove_file(path)
+        raise
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _discard_pdf_pool(pool: PdfRenderPool, terminate: bool = False) -> None:
+    """
+    Shut a pool down and, if it is still the shared one, forget it
+
+    With terminate, its workers are stopped as well (a hung render holds a
+    slot for ever).
+    """
+    global _pdf_pool
+    if _pdf_pool is pool:
+        _pdf_pool = None
+    if terminate:
+        pool.terminate_workers()
+    else:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_render_pool() -> None:
+    """Stop the PDF rendering worker processes (application shutdown)"""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
@@ -0,0 +1,169 @@
+"""
+Report Cache Service
+Cached report results validated against a data watermark
+
+A report result is stored under (report type, normalized params, scope)
+together with the watermark of the data it was computed from: the count
+and latest updated_at of the transactions in the report's period (and
+scope), plus the active branch list for cross-branch reports. A cached
+result is served while the watermark is unchanged. Any new, edited or
+removed transaction in the period moves the watermark and triggers a
+recompute, whichever worker made the change.
+
+Open periods (ending today or later) are validated on every read.
+Closed periods rarely change, so their results are served without any
+query for up to REPORT_CACHE_CLOSED_RECHECK_SECONDS between validations.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.branch import Branch
+from app.db.models.transaction import Transaction
+
+
+def report_watermark(
+    db: Session,
+    period_start: date,
+    period_end: date,
+    branch_id: Optional[str] = None,
+    include_branches: bool = False
+) -> Tuple:
+    """
+    Watermark of the data behind a report over [period_start, period_end)
+
+    (transaction count, latest transaction updated_at), scoped to the
+    branch when given, plus (active branch count, latest branch updated_at)
+    when the report lists branches.
+    """
+    stmt = select(func.count(Transaction.id), func.max(Transaction.updated_at)).where(
+        Transaction.transaction_date >= datetime.combine(period_start, datetime.min.time()),
+        Transaction.transaction_date < datetime.combine(period_end, datetime.min.time())
+    )
+    if branch_id:
+        stmt = stmt.where(Transaction.branch_id == branch_id)
+    watermark = tuple(db.execute(stmt).one())
+
+    if include_branches:
+        watermark += tuple(db.execute(
+            select(func.count(Branch.id), func.max(Branch.updated_at)).where(Branch.is_active == True)
+        ).one())
+    return watermark
+
+
+class ReportResultCache:
+    """
+    In-memory LRU of report results keyed by (report type, params, scope)
+
+    Bounded by REPORT_CACHE_MAX_ENTRIES; entries also expire after
+    REPORT_CACHE_TTL_SECONDS to refresh data outside the watermark
+    (branch names, exchange rates). A TTL of 0 disables the cache.
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.REPORT_CACHE_TTL_SECONDS,
+        max_entries: int = settings.REPORT_CACHE_MAX_ENTRIES,
+        closed_recheck: int = settings.REPORT_CACHE_CLOSED_RECHECK_SECONDS,
+    ):
+        # key -> (watermark, result, stored_at, validated_at)
+        self._cache: "OrderedDict[Hashable, Tuple[Tuple, Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._closed_recheck = closed_recheck
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(report_type: str, params: Dict[str, Any], scope: Optional[str]) -> Hashable:
+        """Normalized cache key: params sorted, dates as ISO strings"""
+        normalized = tuple(sorted(
+            (name, value.isoformat() if isinstance(value, date) else str(value))
+            for name, value in params.items()
+            if value is not None
+        ))
+        return report_type, normalized, str(scope) if scope else 'all'
+
+    def get_or_compute(
+        self,
+        db: Session,
+        report_type: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        period_start: date,
+        period_end: date,
+        branch_id: Optional[str] = None,
+        include_branches: bool = False,
+        fresh: bool = False
+    ) -> Any:
+        """
+        Cached report result, recomputed when its data watermark moved
+
+        Args:
+            report_type: Report name (part of the key)
+            params: Report parameters other than the branch scope
+            compute: Builds the report when the cache can't serve it
+            period_start, period_end: Report period [start, end)
+            branch_id: Branch scope (None = all branches)
+            include_branches: Whether the report lists branches
+            fresh: Skip the cache and recompute
+        """
+        if self._ttl <= 0:
+            return compute()
+
+        key = self.make_key(report_type, params, branch_id)
+        now = time.monotonic()
+        closed = period_end <= date.today()
+
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None and not fresh:
+            cached_watermark, result, stored_at, validated_at = entry
+            if now - stored_at < self._ttl:
+                if closed and now - validated_at < self._closed_recheck:
+                    return self._hit(key, result)
+                watermark = report_watermark(db, period_start, period_end, branch_id, include_branches)
+                if watermark == cached_watermark:
+                    with self._lock:
+                        if key in self._cache:
+                            self._cache[key] = (cached_watermark, result, stored_at, now)
+                    return self._hit(key, result)
+
+        # Watermark first: a change made while computing forces the next recompute
+        watermark = report_watermark(db, period_start, period_end, branch_id, include_branches)
+        result = compute()
+        self.misses += 1
+        with self._lock:
+            self._cache[key] = (watermark, result, now, now)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def _hit(self, key: Hashable, result: Any) -> Any:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def stats(self) -> Dict:
+        """Return cache counters for health/monitoring endpoints"""
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global report result cache
+report_result_cache = ReportResultCache()
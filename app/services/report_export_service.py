@@ -17,14 +17,7 @@ from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
 # PDF support
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-)
-from reportlab.pdfgen import canvas
+from app.services.pdf_render_service import build_pdf
 
 # Template engine
 from jinja2 import Template
@@ -329,6 +322,10 @@ class ReportExportService:
         تصدير إلى PDF
         Export report to PDF format
         
+        Renders in the calling process with the cached styles and fonts;
+        large exports should use pdf_render_service.render_pdf_file, which
+        renders in a worker process into a temp file.
+        
         Args:
             report_data: Dictionary containing report data
             template: Template type (standard, financial, summary)
@@ -338,129 +335,7 @@ class ReportExportService:
         """
         try:
             pdf_file = BytesIO()
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                pdf_file,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=72
-            )
-            
-            # Container for PDF elements
-            story = []
-            
-            # Get styles
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#1F4E78'),
-                spaceAfter=30,
-                alignment=1  # Center
-            )
-            
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=16,
-                textColor=colors.HexColor('#366092'),
-                spaceAfter=12
-            )
-            
-            # Add title
-            title = report_data.get('title', 'Report')
-            story.append(Paragraph(title, title_style))
-            story.append(Spacer(1, 12))
-            
-            # Add metadata
-            generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            story.append(Paragraph(f"<b>Generated:</b> {generated_at}", styles['Normal']))
-            
-            if 'date_range' in report_data:
-                date_range = report_data['date_range']
-                period = f"{date_range.get('start', '')} to {date_range.get('end', '')}"
-                story.append(Paragraph(f"<b>Period:</b> {period}", styles['Normal']))
-            
-            story.append(Spacer(1, 20))
-            
-            # Add summary section
-            if 'summary' in report_data:
-                story.append(Paragraph("Summary", heading_style))
-                
-                summary = report_data['summary']
-                summary_data = [[key.replace('_', ' ').title(), str(value)] 
-                               for key, value in summary.items()]
-                
-                summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-                summary_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, -1), colors.white),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.lightgrey, colors.white])
-                ]))
-                
-                story.append(summary_table)
-                story.append(Spacer(1, 20))
-            
-            # Add detailed data
-            if 'data' in report_data or 'transactions' in report_data or 'branches' in report_data:
-                data_key = 'data' if 'data' in report_data else ('transactions' if 'transactions' in report_data else 'branches')
-                data = report_data[data_key]
-                
-                if data and isinstance(data, list):
-                    story.append(Paragraph("Detailed Data", heading_style))
-                    
-                    # Prepare table data
-                    headers = list(data[0].keys()) if data else []
-                    table_data = [[h.replace('_', ' ').title() for h in headers]]
-                    
-                    # Limit rows for PDF (prevent huge files)
-                    max_rows = 50
-                    for item in data[:max_rows]:
-                        row = []
-                        for header in headers:
-                            value = item.get(header, '')
-                            if isinstance(value, (int, float)):
-                                row.append(f"{value:,.2f}")
-                            else:
-                                row.append(str(value)[:30])  # Truncate long text
-                        table_data.append(row)
-                    
-                    # Create table
-                    col_widths = [1.5*inch] * len(headers)
-                    detail_table = Table(table_data, colWidths=col_widths)
-                    detail_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('FONTSIZE', (0, 1), (-1, -1), 8),
-                        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                    ]))
-                    
-                    story.append(detail_table)
-                    
-                    if len(data) > max_rows:
-                        story.append(Spacer(1, 12))
-                        story.append(Paragraph(
-                            f"<i>Showing {max_rows} of {len(data)} records</i>",
-                            styles['Normal']
-                        ))
-            
-            # Build PDF
-            doc.build(story)
+            build_pdf(report_data, pdf_file)
             pdf_file.seek(0)
             
             return pdf_file
@@ -0,0 +1,379 @@
+"""
+Report Schedule Service
+Cron-scheduled report generation and delivery
+
+Schedules live in report_schedules. The ReportScheduler polls for due
+schedules, claims them with FOR UPDATE SKIP LOCKED (so several app workers
+never run the same schedule twice) and advances next_run_at before running
+them in a worker pool off the event loop. Heavy month-end reports can then
+run off-peak (e.g. "0 2 1 * *") instead of at trading hours.
+
+A run generates the report through the report result cache (warming it for
+the interactive report endpoints), writes the file under
+REPORT_OUTPUT_DIR/<schedule id>/ (file drop) and, for email delivery, mails
+it through the configured SMTP server (a local relay or SMTP stand-in works).
+"""
+
+import asyncio
+import os
+import shutil
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ResourceNotFoundError, ValidationError
+from app.db.base import AsyncSessionLocal, SessionLocal
+from app.db.models.report_schedule import ReportDeliveryMethod, ReportRunStatus, ReportSchedule
+from app.db.models.user import User
+from app.schemas.report import ReportScheduleCreate, ReportScheduleUpdate
+from app.services.pdf_render_service import render_pdf_file
+from app.services.report_cache_service import report_result_cache
+from app.services.report_export_service import ReportExportService
+from app.services.report_service import ReportService
+from app.utils.cron import CronExpression
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OUTPUT_EXTENSIONS = {'json': 'json', 'excel': 'xlsx', 'pdf': 'pdf'}
+OUTPUT_MIME_TYPES = {
+    'json': ('application', 'json'),
+    'excel': ('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'pdf': ('application', 'pdf'),
+}
+
+
+# ==================== Report Runs ====================
+
+class ReportRun(NamedTuple):
+    """How one scheduled run calls ReportService and keys the report cache"""
+    method: str
+    kwargs: Dict[str, Any]
+    cache_params: Dict[str, Any]
+    period_start: date
+    period_end: date
+    branch_id: Optional[UUID]
+    include_branches: bool
+
+
+def _as_date(value: Any) -> Optional[date]:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def resolve_report_run(
+    report_type: str,
+    params: Dict[str, Any],
+    branch_id: Optional[UUID],
+    run_at: datetime
+) -> ReportRun:
+    """
+    Report call of a scheduled run
+
+    Parameters not fixed by the schedule default to the period before the
+    run: the previous day for daily summaries, the previous month for
+    monthly revenue and branch performance.
+    """
+    today = run_at.date()
+    last_month_end = today.replace(day=1) - timedelta(days=1)
+
+    if report_type == 'daily_summary':
+        target_date = _as_date(params.get('target_date')) or today - timedelta(days=1)
+        return ReportRun(
+            'daily_transaction_summary',
+            {'branch_id': branch_id, 'target_date': target_date},
+            {'target_date': target_date},
+            target_date, target_date + timedelta(days=1), branch_id, False
+        )
+
+    if report_type == 'monthly_revenue':
+        year = int(params.get('year') or last_month_end.year)
+        month = int(params.get('month') or last_month_end.month)
+        month_start = date(year, month, 1)
+        return ReportRun(
+            'monthly_revenue_report',
+            {'branch_id': branch_id, 'year': year, 'month': month},
+            {'year': year, 'month': month},
+            month_start, (month_start + timedelta(days=32)).replace(day=1), branch_id, False
+        )
+
+    if report_type == 'branch_performance':
+        start_date = _as_date(params.get('start_date')) or last_month_end.replace(day=1)
+        end_date = _as_date(params.get('end_date')) or last_month_end
+        return ReportRun(
+            'branch_performance_comparison',
+            {'start_date': start_date, 'end_date': end_date},
+            {'start_date': start_date, 'end_date': end_date},
+            start_date, end_date + timedelta(days=1), None, True
+        )
+
+    raise ValueError(f"Unsupported scheduled report type: {report_type}")
+
+
+def generate_report_file(db, schedule: ReportSchedule, run_at: datetime) -> str:
+    """Generate a schedule's report into its output directory; returns the path"""
+    run = resolve_report_run(schedule.report_type, schedule.params or {}, schedule.branch_id, run_at)
+    report_service = ReportService(db)
+    report_data = report_result_cache.get_or_compute(
+        db, schedule.report_type, run.cache_params,
+        lambda: getattr(report_service, run.method)(**run.kwargs),
+        period_start=run.period_start,
+        period_end=run.period_end,
+        branch_id=run.branch_id,
+        include_branches=run.include_branches
+    )
+    # Copy: the cached result is shared with the report endpoints
+    report_data = {**report_data, 'title': schedule.name}
+
+    directory = os.path.join(settings.REPORT_OUTPUT_DIR, str(schedule.id))
+    os.makedirs(directory, exist_ok=True)
+    extension = OUTPUT_EXTENSIONS[schedule.output_format]
+    path = os.path.join(directory, f"{schedule.report_type}_{run_at.strftime('%Y%m%d_%H%M')}.{extension}")
+
+    export_service = ReportExportService()
+    if schedule.output_format == 'pdf':
+        shutil.move(render_pdf_file(report_data), path)
+    elif schedule.output_format == 'excel':
+        with open(path, 'wb') as f:
+            f.write(export_service.export_to_excel(report_data).getvalue())
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(export_service.export_to_json(report_data))
+    return path
+
+
+def deliver_by_email(schedule: ReportSchedule, path: str) -> None:
+    """Mail a generated report to the schedule's recipients"""
+    if not settings.EMAILS_ENABLED or not settings.SMTP_HOST:
+        raise RuntimeError("Email delivery is not configured (EMAILS_ENABLED, SMTP_HOST)")
+
+    message = EmailMessage()
+    message['Subject'] = f"{schedule.name} ({date.today().isoformat()})"
+    message['From'] = settings.EMAILS_FROM_EMAIL or settings.SMTP_USER or 'noreply@localhost'
+    message['To'] = ', '.join(schedule.recipients)
+    message.set_content(f"Scheduled report '{schedule.name}' is attached.")
+    maintype, subtype = OUTPUT_MIME_TYPES[schedule.output_format]
+    with open(path, 'rb') as f:
+        message.add_attachment(f.read(), maintype=maintype, subtype=subtype, filename=os.path.basename(path))
+
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT or 25, timeout=30) as smtp:
+        if settings.SMTP_USER:
+            smtp.starttls()
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD or '')
+        smtp.send_message(message)
+
+
+def run_report_schedule(
+    schedule_id: UUID,
+    run_at: datetime,
+    session_factory: Callable = SessionLocal
+) -> Optional[str]:
+    """
+    Run one schedule (worker thread): generate, store, deliver, record
+
+    Returns:
+        The run status, or None if the schedule no longer exists
+    """
+    db = session_factory()
+    try:
+        schedule = db.get(ReportSchedule, schedule_id)
+        if schedule is None:
+            return None
+
+        path = None
+        try:
+            path = generate_report_file(db, schedule, run_at)
+            if schedule.delivery_method == ReportDeliveryMethod.EMAIL.value:
+                deliver_by_email(schedule, path)
+            status, error = ReportRunStatus.SUCCESS.value, None
+        except Exception as e:
+            db.rollback()
+            status, error = ReportRunStatus.FAILED.value, str(e)
+            logger.error(f"Scheduled report '{schedule.name}' failed: {error}")
+
+        schedule.last_run_at = run_at
+        schedule.last_status = status
+        schedule.last_error = error
+        if path:
+            schedule.last_output_path = path
+        db.commit()
+        return status
+    finally:
+        db.close()
+
+
+# ==================== Service ====================
+
+class ReportScheduleService:
+    """Report schedule definitions"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_schedule(self, data: ReportScheduleCreate, user: User) -> ReportSchedule:
+        """Create a schedule; its first run is the next cron time"""
+        values = data.model_dump(mode='json')
+        values['branch_id'] = data.branch_id
+        schedule = ReportSchedule(
+            **values,
+            next_run_at=CronExpression(data.cron_expression).next_after(datetime.utcnow()),
+            created_by=user.id
+        )
+        self.db.add(schedule)
+        await self.db.commit()
+        await self.db.refresh(schedule)
+        return schedule
+
+    async def list_schedules(self, branch_id: Optional[UUID] = None) -> List[ReportSchedule]:
+        """Schedules, optionally of one branch"""
+        stmt = select(ReportSchedule).order_by(ReportSchedule.name)
+        if branch_id is not None:
+            stmt = stmt.where(ReportSchedule.branch_id == branch_id)
+        return list((await self.db.execute(stmt)).scalars().all())
+
+    async def get_schedule(self, schedule_id: UUID) -> ReportSchedule:
+        """Schedule by ID"""
+        schedule = await self.db.get(ReportSchedule, schedule_id)
+        if schedule is None:
+            raise ResourceNotFoundError("Report schedule", schedule_id)
+        return schedule
+
+    async def update_schedule(self, schedule_id: UUID, data: ReportScheduleUpdate) -> ReportSchedule:
+        """Update a schedule; a new cron expression reschedules the next run"""
+        schedule = await self.get_schedule(schedule_id)
+        changes = data.model_dump(mode='json', exclude_unset=True)
+        for field, value in changes.items():
+            setattr(schedule, field, value)
+        if schedule.delivery_method == ReportDeliveryMethod.EMAIL.value and not schedule.recipients:
+            raise ValidationError("Email delivery requires at least one recipient")
+        if 'cron_expression' in changes or changes.get('is_active'):
+            schedule.next_run_at = CronExpression(schedule.cron_expression).next_after(datetime.utcnow())
+        await self.db.commit()
+        await self.db.refresh(schedule)
+        return schedule
+
+    async def delete_schedule(self, schedule_id: UUID) -> None:
+        """Delete a schedule (its generated files are kept)"""
+        schedule = await self.get_schedule(schedule_id)
+        await self.db.delete(schedule)
+        await self.db.commit()
+
+    async def run_now(self, schedule_id: UUID) -> ReportSchedule:
+        """Make a schedule due, so the scheduler runs it on its next poll"""
+        schedule = await self.get_schedule(schedule_id)
+        schedule.next_run_at = datetime.utcnow()
+        await self.db.commit()
+        await self.db.refresh(schedule)
+        return schedule
+
+
+# ==================== Scheduler ====================
+
+class ReportScheduler:
+    """
+    Background task running due report schedules in a worker pool
+
+    Started and stopped from the application lifespan. Every poll it claims
+    due schedules, moves their next_run_at to the following cron time and
+    hands them to the pool; the poll loop never waits for reports.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        poll_seconds: int = settings.REPORT_SCHEDULER_POLL_SECONDS,
+        workers: int = settings.REPORT_SCHEDULER_WORKERS,
+        batch_size: int = 20,
+    ):
+        self._session_factory = session_factory
+        self._poll_seconds = poll_seconds
+        self._workers = workers
+        self._batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._running: set = set()
+        self._runs_started = 0
+
+    async def start(self) -> None:
+        """Start the background scheduler task"""
+        if self._task is not None:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="report-scheduler")
+        self._task = asyncio.create_task(self._run(), name="report-scheduler")
+        logger.info("Report scheduler started")
+
+    async def stop(self) -> None:
+        """Stop the scheduler; runs in progress finish, queued runs are dropped"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        logger.info("Report scheduler stopped")
+
+    async def claim_due(self, now: Optional[datetime] = None) -> List[UUID]:
+        """Claim due schedules and advance them to their next cron time"""
+        now = now or datetime.utcnow()
+        async with self._session_factory() as session:
+            schedules = (await session.execute(
+                select(ReportSchedule)
+                .where(ReportSchedule.is_active == True, ReportSchedule.next_run_at <= now)
+                .order_by(ReportSchedule.next_run_at)
+                .limit(self._batch_size)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+
+            claimed = []
+            for schedule in schedules:
+                try:
+                    schedule.next_run_at = CronExpression(schedule.cron_expression).next_after(now)
+                    claimed.append(schedule.id)
+                except ValueError as e:
+                    schedule.is_active = False
+                    schedule.last_status = ReportRunStatus.FAILED.value
+                    schedule.last_error = str(e)
+            await session.commit()
+        return claimed
+
+    async def run_once(self) -> int:
+        """Hand due schedules to the worker pool; returns how many were started"""
+        now = datetime.utcnow()
+        claimed = await self.claim_due(now)
+        loop = asyncio.get_running_loop()
+        for schedule_id in claimed:
+            future = loop.run_in_executor(self._pool, run_report_schedule, schedule_id, now)
+            self._running.add(future)
+            future.add_done_callback(self._running.discard)
+        self._runs_started += len(claimed)
+        return len(claimed)
+
+    def stats(self) -> Dict:
+        """Return scheduler counters for health/monitoring endpoints"""
+        return {
+            "running": self._task is not None,
+            "runs_started": self._runs_started,
+            "runs_in_progress": len(self._running),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Report scheduler poll failed: {str(e)}")
+            await asyncio.sleep(self._poll_seconds)
+
+
+# Global report scheduler
+report_scheduler = ReportScheduler()
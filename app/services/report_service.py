@@ -4,11 +4,14 @@ CEMS Report Service - خدمة التقارير الشاملة
 Phase 8.1: Report Service with all calculations
 """
 
-from datetime import date, datetime, timedelta
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple, Any
-from sqlalchemy import func, and_, or_, case
-from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+from sqlalchemy import func, and_, or_, case, literal, select, union_all
+from sqlalchemy.orm import Session, joinedload
 
 from app.db.models.transaction import Transaction, TransactionType, TransactionStatus
 from app.db.models.branch import Branch, BranchBalance
@@ -17,7 +20,9 @@ from app.db.models.currency import Currency, ExchangeRate
 from app.db.models.customer import Customer
 from app.db.models.user import User
 from app.db.models.audit import AuditLog
-from app.core.exceptions import ReportGenerationError
+from app.core.exceptions import ReportGenerationError, ResourceNotFoundError
+from app.services.balance_snapshot_service import branch_balances_at, utc_today, vault_balances_on
+from app.services.exchange_analytics_service import ExchangeAnalyticsService
 
 
 class ReportService:
@@ -252,80 +257,15 @@ class ReportService:
         """
         اتجاهات صرف العملات
         Currency exchange trends analysis
+
+        Daily volume, average rate and VWAP plus rate percentiles,
+        computed on the pair's columns (see ExchangeAnalyticsService)
         """
         try:
             from_currency_code, to_currency_code = currency_pair
-            
-            # Get exchange transactions
-            from app.db.models.transaction import ExchangeTransaction
-
-            transactions = self.db.query(ExchangeTransaction).join(
-                Currency, ExchangeTransaction.from_currency_id == Currency.id
-            ).filter(
-                ExchangeTransaction.transaction_date >= start_date,
-                ExchangeTransaction.transaction_date <= end_date,
-                ExchangeTransaction.status == TransactionStatus.COMPLETED,
-                Currency.code == from_currency_code
-            ).all()
-            
-            # Filter for target currency
-            relevant_txns = [
-                txn for txn in transactions 
-                if txn.target_currency and txn.target_currency.code == to_currency_code
-            ]
-            
-            if not relevant_txns:
-                return {
-                    'currency_pair': f"{from_currency_code}/{to_currency_code}",
-                    'message': 'No data available for this period'
-                }
-            
-            # Daily analysis
-            daily_data = {}
-            for txn in relevant_txns:
-                day = txn.transaction_date
-                if day not in daily_data:
-                    daily_data[day] = {
-                        'count': 0,
-                        'total_source': Decimal('0'),
-                        'total_target': Decimal('0'),
-                        'rates': []
-                    }
-                
-                daily_data[day]['count'] += 1
-                daily_data[day]['total_source'] += txn.source_amount or Decimal('0')
-                daily_data[day]['total_target'] += txn.target_amount or Decimal('0')
-                if txn.exchange_rate:
-                    daily_data[day]['rates'].append(txn.exchange_rate)
-            
-            # Calculate daily averages
-            trend_data = []
-            for day, data in sorted(daily_data.items()):
-                avg_rate = sum(data['rates']) / len(data['rates']) if data['rates'] else Decimal('0')
-                trend_data.append({
-                    'date': day.isoformat(),
-                    'transaction_count': data['count'],
-                    'total_volume': float(data['total_source']),
-                    'average_rate': float(avg_rate)
-                })
-            
-            # Overall statistics
-            all_rates = [r for data in daily_data.values() for r in data['rates']]
-            total_volume = sum(data['total_source'] for data in daily_data.values())
-            
-            return {
-                'currency_pair': f"{from_currency_code}/{to_currency_code}",
-                'date_range': {
-                    'start': start_date.isoformat(),
-                    'end': end_date.isoformat()
-                },
-                'total_transactions': len(relevant_txns),
-                'total_volume': float(total_volume),
-                'average_rate': float(sum(all_rates) / len(all_rates)) if all_rates else 0,
-                'min_rate': float(min(all_rates)) if all_rates else 0,
-                'max_rate': float(max(all_rates)) if all_rates else 0,
-                'daily_trends': trend_data
-            }
+            return ExchangeAnalyticsService(self.db).exchange_trends(
+                from_currency_code, to_currency_code, start_date, end_date
+            )
             
         except Exception as e:
             raise ReportGenerationError(f"Failed to generate exchange trends: {str(e)}")
@@ -417,18 +357,50 @@ class ReportService:
         branch_id: str,
         snapshot_date: Optional[date] = None,
         target_date: Optional[date] = None,
+        at: Optional[datetime] = None,
     ) -> Dict[str, Any]:
         """
         لقطة رصيد الفرع
         Branch balance snapshot at a specific date
+
+        Past dates report the closing balances of that day and `at` any
+        point in time, from the daily snapshots plus the balance history
+        since; today reports the current balances.
         """
         try:
             # Support both "snapshot_date" (current API) and legacy "target_date"
-            snapshot_date = snapshot_date or target_date or date.today()
+            # Snapshots are dated in UTC
+            snapshot_date = snapshot_date or target_date or utc_today()
             
             branch = self.db.query(Branch).filter(Branch.id == branch_id).first()
             if not branch:
                 raise ReportGenerationError("Branch not found")
+
+            if at is not None or snapshot_date < utc_today():
+                point = at or datetime.combine(snapshot_date + timedelta(days=1), time.min)
+                rows = self.db.execute(branch_balances_at(point, branch.id)).all()
+                currencies = self._currencies_by_id(row.currency_id for row in rows)
+
+                balance_data = [
+                    {
+                        'currency_code': currencies[row.currency_id].code if row.currency_id in currencies else 'UNK',
+                        'currency_name': currencies[row.currency_id].name if row.currency_id in currencies else 'Unknown',
+                        'balance': float(row.balance),
+                        'last_updated': None
+                    }
+                    for row in rows
+                ]
+                return {
+                    'branch': {
+                        'id': str(branch.id),
+                        'code': branch.code,
+                        'name': branch.name
+                    },
+                    'snapshot_date': point.date().isoformat() if at else snapshot_date.isoformat(),
+                    'as_of': point.isoformat(),
+                    'balances': balance_data,
+                    'currency_count': len(balance_data)
+                }
             
             balances = self.db.query(BranchBalance).filter(
                 BranchBalance.branch_id == branch_id
@@ -470,10 +442,16 @@ class ReportService:
         """
         ملخص رصيد الخزينة
         Main vault balance summary
+
+        Past dates (UTC) report the nearest daily snapshot on or before the
+        date.
+
+        Raises:
+            ResourceNotFoundError: No snapshot exists on or before a past date
         """
         try:
             if snapshot_date is None:
-                snapshot_date = date.today()
+                snapshot_date = utc_today()
             
             # Get main vault
             main_vault = self.db.query(Vault).filter(
@@ -483,6 +461,31 @@ class ReportService:
             
             if not main_vault:
                 raise ReportGenerationError("Main vault not found")
+
+            if snapshot_date < utc_today():
+                # Closing balances from the nearest daily snapshot
+                rows = self.db.execute(vault_balances_on(snapshot_date, main_vault.id)).all()
+                if not rows:
+                    raise ResourceNotFoundError("Vault balance snapshot", snapshot_date.isoformat())
+                currencies = self._currencies_by_id(row.currency_id for row in rows)
+                balance_data = [
+                    {
+                        'currency_code': currencies[row.currency_id].code if row.currency_id in currencies else 'UNK',
+                        'currency_name': currencies[row.currency_id].name if row.currency_id in currencies else 'Unknown',
+                        'balance': float(row.balance),
+                        'last_updated': row.snapshot_date.isoformat()
+                    }
+                    for row in rows
+                ]
+                return {
+                    'vault': {
+                        'id': str(main_vault.id),
+                        'type': main_vault.vault_type
+                    },
+                    'snapshot_date': snapshot_date.isoformat(),
+                    'balances': balance_data,
+                    'currency_count': len(balance_data)
+                }
             
             balances = self.db.query(VaultBalance).filter(
                 VaultBalance.vault_id == main_vault.id
@@ -507,9 +510,21 @@ class ReportService:
                 'currency_count': len(balance_data)
             }
             
+        except ResourceNotFoundError:
+            raise
         except Exception as e:
             raise ReportGenerationError(f"Failed to generate vault summary: {str(e)}")
     
+    def _currencies_by_id(self, currency_ids) -> Dict[Any, Currency]:
+        """Currencies of the given IDs, by ID"""
+        currency_ids = set(currency_ids)
+        if not currency_ids:
+            return {}
+        return {
+            currency.id: currency
+            for currency in self.db.query(Currency).filter(Currency.id.in_(currency_ids)).all()
+        }
+    
     def low_balance_alert_report(
         self,
         threshold_percentage: float = 20.0
@@ -678,6 +693,185 @@ class ReportService:
             
         except Exception as e:
             raise ReportGenerationError(f"Failed to generate balance movement: {str(e)}")
+
+    MOVEMENT_STREAM_BATCH = 1000
+    MOVEMENT_CSV_COLUMNS = [
+        'date', 'transaction_number', 'type', 'amount', 'description', 'debit', 'credit', 'balance'
+    ]
+
+    def stream_balance_movement(
+        self,
+        branch_id: Optional[str],
+        currency_code: str,
+        start_date: date,
+        end_date: date,
+        output_format: str = 'ndjson'
+    ) -> Iterator[str]:
+        """
+        تقرير حركة الرصيد (تدفق)
+        Balance movement report streamed as NDJSON or CSV
+
+        Same movements as balance_movement_report, but transactions and
+        main-vault transfers are merged in one ordered query read through a
+        server-side cursor, and the running balance is computed row by row
+        from the opening balance of the nearest daily snapshot. Memory stays
+        flat regardless of the date range.
+
+        The currency, opening balance and query are resolved before the
+        first chunk, so errors surface before the response starts.
+
+        NDJSON: an "opening" line, one "movement" line per row, a "closing"
+        line. CSV: a header row, an opening_balance row, the movements and a
+        closing_balance row.
+        """
+        if output_format not in ('ndjson', 'csv'):
+            raise ReportGenerationError(f"Unsupported stream format: {output_format}")
+
+        currency = self.db.query(Currency).filter(Currency.code == currency_code).first()
+        if not currency:
+            raise ReportGenerationError(f"Currency {currency_code} not found")
+
+        start_at = datetime.combine(start_date, time.min)
+        end_before = datetime.combine(end_date + timedelta(days=1), time.min)
+
+        main_vault = None
+        if branch_id is None:
+            main_vault = self.db.query(Vault).filter(
+                Vault.vault_type == 'main',
+                Vault.is_active == True
+            ).first()
+
+        opening = sum(
+            (row.balance for row in self.db.execute(
+                branch_balances_at(start_at, branch_id, currency.id)
+            ).all()),
+            Decimal('0')
+        )
+        if main_vault:
+            opening += sum(
+                (row.balance for row in self.db.execute(
+                    vault_balances_on(start_date - timedelta(days=1), main_vault.id, currency.id)
+                ).all()),
+                Decimal('0')
+            )
+
+        statement = self._movement_statement(
+            branch_id, currency.id, start_at, end_before, main_vault
+        ).execution_options(yield_per=self.MOVEMENT_STREAM_BATCH)
+        result = self.db.execute(statement)
+
+        header = {
+            'branch_id': branch_id or 'all',
+            'currency': currency_code,
+            'date_range': {'start': start_date.isoformat(), 'end': end_date.isoformat()},
+        }
+        return self._encode_movements(result, header, opening, output_format)
+
+    def _movement_statement(self, branch_id, currency_id, start_at, end_before, main_vault):
+        """Completed transactions (and main-vault transfers) of a currency, in date order"""
+        outflow_types = [TransactionType.EXPENSE, TransactionType.EXCHANGE]
+        transactions = select(
+            Transaction.transaction_date.label('occurred_at'),
+            Transaction.transaction_number.label('reference'),
+            case(
+                {t: t.value for t in TransactionType}, value=Transaction.transaction_type
+            ).label('type'),
+            func.coalesce(Transaction.notes, '').label('description'),
+            case(
+                (Transaction.transaction_type.in_(outflow_types), -Transaction.amount),
+                else_=Transaction.amount
+            ).label('change')
+        ).where(
+            Transaction.currency_id == currency_id,
+            Transaction.status == TransactionStatus.COMPLETED,
+            Transaction.transaction_date >= start_at,
+            Transaction.transaction_date < end_before
+        )
+        if branch_id:
+            transactions = transactions.where(Transaction.branch_id == branch_id)
+
+        sources = [transactions]
+        if main_vault:
+            outflow = VaultTransfer.from_vault_id == main_vault.id
+            sources.append(select(
+                func.coalesce(VaultTransfer.completed_at, VaultTransfer.initiated_at),
+                VaultTransfer.transfer_number,
+                case((outflow, literal('vault_outflow')), else_=literal('vault_inflow')),
+                func.coalesce(VaultTransfer.notes, ''),
+                case((outflow, -VaultTransfer.amount), else_=VaultTransfer.amount)
+            ).where(
+                VaultTransfer.currency_id == currency_id,
+                VaultTransfer.status == VaultTransferStatus.COMPLETED,
+                VaultTransfer.initiated_at >= start_at,
+                VaultTransfer.initiated_at < end_before,
+                or_(outflow, VaultTransfer.to_vault_id == main_vault.id)
+            ))
+
+        movements = (union_all(*sources) if len(sources) > 1 else transactions).subquery()
+        return select(movements).order_by(movements.c.occurred_at, movements.c.reference)
+
+    def _encode_movements(self, result, header, opening, output_format) -> Iterator[str]:
+        """Encode movement rows into NDJSON/CSV chunks of up to one batch each"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def ndjson(line: Dict[str, Any]) -> str:
+            return json.dumps(line, ensure_ascii=False) + '\n'
+
+        def drain() -> str:
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        running_balance = opening
+        count = 0
+        try:
+            if output_format == 'csv':
+                writer.writerow(self.MOVEMENT_CSV_COLUMNS)
+                writer.writerow(['', '', 'opening_balance', '', '', '', '', opening])
+                yield drain()
+            else:
+                yield ndjson({'record': 'opening', **header, 'opening_balance': float(opening)})
+
+            for rows in result.partitions():
+                lines = []
+                for row in rows:
+                    running_balance += row.change
+                    count += 1
+                    amount = abs(row.change)
+                    debit = amount if row.change < 0 else Decimal('0')
+                    credit = amount if row.change > 0 else Decimal('0')
+                    if output_format == 'csv':
+                        writer.writerow([
+                            row.occurred_at.isoformat(), row.reference, row.type, amount,
+                            row.description, debit, credit, running_balance
+                        ])
+                    else:
+                        lines.append(ndjson({
+                            'record': 'movement',
+                            'date': row.occurred_at.isoformat(),
+                            'transaction_number': row.reference,
+                            'type': row.type,
+                            'amount': float(amount),
+                            'description': row.description,
+                            'debit': float(debit),
+                            'credit': float(credit),
+                            'balance': float(running_balance),
+                        }))
+                yield drain() if output_format == 'csv' else ''.join(lines)
+
+            if output_format == 'csv':
+                writer.writerow(['', '', 'closing_balance', '', '', '', '', running_balance])
+                yield drain()
+            else:
+                yield ndjson({
+                    'record': 'closing',
+                    'movement_count': count,
+                    'closing_balance': float(running_balance),
+                })
+        finally:
+            result.close()
     
     # ==================== USER ACTIVITY REPORTS ====================
     
@@ -824,7 +1018,9 @@ class ReportService:
         Complete audit trail for an entity
         """
         try:
-            query = self.db.query(AuditLog).filter(
+            query = self.db.query(AuditLog).options(
+                joinedload(AuditLog.user).noload(User.roles)
+            ).filter(
                 AuditLog.entity_type == entity_type,
                 AuditLog.entity_id == entity_id
             )
@@ -984,45 +1180,15 @@ class ReportService:
     ) -> Dict[str, Any]:
         """
         اتجاهات حجم المعاملات
-        Transaction volume trends over time
+        Transaction volume trends over time, with period-over-period growth
+        and a three-period moving average
         """
         try:
             # Last 30 days for daily, 12 weeks for weekly, 12 months for monthly
-            if period == 'daily':
-                days = 30
-                date_trunc = func.date(Transaction.transaction_date)
-            elif period == 'weekly':
-                days = 90
-                date_trunc = func.date_trunc('week', Transaction.transaction_date)
-            else:  # monthly
-                days = 365
-                date_trunc = func.date_trunc('month', Transaction.transaction_date)
-            
+            days = {'daily': 30, 'weekly': 90}.get(period, 365)
             cutoff_date = date.today() - timedelta(days=days)
             
-            query = self.db.query(
-                date_trunc.label('period'),
-                func.count(Transaction.id).label('count'),
-                func.sum(Transaction.source_amount).label('volume')
-            ).filter(
-                Transaction.transaction_date >= cutoff_date,
-                Transaction.status == TransactionStatus.COMPLETED
-            )
-            
-            if branch_id:
-                query = query.filter(Transaction.branch_id == branch_id)
-            
-            query = query.group_by('period').order_by('period')
-            
-            results = query.all()
-            
-            trends = []
-            for period_date, count, volume in results:
-                trends.append({
-                    'period': period_date.isoformat() if isinstance(period_date, date) else str(period_date),
-                    'transaction_count': count,
-                    'total_volume': float(volume or Decimal('0'))
-                })
+            trends = ExchangeAnalyticsService(self.db).volume_trends(cutoff_date, period, branch_id)
             
             return {
                 'branch_id': branch_id,
@@ -1041,71 +1207,45 @@ class ReportService:
     ) -> Dict[str, Any]:
         """
         تحليل تقلبات سعر الصرف
-        Analyze exchange rate volatility for a currency pair
+        Analyze exchange rate volatility for a currency pair: rate
+        statistics and percentiles, per-change returns and rolling volatility
         """
         try:
             from_currency, to_currency = currency_pair
-            cutoff_date = date.today() - timedelta(days=period_days)
-            
-            # Get exchange rates history
-            from app.db.models.currency import ExchangeRate as ER
-            rates = self.db.query(ER).join(
-                Currency, ER.from_currency_id == Currency.id
-            ).filter(
-                ER.effective_from >= cutoff_date,
-                Currency.code == from_currency
-            ).order_by(ER.effective_from).all()
-            
-            # Filter for target currency
-            relevant_rates = [
-                rate for rate in rates
-                if rate.to_currency and rate.to_currency.code == to_currency
-            ]
+            cutoff = datetime.combine(date.today() - timedelta(days=period_days), time.min)
             
-            if not relevant_rates:
-                return {
-                    'currency_pair': f"{from_currency}/{to_currency}",
-                    'message': 'No rate data available'
-                }
+            analysis = ExchangeAnalyticsService(self.db).rate_volatility(from_currency, to_currency, cutoff)
+            return {'period_days': period_days, **analysis}
             
-            # Calculate volatility metrics
-            rate_values = [rate.rate for rate in relevant_rates]
-            
-            avg_rate = sum(rate_values) / len(rate_values)
-            max_rate = max(rate_values)
-            min_rate = min(rate_values)
-            
-            # Standard deviation (simplified)
-            variance = sum((r - avg_rate) ** 2 for r in rate_values) / len(rate_values)
-            std_dev = variance ** Decimal('0.5')
-            
-            # Daily changes
-            daily_changes = []
-            for i in range(1, len(relevant_rates)):
-                prev_rate = relevant_rates[i-1].rate
-                curr_rate = relevant_rates[i].rate
-                change = ((curr_rate - prev_rate) / prev_rate) * 100
-                daily_changes.append({
-                    'date': relevant_rates[i].effective_from.isoformat(),
-                    'rate': float(curr_rate),
-                    'change_percent': float(change)
-                })
+        except Exception as e:
+            raise ReportGenerationError(f"Failed to analyze rate volatility: {str(e)}")
+    
+    def currency_pair_volatility_summary(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> Dict[str, Any]:
+        """
+        ملخص تقلبات جميع أزواج العملات
+        Rate volatility of every currency pair, most volatile first
+        """
+        try:
+            pairs = ExchangeAnalyticsService(self.db).all_pairs_volatility(
+                datetime.combine(start_date, time.min),
+                datetime.combine(end_date + timedelta(days=1), time.min)
+            )
             
             return {
-                'currency_pair': f"{from_currency}/{to_currency}",
-                'period_days': period_days,
-                'statistics': {
-                    'average_rate': float(avg_rate),
-                    'max_rate': float(max_rate),
-                    'min_rate': float(min_rate),
-                    'standard_deviation': float(std_dev),
-                    'volatility_percent': float((std_dev / avg_rate) * 100) if avg_rate else 0
+                'date_range': {
+                    'start': start_date.isoformat(),
+                    'end': end_date.isoformat()
                 },
-                'daily_changes': daily_changes
+                'pair_count': len(pairs),
+                'pairs': pairs
             }
             
         except Exception as e:
-            raise ReportGenerationError(f"Failed to analyze rate volatility: {str(e)}")
+            raise ReportGenerationError(f"Failed to summarize rate volatility: {str(e)}")
 
 
 # ==================== HELPER FUNCTIONS ====================
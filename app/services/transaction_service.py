@@ -11,13 +11,14 @@ Handles all transaction operations with ACID guarantees:
 CRITICAL: All operations are atomic with proper rollback on failures
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 from copy import copy
-from typing import Optional, Dict, Any, List
-from uuid import UUID
+from enum import Enum
+from typing import Optional, Dict, Any, Iterable, List, Set, Union
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, insert, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import selectinload, selectin_polymorphic
@@ -32,7 +33,14 @@ from app.db.models.transaction import (
 from app.db.models.branch import BranchBalance, BalanceChangeType
 from app.db.models.currency import Currency, ExchangeRate
 from app.services.balance_service import BalanceService
+from app.services.balance_reservation_service import BalanceReservationService
 from app.services.currency_service import CurrencyService
+from app.services.exchange_quote_service import ExchangeQuote, ExchangeQuoteService
+from app.services.outbox_service import (
+    OutboxService, TRANSACTION_CREATED, TRANSACTION_STATUS_CHANGED
+)
+from app.services.transaction_validation_service import TransactionValidationService
+from app.core.config import settings
 from app.core.exceptions import (
     ValidationError, InsufficientBalanceError,
     BusinessRuleViolationError, DatabaseOperationError
@@ -62,7 +70,10 @@ class TransactionService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.balance_service = BalanceService(db)
+        self.reservation_service = BalanceReservationService(db)
         self.currency_service = CurrencyService(db)
+        self.validation_service = TransactionValidationService(db)
+        self.quote_service = ExchangeQuoteService()
         self.transaction_generator = TransactionNumberGenerator()
 
     # ==================== INTERNAL HELPERS ====================
@@ -92,13 +103,50 @@ class TransactionService:
         )
         result = await self.db.execute(stmt)
         return result.scalar_one()
+
+    async def _record_limit_usage(self, *transactions: Transaction) -> None:
+        """Add completed transactions to the daily limit counters (before commit)"""
+        await self.validation_service.record_completed_transactions(
+            {
+                'branch_id': transaction.branch_id,
+                'customer_id': transaction.customer_id,
+                'transaction_type': transaction.transaction_type,
+                'amount': transaction.amount,
+                'transaction_date': transaction.transaction_date,
+            }
+            for transaction in transactions
+        )
+
+    # Transaction fields carried by transaction outbox events
+    EVENT_FIELDS = (
+        'id', 'transaction_number', 'transaction_type', 'status', 'branch_id',
+        'currency_id', 'amount', 'customer_id', 'transaction_date',
+    )
+
+    async def _publish_transactions(
+        self,
+        event_type: str,
+        transactions: Iterable[Union[Transaction, Dict[str, Any]]]
+    ) -> None:
+        """Record outbox events for transactions or transaction rows (before commit)"""
+        events = []
+        for transaction in transactions:
+            if isinstance(transaction, dict):
+                values = {field: transaction.get(field) for field in self.EVENT_FIELDS}
+            else:
+                values = {field: getattr(transaction, field) for field in self.EVENT_FIELDS}
+            events.append((values['id'], {
+                field: _event_value(value) for field, value in values.items()
+            }))
+        await OutboxService(self.db).add_many(event_type, events)
     
     # ==================== INCOME TRANSACTIONS ====================
     @retry_on_deadlock(max_attempts=3)
     async def create_income_transaction(
         self,
         transaction: 'IncomeTransactionCreate',
-        user_id: UUID
+        user_id: UUID,
+        idempotency_key: Optional[str] = None
     ) -> IncomeTransaction:
         """
         Create income transaction from schema
@@ -106,6 +154,7 @@ class TransactionService:
         Args:
             transaction: IncomeTransactionCreate schema
             user_id: User creating the transaction
+            idempotency_key: Optional client request key
 
         Returns:
             Created IncomeTransaction
@@ -119,7 +168,8 @@ class TransactionService:
             customer_id=transaction.customer_id,
             reference_number=transaction.reference_number,
             description=transaction.description,
-            notes=transaction.notes
+            notes=transaction.notes,
+            idempotency_key=idempotency_key
         )
 
     async def create_income(
@@ -132,7 +182,8 @@ class TransactionService:
         customer_id: Optional[UUID] = None,
         reference_number: Optional[str] = None,
         description: Optional[str] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> IncomeTransaction:
         """
         Create income transaction (atomic operation)
@@ -156,6 +207,8 @@ class TransactionService:
             reference_number: Optional external reference
             description: Optional transaction description
             notes: Optional transaction notes
+            idempotency_key: Optional client request key; a repeated key
+                returns the original transaction
             
         Returns:
             Created IncomeTransaction
@@ -165,6 +218,14 @@ class TransactionService:
             DatabaseOperationError: Transaction failed
         """
         try:
+            # Return the original transaction for a retried request
+            if idempotency_key:
+                existing = await self._get_idempotent_replay(
+                    user_id, idempotency_key, IncomeTransaction
+                )
+                if existing:
+                    return existing
+
             # Step 1: Validate inputs
             validate_positive_amount(amount)
             await self._validate_branch_exists(branch_id)
@@ -202,6 +263,7 @@ class TransactionService:
                     description=description_value,
                     notes=notes,
                     income_category=category,
+                    idempotency_key=idempotency_key,
                     transaction_date=datetime.utcnow()
                 )
                 
@@ -222,6 +284,8 @@ class TransactionService:
                 # Mark transaction as completed
                 income.status = TransactionStatus.COMPLETED
                 income.completed_at = datetime.utcnow()
+                await self._record_limit_usage(income)
+                await self._publish_transactions(TRANSACTION_CREATED, [income])
 
                 # Commit everything
                 await self.db.commit()
@@ -421,7 +485,8 @@ class TransactionService:
     async def create_expense_transaction(
         self,
         transaction: 'ExpenseTransactionCreate',
-        user_id: UUID
+        user_id: UUID,
+        idempotency_key: Optional[str] = None
     ) -> ExpenseTransaction:
         """
         Create expense transaction from schema
@@ -429,6 +494,7 @@ class TransactionService:
         Args:
             transaction: ExpenseTransactionCreate schema
             user_id: User creating the transaction
+            idempotency_key: Optional client request key
 
         Returns:
             Created ExpenseTransaction
@@ -443,7 +509,8 @@ class TransactionService:
             reference_number=transaction.reference_number,
             description=transaction.description,
             notes=transaction.notes,
-            requires_approval=transaction.approval_required
+            requires_approval=transaction.approval_required,
+            idempotency_key=idempotency_key
         )
 
     async def create_expense(
@@ -457,7 +524,8 @@ class TransactionService:
         reference_number: Optional[str] = None,
         description: Optional[str] = None,
         notes: Optional[str] = None,
-        requires_approval: bool = False
+        requires_approval: bool = False,
+        idempotency_key: Optional[str] = None
     ) -> ExpenseTransaction:
         """
         Create expense transaction (atomic operation)
@@ -483,6 +551,8 @@ class TransactionService:
             description: Optional transaction description
             notes: Optional transaction notes
             requires_approval: Whether approval is needed
+            idempotency_key: Optional client request key; a repeated key
+                returns the original transaction
             
         Returns:
             Created ExpenseTransaction
@@ -493,6 +563,14 @@ class TransactionService:
             DatabaseOperationError: Transaction failed
         """
         try:
+            # Return the original transaction for a retried request
+            if idempotency_key:
+                existing = await self._get_idempotent_replay(
+                    user_id, idempotency_key, ExpenseTransaction
+                )
+                if existing:
+                    return existing
+
             # Step 1: Validate inputs
             validate_positive_amount(amount)
             await self._validate_branch_exists(branch_id)
@@ -542,6 +620,7 @@ class TransactionService:
                     expense_category=category,
                     expense_to=payee.strip(),
                     approval_required=requires_approval,
+                    idempotency_key=idempotency_key,
                     transaction_date=datetime.utcnow()
                 )
                 
@@ -563,6 +642,8 @@ class TransactionService:
                 if not requires_approval:
                     expense.status = TransactionStatus.COMPLETED
                     expense.completed_at = datetime.utcnow()
+                    await self._record_limit_usage(expense)
+                await self._publish_transactions(TRANSACTION_CREATED, [expense])
 
                 await self.db.commit()
 
@@ -590,6 +671,227 @@ class TransactionService:
             logger.error(f"Unexpected error in create_expense: {str(e)}")
             raise DatabaseOperationError(f"Transaction failed: {str(e)}")
     
+    # ==================== BATCH POSTING ====================
+
+    # Rows per multi-row INSERT when posting a batch
+    BATCH_INSERT_SIZE = 500
+
+    async def create_transactions_batch(
+        self,
+        items: List[Union['IncomeTransactionCreate', 'ExpenseTransactionCreate']],
+        user_id: UUID,
+        all_or_nothing: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Post a batch of income/expense transactions (back-office posting)
+        
+        Steps:
+        1. Validate amounts, payees and references in memory
+        2. Look up branches, currencies, customers and existing references
+           with one query each
+        3. Lock every affected (branch, currency) balance in one query and
+           check the running balance of each item in order
+        4. Allocate one block of transaction numbers
+        5. Insert transactions with multi-row INSERTs, apply one balance
+           update per (branch, currency) plus batched history, commit once
+        
+        Args:
+            items: IncomeTransactionCreate / ExpenseTransactionCreate items
+            user_id: User posting the batch
+            all_or_nothing: If True nothing is posted when any item fails;
+                otherwise failed items are skipped and reported
+            
+        Returns:
+            Dictionary with results: total, successful, failed, errors, created
+            
+        Raises:
+            DatabaseOperationError: If writing the batch fails (nothing posted)
+        """
+        from app.db.models.branch import Branch
+        from app.db.models.customer import Customer
+        from app.schemas.transaction import ExpenseTransactionCreate
+
+        logger.info(f"Posting batch of {len(items)} transactions by user {user_id}")
+
+        results = {
+            "total": len(items),
+            "successful": 0,
+            "failed": 0,
+            "errors": [],
+            "created": []
+        }
+        rejected: Set[int] = set()
+
+        def reject(idx: int, error: str) -> None:
+            if idx not in rejected:
+                rejected.add(idx)
+                results["failed"] += 1
+                results["errors"].append({"index": idx, "error": error})
+
+        # Step 1: In-memory validation
+        seen_references: Dict[str, int] = {}
+        for idx, item in enumerate(items):
+            try:
+                validate_positive_amount(item.amount)
+                if isinstance(item, ExpenseTransactionCreate):
+                    if not item.expense_to or len(item.expense_to.strip()) < 2:
+                        raise ValidationError("Payee name is required and must be at least 2 characters")
+                    validate_transaction_limits(item.amount, "expense")
+            except ValidationError as e:
+                reject(idx, str(e))
+                continue
+
+            if item.reference_number:
+                if item.reference_number in seen_references:
+                    reject(
+                        idx,
+                        f"Reference number {item.reference_number} duplicated in batch "
+                        f"(item {seen_references[item.reference_number]})"
+                    )
+                    continue
+                seen_references[item.reference_number] = idx
+
+        # Step 2: Set-based lookups
+        active_branches = await self._get_active_ids(Branch, {item.branch_id for item in items})
+        active_currencies = await self._get_active_ids(Currency, {item.currency_id for item in items})
+        active_customers = await self._get_active_ids(
+            Customer, {item.customer_id for item in items if item.customer_id}
+        )
+        existing_references = await self._get_existing_references(set(seen_references))
+
+        for idx, item in enumerate(items):
+            if item.branch_id not in active_branches:
+                reject(idx, f"Branch {item.branch_id} not found or not active")
+            elif item.currency_id not in active_currencies:
+                reject(idx, f"Currency {item.currency_id} not found or not active")
+            elif item.customer_id and item.customer_id not in active_customers:
+                reject(idx, f"Customer {item.customer_id} not found or not active")
+            elif item.reference_number in existing_references:
+                reject(idx, f"Transaction with reference number {item.reference_number} already exists")
+
+        # Step 3: Lock balances and check running balances in item order
+        balances = await self.balance_service.repo.lock_branch_balances(
+            (item.branch_id, item.currency_id) for idx, item in enumerate(items)
+            if idx not in rejected
+        )
+        available = {
+            pair: balance.balance - balance.reserved_balance
+            for pair, balance in balances.items()
+        }
+
+        for idx, item in enumerate(items):
+            if idx in rejected:
+                continue
+            pair = (item.branch_id, item.currency_id)
+            if isinstance(item, ExpenseTransactionCreate):
+                if pair not in available:
+                    reject(idx, f"Branch {item.branch_id} does not have balance for currency {item.currency_id}")
+                    continue
+                if available[pair] < item.amount:
+                    reject(
+                        idx,
+                        f"Insufficient balance. Available: {available[pair]}, Required: {item.amount}"
+                    )
+                    continue
+                available[pair] -= item.amount
+            else:
+                available[pair] = available.get(pair, Decimal("0")) + item.amount
+
+        results["errors"].sort(key=lambda error: error["index"])
+        accepted = [(idx, item) for idx, item in enumerate(items) if idx not in rejected]
+
+        if not accepted or (all_or_nothing and rejected):
+            # Release balance locks; nothing was written
+            await self.db.rollback()
+            logger.warning(f"Transaction batch not posted: {results['failed']} items rejected")
+            return results
+
+        try:
+            # Step 4: Transaction number block
+            numbers = await self.transaction_generator.generate_block(self.db, len(accepted))
+
+            # Step 5: Build rows
+            now = datetime.utcnow()
+            transaction_rows = []
+            balance_changes = []
+
+            for (idx, item), transaction_number in zip(accepted, numbers):
+                is_expense = isinstance(item, ExpenseTransactionCreate)
+                requires_approval = is_expense and item.approval_required
+                transaction_id = uuid4()
+
+                transaction_rows.append({
+                    "id": transaction_id,
+                    "transaction_number": transaction_number,
+                    "transaction_type": TransactionType.EXPENSE if is_expense else TransactionType.INCOME,
+                    "status": TransactionStatus.PENDING if requires_approval else TransactionStatus.COMPLETED,
+                    "amount": item.amount,
+                    "currency_id": item.currency_id,
+                    "branch_id": item.branch_id,
+                    "user_id": user_id,
+                    "customer_id": item.customer_id,
+                    "reference_number": item.reference_number,
+                    "description": item.description or item.notes,
+                    "notes": item.notes,
+                    "income_category": None if is_expense else item.income_category,
+                    "income_source": None if is_expense else item.income_source,
+                    "expense_category": item.expense_category if is_expense else None,
+                    "expense_to": item.expense_to.strip() if is_expense else None,
+                    "approval_required": requires_approval,
+                    "fingerprint": Transaction.compute_fingerprint(
+                        item.branch_id, item.currency_id, item.amount, item.customer_id, now
+                    ),
+                    "transaction_date": now,
+                    "completed_at": None if requires_approval else now,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                balance_changes.append({
+                    "branch_id": item.branch_id,
+                    "currency_id": item.currency_id,
+                    "amount": -item.amount if is_expense else item.amount,
+                    "change_type": BalanceChangeType.TRANSACTION,
+                    "reference_id": transaction_id,
+                    "reference_type": "transaction",
+                    "performed_by": user_id,
+                    "notes": (
+                        f"Expense: {item.expense_category.value} to {item.expense_to.strip()}"
+                        if is_expense else f"Income: {item.income_category.value}"
+                    )
+                })
+
+            for start in range(0, len(transaction_rows), self.BATCH_INSERT_SIZE):
+                await self.db.execute(
+                    insert(Transaction.__table__),
+                    transaction_rows[start:start + self.BATCH_INSERT_SIZE]
+                )
+
+            await self.balance_service.apply_balance_changes(balance_changes, balances)
+            await self.validation_service.record_completed_transactions(
+                row for row in transaction_rows
+                if row["status"] == TransactionStatus.COMPLETED
+            )
+            await self._publish_transactions(TRANSACTION_CREATED, transaction_rows)
+            await self.db.commit()
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to post transaction batch: {str(e)}")
+            raise DatabaseOperationError(f"Failed to post transaction batch: {str(e)}")
+
+        results["successful"] = len(transaction_rows)
+        results["created"] = [
+            {"index": idx, "id": str(row["id"]), "transaction_number": row["transaction_number"]}
+            for (idx, _), row in zip(accepted, transaction_rows)
+        ]
+
+        logger.info(
+            f"Transaction batch posted: {results['successful']} posted, "
+            f"{results['failed']} rejected"
+        )
+
+        return results
+
     # ==================== EXCHANGE TRANSACTIONS ====================
 
     async def calculate_exchange(
@@ -661,11 +963,57 @@ class TransactionService:
             logger.error(f"Error calculating exchange: {str(e)}")
             raise ValidationError(f"Failed to calculate exchange: {str(e)}")
 
+    async def create_exchange_quote(
+        self,
+        calculation: 'ExchangeCalculationRequest',
+        user_id: UUID
+    ) -> ExchangeQuote:
+        """
+        Calculate an exchange and lock its rate for the user
+
+        With calculation.branch_id, the total cost is also held at that
+        branch until the quote expires.
+
+        Args:
+            calculation: ExchangeCalculationRequest schema
+            user_id: User the quote is reserved for
+
+        Returns:
+            ExchangeQuote; pass its quote_id to create_exchange
+
+        Raises:
+            ValidationError: No rate for the currency pair
+            InsufficientBalanceError: Branch cannot cover the total cost
+        """
+        result = await self.calculate_exchange(calculation)
+        expires_at = self.quote_service.expiry()
+
+        hold_id = None
+        if calculation.branch_id:
+            hold = await self.reservation_service.hold(
+                branch_id=calculation.branch_id,
+                currency_id=calculation.from_currency_id,
+                amount=result["total_cost"],
+                reference_type=BalanceReservationService.EXCHANGE_QUOTE,
+                ttl=expires_at - datetime.utcnow(),
+                created_by=user_id
+            )
+            hold_id = hold.id
+            await self.db.commit()
+
+        return self.quote_service.issue(
+            user_id, result,
+            branch_id=calculation.branch_id,
+            hold_id=hold_id,
+            expires_at=expires_at
+        )
+
     @retry_on_deadlock(max_attempts=3)
     async def create_exchange_transaction(
         self,
         transaction: 'ExchangeTransactionCreate',
-        user_id: UUID
+        user_id: UUID,
+        idempotency_key: Optional[str] = None
     ) -> ExchangeTransaction:
         """
         Create exchange transaction from schema
@@ -673,6 +1021,7 @@ class TransactionService:
         Args:
             transaction: ExchangeTransactionCreate schema
             user_id: User creating the transaction
+            idempotency_key: Optional client request key
 
         Returns:
             Created ExchangeTransaction
@@ -687,7 +1036,9 @@ class TransactionService:
             user_id=user_id,
             reference_number=transaction.reference_number,
             description=transaction.description,
-            notes=transaction.notes
+            notes=transaction.notes,
+            idempotency_key=idempotency_key,
+            quote_id=transaction.quote_id
         )
 
     async def create_exchange(
@@ -701,14 +1052,16 @@ class TransactionService:
         user_id: UUID,
         reference_number: Optional[str] = None,
         description: Optional[str] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        quote_id: Optional[str] = None
     ) -> ExchangeTransaction:
         """
         Create currency exchange transaction (atomic operation)
 
         Steps:
         1. Get currency objects and their codes
-        2. Get latest exchange rate
+        2. Get latest exchange rate (or the quoted rate)
         3. Calculate to_amount and commission
         4. Check branch has from_currency balance
         5. Generate transaction number
@@ -730,13 +1083,21 @@ class TransactionService:
             reference_number: Optional external reference
             description: Optional transaction description
             notes: Optional transaction notes
+            idempotency_key: Optional client request key; a repeated key
+                returns the original transaction
+            quote_id: Optional quote from create_exchange_quote; its rate
+                and commission are used instead of a fresh rate lookup, and
+                its balance hold (if any) is committed for the total cost;
+                a quote books one exchange
             
         Returns:
             Created ExchangeTransaction
             
         Raises:
-            ValidationError: Invalid inputs or same currencies
+            ValidationError: Invalid inputs, same currencies, or an expired,
+                mismatched or already used quote
             InsufficientBalanceError: Not enough funds
+            BusinessRuleViolationError: The quote's balance hold has lapsed
             DatabaseOperationError: Transaction failed
         """
         try:
@@ -746,9 +1107,29 @@ class TransactionService:
             if from_currency_id == to_currency_id:
                 raise ValidationError("Cannot exchange between same currencies")
 
+            quote = None
+            if quote_id:
+                quote = self.quote_service.resolve(
+                    quote_id,
+                    user_id=user_id,
+                    from_currency_id=from_currency_id,
+                    to_currency_id=to_currency_id,
+                    from_amount=from_amount,
+                    commission_percentage=commission_percentage,
+                    branch_id=branch_id
+                )
+                commission_percentage = quote.commission_percentage
+
             # Steps 1-12: Atomic operation
             try:
                 async with self.db.begin():
+                    if idempotency_key:
+                        existing = await self._get_idempotent_replay(
+                            user_id, idempotency_key, ExchangeTransaction
+                        )
+                        if existing:
+                            return existing
+
                     await self._validate_branch_exists(branch_id)
                     await self._validate_currency_exists(from_currency_id)
                     await self._validate_currency_exists(to_currency_id)
@@ -771,18 +1152,22 @@ class TransactionService:
                     if not to_currency:
                         raise ValidationError(f"Target currency {to_currency_id} not found")
 
-                    # Step 2: Get latest exchange rate using currency codes
-                    rate_info = await self.currency_service.get_latest_rate(
-                        from_currency.code, to_currency.code
-                    )
-
-                    if not rate_info:
-                        raise ValidationError(
-                            f"No exchange rate found for {from_currency.code} -> {to_currency.code}"
+                    # Step 2: Use the quoted rate, or get the latest rate
+                    # using currency codes
+                    if quote:
+                        exchange_rate = quote.exchange_rate
+                    else:
+                        rate_info = await self.currency_service.get_latest_rate(
+                            from_currency.code, to_currency.code
                         )
 
-                    # Access rate from Pydantic model object (not dictionary)
-                    exchange_rate = Decimal(str(rate_info.rate))
+                        if not rate_info:
+                            raise ValidationError(
+                                f"No exchange rate found for {from_currency.code} -> {to_currency.code}"
+                            )
+
+                        # Access rate from Pydantic model object (not dictionary)
+                        exchange_rate = Decimal(str(rate_info.rate))
 
                     # Step 3: Calculate amounts and commission using request value (can be 0)
                     to_amount = (from_amount * exchange_rate).quantize(Decimal("0.01"))
@@ -797,16 +1182,18 @@ class TransactionService:
                     total_cost = from_amount + commission_amount
 
                     # Step 4: Check balance using the total cost in from currency
-                    from_balance_info = await self.balance_service.get_balance(
-                        branch_id, from_currency_id
-                    )
-                    available = Decimal(str(from_balance_info['available_balance']))
-
-                    if available < total_cost:
-                        raise InsufficientBalanceError(
-                            f"Insufficient {from_currency.code} balance. "
-                            f"Available: {available}, Required: {total_cost}"
+                    # (a quote hold already set the total cost aside)
+                    if not (quote and quote.hold_id):
+                        from_balance_info = await self.balance_service.get_balance(
+                            branch_id, from_currency_id
                         )
+                        available = Decimal(str(from_balance_info['available_balance']))
+
+                        if available < total_cost:
+                            raise InsufficientBalanceError(
+                                f"Insufficient {from_currency.code} balance. "
+                                f"Available: {available}, Required: {total_cost}"
+                            )
 
                     # Step 5: Generate transaction number
                     transaction_number = await self.transaction_generator.generate(
@@ -834,25 +1221,44 @@ class TransactionService:
                         exchange_rate_used=exchange_rate,
                         commission_amount=commission_amount,
                         commission_percentage=commission_percentage,
+                        idempotency_key=idempotency_key,
                         transaction_date=datetime.utcnow()
                     )
 
                     self.db.add(exchange)
                     await self.db.flush()
 
-                    # Deduct from_currency from branch including commission (if any)
-                    await self.balance_service.update_balance(
-                        branch_id=branch_id,
-                        currency_id=from_currency_id,
-                        amount=-total_cost,
-                        change_type=BalanceChangeType.TRANSACTION,
-                        reference_id=exchange.id,
-                        reference_type="transaction",
-                        notes=(
-                            f"Exchange out: {from_amount} {from_currency.code} "
-                            f"to {to_currency.code} (commission {commission_amount})"
-                        )
+                    # Deduct from_currency from branch including commission (if any);
+                    # a quote is used up here and its hold committed, otherwise
+                    # the balance is validated and updated
+                    exchange_out_notes = (
+                        f"Exchange out: {from_amount} {from_currency.code} "
+                        f"to {to_currency.code} (commission {commission_amount})"
                     )
+                    if quote:
+                        self.quote_service.redeem(quote)
+                    if quote and quote.hold_id:
+                        committed = await self.reservation_service.commit(
+                            quote.hold_id,
+                            change_type=BalanceChangeType.TRANSACTION,
+                            reference_id=exchange.id,
+                            reference_type="transaction",
+                            notes=exchange_out_notes
+                        )
+                        if committed is None:
+                            raise BusinessRuleViolationError(
+                                "Exchange quote hold is no longer active; request a new quote"
+                            )
+                    else:
+                        await self.balance_service.update_balance(
+                            branch_id=branch_id,
+                            currency_id=from_currency_id,
+                            amount=-total_cost,
+                            change_type=BalanceChangeType.TRANSACTION,
+                            reference_id=exchange.id,
+                            reference_type="transaction",
+                            notes=exchange_out_notes
+                        )
 
                     # Add to_currency to branch
                     await self.balance_service.update_balance(
@@ -868,6 +1274,8 @@ class TransactionService:
                     # Mark as completed
                     exchange.status = TransactionStatus.COMPLETED
                     exchange.completed_at = datetime.utcnow()
+                    await self._record_limit_usage(exchange)
+                    await self._publish_transactions(TRANSACTION_CREATED, [exchange])
 
                 # Reload exchange with required relationships to avoid lazy loads
                 # outside the greenlet/async context when serializing the response.
@@ -883,13 +1291,15 @@ class TransactionService:
 
                 return exchange
 
+            except (ValidationError, BusinessRuleViolationError):
+                raise
             except Exception as e:
                 logger.error(f"Failed to create exchange transaction: {str(e)}")
                 raise DatabaseOperationError(
                     f"Failed to create exchange transaction: {str(e)}"
                 )
                 
-        except (ValidationError, InsufficientBalanceError):
+        except (ValidationError, BusinessRuleViolationError):
             raise
         except Exception as e:
             logger.error(f"Unexpected error in create_exchange: {str(e)}")
@@ -900,7 +1310,8 @@ class TransactionService:
     async def create_transfer_transaction(
         self,
         transaction: 'TransferTransactionCreate',
-        user_id: UUID
+        user_id: UUID,
+        idempotency_key: Optional[str] = None
     ) -> TransferTransaction:
         """
         Create transfer transaction from schema
@@ -908,6 +1319,7 @@ class TransactionService:
         Args:
             transaction: TransferTransactionCreate schema
             user_id: User creating the transaction
+            idempotency_key: Optional client request key
 
         Returns:
             Created TransferTransaction
@@ -921,7 +1333,8 @@ class TransactionService:
             transfer_type=transaction.transfer_type,
             reference_number=transaction.reference_number,
             description=transaction.description,
-            notes=transaction.notes
+            notes=transaction.notes,
+            idempotency_key=idempotency_key
         )
 
     async def create_transfer(
@@ -934,7 +1347,8 @@ class TransactionService:
         transfer_type: TransferType = TransferType.BRANCH_TO_BRANCH,
         reference_number: Optional[str] = None,
         description: Optional[str] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> TransferTransaction:
         """
         Create branch transfer transaction (two-phase commit)
@@ -960,6 +1374,8 @@ class TransactionService:
             reference_number: Optional external reference
             description: Optional transfer description
             notes: Optional transfer notes
+            idempotency_key: Optional client request key; a repeated key
+                returns the original transaction
             
         Returns:
             Created TransferTransaction (status: pending)
@@ -970,6 +1386,14 @@ class TransactionService:
             DatabaseOperationError: Transaction failed
         """
         try:
+            # Return the original transaction for a retried request
+            if idempotency_key:
+                existing = await self._get_idempotent_replay(
+                    user_id, idempotency_key, TransferTransaction
+                )
+                if existing:
+                    return existing
+
             # Validate inputs
             validate_positive_amount(amount)
             await self._validate_branch_exists(from_branch_id)
@@ -1018,20 +1442,24 @@ class TransactionService:
                     from_branch_id=from_branch_id,
                     to_branch_id=to_branch_id,
                     transfer_type=transfer_type,
+                    idempotency_key=idempotency_key,
                     transaction_date=datetime.utcnow()
                 )
                 
                 self.db.add(transfer)
                 await self.db.flush()
                 
-                # Reserve balance (don't deduct yet)
-                await self.balance_service.reserve_balance(
+                # Hold balance until received or cancelled (don't deduct yet)
+                await self.reservation_service.hold(
                     branch_id=from_branch_id,
                     currency_id=currency_id,
                     amount=amount,
+                    reference_type=BalanceReservationService.TRANSFER,
+                    ttl=timedelta(hours=settings.BALANCE_TRANSFER_HOLD_TTL_HOURS),
                     reference_id=transfer.id,
-                    reference_type="transaction"
+                    created_by=user_id
                 )
+                await self._publish_transactions(TRANSACTION_CREATED, [transfer])
 
                 await self.db.commit()
                 transfer = await self._load_transaction_with_relationships(
@@ -1123,16 +1551,40 @@ class TransactionService:
             
             # Atomic operation - Phase 2
             try:
-                # Deduct from source branch
-                await self.balance_service.update_balance(
-                    branch_id=transfer.from_branch_id,
-                    currency_id=transfer.currency_id,
-                    amount=-transfer.amount,
-                    change_type=BalanceChangeType.TRANSFER_OUT,
-                    reference_id=transfer.id,
-                    reference_type="transaction",
-                    notes=f"Transfer to {transfer.to_branch_id}"
+                # Deduct from source branch: commit the hold placed when the
+                # transfer was initiated, or re-validate if it has lapsed
+                hold = await self.reservation_service.get_for_reference(
+                    transfer.id, BalanceReservationService.TRANSFER
                 )
+                committed = None
+                if hold is not None:
+                    committed = await self.reservation_service.commit(
+                        hold.id,
+                        change_type=BalanceChangeType.TRANSFER_OUT,
+                        reference_id=transfer.id,
+                        reference_type="transaction",
+                        performed_by=received_by_user_id,
+                        notes=f"Transfer to {transfer.to_branch_id}"
+                    )
+                else:
+                    # Initiated before holds existed: drop the bare reservation
+                    await self.balance_service.release_reserved_balance(
+                        branch_id=transfer.from_branch_id,
+                        currency_id=transfer.currency_id,
+                        amount=transfer.amount,
+                        reference_id=transfer.id
+                    )
+
+                if committed is None:
+                    await self.balance_service.update_balance(
+                        branch_id=transfer.from_branch_id,
+                        currency_id=transfer.currency_id,
+                        amount=-transfer.amount,
+                        change_type=BalanceChangeType.TRANSFER_OUT,
+                        reference_id=transfer.id,
+                        reference_type="transaction",
+                        notes=f"Transfer to {transfer.to_branch_id}"
+                    )
 
                 # Add to destination branch
                 await self.balance_service.update_balance(
@@ -1145,19 +1597,13 @@ class TransactionService:
                     notes=f"Transfer from {transfer.from_branch_id}"
                 )
                 
-                # Release reserved balance
-                await self.balance_service.release_reserved_balance(
-                    branch_id=transfer.from_branch_id,
-                    currency_id=transfer.currency_id,
-                    amount=transfer.amount,
-                    reference_id=transfer.id
-                )
-                
                 # Update transfer status
                 transfer.status = TransactionStatus.COMPLETED
                 transfer.completed_at = datetime.utcnow()
                 transfer.received_by_id = received_by_user_id
                 transfer.received_at = datetime.utcnow()
+                await self._record_limit_usage(transfer)
+                await self._publish_transactions(TRANSACTION_STATUS_CHANGED, [transfer])
 
                 await self.db.commit()
                 transfer = await self._load_transaction_with_relationships(
@@ -1225,6 +1671,8 @@ class TransactionService:
 
             # Mark the transaction as completed now that it is approved
             expense.complete(approver_id)
+            await self._record_limit_usage(expense)
+            await self._publish_transactions(TRANSACTION_STATUS_CHANGED, [expense])
 
             # If there are approval notes, add them to the transaction notes
             if approval_notes:
@@ -1326,19 +1774,27 @@ class TransactionService:
                     )
                 
                 elif isinstance(transaction, TransferTransaction):
-                    # Release reserved balance
-                    await self.balance_service.release_reserved_balance(
-                        branch_id=transaction.from_branch_id,
-                        currency_id=transaction.currency_id,
-                        amount=transaction.amount,
-                        reference_id=transaction.id
+                    # Release the transfer's hold (expired holds are
+                    # already released)
+                    hold = await self.reservation_service.get_for_reference(
+                        transaction.id, BalanceReservationService.TRANSFER
                     )
+                    if hold is not None:
+                        await self.reservation_service.release(hold.id)
+                    else:
+                        await self.balance_service.release_reserved_balance(
+                            branch_id=transaction.from_branch_id,
+                            currency_id=transaction.currency_id,
+                            amount=transaction.amount,
+                            reference_id=transaction.id
+                        )
                 
                 # Update transaction status
                 transaction.status = TransactionStatus.CANCELLED
                 transaction.cancelled_at = datetime.utcnow()
                 transaction.cancelled_by_id = cancelled_by_user_id
                 transaction.cancellation_reason = reason.strip()
+                await self._publish_transactions(TRANSACTION_STATUS_CHANGED, [transaction])
                 
                 await self.db.commit()
                 transaction = await self._load_transaction_with_relationships(
@@ -1642,11 +2098,29 @@ class TransactionService:
         if not customer.is_active:
             raise ValidationError(f"Customer {customer_id} is not active")
     
+    async def _get_active_ids(self, model, ids: Set[UUID]) -> Set[UUID]:
+        """Return which of the given IDs exist and are active, in one query"""
+        if not ids:
+            return set()
+        stmt = select(model.id).where(and_(model.id.in_(ids), model.is_active == True))
+        result = await self.db.execute(stmt)
+        return set(result.scalars().all())
+
+    async def _get_existing_references(self, reference_numbers: Set[str]) -> Set[str]:
+        """Return which of the given reference numbers are already used"""
+        if not reference_numbers:
+            return set()
+        stmt = select(Transaction.reference_number).where(
+            Transaction.reference_number.in_(reference_numbers)
+        )
+        result = await self.db.execute(stmt)
+        return set(result.scalars().all())
+
     async def _check_duplicate_reference(self, reference_number: str) -> None:
-        """Check for duplicate reference number"""
-        stmt = select(Transaction).where(
+        """Check for duplicate reference number (index lookup)"""
+        stmt = select(Transaction.id).where(
             Transaction.reference_number == reference_number
-        )
+        ).limit(1)
         result = await self.db.execute(stmt)
         existing = result.scalar_one_or_none()
         
@@ -1654,3 +2128,45 @@ class TransactionService:
             raise ValidationError(
                 f"Transaction with reference number {reference_number} already exists"
             )
+
+    async def _get_idempotent_replay(
+        self,
+        user_id: UUID,
+        idempotency_key: str,
+        model: type[Transaction]
+    ) -> Optional[Transaction]:
+        """
+        Return the transaction already created for (user, idempotency key)
+
+        Raises:
+            ValidationError: Key was used for a different transaction type
+        """
+        stmt = select(Transaction.id, Transaction.transaction_type).where(
+            and_(
+                Transaction.user_id == user_id,
+                Transaction.idempotency_key == idempotency_key
+            )
+        )
+        row = (await self.db.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+
+        if model.__mapper__.polymorphic_identity != TransactionType(row.transaction_type).value:
+            raise ValidationError(
+                f"Idempotency key {idempotency_key} was already used for a "
+                f"{TransactionType(row.transaction_type).value} transaction"
+            )
+
+        logger.info(f"Replaying transaction {row.id} for idempotency key {idempotency_key}")
+        return await self._load_transaction_with_relationships(row.id, model)
+
+
+def _event_value(value: Any) -> Any:
+    """JSON-safe form of a transaction field for outbox payloads"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
@@ -10,15 +10,19 @@ Comprehensive validation for all transaction operations:
 - Business rule enforcement
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from uuid import UUID
 
 from sqlalchemy import select, func, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.transaction import Transaction, TransactionType, TransactionStatus
+from app.core.config import settings
+from app.db.models.transaction import (
+    Transaction, TransactionType, TransactionStatus, TransactionLimitCounter
+)
 from app.db.models.branch import Branch, BranchBalance
 from app.db.models.currency import Currency, ExchangeRate
 from app.db.models.customer import Customer
@@ -278,7 +282,8 @@ class TransactionValidationService:
         
         Checks:
         - Single transaction maximum
-        - Daily transaction maximum per branch
+        - Daily transaction maximum per branch (from the running counters,
+          window set by TRANSACTION_LIMIT_WINDOW)
         
         Args:
             branch_id: Branch ID
@@ -298,27 +303,10 @@ class TransactionValidationService:
                 f"{self.MAX_TRANSACTION_AMOUNT}"
             )
         
-        # Get today's total for this branch
-        today_start = datetime.utcnow().replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        today_end = datetime.utcnow().replace(
-            hour=23, minute=59, second=59, microsecond=999999
+        daily_total, _ = await self._get_limit_usage(
+            TransactionLimitCounter.SCOPE_BRANCH, branch_id, transaction_type
         )
         
-        stmt = select(func.sum(Transaction.amount)).where(
-            and_(
-                Transaction.branch_id == branch_id,
-                Transaction.transaction_type == transaction_type,
-                Transaction.status == TransactionStatus.COMPLETED,
-                Transaction.transaction_date >= today_start,
-                Transaction.transaction_date <= today_end
-            )
-        )
-        
-        result = await self.db.execute(stmt)
-        daily_total = result.scalar() or Decimal('0')
-        
         # Check daily limit
         new_daily_total = daily_total + amount
         
@@ -356,22 +344,10 @@ class TransactionValidationService:
         Raises:
             BusinessRuleViolationError: Customer exceeded daily limit
         """
-        today_start = datetime.utcnow().replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        
-        stmt = select(func.count(Transaction.id)).where(
-            and_(
-                Transaction.customer_id == customer_id,
-                Transaction.transaction_type == TransactionType.EXCHANGE,
-                Transaction.status == TransactionStatus.COMPLETED,
-                Transaction.transaction_date >= today_start
-            )
+        _, today_count = await self._get_limit_usage(
+            TransactionLimitCounter.SCOPE_CUSTOMER, customer_id, TransactionType.EXCHANGE
         )
         
-        result = await self.db.execute(stmt)
-        today_count = result.scalar() or 0
-        
         if today_count >= self.MAX_CUSTOMER_DAILY_EXCHANGES:
             raise BusinessRuleViolationError(
                 f"Customer has reached daily exchange limit "
@@ -385,6 +361,122 @@ class TransactionValidationService:
             'remaining': self.MAX_CUSTOMER_DAILY_EXCHANGES - today_count
         }
     
+    # ==================== LIMIT COUNTERS ====================
+    
+    @staticmethod
+    def limit_bucket(moment: datetime) -> datetime:
+        """Return the (naive UTC) hour bucket a transaction time falls into"""
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        return moment.replace(minute=0, second=0, microsecond=0)
+    
+    @classmethod
+    def limit_window_start(
+        cls,
+        now: Optional[datetime] = None,
+        window: Optional[str] = None
+    ) -> datetime:
+        """
+        Return the first hour bucket inside the daily limit window
+        
+        "calendar_day" starts at UTC midnight; "rolling_24h" includes the
+        bucket containing now - 24h, so it errs on the strict side by up to
+        one hour.
+        """
+        now = now or datetime.utcnow()
+        window = window or settings.TRANSACTION_LIMIT_WINDOW
+        
+        if window == "rolling_24h":
+            return cls.limit_bucket(now - timedelta(hours=24))
+        return cls.limit_bucket(now).replace(hour=0)
+    
+    async def record_completed_transactions(
+        self,
+        transactions: Iterable[Dict[str, Any]]
+    ) -> int:
+        """
+        Add completed transactions to the running limit counters
+        
+        Must run in the same database transaction that completes them,
+        ideally right before commit: the upsert holds the counter row locks
+        until the transaction ends.
+        
+        Args:
+            transactions: Dicts with branch_id, customer_id, transaction_type,
+                amount and transaction_date
+            
+        Returns:
+            Number of counter rows touched
+        """
+        totals: Dict[Tuple, list] = {}
+        for txn in transactions:
+            bucket = self.limit_bucket(txn.get('transaction_date') or datetime.utcnow())
+            scopes = [(TransactionLimitCounter.SCOPE_BRANCH, txn['branch_id'])]
+            if txn.get('customer_id'):
+                scopes.append((TransactionLimitCounter.SCOPE_CUSTOMER, txn['customer_id']))
+            
+            for scope, scope_id in scopes:
+                key = (scope, scope_id, TransactionType(txn['transaction_type']), bucket)
+                entry = totals.setdefault(key, [Decimal('0'), 0])
+                entry[0] += Decimal(str(txn['amount']))
+                entry[1] += 1
+        
+        if not totals:
+            return 0
+        
+        # Sorted keys give concurrent writers the same lock order
+        rows = [
+            {
+                'scope': scope,
+                'scope_id': scope_id,
+                'transaction_type': transaction_type,
+                'bucket_start': bucket,
+                'total_amount': amount,
+                'transaction_count': count,
+                'updated_at': datetime.utcnow(),
+            }
+            for (scope, scope_id, transaction_type, bucket), (amount, count)
+            in sorted(totals.items())
+        ]
+        
+        stmt = pg_insert(TransactionLimitCounter).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['scope', 'scope_id', 'transaction_type', 'bucket_start'],
+            set_={
+                'total_amount': TransactionLimitCounter.total_amount + stmt.excluded.total_amount,
+                'transaction_count': (
+                    TransactionLimitCounter.transaction_count + stmt.excluded.transaction_count
+                ),
+                'updated_at': stmt.excluded.updated_at,
+            }
+        )
+        await self.db.execute(stmt)
+        
+        return len(rows)
+    
+    async def _get_limit_usage(
+        self,
+        scope: str,
+        scope_id: UUID,
+        transaction_type: TransactionType
+    ) -> Tuple[Decimal, int]:
+        """Return (total amount, count) inside the current limit window"""
+        stmt = select(
+            func.coalesce(func.sum(TransactionLimitCounter.total_amount), 0),
+            func.coalesce(func.sum(TransactionLimitCounter.transaction_count), 0)
+        ).where(
+            and_(
+                TransactionLimitCounter.scope == scope,
+                TransactionLimitCounter.scope_id == scope_id,
+                TransactionLimitCounter.transaction_type == transaction_type,
+                TransactionLimitCounter.bucket_start >= self.limit_window_start()
+            )
+        )
+        
+        result = await self.db.execute(stmt)
+        total_amount, count = result.one()
+        return Decimal(str(total_amount)), int(count)
+    
     # ==================== DUPLICATE DETECTION ====================
     
     async def check_duplicate_transaction(
@@ -393,21 +485,27 @@ class TransactionValidationService:
         branch_id: Optional[UUID] = None,
         amount: Optional[Decimal] = None,
         currency_id: Optional[UUID] = None,
-        time_window_minutes: int = 5
+        customer_id: Optional[UUID] = None,
+        time_window_minutes: Optional[int] = None
     ) -> Optional[Transaction]:
         """
         Check for potential duplicate transactions
         
         Checks for:
         1. Exact reference number match
-        2. Same branch, amount, currency within time window
+        2. Same branch, amount, currency and customer within time window
+        
+        Both are index lookups: the second probes the fingerprint index
+        with one fingerprint per minute bucket in the window.
         
         Args:
             reference_number: External reference
             branch_id: Branch ID
             amount: Transaction amount
             currency_id: Currency ID
+            customer_id: Customer ID (part of the fingerprint)
             time_window_minutes: Time window for duplicate detection
+                (default: DUPLICATE_TRANSACTION_WINDOW_MINUTES)
             
         Returns:
             Existing transaction if duplicate found, None otherwise
@@ -416,7 +514,7 @@ class TransactionValidationService:
         if reference_number:
             stmt = select(Transaction).where(
                 Transaction.reference_number == reference_number
-            )
+            ).limit(1)
             result = await self.db.execute(stmt)
             existing = result.scalar_one_or_none()
             
@@ -428,32 +526,49 @@ class TransactionValidationService:
         
         # Check similar transaction in time window
         if all([branch_id, amount, currency_id]):
-            time_threshold = datetime.utcnow() - timedelta(
-                minutes=time_window_minutes
+            window = time_window_minutes or settings.DUPLICATE_TRANSACTION_WINDOW_MINUTES
+            fingerprints = self.window_fingerprints(
+                branch_id, currency_id, amount, customer_id, window
             )
             
             stmt = select(Transaction).where(
                 and_(
-                    Transaction.branch_id == branch_id,
-                    Transaction.amount == amount,
-                    Transaction.currency_id == currency_id,
-                    Transaction.transaction_date >= time_threshold,
+                    Transaction.fingerprint.in_(fingerprints),
                     Transaction.status != TransactionStatus.CANCELLED
                 )
-            )
+            ).order_by(Transaction.transaction_date.desc()).limit(1)
             
             result = await self.db.execute(stmt)
             similar = result.scalar_one_or_none()
             
             if similar:
                 logger.warning(
-                    f"Similar transaction detected within {time_window_minutes} "
+                    f"Similar transaction detected within {window} "
                     f"minutes: {similar.transaction_number}"
                 )
                 return similar
         
         return None
     
+    @staticmethod
+    def window_fingerprints(
+        branch_id: UUID,
+        currency_id: UUID,
+        amount: Decimal,
+        customer_id: Optional[UUID],
+        window_minutes: int,
+        now: Optional[datetime] = None
+    ) -> List[str]:
+        """Fingerprints for every minute bucket from now - window to now"""
+        now = now or datetime.utcnow()
+        return [
+            Transaction.compute_fingerprint(
+                branch_id, currency_id, amount, customer_id,
+                now - timedelta(minutes=offset)
+            )
+            for offset in range(window_minutes + 1)
+        ]
+    
     # ==================== ENTITY VALIDATION ====================
     
     async def validate_branch(self, branch_id: UUID) -> Branch:
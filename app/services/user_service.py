@@ -26,16 +26,16 @@ Business Rules:
 6. Superuser flag grants all permissions
 """
 
-from typing import List, Optional, Dict, Any
-from uuid import UUID
+from typing import List, Optional, Dict, Any, Tuple, Set
+from uuid import UUID, uuid4
 from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 
-from app.db.models.user import User
+from app.db.models.user import User, user_roles
 from app.db.models.role import Role
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_password, hash_passwords
 from app.core.exceptions import (
     ValidationError,
     ResourceNotFoundError,
@@ -391,6 +391,9 @@ class UserService:
                 f"Consider deactivating the user instead. Error: {str(e)}"
             )
 
+    # Rows per multi-row INSERT in bulk provisioning
+    BULK_INSERT_BATCH_SIZE = 500
+
     async def bulk_create_users(
         self,
         users_data: List[Dict[str, Any]],
@@ -399,12 +402,21 @@ class UserService:
         """
         Create multiple users in bulk
 
+        Steps:
+        1. Validate required fields and duplicates within the batch
+        2. Prefetch existing emails/usernames and requested roles (two queries)
+        3. Hash all passwords in parallel in a process pool
+        4. Insert users and user_roles rows in batches, one commit
+
         Args:
             users_data: List of user creation data
             current_user: User performing the operation
 
         Returns:
             Dictionary with results: total, successful, failed, errors
+
+        Raises:
+            DatabaseOperationError: If the batch insert fails (nothing is created)
         """
         logger.info(f"Bulk creating {len(users_data)} users")
 
@@ -416,26 +428,122 @@ class UserService:
             "created_users": []
         }
 
+        def reject(idx: int, user_data: Dict[str, Any], error: str) -> None:
+            results["failed"] += 1
+            results["errors"].append({
+                "index": idx,
+                "email": user_data.get("email", "unknown"),
+                "error": error
+            })
+            logger.warning(f"Failed to create user at index {idx}: {error}")
+
+        # 1. Required fields and in-batch duplicates
+        candidates: List[Tuple[int, Dict[str, Any], str, str]] = []
+        batch_emails: Set[str] = set()
+        batch_usernames: Set[str] = set()
+
         for idx, user_data in enumerate(users_data):
+            email = (user_data.get('email') or '').strip().lower()
+            username = (user_data.get('username') or '').strip()
+
             try:
-                # Create user
-                user = await self.create_user(user_data, current_user)
-                results["successful"] += 1
-                results["created_users"].append({
-                    "index": idx,
-                    "email": user.email,
-                    "id": str(user.id)
-                })
+                role_ids = [UUID(str(role_id)) for role_id in user_data.get('role_ids') or []]
+            except ValueError:
+                reject(idx, user_data, "Invalid role ID")
+                continue
 
-            except (ValidationError, DatabaseOperationError) as e:
-                results["failed"] += 1
-                results["errors"].append({
-                    "index": idx,
-                    "email": user_data.get("email", "unknown"),
-                    "error": str(e)
+            if not email or not username or not user_data.get('password'):
+                reject(idx, user_data, "Email, username, and password are required")
+            elif email in batch_emails or username in batch_usernames:
+                reject(idx, user_data, "Email or username duplicated in request")
+            else:
+                batch_emails.add(email)
+                batch_usernames.add(username)
+                candidates.append((idx, {**user_data, 'role_ids': role_ids}, email, username))
+
+        # 2. Prefetch existing users and roles
+        existing_emails, existing_usernames = await self._get_existing_emails_and_usernames(
+            batch_emails, batch_usernames
+        )
+        roles = await self._get_roles_by_ids({
+            role_id for _, user_data, _, _ in candidates
+            for role_id in user_data.get('role_ids') or []
+        })
+
+        accepted = []
+        for idx, user_data, email, username in candidates:
+            missing_roles = [
+                str(role_id) for role_id in user_data.get('role_ids') or []
+                if role_id not in roles
+            ]
+            if email in existing_emails or username in existing_usernames:
+                reject(idx, user_data, "Email or username already exists")
+            elif missing_roles:
+                reject(idx, user_data, f"Role(s) not found: {', '.join(missing_roles)}")
+            else:
+                accepted.append((idx, user_data, email, username))
+
+        results["errors"].sort(key=lambda error: error["index"])
+
+        if not accepted:
+            return results
+
+        # 3. Hash passwords in parallel
+        hashed_passwords = await hash_passwords([user_data['password'] for _, user_data, _, _ in accepted])
+
+        # 4. Batched inserts
+        now = datetime.utcnow()
+        assigned_by = current_user.id if current_user else None
+        user_rows = []
+        role_rows = []
+
+        for (idx, user_data, email, username), hashed_password in zip(accepted, hashed_passwords):
+            user_id = uuid4()
+            user_rows.append({
+                "id": user_id,
+                "email": email,
+                "username": username,
+                "hashed_password": hashed_password,
+                "full_name": user_data.get('full_name', ''),
+                "phone_number": user_data.get('phone_number', user_data.get('phone')),
+                "is_active": user_data.get('is_active', True),
+                "is_superuser": user_data.get('is_superuser', False),
+                "primary_branch_id": user_data.get('primary_branch_id'),
+                "created_at": now,
+                "updated_at": now,
+            })
+            for role_id in dict.fromkeys(user_data.get('role_ids') or []):
+                role_rows.append({
+                    "id": uuid4(),
+                    "user_id": user_id,
+                    "role_id": role_id,
+                    "assigned_at": now,
+                    "assigned_by": assigned_by,
                 })
-                logger.warning(f"Failed to create user at index {idx}: {str(e)}")
-                continue
+
+        try:
+            for start in range(0, len(user_rows), self.BULK_INSERT_BATCH_SIZE):
+                await self.db.execute(
+                    insert(User.__table__),
+                    user_rows[start:start + self.BULK_INSERT_BATCH_SIZE]
+                )
+            for start in range(0, len(role_rows), self.BULK_INSERT_BATCH_SIZE):
+                await self.db.execute(
+                    insert(user_roles),
+                    role_rows[start:start + self.BULK_INSERT_BATCH_SIZE]
+                )
+            await self.db.commit()
+
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Failed to bulk create users: {str(e)}")
+            raise DatabaseOperationError(f"Bulk user creation failed: {str(e)}")
+
+        results["successful"] = len(user_rows)
+        results["created_users"] = [
+            {"index": idx, "email": row["email"], "id": str(row["id"])}
+            for (idx, _, _, _), row in zip(accepted, user_rows)
+        ]
 
         logger.info(
             f"Bulk user creation completed: "
@@ -463,6 +571,14 @@ class UserService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def _get_roles_by_ids(self, role_ids: Set[UUID]) -> Dict[UUID, Role]:
+        """Get roles by ID in one query"""
+        if not role_ids:
+            return {}
+        query = select(Role).where(Role.id.in_(role_ids))
+        result = await self.db.execute(query)
+        return {role.id: role for role in result.scalars().all()}
+
     # ==================== Helper Methods ====================
 
     async def _get_user_by_email_or_username(
@@ -474,3 +590,22 @@ class UserService:
         )
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
+
+    async def _get_existing_emails_and_usernames(
+        self, emails: Set[str], usernames: Set[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """Return which of the given emails/usernames are taken, in one query"""
+        if not emails and not usernames:
+            return set(), set()
+        query = select(User.email, User.username).where(
+            User.email.in_(emails) | User.username.in_(usernames)
+        )
+        result = await self.db.execute(query)
+
+        existing_emails, existing_usernames = set(), set()
+        for email, username in result.all():
+            if email in emails:
+                existing_emails.add(email)
+            if username in usernames:
+                existing_usernames.add(username)
+        return existing_emails, existing_usernames
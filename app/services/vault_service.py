@@ -23,29 +23,37 @@ Critical Operations:
 - Approval workflow enforced for large amounts
 - Comprehensive logging and error handling
 """
-from typing import Optional, List, Dict, Tuple
+import time
+from typing import Optional, List, Dict, Tuple, Iterable
 from datetime import datetime, timedelta
-from decimal import Decimal
-from uuid import UUID
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, or_, func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, or_, case, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload, aliased
 from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
 
 from app.db.models.vault import (
     Vault, VaultBalance, VaultTransfer,
     VaultType, VaultTransferType, VaultTransferStatus,
     VaultTransferNumberGenerator
 )
-from app.db.models.branch import Branch, BranchBalance
-from app.db.models.currency import Currency
+from app.db.models.branch import Branch, BranchBalance, BalanceChangeType
+from app.db.models.currency import Currency, ExchangeRate
 from app.db.models.user import User
 from app.schemas.vault import (
     VaultCreate, VaultUpdate,
     VaultToVaultTransferCreate, VaultToBranchTransferCreate,
     BranchToVaultTransferCreate, TransferApproval,
-    VaultReconciliationRequest
+    VaultReconciliationRequest,
+    CashDistributionRequest, DistributionTargetEnum, DistributionDirectionEnum
 )
+from app.core.config import settings
+from app.core.exceptions import InsufficientBalanceError
+from app.services.audit_service import audit_log_writer
+from app.services.balance_service import BalanceService
 from app.core.constants import (
     TRANSFER_APPROVAL_THRESHOLD,
     MAX_TRANSFER_AMOUNT,
@@ -55,6 +63,164 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+CENT = Decimal('0.01')
+
+
+class VaultStatisticsCache:
+    """
+    In-memory snapshot of vault statistics per vault, with TTL
+
+    Transfers and balance updates made through this process invalidate the
+    vaults they touch; changes made by other workers show up after the TTL.
+    A TTL of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: int = settings.VAULT_STATISTICS_CACHE_SECONDS):
+        self._cache: Dict[UUID, Tuple[Dict, float]] = {}
+        self._ttl = ttl
+
+    def get(self, vault_id: UUID) -> Optional[Dict]:
+        """Get the cached statistics of a vault"""
+        entry = self._cache.get(vault_id)
+        if entry is None:
+            return None
+        stats, stored_at = entry
+        if time.monotonic() - stored_at < self._ttl:
+            return stats
+        del self._cache[vault_id]
+        return None
+
+    def set(self, vault_id: UUID, stats: Dict) -> None:
+        """Cache the statistics of a vault"""
+        if self._ttl > 0:
+            self._cache[vault_id] = (stats, time.monotonic())
+
+    def invalidate(self, *vault_ids: Optional[UUID]) -> None:
+        """Drop the cached statistics of the given vaults"""
+        for vault_id in vault_ids:
+            self._cache.pop(vault_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached statistics"""
+        self._cache.clear()
+
+
+# Global vault statistics cache
+vault_statistics_cache = VaultStatisticsCache()
+
+
+def plan_cash_distribution(
+    positions: Iterable,
+    vault_balances: Dict[UUID, Decimal],
+    target: DistributionTargetEnum = DistributionTargetEnum.THRESHOLD,
+    include_sweeps: bool = True
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Compute branch top-ups and sweeps against balance thresholds in one pass
+
+    Positions below their minimum threshold are topped up and positions
+    above their maximum are swept, based on the available balance (balance
+    minus reserved). Sweeps credit the vault in the same run, so they fund
+    top-ups of their currency; top-ups the vault cannot cover are funded
+    most underfunded first (lowest available / minimum) and the rest is
+    reported as shortfall.
+
+    Args:
+        positions: Rows of (branch_id, branch_code, branch_vault_id,
+            currency_id, currency_code, balance, reserved_balance,
+            minimum_threshold, maximum_threshold)
+        vault_balances: Vault balance per currency_id
+        target: Level top-ups and sweeps bring balances to
+        include_sweeps: Plan sweeps of balances above maximum
+
+    Returns:
+        (plan lines, vault totals per currency)
+    """
+    lines = []
+    for (branch_id, branch_code, branch_vault_id, currency_id, currency_code,
+         balance, reserved_balance, minimum, maximum) in positions:
+        available = balance - (reserved_balance or Decimal('0'))
+        low, high = minimum, maximum
+        if target == DistributionTargetEnum.MIDPOINT and minimum is not None and maximum is not None:
+            low = high = (minimum + maximum) / 2
+
+        if minimum is not None and available < minimum:
+            direction = DistributionDirectionEnum.TOP_UP
+            required = (low - available).quantize(CENT, rounding=ROUND_CEILING)
+        elif include_sweeps and maximum is not None and available > maximum:
+            direction = DistributionDirectionEnum.SWEEP
+            required = (available - high).quantize(CENT, rounding=ROUND_FLOOR)
+        else:
+            continue
+
+        lines.append({
+            'branch_id': branch_id,
+            'branch_code': branch_code,
+            'branch_vault_id': branch_vault_id,
+            'currency_id': currency_id,
+            'currency_code': currency_code,
+            'direction': direction,
+            'available_balance': available,
+            'minimum_threshold': minimum,
+            'maximum_threshold': maximum,
+            'required_amount': required,
+            'planned_amount': Decimal('0'),
+            'transfer_id': None,
+            'transfer_number': None,
+            'skipped_reason': None,
+        })
+
+    totals: Dict[UUID, Dict] = {}
+    for line in lines:
+        totals.setdefault(line['currency_id'], {
+            'currency_id': line['currency_id'],
+            'currency_code': line['currency_code'],
+            'opening_vault_balance': vault_balances.get(line['currency_id'], Decimal('0')),
+            'total_top_ups': Decimal('0'),
+            'total_sweeps': Decimal('0'),
+            'shortfall': Decimal('0'),
+        })
+
+    # Sweeps first: they add to what the vault can hand out
+    for line in lines:
+        if line['direction'] != DistributionDirectionEnum.SWEEP:
+            continue
+        if line['branch_vault_id'] is None:
+            line['skipped_reason'] = "Branch vault not found"
+            continue
+        line['planned_amount'] = line['required_amount']
+        totals[line['currency_id']]['total_sweeps'] += line['required_amount']
+
+    pools = {
+        currency_id: total['opening_vault_balance'] + total['total_sweeps']
+        for currency_id, total in totals.items()
+    }
+    top_ups = sorted(
+        (line for line in lines if line['direction'] == DistributionDirectionEnum.TOP_UP),
+        key=lambda line: (
+            line['available_balance'] / line['minimum_threshold'] if line['minimum_threshold'] else 0,
+            line['branch_code']
+        )
+    )
+    for line in top_ups:
+        total = totals[line['currency_id']]
+        planned = max(min(line['required_amount'], pools[line['currency_id']]), Decimal('0'))
+        pools[line['currency_id']] -= planned
+        line['planned_amount'] = planned
+        total['total_top_ups'] += planned
+        if planned < line['required_amount']:
+            total['shortfall'] += line['required_amount'] - planned
+            if planned == 0:
+                line['skipped_reason'] = "Insufficient vault balance"
+
+    for total in totals.values():
+        total['closing_vault_balance'] = (
+            total['opening_vault_balance'] + total['total_sweeps'] - total['total_top_ups']
+        )
+
+    lines.sort(key=lambda line: (line['branch_code'], line['currency_code']))
+    return lines, sorted(totals.values(), key=lambda total: total['currency_code'])
+
 
 class VaultService:
     """Service for vault operations"""
@@ -322,6 +488,7 @@ class VaultService:
         balance.last_updated = datetime.utcnow()
         await self.db.commit()
         await self.db.refresh(balance)
+        vault_statistics_cache.invalidate(vault_id)
 
         return balance
     
@@ -416,15 +583,11 @@ class VaultService:
             transfer.approved_by = user.id
             transfer.approved_at = datetime.utcnow()
 
+        # Record and (if approved) execute in one unit of work
         self.db.add(transfer)
-        await self.db.commit()
-        await self.db.refresh(transfer)
-
-        # Execute transfer if approved
-        if transfer.status == VaultTransferStatus.IN_TRANSIT:
-            await self._execute_vault_transfer(transfer)
-
-        return transfer
+        return await self._save_transfer(
+            transfer, execute=transfer.status == VaultTransferStatus.IN_TRANSIT
+        )
     
     async def transfer_to_branch(
         self,
@@ -498,11 +661,11 @@ class VaultService:
             transfer.approved_by = user.id
             transfer.approved_at = datetime.utcnow()
 
+        # Record and (if approved) execute in one unit of work
         self.db.add(transfer)
-        await self.db.commit()
-        await self.db.refresh(transfer)
-
-        return transfer
+        return await self._save_transfer(
+            transfer, execute=transfer.status == VaultTransferStatus.IN_TRANSIT
+        )
     
     async def transfer_from_branch(
         self,
@@ -577,10 +740,7 @@ class VaultService:
         )
 
         self.db.add(transfer)
-        await self.db.commit()
-        await self.db.refresh(transfer)
-
-        return transfer
+        return await self._save_transfer(transfer)
     
     # ==================== TRANSFER WORKFLOW ====================
     
@@ -619,18 +779,13 @@ class VaultService:
             transfer.status = VaultTransferStatus.IN_TRANSIT
             transfer.approved_by = user.id
             transfer.approved_at = datetime.utcnow()
-
-            # Execute the transfer
-            await self._execute_vault_transfer(transfer)
         else:
             transfer.status = VaultTransferStatus.CANCELLED
             transfer.rejection_reason = approval_data.notes
             transfer.cancelled_at = datetime.utcnow()
 
-        await self.db.commit()
-        await self.db.refresh(transfer)
-
-        return transfer
+        # Execute the transfer (if approved) with the status change
+        return await self._save_transfer(transfer, execute=approval_data.approved)
     
     async def complete_transfer(
         self,
@@ -661,6 +816,7 @@ class VaultService:
 
         await self.db.commit()
         await self.db.refresh(transfer)
+        vault_statistics_cache.invalidate(transfer.from_vault_id, transfer.to_vault_id)
 
         return transfer
 
@@ -689,75 +845,153 @@ class VaultService:
             )
 
         # Reverse balance changes if already executed
-        if transfer.status == VaultTransferStatus.IN_TRANSIT:
-            await self._reverse_vault_transfer(transfer)
+        executed = transfer.status == VaultTransferStatus.IN_TRANSIT
 
         transfer.status = VaultTransferStatus.CANCELLED
         transfer.rejection_reason = reason
         transfer.cancelled_at = datetime.utcnow()
 
-        await self.db.commit()
-        await self.db.refresh(transfer)
+        return await self._save_transfer(transfer, reverse=executed)
+    
+    # ==================== TRANSFER EXECUTION ====================
+
+    async def _save_transfer(
+        self,
+        transfer: VaultTransfer,
+        execute: bool = False,
+        reverse: bool = False
+    ) -> VaultTransfer:
+        """
+        Persist a transfer and its balance moves with a single commit
+
+        Args:
+            transfer: New or changed transfer (already added to the session)
+            execute: Move the transfer amount from source to destination
+            reverse: Move the transfer amount back (cancelled in transit)
+
+        Returns:
+            The refreshed transfer
+        """
+        try:
+            await self.db.flush()
+            if execute or reverse:
+                await self._apply_transfer_legs([transfer], reverse=reverse)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
 
+        vault_statistics_cache.invalidate(transfer.from_vault_id, transfer.to_vault_id)
+        await self.db.refresh(transfer)
         return transfer
-    
-    async def _execute_vault_transfer(self, transfer: VaultTransfer):
-        """Execute the actual balance changes for a transfer"""
-        # Deduct from source vault
-        await self.update_vault_balance(
-            transfer.from_vault_id,
-            transfer.currency_id,
-            transfer.amount,
-            operation='subtract'
-        )
 
-        # Add to destination (vault or branch)
-        if transfer.to_vault_id:
-            await self.update_vault_balance(
-                transfer.to_vault_id,
-                transfer.currency_id,
-                transfer.amount,
-                operation='add'
-            )
-        elif transfer.to_branch_id:
-            # Update branch balance
-            from app.services.branch_service import BranchService
-            branch_service = BranchService(self.db)
-            await branch_service.update_branch_balance(
-                transfer.to_branch_id,
-                transfer.currency_id,
-                transfer.amount,
-                operation='add'
-            )
-
-    async def _reverse_vault_transfer(self, transfer: VaultTransfer):
-        """Reverse a transfer (for cancellations)"""
-        # Add back to source vault
-        await self.update_vault_balance(
-            transfer.from_vault_id,
-            transfer.currency_id,
-            transfer.amount,
-            operation='add'
-        )
+    async def _apply_transfer_legs(
+        self,
+        transfers: Iterable[VaultTransfer],
+        reverse: bool = False
+    ) -> None:
+        """
+        Move the balances of transfers inside the current transaction
+
+        Legs are netted per (vault or branch, currency) and applied in a
+        fixed order, so concurrent transfers cannot deadlock:
+        1. Vault balances in (vault_id, currency_id) order, each with one
+           conditional UPDATE that takes the row lock and refuses to go
+           negative; a credit to a missing row is an upsert instead
+        2. Branch balances through BalanceService.apply_balance_changes,
+           which locks them in (branch_id, currency_id) order with one
+           SELECT ... FOR UPDATE and writes history in one INSERT
+
+        Raises:
+            HTTPException: 400 if a source balance is insufficient
+        """
+        vault_deltas: Dict[Tuple[UUID, UUID], Decimal] = {}
+        branch_changes = []
+
+        def branch_leg(transfer: VaultTransfer, branch_id: UUID, amount: Decimal) -> Dict:
+            return {
+                'branch_id': branch_id,
+                'currency_id': transfer.currency_id,
+                'amount': amount,
+                'change_type': (
+                    BalanceChangeType.TRANSFER_IN if amount > 0
+                    else BalanceChangeType.TRANSFER_OUT
+                ),
+                'reference_id': transfer.id,
+                'reference_type': 'vault_transfer',
+                'performed_by': transfer.approved_by,
+                'notes': (
+                    f"{'Reversed v' if reverse else 'V'}ault transfer {transfer.transfer_number}"
+                ),
+            }
+
+        for transfer in transfers:
+            amount = -transfer.amount if reverse else transfer.amount
 
-        # Deduct from destination
-        if transfer.to_vault_id:
-            await self.update_vault_balance(
-                transfer.to_vault_id,
-                transfer.currency_id,
-                transfer.amount,
-                operation='subtract'
-            )
-        elif transfer.to_branch_id:
-            from app.services.branch_service import BranchService
-            branch_service = BranchService(self.db)
-            await branch_service.update_branch_balance(
-                transfer.to_branch_id,
-                transfer.currency_id,
-                transfer.amount,
-                operation='subtract'
+            # Sweeps move the branch's cash balance, not the branch vault's
+            if transfer.from_branch_id:
+                branch_changes.append(branch_leg(transfer, transfer.from_branch_id, -amount))
+            else:
+                source = (transfer.from_vault_id, transfer.currency_id)
+                vault_deltas[source] = vault_deltas.get(source, Decimal('0')) - amount
+
+            if transfer.to_vault_id:
+                target = (transfer.to_vault_id, transfer.currency_id)
+                vault_deltas[target] = vault_deltas.get(target, Decimal('0')) + amount
+            elif transfer.to_branch_id:
+                branch_changes.append(branch_leg(transfer, transfer.to_branch_id, amount))
+
+        now = datetime.utcnow()
+        for (vault_id, currency_id), delta in sorted(
+            vault_deltas.items(), key=lambda item: (str(item[0][0]), str(item[0][1]))
+        ):
+            if delta == 0:
+                continue
+            updated = (await self.db.execute(
+                update(VaultBalance)
+                .where(
+                    VaultBalance.vault_id == vault_id,
+                    VaultBalance.currency_id == currency_id,
+                    VaultBalance.balance + delta >= 0
+                )
+                .values(balance=VaultBalance.balance + delta, last_updated=now, updated_at=now)
+                .returning(VaultBalance.balance)
+            )).one_or_none()
+            if updated is not None:
+                continue
+            if delta < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Insufficient balance in vault"
+                )
+
+            # First credit of this currency: create the row (or add to one
+            # created concurrently)
+            stmt = pg_insert(VaultBalance).values(
+                vault_id=vault_id,
+                currency_id=currency_id,
+                balance=delta,
+                last_updated=now
             )
-    
+            stmt = stmt.on_conflict_do_update(
+                constraint='uq_vault_currency',
+                set_={
+                    'balance': VaultBalance.balance + stmt.excluded.balance,
+                    'last_updated': now,
+                    'updated_at': now,
+                }
+            )
+            await self.db.execute(stmt)
+
+        if branch_changes:
+            try:
+                await BalanceService(self.db).apply_balance_changes(branch_changes)
+            except InsufficientBalanceError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Insufficient balance in branch"
+                )
+
     def _can_approve_transfer(self, user: User) -> bool:
         """Check if user can approve transfers"""
         # Check for manager or admin role (lowercase as defined in DEFAULT_ROLES)
@@ -766,6 +1000,169 @@ class VaultService:
             for role in user.roles
         )
     
+    # ==================== CASH DISTRIBUTION ====================
+
+    async def distribute_cash(
+        self,
+        request: CashDistributionRequest,
+        user: User
+    ) -> Dict:
+        """
+        Plan branch top-ups and sweeps from a vault, optionally executing them
+
+        All branch balances with thresholds are read in one query and the
+        plan is computed in one pass (see plan_cash_distribution). An
+        executed plan is one transfer run: one transfer number block, one
+        batched insert of the transfers and one pass of balance legs, all
+        committed together. Executed runs are written to the audit log with
+        their full plan.
+
+        Args:
+            request: Scope, target level and whether to execute
+            user: User running the distribution (approves every transfer)
+
+        Returns:
+            The plan document (with transfer numbers when executed)
+
+        Raises:
+            HTTPException: 403 if the user cannot approve transfers, 400 if a
+                balance moved below a planned amount before execution
+        """
+        if request.execute and not self._can_approve_transfer(user):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions to execute a distribution run"
+            )
+
+        if request.vault_id:
+            vault = await self.get_vault_by_id(request.vault_id)
+        else:
+            vault = await self.get_main_vault()
+
+        branch_vault = aliased(Vault)
+        query = (
+            select(
+                BranchBalance.branch_id, Branch.code, branch_vault.id,
+                BranchBalance.currency_id, Currency.code,
+                BranchBalance.balance, BranchBalance.reserved_balance,
+                BranchBalance.minimum_threshold, BranchBalance.maximum_threshold
+            )
+            .join(Branch, Branch.id == BranchBalance.branch_id)
+            .join(Currency, Currency.id == BranchBalance.currency_id)
+            .outerjoin(branch_vault, and_(
+                branch_vault.branch_id == Branch.id,
+                branch_vault.vault_type == VaultType.BRANCH,
+                branch_vault.is_active == True
+            ))
+            .where(
+                Branch.is_active == True,
+                BranchBalance.is_active == True,
+                or_(
+                    BranchBalance.minimum_threshold.isnot(None),
+                    BranchBalance.maximum_threshold.isnot(None)
+                )
+            )
+            .order_by(BranchBalance.branch_id, BranchBalance.currency_id)
+        )
+        balance_query = select(VaultBalance.currency_id, VaultBalance.balance).where(
+            VaultBalance.vault_id == vault.id
+        ).order_by(VaultBalance.currency_id)
+
+        if request.currency_ids:
+            query = query.where(BranchBalance.currency_id.in_(request.currency_ids))
+            balance_query = balance_query.where(VaultBalance.currency_id.in_(request.currency_ids))
+        if request.branch_ids:
+            query = query.where(BranchBalance.branch_id.in_(request.branch_ids))
+        if request.execute:
+            # Plan on locked balances, in the order the legs lock them
+            balance_query = balance_query.with_for_update()
+            query = query.with_for_update(of=BranchBalance)
+
+        vault_balances = dict((await self.db.execute(balance_query)).all())
+        positions = (await self.db.execute(query)).all()
+
+        lines, currencies = plan_cash_distribution(
+            positions, vault_balances, request.target, request.include_sweeps
+        )
+        planned = [line for line in lines if line['planned_amount'] > 0]
+
+        plan = {
+            'plan_id': uuid4(),
+            'vault_id': vault.id,
+            'vault_code': vault.vault_code,
+            'target': request.target,
+            'executed': request.execute and bool(planned),
+            'created_by': user.id,
+            'created_at': datetime.utcnow(),
+            'transfer_count': 0,
+            'lines': lines,
+            'currencies': currencies,
+            'notes': request.notes,
+        }
+
+        if not plan['executed']:
+            if request.execute:
+                await self.db.rollback()   # release the row locks
+            return plan
+
+        try:
+            numbers = await VaultTransferNumberGenerator.generate_block(self.db, len(planned))
+            notes = f"Cash distribution {plan['plan_id']}"
+            if request.notes:
+                notes = f"{notes}: {request.notes}"
+
+            transfers = []
+            for line, number in zip(planned, numbers):
+                transfer = VaultTransfer(
+                    id=uuid4(),
+                    transfer_number=number,
+                    currency_id=line['currency_id'],
+                    amount=line['planned_amount'],
+                    status=VaultTransferStatus.IN_TRANSIT,
+                    initiated_by=user.id,
+                    approved_by=user.id,
+                    approved_at=plan['created_at'],
+                    notes=notes
+                )
+                if line['direction'] == DistributionDirectionEnum.TOP_UP:
+                    transfer.transfer_type = VaultTransferType.VAULT_TO_BRANCH
+                    transfer.from_vault_id = vault.id
+                    transfer.to_branch_id = line['branch_id']
+                else:
+                    transfer.transfer_type = VaultTransferType.BRANCH_TO_VAULT
+                    transfer.from_vault_id = line['branch_vault_id']
+                    transfer.from_branch_id = line['branch_id']
+                    transfer.to_vault_id = vault.id
+                line['transfer_id'] = transfer.id
+                line['transfer_number'] = number
+                transfers.append(transfer)
+
+            self.db.add_all(transfers)
+            await self.db.flush()
+            await self._apply_transfer_legs(transfers)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        vault_statistics_cache.invalidate(
+            *{t.from_vault_id for t in transfers}, *{t.to_vault_id for t in transfers}
+        )
+        plan['transfer_count'] = len(transfers)
+        audit_log_writer.log(
+            action="cash_distribution",
+            entity_type="vault",
+            user_id=user.id,
+            entity_id=vault.id,
+            changes=jsonable_encoder(plan),
+            description=f"Cash distribution {plan['plan_id']}: {len(transfers)} transfers"
+        )
+        logger.info(
+            f"Cash distribution {plan['plan_id']} from vault {vault.vault_code}: "
+            f"{len(transfers)} transfers ({numbers[0]} - {numbers[-1]})"
+        )
+        return plan
+
     # ==================== TRANSFER HISTORY ====================
     
     async def get_transfer_history(
@@ -876,53 +1273,92 @@ class VaultService:
     
     # ==================== STATISTICS & REPORTING ====================
     
-    async def get_vault_statistics(self, vault_id: UUID) -> Dict:
-        """Get comprehensive vault statistics"""
+    async def get_vault_statistics(self, vault_id: UUID, use_cache: bool = True) -> Dict:
+        """
+        Get comprehensive vault statistics
+
+        Currency count, USD valuation, pending transfer counts and the last
+        transfer date come from one aggregate query; balances are valued in
+        SQL with the current rate to USD (or the inverse of USD to the
+        currency), currencies without a rate are left out.
+
+        Args:
+            vault_id: Vault ID
+            use_cache: Serve the cached snapshot if one is fresh
+
+        Returns:
+            Vault statistics
+        """
+        if use_cache:
+            cached = vault_statistics_cache.get(vault_id)
+            if cached is not None:
+                return cached
+
         vault = await self.get_vault_by_id(vault_id)
-        balances = await self.get_vault_balance(vault_id)
 
-        # Count pending transfers
-        pending_in_stmt = select(func.count()).select_from(VaultTransfer).filter(
-            VaultTransfer.to_vault_id == vault_id,
-            VaultTransfer.status.in_([
-                VaultTransferStatus.PENDING,
-                VaultTransferStatus.IN_TRANSIT
-            ])
-        )
-        pending_in_result = await self.db.execute(pending_in_stmt)
-        pending_in = pending_in_result.scalar()
-
-        pending_out_stmt = select(func.count()).select_from(VaultTransfer).filter(
-            VaultTransfer.from_vault_id == vault_id,
-            VaultTransfer.status.in_([
-                VaultTransferStatus.PENDING,
-                VaultTransferStatus.IN_TRANSIT
-            ])
-        )
-        pending_out_result = await self.db.execute(pending_out_stmt)
-        pending_out = pending_out_result.scalar()
+        now = datetime.utcnow()
+        usd_id = select(Currency.id).where(Currency.code == 'USD').scalar_subquery()
+
+        def current_rate(from_currency_id, to_currency_id):
+            return (
+                select(ExchangeRate.rate)
+                .where(
+                    ExchangeRate.from_currency_id == from_currency_id,
+                    ExchangeRate.to_currency_id == to_currency_id,
+                    ExchangeRate.effective_from <= now,
+                    or_(ExchangeRate.effective_to.is_(None), ExchangeRate.effective_to > now)
+                )
+                .order_by(ExchangeRate.effective_from.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
 
-        # Get last transfer date
-        last_transfer_stmt = select(VaultTransfer).filter(
+        usd_value = case(
+            (VaultBalance.currency_id == usd_id, VaultBalance.balance),
+            else_=func.coalesce(
+                VaultBalance.balance * current_rate(VaultBalance.currency_id, usd_id),
+                VaultBalance.balance / current_rate(usd_id, VaultBalance.currency_id)
+            )
+        )
+        balances = select(
+            func.count().label('currency_count'),
+            func.coalesce(func.sum(usd_value), 0).label('total_usd')
+        ).where(VaultBalance.vault_id == vault_id).subquery()
+
+        open_transfer = VaultTransfer.status.in_([
+            VaultTransferStatus.PENDING,
+            VaultTransferStatus.IN_TRANSIT
+        ])
+        transfers = select(
+            func.count().filter(
+                and_(VaultTransfer.to_vault_id == vault_id, open_transfer)
+            ).label('pending_in'),
+            func.count().filter(
+                and_(VaultTransfer.from_vault_id == vault_id, open_transfer)
+            ).label('pending_out'),
+            func.max(VaultTransfer.initiated_at).label('last_transfer_date')
+        ).where(
             or_(
                 VaultTransfer.from_vault_id == vault_id,
                 VaultTransfer.to_vault_id == vault_id
             )
-        ).order_by(VaultTransfer.initiated_at.desc()).limit(1)
-        last_transfer_result = await self.db.execute(last_transfer_stmt)
-        last_transfer = last_transfer_result.scalar_one_or_none()
+        ).subquery()
 
-        return {
+        row = (await self.db.execute(select(balances, transfers))).one()
+
+        stats = {
             'vault_id': vault.id,
             'vault_code': vault.vault_code,
             'vault_name': vault.name,
-            'total_balance_usd_equivalent': await self.get_vault_total_value_usd(vault_id),
-            'currency_count': len(balances),
-            'pending_transfers_in': pending_in,
-            'pending_transfers_out': pending_out,
-            'last_transfer_date': last_transfer.initiated_at if last_transfer else None,
+            'total_balance_usd_equivalent': Decimal(row.total_usd),
+            'currency_count': row.currency_count,
+            'pending_transfers_in': row.pending_in,
+            'pending_transfers_out': row.pending_out,
+            'last_transfer_date': row.last_transfer_date,
             'last_reconciliation_date': None  # Would track this separately
         }
+        vault_statistics_cache.set(vault_id, stats)
+        return stats
     
     async def get_transfer_summary(
         self,
@@ -930,42 +1366,95 @@ class VaultService:
         period_start: Optional[datetime] = None,
         period_end: Optional[datetime] = None
     ) -> Dict:
-        """Get transfer summary statistics"""
+        """
+        Get transfer summary statistics
+
+        Counts per status and completed amounts are aggregated in SQL
+        (COUNT/SUM ... FILTER) per currency and transfer type in one query;
+        the few resulting rows are folded into totals, by_currency and
+        by_type.
+        """
         if not period_start:
             period_start = datetime.utcnow() - timedelta(days=30)
         if not period_end:
             period_end = datetime.utcnow()
 
-        stmt = select(VaultTransfer).filter(
-            VaultTransfer.initiated_at.between(period_start, period_end)
+        completed = VaultTransfer.status == VaultTransferStatus.COMPLETED
+        stmt = (
+            select(
+                VaultTransfer.currency_id,
+                Currency.code.label('currency_code'),
+                VaultTransfer.transfer_type,
+                func.count().label('total'),
+                func.count().filter(completed).label('completed'),
+                func.count().filter(
+                    VaultTransfer.status == VaultTransferStatus.PENDING
+                ).label('pending'),
+                func.count().filter(
+                    VaultTransfer.status == VaultTransferStatus.CANCELLED
+                ).label('cancelled'),
+                func.coalesce(
+                    func.sum(VaultTransfer.amount).filter(completed), 0
+                ).label('amount')
+            )
+            .join(Currency, Currency.id == VaultTransfer.currency_id)
+            .where(VaultTransfer.initiated_at.between(period_start, period_end))
+            .group_by(VaultTransfer.currency_id, Currency.code, VaultTransfer.transfer_type)
         )
 
         if vault_id:
-            stmt = stmt.filter(
+            stmt = stmt.where(
                 or_(
                     VaultTransfer.from_vault_id == vault_id,
                     VaultTransfer.to_vault_id == vault_id
                 )
             )
 
-        result = await self.db.execute(stmt)
-        transfers = list(result.scalars().all())
-
-        total_count = len(transfers)
-        completed = sum(1 for t in transfers if t.status == VaultTransferStatus.COMPLETED)
-        pending = sum(1 for t in transfers if t.status == VaultTransferStatus.PENDING)
-        cancelled = sum(1 for t in transfers if t.status == VaultTransferStatus.CANCELLED)
-
-        total_amount = sum(t.amount for t in transfers if t.status == VaultTransferStatus.COMPLETED)
-        avg_amount = total_amount / completed if completed > 0 else Decimal('0.00')
+        rows = (await self.db.execute(stmt)).all()
+
+        total_count = completed_count = pending = cancelled = 0
+        total_amount = Decimal('0.00')
+        by_currency: Dict[UUID, Dict] = {}
+        by_type: Dict[str, Dict] = {}
+
+        for row in rows:
+            total_count += row.total
+            completed_count += row.completed
+            pending += row.pending
+            cancelled += row.cancelled
+            total_amount += row.amount
+
+            currency = by_currency.setdefault(row.currency_id, {
+                'currency_id': row.currency_id,
+                'currency_code': row.currency_code,
+                'total_transfers': 0,
+                'completed_transfers': 0,
+                'total_amount_transferred': Decimal('0.00'),
+            })
+            currency['total_transfers'] += row.total
+            currency['completed_transfers'] += row.completed
+            currency['total_amount_transferred'] += row.amount
+
+            transfer_type = getattr(row.transfer_type, 'value', row.transfer_type)
+            by_kind = by_type.setdefault(transfer_type, {
+                'transfer_type': transfer_type,
+                'total_transfers': 0,
+                'completed_transfers': 0,
+            })
+            by_kind['total_transfers'] += row.total
+            by_kind['completed_transfers'] += row.completed
+
+        avg_amount = total_amount / completed_count if completed_count > 0 else Decimal('0.00')
 
         return {
             'period_start': period_start,
             'period_end': period_end,
             'total_transfers': total_count,
-            'completed_transfers': completed,
+            'completed_transfers': completed_count,
             'pending_transfers': pending,
             'cancelled_transfers': cancelled,
             'total_amount_transferred': total_amount,
-            'average_transfer_amount': avg_amount
+            'average_transfer_amount': avg_amount,
+            'by_currency': sorted(by_currency.values(), key=lambda c: c['currency_code']),
+            'by_type': sorted(by_type.values(), key=lambda t: t['transfer_type'])
         }
@@ -0,0 +1,99 @@
+"""
+Cron Expressions
+Five-field cron schedules (minute hour day-of-month month day-of-week)
+
+Supports `*`, values, ranges (`1-5`), steps (`*/15`, `8-18/2`) and comma
+lists. Day of week is 0-6 from Sunday (7 is also Sunday). As in Vixie cron,
+when both day fields are restricted a day matching either one runs.
+Times are naive UTC, to the minute.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import List, Set
+
+# (name, min, max) of the five fields
+CRON_FIELDS = [
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day of month', 1, 31),
+    ('month', 1, 12),
+    ('day of week', 0, 7),
+]
+
+# Longest gap between two runs to search (covers Feb 29 schedules)
+MAX_SEARCH_DAYS = 366 * 8
+
+
+def _parse_field(spec: str, name: str, low: int, high: int) -> Set[int]:
+    """Values of one cron field"""
+    values: Set[int] = set()
+    for part in spec.split(','):
+        base, _, step_text = part.partition('/')
+        try:
+            step = int(step_text) if step_text else 1
+            if base == '*':
+                start, end = low, high
+            elif '-' in base:
+                start, end = (int(bound) for bound in base.split('-', 1))
+            else:
+                start = int(base)
+                end = high if step_text else start
+        except ValueError:
+            raise ValueError(f"Invalid {name} field: '{spec}'")
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Invalid {name} field: '{spec}' (allowed {low}-{high})")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """A parsed cron schedule"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(
+                f"Cron expression must have 5 fields (minute hour day month weekday): '{expression}'"
+            )
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            _parse_field(spec, *field) for spec, field in zip(fields, CRON_FIELDS)
+        )
+        self.minutes: List[int] = sorted(minutes)
+        self.hours: List[int] = sorted(hours)
+        self.days = days
+        self.months = months
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday_match
+        if self._any_weekday:
+            return day_match
+        return day_match or weekday_match
+
+    def next_after(self, after: datetime) -> datetime:
+        """First run time strictly after `after`"""
+        start = (after + timedelta(minutes=1)).replace(second=0, microsecond=0)
+        day = start.date()
+        for _ in range(MAX_SEARCH_DAYS):
+            if self._day_matches(day):
+                first_day = day == start.date()
+                for hour in self.hours:
+                    if first_day and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        if first_day and hour == start.hour and minute < start.minute:
+                            continue
+                        return datetime.combine(day, time(hour, minute))
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never runs: '{self.expression}'")
+
+    def __repr__(self) -> str:
+        return f"<CronExpression('{self.expression}')>"
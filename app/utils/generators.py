@@ -25,6 +25,26 @@ def generate_customer_number() -> str:
     return f"CUS-{date_part}-{random_part}"
 
 
+def format_customer_number(sequence_value: int, on_date: Optional[datetime] = None) -> str:
+    """
+    Format a customer number from the customer_number_seq sequence
+    Format: CUS-YYMMDD-NNNNNN
+    Example: CUS-250110-000042
+    
+    Used by bulk import, which allocates numbers in blocks from the
+    sequence instead of probing random numbers one by one.
+    
+    Args:
+        sequence_value: Value taken from customer_number_seq
+        on_date: Registration date (default: today)
+        
+    Returns:
+        str: Formatted customer number
+    """
+    date_part = (on_date or datetime.now()).strftime("%y%m%d")
+    return f"CUS-{date_part}-{sequence_value:06d}"
+
+
 def generate_transaction_reference() -> str:
     """
     Generate unique transaction reference
@@ -4,9 +4,12 @@ Shared test fixtures for CEMS
 """
 
 import asyncio
+from types import SimpleNamespace
 from typing import AsyncGenerator, Generator
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import Insert
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import NullPool
 
@@ -256,6 +259,197 @@ async def reset_db(db_session: AsyncSession):
     # Cleanup will happen in db_session fixture
 
 
+# ==================== Fake Sessions ====================
+
+class FakeResult:
+    """
+    Result stand-in
+
+    value answers the single-row and scalar accessors, rows the list ones
+    and partitions the streamed (yield_per) ones.
+    """
+
+    def __init__(self, value=None, rows=None, partitions=None, rowcount=0):
+        self._value = value
+        self._rows = rows or []
+        self._partitions = partitions or []
+        self.rowcount = rowcount
+        self.closed = False
+
+    def scalar(self):
+        return self._value
+
+    def scalar_one(self):
+        return self._value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+    def one(self):
+        return self._value
+
+    def one_or_none(self):
+        return self._value
+
+    def all(self):
+        return self._rows
+
+    def scalars(self):
+        return self
+
+    def partitions(self):
+        yield from self._partitions
+
+    def close(self):
+        self.closed = True
+
+
+class FakeQuery:
+    """Legacy Query stand-in: filters chain, first() and all() return the given values"""
+
+    def __init__(self, first=None, rows=None):
+        self._first = first
+        self._rows = rows or []
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self._first
+
+    def all(self):
+        return self._rows
+
+
+class FakeSyncSession:
+    """
+    Session stand-in recording what a service does with it
+
+    execute() records the statement and its params and returns the next
+    queued result; a queued exception is raised instead and a queued
+    callable is called with (statement, params). Once the queue is empty,
+    default is used (an empty FakeResult unless given). query() returns the
+    next queued FakeQuery, get() looks objects up by key and flush() gives
+    added objects sequential ids.
+    """
+
+    def __init__(self, *results, default=None, queries=(), objects=None):
+        self.results = list(results)
+        self.default = FakeResult() if default is None else default
+        self.queries = list(queries)
+        self.objects = dict(objects or {})
+        self.statements = []
+        self.params = []
+        self.added = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+        self.info = {}
+
+    def _execute(self, statement, params):
+        self.statements.append(statement)
+        self.params.append(params)
+        result = self.results.pop(0) if self.results else self.default
+        if isinstance(result, Exception):
+            raise result
+        if callable(result):
+            return result(statement, params)
+        return result
+
+    def _flush(self):
+        for number, obj in enumerate(self.added, start=1):
+            obj.id = getattr(obj, "id", None) or number
+
+    def inserts(self):
+        """(table name, rows) of every INSERT executed"""
+        return [
+            (statement.table.name, list(params or []))
+            for statement, params in zip(self.statements, self.params)
+            if isinstance(statement, Insert)
+        ]
+
+    def execute(self, statement, params=None):
+        return self._execute(statement, params)
+
+    def query(self, *entities):
+        return self.queries.pop(0)
+
+    def get(self, model, key):
+        return self.objects.get(key)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def add_all(self, objects):
+        self.added.extend(objects)
+
+    def flush(self):
+        self._flush()
+
+    def refresh(self, obj):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession(FakeSyncSession):
+    """AsyncSession flavour of FakeSyncSession; begin() and `async with` yield itself"""
+
+    async def execute(self, statement, params=None):
+        return self._execute(statement, params)
+
+    async def get(self, model, key):
+        return self.objects.get(key)
+
+    async def flush(self):
+        self._flush()
+
+    async def refresh(self, obj):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def close(self):
+        self.closed = True
+
+    def begin(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def compile_sql(statement) -> str:
+    """Statement rendered for PostgreSQL as executed, parameters left as placeholders"""
+    return str(statement.compile(dialect=postgresql.dialect())).replace("%%", "%")
+
+
+@pytest.fixture
+def fakes():
+    """Builders for database-free unit tests"""
+    return SimpleNamespace(
+        session=FakeSession,
+        sync_session=FakeSyncSession,
+        result=FakeResult,
+        query=FakeQuery,
+        sql=compile_sql,
+    )
+
+
 # ==================== Pytest Hooks ====================
 
 def pytest_configure(config):
@@ -0,0 +1,94 @@
+"""
+Unit Tests for the batched audit log writer
+Uses a fake session factory, no database required
+"""
+
+import json
+
+import pytest
+from sqlalchemy.exc import DataError
+
+from app.services.audit_service import AuditLogWriter
+
+
+def make_writer(fakes, tmp_path, sink, fail=False, **kwargs):
+    """Writer whose sessions append each inserted batch to sink"""
+
+    def insert(statement, rows):
+        if any(row["action"] == "poison" for row in rows):
+            raise DataError("INSERT INTO audit_logs", {}, Exception("value too long"))
+        sink.append(list(rows))
+
+    outcome = RuntimeError("database unavailable") if fail else insert
+    return AuditLogWriter(
+        session_factory=lambda: fakes.session(default=outcome),
+        spill_dir=str(tmp_path),
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+async def test_flush_writes_queued_entries_in_batches(fakes, tmp_path):
+    """Queued entries are written with one statement per batch"""
+    batches = []
+    writer = make_writer(fakes, tmp_path, batches, batch_size=2)
+
+    for i in range(5):
+        assert writer.log(action="access", entity_type="http_request", description=f"req {i}")
+
+    written = await writer.flush()
+
+    assert written == 5
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0]["action"] == "access"
+    assert batches[0][0]["timestamp"] is not None
+
+
+@pytest.mark.unit
+async def test_full_queue_spills_to_disk(fakes, tmp_path):
+    """Entries that do not fit in the queue are spilled, not dropped"""
+    writer = make_writer(fakes, tmp_path, [], max_queue_size=1)
+
+    assert writer.log(action="access", entity_type="http_request") is True
+    assert writer.log(action="access", entity_type="http_request") is False
+
+    spill_file = tmp_path / "audit_spill.jsonl"
+    lines = spill_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["action"] == "access"
+    assert writer.stats()["spilled"] == 1
+
+
+@pytest.mark.unit
+async def test_failed_batch_is_spilled_and_replayed(fakes, tmp_path):
+    """A failed insert spills the batch; replay writes it once the DB is back"""
+    batches = []
+    failing = make_writer(fakes, tmp_path, batches, fail=True)
+    failing.log(action="login", entity_type="security")
+
+    assert await failing.flush() == 0
+    assert failing.stats()["failed_batches"] == 1
+
+    healthy = make_writer(fakes, tmp_path, batches)
+    await healthy._replay_spill()
+
+    assert len(batches) == 1
+    assert batches[0][0]["action"] == "login"
+    assert not (tmp_path / "audit_spill.jsonl").exists()
+
+
+@pytest.mark.unit
+async def test_poison_row_is_quarantined_and_the_rest_written(fakes, tmp_path):
+    """A row the database rejects does not block the rest of its batch"""
+    batches = []
+    writer = make_writer(fakes, tmp_path, batches, batch_size=10)
+    for action in ("login", "poison", "logout"):
+        writer.log(action=action, entity_type="security")
+
+    assert await writer.flush() == 2
+
+    assert [batch[0]["action"] for batch in batches] == ["login", "logout"]
+    quarantined = (tmp_path / "audit_quarantine.jsonl").read_text().splitlines()
+    assert [json.loads(line)["action"] for line in quarantined] == ["poison"]
+    assert not (tmp_path / "audit_spill.jsonl").exists()
+    assert writer.stats()["quarantined"] == 1
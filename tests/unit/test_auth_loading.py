@@ -0,0 +1,94 @@
+"""
+Unit Tests for relationship loading on the authentication path
+Guards against eager-load cascades between users and roles
+"""
+
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.core.security import create_access_token
+from app.db.models.audit import AuditLog
+from app.db.models.role import Role
+from app.db.models.user import User
+
+
+EAGER_STRATEGIES = {"joined", "selectin", "subquery", "immediate"}
+
+
+def eager_graph(model):
+    """Return (source, relationship) pairs reachable through eager loaders"""
+    seen, edges, pending = set(), [], [model]
+    while pending:
+        mapper = inspect(pending.pop())
+        if mapper in seen:
+            continue
+        seen.add(mapper)
+        for rel in mapper.relationships:
+            if rel.lazy in EAGER_STRATEGIES:
+                edges.append((mapper.class_.__name__, rel.key))
+                pending.append(rel.mapper.class_)
+    return edges
+
+
+# ==================== Loader Strategy Audit ====================
+
+@pytest.mark.unit
+def test_user_eager_graph_stops_at_roles():
+    """Loading a user eagerly loads its roles and nothing beyond them"""
+    assert eager_graph(User) == [("User", "roles")]
+
+
+@pytest.mark.unit
+def test_role_members_are_never_loaded_implicitly():
+    """Role.users must be queried explicitly"""
+    assert inspect(Role).relationships["users"].lazy == "raise_on_sql"
+    assert eager_graph(Role) == []
+
+
+@pytest.mark.unit
+def test_audit_log_does_not_join_user():
+    """Audit queries do not join users (and their roles) by default"""
+    assert eager_graph(AuditLog) == []
+
+
+# ==================== Auth Query Regression ====================
+
+@pytest.mark.unit
+async def test_get_current_user_query_count(db_session: AsyncSession, test_engine):
+    """get_current_user loads one user row and its roles in two statements"""
+    shared = Role(name="shared", display_name_ar="مشترك", permissions=["users:read"])
+    other = Role(name="other", display_name_ar="آخر", permissions=["reports:view"])
+    users = []
+    for i in range(5):
+        user = User(
+            username=f"member{i}",
+            email=f"member{i}@example.com",
+            hashed_password="hashed",
+            full_name=f"Member {i}",
+        )
+        user.roles.extend([shared, other])
+        users.append(user)
+    db_session.add_all(users)
+    await db_session.commit()
+    user_id = users[0].id
+    db_session.expunge_all()
+
+    token = create_access_token({"sub": str(user_id)})
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        current_user = await get_current_user(token=token, db=db_session)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert current_user.id == user_id
+    assert sorted(role.name for role in current_user.roles) == ["other", "shared"]
+    assert len(statements) == 2
+    # Only the user and its two roles are loaded, not the other members
+    assert len(db_session.identity_map) == 3
@@ -0,0 +1,131 @@
+"""
+Unit Tests for event-driven balance alerts
+Uses fake sessions, no database required
+"""
+
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.db.models.branch import BalanceAlertType, BranchAlert
+from app.services.balance_alert_service import BalanceAlertMonitor, BalanceBreach
+
+LOW = BalanceAlertType.LOW_BALANCE
+HIGH = BalanceAlertType.HIGH_BALANCE
+
+
+def payload(branch_id, currency_id, balance, minimum="100", maximum="5000"):
+    return {
+        "branch_id": str(branch_id), "currency_id": str(currency_id),
+        "balance": balance, "reserved_balance": "0",
+        "minimum_threshold": minimum, "maximum_threshold": maximum,
+    }
+
+
+@pytest.mark.unit
+def test_breach_is_counted_once_until_it_clears():
+    monitor = BalanceAlertMonitor()
+    branch, usd, eur = uuid4(), uuid4(), uuid4()
+
+    monitor.apply_event(1, payload(branch, usd, "50"))
+    monitor.apply_event(2, payload(branch, usd, "40"))
+    monitor.apply_event(3, payload(branch, eur, "9000"))
+
+    assert monitor.count(LOW) == 1 and monitor.count(HIGH) == 1
+    assert monitor.count(LOW, branch) == 1 and monitor.count(LOW, uuid4()) == 0
+    (breach,) = monitor.breaches(branch, LOW)
+    assert breach.balance == Decimal("40") and breach.threshold == Decimal("100")
+
+    monitor.apply_event(4, payload(branch, usd, "150"))
+    assert monitor.count(LOW) == 0 and monitor.breaches(alert_type=LOW) == []
+
+
+@pytest.mark.unit
+def test_stale_and_threshold_less_events_are_ignored():
+    monitor = BalanceAlertMonitor()
+    branch, usd = uuid4(), uuid4()
+
+    monitor.apply_event(5, payload(branch, usd, "50"))
+    monitor.apply_event(4, payload(branch, usd, "500"))
+    event = payload(branch, usd, "500")
+    del event["minimum_threshold"], event["maximum_threshold"]
+    monitor.apply_event(6, event)
+
+    assert monitor.count(LOW, branch) == 1
+
+
+@pytest.mark.unit
+async def test_resync_rebuilds_index_but_keeps_newer_event_state(fakes):
+    branch, usd, eur, try_ = uuid4(), uuid4(), uuid4(), uuid4()
+    rows = [
+        (branch, usd, Decimal("10"), Decimal("100"), None),
+        (branch, eur, Decimal("10"), Decimal("100"), None),
+    ]
+    db = fakes.session(fakes.result(rows=rows))
+    monitor = BalanceAlertMonitor(session_factory=lambda: db)
+    monitor.apply_event(10**9, payload(branch, eur, "500"))   # newer than the scan
+    monitor.apply_event(10**9, payload(branch, try_, "1"))    # also newer
+    monitor._set((uuid4(), uuid4(), LOW), None)
+
+    assert await monitor.resync() == 2
+    assert monitor.ready
+    assert {breach.currency_id for breach in monitor.breaches()} == {usd, try_}
+    statement = fakes.sql(db.statements[0])
+    assert "branch_balances.balance < branch_balances.minimum_threshold" in statement
+
+
+@pytest.mark.unit
+async def test_new_breaches_are_written_once_under_a_lock(fakes):
+    branch, usd = uuid4(), uuid4()
+    db = fakes.session(fakes.result(rows=[(usd, "USD")]))
+    monitor = BalanceAlertMonitor(session_factory=lambda: db)
+    monitor._task = SimpleNamespace()   # running: new breaches are queued
+
+    monitor.apply_event(1, payload(branch, usd, "50"))
+    monitor.apply_event(2, payload(branch, usd, "45"))
+    monitor.apply_event(3, payload(uuid4(), uuid4(), "1"))
+    monitor.apply_event(4, payload(monitor.breaches()[1].branch_id, monitor.breaches()[1].currency_id, "500"))
+
+    assert await monitor.write_pending() == 1
+    (alert,) = db.added
+    assert isinstance(alert, BranchAlert)
+    assert alert.title == "Low Balance Alert - USD"
+    assert alert.message == "Balance (45) is below minimum threshold (100)"
+    assert "pg_advisory_xact_lock" in fakes.sql(db.statements[1])
+    assert db.commits == 1
+    assert await monitor.write_pending() == 0
+
+
+@pytest.mark.unit
+def test_reads_from_other_threads_survive_index_updates():
+    """Sync endpoints read the index from threadpool threads while it changes"""
+    monitor = BalanceAlertMonitor()
+    branch_id = uuid4()
+    breaches = [BalanceBreach(branch_id, uuid4(), LOW, Decimal("1"), Decimal("100")) for _ in range(200)]
+    errors, done = [], threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                monitor.breaches(branch_id=branch_id)
+                monitor.stats()
+        except RuntimeError as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for _ in range(20):
+        for breach in breaches:
+            monitor._set(breach.key, breach)
+        for breach in breaches:
+            monitor._set(breach.key, None)
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert monitor.count(LOW) == 0
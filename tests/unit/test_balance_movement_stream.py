@@ -0,0 +1,82 @@
+"""
+Unit Tests for the streamed balance movement report
+Uses fake sessions, no database required
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.exceptions import ReportGenerationError
+from app.services.report_service import ReportService
+
+USD = SimpleNamespace(id=uuid4(), code="USD")
+
+
+def movement(hour, reference, kind, change):
+    return SimpleNamespace(
+        occurred_at=datetime(2025, 2, 10, hour), reference=reference,
+        type=kind, description="", change=Decimal(change),
+    )
+
+
+@pytest.mark.unit
+def test_branch_stream_starts_from_snapshot_opening_and_runs_the_balance(fakes):
+    stream = fakes.result(partitions=[
+        [movement(9, "TXN-1", "income", "250.00")],
+        [movement(11, "TXN-2", "expense", "-100.00")],
+    ])
+    db = fakes.sync_session(
+        fakes.result(rows=[SimpleNamespace(balance=Decimal("1000.00"))]), stream,
+        queries=[fakes.query(first=USD)],
+    )
+
+    chunks = ReportService(db).stream_balance_movement(
+        str(uuid4()), "USD", date(2025, 2, 10), date(2025, 2, 10)
+    )
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+    assert lines[0]["record"] == "opening" and lines[0]["opening_balance"] == 1000.0
+    assert [line["balance"] for line in lines[1:3]] == [1250.0, 1150.0]
+    assert lines[2]["debit"] == 100.0 and lines[2]["credit"] == 0.0
+    assert lines[3] == {"record": "closing", "movement_count": 2, "closing_balance": 1150.0}
+    assert stream.closed
+
+    query = db.statements[1]
+    assert query.get_execution_options()["yield_per"] == ReportService.MOVEMENT_STREAM_BATCH
+    assert "UNION ALL" not in fakes.sql(query)
+
+
+@pytest.mark.unit
+def test_all_branch_csv_merges_vault_transfers_and_adds_vault_opening(fakes):
+    vault = SimpleNamespace(id=uuid4())
+    db = fakes.sync_session(
+        fakes.result(rows=[SimpleNamespace(balance=Decimal("300.00"))]),
+        fakes.result(rows=[SimpleNamespace(balance=Decimal("700.00"))]),
+        fakes.result(partitions=[[movement(8, "VTR-1", "vault_outflow", "-50.00")]]),
+        queries=[fakes.query(first=USD), fakes.query(first=vault)],
+    )
+
+    chunks = ReportService(db).stream_balance_movement(
+        None, "USD", date(2025, 2, 10), date(2025, 2, 10), output_format="csv"
+    )
+    rows = "".join(chunks).splitlines()
+
+    assert rows[0].startswith("date,transaction_number,type")
+    assert rows[1].endswith("opening_balance,,,,,1000.00")
+    assert rows[2].startswith("2025-02-10T08:00:00,VTR-1,vault_outflow,50.00")
+    assert rows[3].endswith("closing_balance,,,,,950.00")
+    sql = fakes.sql(db.statements[2])
+    assert "UNION ALL" in sql and "ORDER BY" in sql
+
+
+@pytest.mark.unit
+def test_unknown_currency_fails_before_streaming(fakes):
+    db = fakes.sync_session(queries=[fakes.query(first=None)])
+
+    with pytest.raises(ReportGenerationError):
+        ReportService(db).stream_balance_movement(None, "XXX", date(2025, 2, 10), date(2025, 2, 10))
@@ -0,0 +1,146 @@
+"""
+Unit Tests for the branch balance read model and the outbox
+Uses fake sessions, no database required
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services import outbox_service
+from app.services.balance_read_model import (
+    BALANCE_CHANGED, BranchBalanceReadModel, balance_event_payload, balance_read_model
+)
+from app.services.balance_service import BalanceService
+from app.services.outbox_service import OutboxService, outbox_relay
+
+
+def make_balance(branch_id=None, currency_id=None, balance="1000.00", reserved="0"):
+    currency_id = currency_id or uuid4()
+    return SimpleNamespace(
+        id=uuid4(), branch_id=branch_id or uuid4(), currency_id=currency_id,
+        currency=SimpleNamespace(id=currency_id, code="USD", name_en="US Dollar"),
+        balance=Decimal(balance), reserved_balance=Decimal(reserved),
+        minimum_threshold=Decimal("100"), maximum_threshold=None,
+        last_updated=datetime.utcnow(), updated_at=datetime.utcnow(),
+    )
+
+
+def event_for(source, **values):
+    payload = balance_event_payload(source)
+    payload.update(values)
+    return payload
+
+
+@pytest.fixture(autouse=True)
+def clear_global_model():
+    balance_read_model.clear()
+    yield
+    balance_read_model.clear()
+
+
+@pytest.mark.unit
+def test_loaded_balance_is_served_until_stale(monkeypatch):
+    model = BranchBalanceReadModel(max_staleness_seconds=5)
+    balance = make_balance(reserved="250")
+    model.load([balance])
+
+    snapshot = model.get(balance.branch_id, balance.currency_id)
+    assert snapshot.available_balance == Decimal("750")
+    assert snapshot.currency.code == "USD"
+
+    now = snapshot.confirmed_at + 6
+    monkeypatch.setattr("app.services.balance_read_model.time.monotonic", lambda: now)
+    assert model.get(balance.branch_id, balance.currency_id) is None
+    assert model.stats()["hits"] == 1 and model.stats()["misses"] == 1
+
+
+@pytest.mark.unit
+def test_events_never_move_a_balance_backwards():
+    model = BranchBalanceReadModel()
+    balance = make_balance()
+    model.load([balance])
+
+    model.apply_event(10, event_for(balance, balance="900.00"))
+    model.apply_event(9, event_for(balance, balance="950.00"))
+    model.apply_event(10, event_for(balance, balance="950.00"))
+
+    snapshot = model.get(balance.branch_id, balance.currency_id)
+    assert snapshot.balance == Decimal("900.00")
+    assert snapshot.version == 10
+
+
+@pytest.mark.unit
+def test_reload_keeps_snapshot_newer_than_the_tail():
+    model = BranchBalanceReadModel()
+    balance = make_balance()
+    model.load([balance])
+    model.apply_event(outbox_relay.last_id + 5, event_for(balance, balance="10.00"))
+
+    model.load([balance])
+
+    assert model.get(balance.branch_id, balance.currency_id).balance == Decimal("10.00")
+
+
+@pytest.mark.unit
+def test_event_for_unknown_currency_invalidates_branch_listing():
+    model = BranchBalanceReadModel()
+    balance = make_balance()
+    model.load_branch(balance.branch_id, [balance])
+    assert len(model.get_branch(balance.branch_id)) == 1
+
+    model.apply_event(1, event_for(make_balance(branch_id=balance.branch_id)))
+
+    assert model.get_branch(balance.branch_id) is None
+
+
+@pytest.mark.unit
+async def test_committed_events_reach_subscribers_of_this_worker(fakes):
+    db = fakes.session()
+    balance = make_balance()
+    balance_read_model.load([balance])
+
+    event = await OutboxService(db).add(
+        BALANCE_CHANGED, event_for(balance, balance="400.00"), aggregate_id=balance.branch_id
+    )
+    assert balance_read_model.get(balance.branch_id, balance.currency_id).balance == Decimal("1000.00")
+
+    outbox_service._dispatch_committed_events(db)
+
+    snapshot = balance_read_model.get(balance.branch_id, balance.currency_id)
+    assert snapshot.balance == Decimal("400.00")
+    assert snapshot.version == event.id
+    assert db.info == {}
+
+
+@pytest.mark.unit
+async def test_rolled_back_events_are_dropped(fakes):
+    db = fakes.session()
+    balance = make_balance()
+    balance_read_model.load([balance])
+
+    await OutboxService(db).add(BALANCE_CHANGED, event_for(balance, balance="1.00"))
+    outbox_service._drop_rolled_back_events(db)
+    outbox_service._dispatch_committed_events(db)
+
+    assert balance_read_model.get(balance.branch_id, balance.currency_id).balance == Decimal("1000.00")
+
+
+@pytest.mark.unit
+async def test_sufficient_balance_check_reads_the_model(fakes, monkeypatch):
+    service = BalanceService(fakes.session())
+    balance = make_balance(reserved="300")
+    loads = []
+
+    async def get_branch_balance(branch_id, currency_id):
+        loads.append((branch_id, currency_id))
+        return balance
+
+    monkeypatch.setattr(service.repo, "get_branch_balance", get_branch_balance)
+
+    assert await service.check_sufficient_balance(balance.branch_id, balance.currency_id, Decimal("700"))
+    assert not await service.check_sufficient_balance(balance.branch_id, balance.currency_id, Decimal("701"))
+    assert len(loads) == 1
@@ -0,0 +1,182 @@
+"""
+Unit Tests for balance holds (reservations)
+Uses fake sessions, no database required
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.exceptions import InsufficientBalanceError
+from app.db.models.branch import BalanceChangeType, BalanceReservation, ReservationStatus
+from app.db.models.outbox import OutboxEvent
+from app.schemas.transaction import ExchangeCalculationRequest
+from app.services.balance_reservation_service import (
+    BalanceReservationService, BalanceHoldSweeper
+)
+from app.services.exchange_quote_service import ExchangeQuoteService
+from app.services.transaction_service import TransactionService
+
+
+def events(db):
+    return [obj for obj in db.added if isinstance(obj, OutboxEvent)]
+
+
+def balance_row(**values):
+    row = {
+        "branch_id": uuid4(), "currency_id": uuid4(), "balance": Decimal("1000.00"),
+        "reserved_balance": Decimal("250.00"), "last_updated": datetime.utcnow(),
+    }
+    row.update(values)
+    return SimpleNamespace(**row)
+
+
+@pytest.mark.unit
+async def test_hold_is_a_conditional_update_plus_reservation_row(fakes):
+    db = fakes.session(fakes.result(value=balance_row()))
+    service = BalanceReservationService(db)
+
+    hold = await service.hold(
+        uuid4(), uuid4(), Decimal("250.00"),
+        reference_type=BalanceReservationService.TRANSFER,
+        ttl=timedelta(hours=1)
+    )
+
+    statement = fakes.sql(db.statements[0])
+    assert statement.startswith("UPDATE branch_balances SET reserved_balance=")
+    assert "branch_balances.balance - branch_balances.reserved_balance >=" in statement
+    assert db.added[0] is hold
+    assert [event.event_type for event in events(db)] == ["balance.changed"]
+    assert events(db)[0].payload["reserved_balance"] == "250.00"
+    assert hold.status == ReservationStatus.ACTIVE
+    assert hold.expires_at > datetime.utcnow() + timedelta(minutes=59)
+
+
+@pytest.mark.unit
+async def test_hold_without_available_balance_is_rejected(fakes):
+    db = fakes.session(fakes.result(value=None))
+
+    with pytest.raises(InsufficientBalanceError):
+        await BalanceReservationService(db).hold(
+            uuid4(), uuid4(), Decimal("1"), "transfer", ttl=timedelta(minutes=1)
+        )
+    assert db.added == []
+
+
+@pytest.mark.unit
+async def test_commit_is_one_statement_and_writes_history(fakes):
+    row = balance_row(
+        balance=Decimal("750.00"), reserved_balance=Decimal("0"), amount=Decimal("250.00"),
+        status=ReservationStatus.COMMITTED
+    )
+    db = fakes.session(fakes.result(value=row))
+
+    new_balance = await BalanceReservationService(db).commit(
+        uuid4(), change_type=BalanceChangeType.TRANSFER_OUT, reference_id=uuid4()
+    )
+
+    assert new_balance == Decimal("750.00")
+    statement = fakes.sql(db.statements[0])
+    assert statement.startswith("WITH held AS \n(UPDATE balance_reservations SET status=")
+    assert "UPDATE branch_balances SET balance=(branch_balances.balance - CASE WHEN (held.status =" in statement
+
+    history = db.params[1][0]
+    assert history["amount"] == Decimal("-250.00")
+    assert history["balance_before"] == Decimal("1000.00")
+    assert history["balance_after"] == Decimal("750.00")
+    assert events(db)[0].payload["balance"] == "750.00"
+
+
+@pytest.mark.unit
+async def test_commit_of_inactive_hold_returns_none(fakes):
+    db = fakes.session(fakes.result(value=None))
+
+    assert await BalanceReservationService(db).commit(
+        uuid4(), change_type=BalanceChangeType.TRANSACTION
+    ) is None
+    assert len(db.statements) == 1
+
+
+@pytest.mark.unit
+async def test_commit_of_lapsed_hold_releases_it_and_returns_none(fakes):
+    row = balance_row(
+        balance=Decimal("1000.00"), reserved_balance=Decimal("0"), amount=Decimal("250.00"),
+        status=ReservationStatus.EXPIRED
+    )
+    db = fakes.session(fakes.result(value=row))
+
+    assert await BalanceReservationService(db).commit(
+        uuid4(), change_type=BalanceChangeType.TRANSFER_OUT
+    ) is None
+
+    statement = fakes.sql(db.statements[0])
+    assert "SET status=CASE WHEN (balance_reservations.expires_at >" in statement
+    assert "reserved_balance=(branch_balances.reserved_balance - held.amount)" in statement
+    assert len(db.statements) == 1                    # no history for a release
+    assert events(db)[0].payload["reserved_balance"] == "0"
+
+
+@pytest.mark.unit
+async def test_release_expired_sums_holds_per_balance(fakes):
+    db = fakes.session(fakes.result(rows=[balance_row(holds=3), balance_row(holds=2)]))
+
+    assert await BalanceReservationService(db).release_expired(batch_size=10) == 5
+    statement = fakes.sql(db.statements[0])
+    assert "FOR UPDATE SKIP LOCKED" in statement
+    assert "sum(expired.amount)" in statement
+    assert db.commits == 1
+    assert len(events(db)) == 2
+
+
+@pytest.mark.unit
+async def test_sweeper_releases_until_a_partial_batch(fakes):
+    db = fakes.session(fakes.result(rows=[balance_row(holds=2)]), fakes.result(rows=[balance_row(holds=1)]))
+    sweeper = BalanceHoldSweeper(session_factory=lambda: db, interval_seconds=60, batch_size=2)
+
+    assert await sweeper.sweep() == 3
+    assert len(db.statements) == 2
+    assert sweeper.stats()["released"] == 3
+
+
+@pytest.mark.unit
+async def test_branch_quote_holds_total_cost(fakes, monkeypatch):
+    monkeypatch.setattr(ExchangeQuoteService, "_quotes", type(ExchangeQuoteService._quotes)())
+    db = fakes.session()
+    service = TransactionService(db)
+    branch_id, usd, try_ = uuid4(), uuid4(), uuid4()
+    held = {}
+
+    async def calculate_exchange(calculation):
+        return {
+            "from_currency_id": usd, "from_currency_code": "USD",
+            "to_currency_id": try_, "to_currency_code": "TRY",
+            "from_amount": Decimal("100"), "to_amount": Decimal("3250"),
+            "exchange_rate": Decimal("32.5"), "commission_percentage": Decimal("1"),
+            "commission_amount": Decimal("1"), "total_cost": Decimal("101"),
+            "effective_rate": Decimal("32.5"),
+        }
+
+    async def hold(**kwargs):
+        held.update(kwargs)
+        return BalanceReservation(id=uuid4(), **{
+            key: kwargs[key] for key in ("branch_id", "currency_id", "amount", "reference_type")
+        })
+
+    monkeypatch.setattr(service, "calculate_exchange", calculate_exchange)
+    monkeypatch.setattr(service.reservation_service, "hold", hold)
+
+    quote = await service.create_exchange_quote(
+        ExchangeCalculationRequest(
+            from_currency_id=usd, to_currency_id=try_,
+            from_amount=Decimal("100"), branch_id=branch_id
+        ),
+        uuid4()
+    )
+
+    assert held["amount"] == Decimal("101")
+    assert held["reference_type"] == BalanceReservationService.EXCHANGE_QUOTE
+    assert quote.hold_id is not None and quote.branch_id == branch_id
+    assert db.commits == 1
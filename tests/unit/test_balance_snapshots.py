@@ -0,0 +1,109 @@
+"""
+Unit Tests for daily balance snapshots
+Uses fake sessions, no database required
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.balance_snapshot_service import (
+    BalanceSnapshotJob,
+    branch_balances_at,
+    snapshot_insert,
+)
+from app.core.exceptions import ResourceNotFoundError
+from app.services import report_service
+from app.services.report_service import ReportService
+
+
+@pytest.mark.unit
+def test_snapshot_is_a_single_insert_select_of_branch_and_vault_balances(fakes):
+    sql = fakes.sql(snapshot_insert(date(2025, 2, 17)))
+
+    assert sql.startswith("INSERT INTO daily_balance_snapshots")
+    assert "UNION ALL" in sql
+    assert "branch_balance_history.performed_at >=" in sql
+    assert sql.rstrip().endswith("ON CONFLICT DO NOTHING")
+
+
+@pytest.mark.unit
+def test_point_in_time_reads_nearest_snapshot_plus_history_delta(fakes):
+    branch_id = uuid4()
+    statement = branch_balances_at(datetime(2025, 2, 18, 14, 30), branch_id)
+    sql = fakes.sql(statement)
+    params = statement.compile(dialect=postgresql.dialect()).params
+
+    assert "WITH branch_close AS" in sql
+    assert "DISTINCT ON (daily_balance_snapshots.holder_id, daily_balance_snapshots.currency_id)" in sql
+    assert "FULL OUTER JOIN" in sql
+    assert params["snapshot_date_1"] == date(2025, 2, 18)
+    assert params["performed_at_1"] == datetime(2025, 2, 18, 14, 30)
+
+
+@pytest.mark.unit
+async def test_job_snapshots_yesterday_once(fakes):
+    sessions = [
+        fakes.session(fakes.result(value=False), fakes.result(), fakes.result(rowcount=12)),
+    ]
+    job = BalanceSnapshotJob(session_factory=lambda: sessions.pop(0), check_seconds=1)
+
+    assert await job.run_once() == 12
+    assert await job.run_once() == 0          # already done today, no session opened
+
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    assert job.stats() == {"running": False, "last_snapshot": yesterday.isoformat(), "rows_written": 12}
+
+
+@pytest.mark.unit
+async def test_job_skips_a_day_already_snapshotted(fakes):
+    session = fakes.session(fakes.result(value=True))
+    job = BalanceSnapshotJob(session_factory=lambda: session, check_seconds=1)
+
+    assert await job.run_once() == 0
+    assert len(session.statements) == 1 and session.commits == 0
+
+
+@pytest.mark.unit
+def test_past_branch_snapshot_is_read_from_daily_snapshots(fakes):
+    branch = SimpleNamespace(id=uuid4(), code="BR001", name="Main")
+    usd = SimpleNamespace(id=uuid4(), code="USD", name="US Dollar")
+    db = fakes.sync_session(
+        fakes.result(rows=[SimpleNamespace(currency_id=usd.id, balance=Decimal("1500.00"))]),
+        queries=[fakes.query(first=branch), fakes.query(rows=[usd])],
+    )
+
+    report = ReportService(db).branch_balance_snapshot(branch.id, snapshot_date=date(2025, 2, 17))
+
+    assert report["as_of"] == "2025-02-18T00:00:00"
+    assert report["balances"] == [
+        {"currency_code": "USD", "currency_name": "US Dollar", "balance": 1500.0, "last_updated": None}
+    ]
+    (statement,) = db.statements
+    assert "branch_close" in fakes.sql(statement)
+
+
+@pytest.mark.unit
+def test_past_vault_date_without_snapshot_is_an_explicit_error(fakes):
+    vault = SimpleNamespace(id=uuid4(), vault_type="main")
+    db = fakes.sync_session(fakes.result(rows=[]), queries=[fakes.query(first=vault)])
+
+    with pytest.raises(ResourceNotFoundError):
+        ReportService(db).vault_balance_summary(snapshot_date=date(2025, 2, 17))
+
+
+@pytest.mark.unit
+def test_today_is_the_utc_date_snapshots_are_written_in(fakes, monkeypatch):
+    """Just after UTC midnight, the new UTC day is 'today' and reads live balances"""
+    vault = SimpleNamespace(id=uuid4(), vault_type="main")
+    monkeypatch.setattr(report_service, "utc_today", lambda: date(2025, 2, 18))
+    db = fakes.sync_session(queries=[fakes.query(first=vault), fakes.query(rows=[])])
+
+    report = ReportService(db).vault_balance_summary()
+
+    assert report["snapshot_date"] == "2025-02-18"
+    assert db.statements == []                # current balances, no snapshot query
@@ -0,0 +1,78 @@
+"""
+Unit Tests for bulk user provisioning
+Uses a fake session, no database required
+"""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.security import hash_passwords, verify_password
+from app.db.models.user import User, user_roles
+from app.services import user_service
+from app.services.user_service import UserService
+
+
+def make_service(fakes, monkeypatch, existing_emails=(), existing_usernames=(), roles=()):
+    service = UserService(fakes.session())
+    lookups = []
+
+    async def get_existing(emails, usernames):
+        lookups.append("users")
+        return set(existing_emails) & emails, set(existing_usernames) & usernames
+
+    async def get_roles(role_ids):
+        lookups.append("roles")
+        return {role_id: SimpleNamespace(id=role_id) for role_id in role_ids if role_id in roles}
+
+    async def fake_hash(passwords):
+        return [f"hashed:{password}" for password in passwords]
+
+    monkeypatch.setattr(service, "_get_existing_emails_and_usernames", get_existing)
+    monkeypatch.setattr(service, "_get_roles_by_ids", get_roles)
+    monkeypatch.setattr(user_service, "hash_passwords", fake_hash)
+    return service, lookups
+
+
+def make_user(name, **overrides):
+    data = {"email": f"{name}@example.com", "username": name, "password": "Secret123!"}
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.unit
+async def test_bulk_create_prefetches_and_inserts_in_batches(fakes, monkeypatch):
+    """Two lookups, one insert per table, one commit"""
+    role_id = uuid4()
+    service, lookups = make_service(fakes, monkeypatch, existing_usernames={"taken"}, roles={role_id})
+    users = [
+        make_user("alice", role_ids=[role_id]),
+        make_user("bob", email="ALICE@example.com"),       # duplicate email in request
+        make_user("taken"),                                 # already exists
+        make_user("carol", role_ids=[str(uuid4())]),        # unknown role
+        make_user("dave", password=None),                   # missing password
+        make_user("erin", role_ids=[str(role_id)]),
+    ]
+
+    results = await service.bulk_create_users(users, SimpleNamespace(id=uuid4()))
+
+    assert results["successful"] == 2
+    assert [error["index"] for error in results["errors"]] == [1, 2, 3, 4]
+    assert sorted(lookups) == ["roles", "users"]
+
+    inserts = dict(service.db.inserts())
+    assert [row["username"] for row in inserts[User.__tablename__]] == ["alice", "erin"]
+    assert inserts[User.__tablename__][0]["hashed_password"] == "hashed:Secret123!"
+    assert [row["role_id"] for row in inserts[user_roles.name]] == [role_id, role_id]
+    assert service.db.commits == 1
+
+
+@pytest.mark.unit
+async def test_hash_passwords_preserves_order():
+    """Parallel hashing returns one verifiable hash per input, in order"""
+    hashes = await hash_passwords(["FirstPass1!", "SecondPass2!"])
+
+    assert verify_password("FirstPass1!", hashes[0])
+    assert verify_password("SecondPass2!", hashes[1])
+    assert await hash_passwords([]) == []
@@ -0,0 +1,145 @@
+"""
+Unit Tests for threshold-based cash distribution
+Uses fake sessions, no database required
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.models.branch import BalanceChangeType
+from app.db.models.vault import VaultTransfer, VaultTransferStatus, VaultTransferType
+from app.schemas.vault import CashDistributionRequest, DistributionTargetEnum
+from app.services import vault_service as vault_module
+from app.services.balance_service import BalanceService
+from app.services.vault_service import VaultService, plan_cash_distribution
+
+USD, EUR = uuid4(), uuid4()
+
+
+def position(code, balance, minimum=None, maximum=None, currency=USD, reserved="0", vault=True):
+    return (
+        uuid4(), code, uuid4() if vault else None, currency, "USD" if currency == USD else "EUR",
+        Decimal(balance), Decimal(reserved),
+        None if minimum is None else Decimal(minimum),
+        None if maximum is None else Decimal(maximum),
+    )
+
+
+@pytest.mark.unit
+def test_plan_funds_most_underfunded_first_and_counts_sweeps():
+    positions = [
+        position("BR001", "800", minimum="1000"),                    # needs 200
+        position("BR002", "100", minimum="1000", reserved="50"),     # needs 950
+        position("BR003", "9000", minimum="1000", maximum="5000"),   # sweep 4000
+        position("BR004", "2000", minimum="1000", maximum="5000"),   # within range
+    ]
+
+    lines, (usd,) = plan_cash_distribution(positions, {USD: Decimal("500")})
+
+    by_branch = {line["branch_code"]: line for line in lines}
+    assert set(by_branch) == {"BR001", "BR002", "BR003"}
+    assert by_branch["BR003"]["planned_amount"] == Decimal("4000.00")
+    assert by_branch["BR002"]["planned_amount"] == Decimal("950.00")
+    assert by_branch["BR001"]["planned_amount"] == Decimal("200.00")
+    assert usd["shortfall"] == 0
+    assert usd["closing_vault_balance"] == Decimal("3350.00")
+
+
+@pytest.mark.unit
+def test_plan_reports_shortfall_midpoint_and_missing_branch_vault():
+    positions = [
+        position("BR001", "0", minimum="1000", maximum="3000"),
+        position("BR002", "500", minimum="1000"),
+        position("BR003", "60", maximum="50", currency=EUR, vault=False),
+    ]
+
+    lines, (eur, usd) = plan_cash_distribution(
+        positions, {USD: Decimal("1200")}, DistributionTargetEnum.MIDPOINT
+    )
+
+    br001, br002, br003 = lines
+    assert br001["required_amount"] == Decimal("2000.00")
+    assert br001["planned_amount"] == Decimal("1200")
+    assert br002["planned_amount"] == 0 and br002["skipped_reason"] == "Insufficient vault balance"
+    assert usd["shortfall"] == Decimal("1300.00")
+    assert br003["skipped_reason"] == "Branch vault not found" and eur["total_sweeps"] == 0
+
+
+@pytest.mark.unit
+async def test_executed_run_allocates_a_number_block_and_commits_once(fakes, monkeypatch):
+    vault = SimpleNamespace(id=uuid4(), vault_code="VLT-MAIN")
+    top_up = position("BR001", "100", minimum="1000")
+    sweep = position("BR002", "9000", maximum="5000")
+    db = fakes.session(
+        fakes.result(rows=[(USD, Decimal("5000"))]),
+        fakes.result(rows=[top_up, sweep]),
+        fakes.result(),                                   # number block lock
+        fakes.result(value="VTR-20250101-00041"),         # last number of the day
+    )
+    service = VaultService(db)
+    applied, audited = [], []
+
+    async def get_main_vault():
+        return vault
+
+    async def apply_legs(transfers, reverse=False):
+        applied.extend(transfers)
+
+    monkeypatch.setattr(service, "get_main_vault", get_main_vault)
+    monkeypatch.setattr(service, "_can_approve_transfer", lambda user: True)
+    monkeypatch.setattr(service, "_apply_transfer_legs", apply_legs)
+    monkeypatch.setattr(vault_module.audit_log_writer, "log", lambda **entry: audited.append(entry))
+
+    plan = await service.distribute_cash(CashDistributionRequest(execute=True), SimpleNamespace(id=uuid4()))
+
+    assert plan["executed"] and plan["transfer_count"] == 2
+    assert [line["transfer_number"][-5:] for line in plan["lines"]] == ["00042", "00043"]
+    assert applied == db.added
+    first, second = db.added
+    assert first.transfer_type == VaultTransferType.VAULT_TO_BRANCH and first.from_vault_id == vault.id
+    assert second.transfer_type == VaultTransferType.BRANCH_TO_VAULT
+    assert second.from_branch_id == sweep[0] and second.to_vault_id == vault.id
+    assert all(t.status == VaultTransferStatus.IN_TRANSIT for t in db.added)
+    assert "FOR UPDATE OF branch_balances" in fakes.sql(db.statements[1])
+    assert db.commits == 1
+    (entry,) = audited
+    assert entry["action"] == "cash_distribution" and entry["changes"]["transfer_count"] == 2
+
+
+@pytest.mark.unit
+async def test_execution_requires_approval_rights(fakes):
+    service = VaultService(fakes.session())
+    service._can_approve_transfer = lambda user: False
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.distribute_cash(CashDistributionRequest(execute=True), SimpleNamespace(id=uuid4()))
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.unit
+async def test_sweep_debits_the_branch_balance_and_credits_the_vault(fakes, monkeypatch):
+    applied = []
+
+    async def apply_balance_changes(self, changes, balances=None):
+        applied.extend(changes)
+
+    monkeypatch.setattr(BalanceService, "apply_balance_changes", apply_balance_changes)
+    branch_id, main_vault_id = uuid4(), uuid4()
+    transfer = VaultTransfer(
+        id=uuid4(), transfer_number="VTR-20250101-00001", currency_id=USD,
+        amount=Decimal("400.00"), from_vault_id=uuid4(), from_branch_id=branch_id,
+        to_vault_id=main_vault_id, transfer_type=VaultTransferType.BRANCH_TO_VAULT,
+    )
+    db = fakes.session(fakes.result(value=SimpleNamespace(balance=Decimal("400"))))
+
+    await VaultService(db)._apply_transfer_legs([transfer])
+
+    (credit,) = db.statements
+    assert credit.compile().params["vault_id_1"] == main_vault_id
+    (change,) = applied
+    assert change["branch_id"] == branch_id and change["amount"] == Decimal("-400.00")
+    assert change["change_type"] == BalanceChangeType.TRANSFER_OUT
@@ -0,0 +1,128 @@
+"""
+Unit Tests for the set-based bulk customer import
+Uses a fake repository and session, no database required
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.db.models.customer import CustomerType, RiskLevel
+from app.repositories.customer_repo import CustomerRepository
+from app.services.customer_service import CustomerService
+from app.utils.generators import format_customer_number
+
+BRANCH = uuid4()
+
+
+class FakeRepo:
+    """Records the set-based calls made by the import pipeline"""
+
+    def __init__(self, existing_ids=(), existing_passports=()):
+        self.existing_ids = set(existing_ids)
+        self.existing_passports = set(existing_passports)
+        self.lookups = 0
+        self.copied = []
+
+    async def find_existing_identifiers(self, national_ids, passport_numbers):
+        self.lookups += 1
+        return (
+            self.existing_ids & set(national_ids),
+            self.existing_passports & set(passport_numbers),
+        )
+
+    async def allocate_customer_number_block(self, count):
+        return list(range(100, 100 + count))
+
+    async def copy_customers(self, rows):
+        self.copied.extend(rows)
+        return len(rows)
+
+
+def make_row(national_id=None, passport_number=None, **overrides):
+    row = {
+        "first_name": "Ahmed",
+        "last_name": "Ali",
+        "phone_number": "+966501234567",
+        "date_of_birth": "1990-01-01",
+        "nationality": "Saudi",
+        "national_id": national_id,
+        "passport_number": passport_number,
+    }
+    row.update(overrides)
+    return row
+
+
+def make_service(fakes, repo):
+    service = CustomerService(fakes.session(objects={BRANCH: SimpleNamespace(id=BRANCH)}))
+    service.repo = repo
+    return service
+
+
+@pytest.mark.unit
+def test_format_customer_number_is_zero_padded():
+    """Sequence values become fixed-width customer numbers"""
+    assert format_customer_number(42, datetime(2025, 1, 10)) == "CUS-250110-000042"
+
+
+@pytest.mark.unit
+def test_copy_record_follows_copy_columns():
+    """Enums are sent as their values and JSON as text"""
+    repo = CustomerRepository(db=None)
+    record = repo._to_copy_record({
+        "customer_type": CustomerType.CORPORATE,
+        "risk_level": RiskLevel.HIGH,
+        "additional_info": {"occupation": "engineer"},
+    })
+    columns = CustomerRepository.COPY_COLUMNS
+
+    assert len(record) == len(columns)
+    assert record[columns.index("customer_type")] == "corporate"
+    assert record[columns.index("risk_level")] == "high"
+    assert record[columns.index("additional_info")] == '{"occupation": "engineer"}'
+    assert "search_document" not in columns
+
+
+@pytest.mark.unit
+async def test_import_reports_per_row_errors_and_loads_valid_rows(fakes):
+    """Invalid, in-file duplicate and existing rows are rejected individually"""
+    repo = FakeRepo(existing_passports={"P1234567"})
+    service = make_service(fakes, repo)
+    rows = [
+        make_row(national_id="1234567890"),
+        make_row(national_id="123"),                     # invalid national ID
+        make_row(national_id="1234567890"),              # duplicate within file
+        make_row(passport_number="p1234567"),            # already in database
+        make_row(passport_number="P7654321", risk_level="high"),
+    ]
+
+    results = await service.import_customers(rows, SimpleNamespace(id=uuid4()), BRANCH)
+
+    assert results["total"] == 5
+    assert results["successful"] == 2
+    assert results["failed"] == 3
+    assert [error["index"] for error in results["errors"]] == [1, 2, 3]
+    assert repo.lookups == 1
+    assert [row["customer_number"][-6:] for row in repo.copied] == ["000100", "000101"]
+    assert repo.copied[1]["risk_level"] == RiskLevel.HIGH
+    assert [c["index"] for c in results["created_customers"]] == [0, 4]
+    assert service.db.commits == 1
+
+
+@pytest.mark.unit
+async def test_all_or_nothing_loads_nothing_when_a_row_fails(fakes):
+    """all_or_nothing skips the load if any row was rejected"""
+    repo = FakeRepo()
+    service = make_service(fakes, repo)
+    rows = [make_row(national_id="1234567890"), make_row()]
+
+    results = await service.import_customers(
+        rows, SimpleNamespace(id=uuid4()), BRANCH, all_or_nothing=True
+    )
+
+    assert results["successful"] == 0
+    assert results["failed"] == 1
+    assert repo.copied == []
+    assert service.db.commits == 0
@@ -0,0 +1,52 @@
+"""
+Unit Tests for customer search normalization and query building
+No database required
+"""
+
+import pytest
+from sqlalchemy import and_, select
+
+from app.db.models.customer import Customer, normalize_search_text
+from app.repositories.customer_repo import CustomerRepository
+
+
+@pytest.mark.unit
+def test_normalize_folds_arabic_variants_and_harakat():
+    """Arabic alef/yaa/taa marbuta variants and harakat are folded"""
+    assert normalize_search_text("أحمد") == normalize_search_text("احمد")
+    assert normalize_search_text("فاطمة") == "فاطمه"
+    assert normalize_search_text("عَلِيّ") == "علي"
+
+
+@pytest.mark.unit
+def test_normalize_latin_and_whitespace():
+    """Latin text is lower-cased and whitespace collapsed"""
+    assert normalize_search_text("  Ahmed   ALI ") == "ahmed ali"
+
+
+@pytest.mark.unit
+def test_normalize_phone_like_input_keeps_digits_only():
+    """Phone-like input matches the digits-only phone in the search document"""
+    assert normalize_search_text("+966 (50) 123-4567") == "966501234567"
+    assert normalize_search_text("CUS-00001") == "cus-00001"
+
+
+@pytest.mark.unit
+def test_search_filter_uses_search_document_not_ilike(fakes):
+    """Text search is a single predicate on the trigram-indexed column"""
+    repo = CustomerRepository(db=None)
+    sql = fakes.sql(select(Customer.id).where(and_(*repo._build_filters(query="Ahmed"))))
+
+    assert "customers.search_document LIKE" in sql
+    assert "customers.search_document %>" in sql
+    assert "ILIKE" not in sql
+
+
+@pytest.mark.unit
+def test_short_query_skips_similarity_operator(fakes):
+    """Inputs shorter than a trigram only use the substring match"""
+    repo = CustomerRepository(db=None)
+    sql = fakes.sql(select(Customer.id).where(and_(*repo._build_filters(query="al"))))
+
+    assert "search_document LIKE" in sql
+    assert "%>" not in sql
@@ -0,0 +1,84 @@
+"""
+Unit Tests for CSV/Parquet dataset exports
+Uses fake sessions, no database required
+"""
+
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import ValidationError
+from app.db.models.transaction import TransactionStatus, TransactionType
+from app.services import data_export_service as export_module
+from app.services.data_export_service import DataExportService, audit_query, transactions_query
+
+
+def transaction_row(number, amount):
+    return (
+        uuid4(), number, TransactionType.INCOME, TransactionStatus.COMPLETED, "USD",
+        Decimal(amount), None, uuid4(), uuid4(), None, None,
+        datetime(2025, 2, 10, 9, 30), None,
+    )
+
+
+@pytest.mark.unit
+def test_dataset_queries_use_half_open_date_windows_and_branch_scope():
+    branch_id = uuid4()
+    compiled = transactions_query(date(2025, 2, 1), date(2025, 2, 10), branch_id).compile(
+        dialect=postgresql.dialect()
+    )
+
+    assert compiled.params["transaction_date_1"] == datetime(2025, 2, 1)
+    assert compiled.params["transaction_date_2"] == datetime(2025, 2, 11)
+    assert compiled.params["branch_id_1"] == branch_id
+    assert "ORDER BY transactions.transaction_date" in str(compiled)
+    assert "WHERE" not in str(audit_query().compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.unit
+def test_csv_streams_header_then_one_chunk_per_batch(fakes, monkeypatch):
+    monkeypatch.setattr(export_module.settings, "EXPORT_BATCH_ROWS", 2)
+    result = fakes.result(partitions=[
+        [transaction_row("TXN-1", "10.50"), transaction_row("TXN-2", "20.00")],
+        [transaction_row("TXN-3", "5.25")],
+    ])
+    db = fakes.sync_session(result)
+
+    chunks = list(DataExportService(db).stream_csv("transactions"))
+
+    assert len(chunks) == 3
+    assert chunks[0].startswith("id,transaction_number,transaction_type,status,currency_code,amount")
+    first = chunks[1].splitlines()[0].split(",")
+    assert first[1:6] == ["TXN-1", "income", "completed", "USD", "10.50"]
+    assert first[11] == "2025-02-10T09:30:00"
+    assert result.closed
+    assert db.statements[0].get_execution_options()["yield_per"] == 2
+
+
+@pytest.mark.unit
+def test_unknown_dataset_is_rejected(fakes):
+    with pytest.raises(ValidationError):
+        DataExportService(fakes.sync_session()).stream_csv("customers")
+
+
+@pytest.mark.unit
+def test_parquet_writes_typed_row_groups(fakes):
+    pq = pytest.importorskip("pyarrow.parquet")
+    result = fakes.result(partitions=[
+        [transaction_row("TXN-1", "10.50")],
+        [transaction_row("TXN-2", "20.00")],
+    ])
+
+    path = DataExportService(fakes.sync_session(result)).write_parquet("transactions")
+    try:
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 2
+        table = parquet_file.read()
+        assert str(table.schema.field("amount").type) == "decimal128(15, 2)"
+        assert table.column("transaction_type").to_pylist() == ["income", "income"]
+    finally:
+        os.remove(path)
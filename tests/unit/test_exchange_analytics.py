@@ -0,0 +1,141 @@
+"""
+Unit Tests for the vectorized exchange analytics
+Uses fake sessions, no database required
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.services.exchange_analytics_service import (
+    ExchangeAnalyticsService,
+    daily_aggregate,
+    grouped_rate_statistics,
+    rolling_std,
+    vwap,
+)
+
+
+# ==================== Array Helpers ====================
+
+@pytest.mark.unit
+def test_daily_aggregate_counts_volume_average_and_vwap():
+    days = np.array(['2025-01-01', '2025-01-01', '2025-01-02', '2025-01-02'], dtype='datetime64[D]')
+    rates = np.array([32.0, 34.0, 33.0, np.nan])
+    volumes = np.array([100.0, 300.0, 50.0, 20.0])
+
+    unique_days, counts, volume, average, day_vwap = daily_aggregate(days, rates, volumes)
+
+    assert [str(d) for d in unique_days] == ['2025-01-01', '2025-01-02']
+    assert counts.tolist() == [2, 2]
+    assert volume.tolist() == [400.0, 70.0]
+    assert average.tolist() == [33.0, 33.0]           # unpriced row ignored
+    assert day_vwap.tolist() == [33.5, 33.0]
+
+
+@pytest.mark.unit
+def test_rolling_std_and_vwap():
+    values = np.array([1.0, 2.0, 4.0, 7.0])
+
+    assert np.allclose(rolling_std(values, 3), [np.std([1, 2, 4], ddof=1), np.std([2, 4, 7], ddof=1)])
+    assert rolling_std(values, 5).size == 0
+    assert vwap(np.array([10.0, 20.0]), np.array([1.0, 3.0])) == 17.5
+    assert vwap(np.array([np.nan]), np.array([5.0])) == 0.0
+
+
+@pytest.mark.unit
+def test_grouped_statistics_match_per_pair_computation():
+    keys = np.array(['EUR/USD'] * 3 + ['USD/TRY'] * 4)
+    rates = np.array([1.08, 1.10, 1.09, 32.0, 32.5, 33.0, 32.8])
+
+    stats = grouped_rate_statistics(keys, rates)
+
+    assert stats['key'].tolist() == ['EUR/USD', 'USD/TRY']
+    assert stats['count'].tolist() == [3, 4]
+    for i, series in enumerate((rates[:3], rates[3:])):
+        assert stats['mean'][i] == pytest.approx(series.mean())
+        assert stats['std'][i] == pytest.approx(series.std())
+        assert stats['return_std'][i] == pytest.approx(np.diff(np.log(series)).std(ddof=1))
+    assert (stats['first'].tolist(), stats['last'].tolist()) == ([1.08, 32.0], [1.09, 32.8])
+
+
+# ==================== Service ====================
+
+@pytest.mark.unit
+def test_exchange_trends_filters_the_pair_in_sql(fakes):
+    db = fakes.sync_session(default=fakes.result(rows=[
+        (date(2025, 1, 1), Decimal('32.000000'), Decimal('100.00')),
+        (date(2025, 1, 1), Decimal('34.000000'), Decimal('300.00')),
+        (date(2025, 1, 2), Decimal('33.000000'), Decimal('50.00')),
+    ]))
+
+    trends = ExchangeAnalyticsService(db).exchange_trends('USD', 'TRY', date(2025, 1, 1), date(2025, 1, 2))
+
+    sql = fakes.sql(db.statements[0])
+    assert sql.count('JOIN currencies AS') == 2 and 'currencies_2.code' in sql
+    assert trends['total_transactions'] == 3 and trends['total_volume'] == 450.0
+    assert trends['vwap'] == pytest.approx((32 * 100 + 34 * 300 + 33 * 50) / 450)
+    assert trends['percentiles']['p50'] == 33.0
+    assert trends['daily_trends'][0] == {
+        'date': '2025-01-01', 'transaction_count': 2, 'total_volume': 400.0,
+        'average_rate': 33.0, 'vwap': 33.5
+    }
+
+
+@pytest.mark.unit
+def test_rate_volatility_returns_changes_and_rolling_window(fakes):
+    start = datetime(2025, 1, 1)
+    rates = [Decimal('32.0'), Decimal('32.5'), Decimal('32.2'), Decimal('33.0')]
+    rows = [(start + timedelta(days=i), rate) for i, rate in enumerate(rates)]
+    db = fakes.sync_session(default=fakes.result(rows=rows))
+
+    analysis = ExchangeAnalyticsService(db).rate_volatility('USD', 'TRY', start, window=2)
+
+    assert analysis['statistics']['max_rate'] == 33.0
+    assert analysis['daily_changes'][0]['change_percent'] == pytest.approx(0.5 / 32 * 100)
+    assert analysis['daily_changes'][0]['log_return'] == pytest.approx(np.log(32.5 / 32))
+    assert [p['date'] for p in analysis['rolling_volatility']['points']] == [
+        '2025-01-03T00:00:00', '2025-01-04T00:00:00'
+    ]
+
+
+@pytest.mark.unit
+def test_empty_results(fakes):
+    service = ExchangeAnalyticsService(fakes.sync_session())
+
+    assert service.exchange_trends('USD', 'TRY', date(2025, 1, 1), date(2025, 1, 2))['message']
+    assert service.rate_volatility('USD', 'TRY', datetime(2025, 1, 1))['message']
+    assert service.all_pairs_volatility(datetime(2020, 1, 1), datetime(2025, 1, 1)) == []
+    assert service.volume_trends(date(2025, 1, 1), 'daily') == []
+
+
+@pytest.mark.unit
+def test_all_pairs_sorted_by_volatility(fakes):
+    db = fakes.sync_session(default=fakes.result(rows=[
+        ('EUR', 'USD', Decimal('1.08')), ('EUR', 'USD', Decimal('1.081')), ('EUR', 'USD', Decimal('1.08')),
+        ('USD', 'TRY', Decimal('32.0')), ('USD', 'TRY', Decimal('34.0')), ('USD', 'TRY', Decimal('31.0')),
+        ('USD', 'YER', Decimal('250.0')),
+    ]))
+
+    pairs = ExchangeAnalyticsService(db).all_pairs_volatility(datetime(2020, 1, 1), datetime(2025, 1, 1))
+
+    assert [p['currency_pair'] for p in pairs] == ['USD/TRY', 'EUR/USD', 'USD/YER']
+    assert pairs[2]['return_volatility_percent'] is None
+    assert pairs[0]['change_percent'] == pytest.approx(-1 / 32 * 100)
+
+
+@pytest.mark.unit
+def test_volume_trends_growth_and_moving_average(fakes):
+    db = fakes.sync_session(default=fakes.result(rows=[
+        (date(2025, 1, 1), 2, Decimal('100')),
+        (date(2025, 1, 2), 3, Decimal('150')),
+        (date(2025, 1, 3), 1, Decimal('50')),
+    ]))
+
+    trends = ExchangeAnalyticsService(db).volume_trends(date(2025, 1, 1), 'daily', branch_id='b1')
+
+    assert [t['growth_percent'] for t in trends] == [None, 50.0, pytest.approx(-66.6666667)]
+    assert [t['moving_average_volume'] for t in trends] == [None, None, 100.0]
+    assert 'transactions.branch_id' in fakes.sql(db.statements[0])
@@ -0,0 +1,213 @@
+"""
+Unit Tests for exchange quotes
+No database required
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import BusinessRuleViolationError, ValidationError
+from app.repositories.currency_repo import CurrencyRepository
+from app.services.exchange_quote_service import ExchangeQuoteService
+from app.services.transaction_service import TransactionService
+
+
+USER = uuid4()
+USD = uuid4()
+TRY = uuid4()
+
+
+def calculation(from_amount="100.00", rate="32.50"):
+    return {
+        "from_currency_id": USD,
+        "from_currency_code": "USD",
+        "to_currency_id": TRY,
+        "to_currency_code": "TRY",
+        "from_amount": Decimal(from_amount),
+        "to_amount": Decimal(from_amount) * Decimal(rate),
+        "exchange_rate": Decimal(rate),
+        "commission_percentage": Decimal("1.00"),
+        "commission_amount": Decimal("1.00"),
+        "total_cost": Decimal(from_amount) + Decimal("1.00"),
+        "effective_rate": Decimal(rate),
+    }
+
+
+@pytest.fixture
+def quotes(monkeypatch):
+    monkeypatch.setattr(ExchangeQuoteService, "_quotes", type(ExchangeQuoteService._quotes)())
+    return ExchangeQuoteService()
+
+
+def resolve(service, quote_id, **overrides):
+    request = {
+        "user_id": USER,
+        "from_currency_id": USD,
+        "to_currency_id": TRY,
+        "from_amount": Decimal("100"),
+    }
+    request.update(overrides)
+    return service.resolve(quote_id, **request)
+
+
+@pytest.mark.unit
+def test_issued_quote_resolves_with_locked_rate(quotes):
+    quote = quotes.issue(USER, calculation())
+
+    resolved = resolve(quotes, quote.quote_id, commission_percentage=Decimal("1"))
+
+    assert resolved is quote
+    assert resolved.exchange_rate == Decimal("32.50")
+    assert quote.to_dict()["quote_id"] == quote.quote_id
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("overrides", [
+    {"user_id": uuid4()},
+    {"to_currency_id": uuid4()},
+    {"from_amount": Decimal("100.01")},
+    {"commission_percentage": Decimal("2")},
+])
+def test_mismatched_request_is_rejected(quotes, overrides):
+    quote = quotes.issue(USER, calculation())
+
+    with pytest.raises(ValidationError):
+        resolve(quotes, quote.quote_id, **overrides)
+
+
+@pytest.mark.unit
+def test_tampered_quote_id_is_rejected(quotes):
+    quote = quotes.issue(USER, calculation())
+    quote_id = quote.quote_id
+
+    with pytest.raises(ValidationError):
+        resolve(quotes, quote.token + "." + "0" * 32)
+
+    quote.exchange_rate = Decimal("40")
+    with pytest.raises(ValidationError):
+        resolve(quotes, quote_id)
+
+
+@pytest.mark.unit
+def test_expired_quote_is_rejected_and_dropped(quotes):
+    quote = quotes.issue(USER, calculation())
+    quote.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    quote_id = quote.quote_id
+
+    with pytest.raises(ValidationError):
+        resolve(quotes, quote_id)
+    assert quote.token not in ExchangeQuoteService._quotes
+
+
+@pytest.mark.unit
+def test_store_evicts_oldest_when_full(quotes, monkeypatch):
+    monkeypatch.setattr(settings, "EXCHANGE_QUOTE_MAX_ENTRIES", 2)
+    first = quotes.issue(USER, calculation())
+    quotes.issue(USER, calculation())
+    quotes.issue(USER, calculation())
+
+    assert len(ExchangeQuoteService._quotes) == 2
+    with pytest.raises(ValidationError):
+        resolve(quotes, first.quote_id)
+
+
+@pytest.mark.unit
+async def test_create_exchange_rejects_unknown_quote_before_database(quotes):
+    service = TransactionService(db=None)
+
+    with pytest.raises(ValidationError):
+        await service.create_exchange(
+            branch_id=uuid4(), customer_id=None, from_currency_id=USD,
+            to_currency_id=TRY, from_amount=Decimal("100"), commission_percentage=None,
+            user_id=USER, quote_id="missing.quote"
+        )
+
+
+@pytest.mark.unit
+def test_quote_is_redeemed_once(quotes):
+    quote = quotes.issue(USER, calculation())
+
+    quotes.redeem(resolve(quotes, quote.quote_id))
+
+    with pytest.raises(ValidationError):
+        quotes.redeem(quote)
+    with pytest.raises(ValidationError):
+        resolve(quotes, quote.quote_id)
+
+
+@pytest.fixture
+def exchange_service(fakes, monkeypatch):
+    """TransactionService whose lookups and balance writes are recorded, not run"""
+    service = TransactionService(db=fakes.session())
+    service.calls = []
+
+    async def noop(*args, **kwargs):
+        return None
+
+    async def get_currency_by_id(repo, currency_id):
+        return SimpleNamespace(id=currency_id, code="USD" if currency_id == USD else "TRY")
+
+    async def generate(db):
+        return "TRX-20250101-00001"
+
+    async def commit(hold_id, **kwargs):
+        service.calls.append(("commit", hold_id))
+        return Decimal("899.00")
+
+    async def update_balance(**kwargs):
+        service.calls.append(("update_balance", kwargs["currency_id"]))
+
+    async def load(transaction_id, model):
+        return next(obj for obj in service.db.added if obj.id == transaction_id)
+
+    for name in ("_validate_branch_exists", "_validate_currency_exists",
+                 "_record_limit_usage", "_publish_transactions"):
+        monkeypatch.setattr(service, name, noop)
+    monkeypatch.setattr(CurrencyRepository, "get_currency_by_id", get_currency_by_id)
+    monkeypatch.setattr(service.transaction_generator, "generate", generate)
+    monkeypatch.setattr(service.reservation_service, "commit", commit)
+    monkeypatch.setattr(service.balance_service, "update_balance", update_balance)
+    monkeypatch.setattr(service, "_load_transaction_with_relationships", load)
+    return service
+
+
+def create_exchange(service, quote_id, branch_id):
+    return service.create_exchange(
+        branch_id=branch_id, customer_id=None, from_currency_id=USD,
+        to_currency_id=TRY, from_amount=Decimal("100"), commission_percentage=None,
+        user_id=USER, quote_id=quote_id
+    )
+
+
+@pytest.mark.unit
+async def test_quote_books_a_single_exchange(quotes, exchange_service):
+    branch_id, hold_id = uuid4(), uuid4()
+    quote = quotes.issue(USER, calculation(), branch_id=branch_id, hold_id=hold_id)
+
+    exchange = await create_exchange(exchange_service, quote.quote_id, branch_id)
+
+    assert exchange.exchange_rate_used == Decimal("32.50")
+    assert exchange_service.calls == [("commit", hold_id), ("update_balance", TRY)]
+    with pytest.raises(ValidationError):
+        await create_exchange(exchange_service, quote.quote_id, branch_id)
+    assert len(exchange_service.calls) == 2
+
+
+@pytest.mark.unit
+async def test_lapsed_quote_hold_is_not_replaced_by_a_plain_deduction(quotes, exchange_service, monkeypatch):
+    branch_id = uuid4()
+    quote = quotes.issue(USER, calculation(), branch_id=branch_id, hold_id=uuid4())
+
+    async def commit(hold_id, **kwargs):
+        return None
+
+    monkeypatch.setattr(exchange_service.reservation_service, "commit", commit)
+
+    with pytest.raises(BusinessRuleViolationError):
+        await create_exchange(exchange_service, quote.quote_id, branch_id)
+    assert exchange_service.calls == []
@@ -0,0 +1,145 @@
+"""
+Unit Tests for Idempotency-Key handling
+Uses fake sessions, no database required
+"""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import ResourceConflictError
+from app.db.models.idempotency import IdempotencyRecord
+from app.services.idempotency_service import IdempotencyService
+
+
+@pytest.mark.unit
+def test_request_hash_is_canonical():
+    """Key order does not matter; scope and values do"""
+    first = IdempotencyService.request_hash("transactions.exchange", {"a": 1, "b": "2"})
+    assert first == IdempotencyService.request_hash("transactions.exchange", {"b": "2", "a": 1})
+    assert first != IdempotencyService.request_hash("transactions.transfer", {"a": 1, "b": "2"})
+    assert first != IdempotencyService.request_hash("transactions.exchange", {"a": 2, "b": "2"})
+
+
+@pytest.mark.unit
+async def test_without_key_handler_runs_directly():
+    service = IdempotencyService(db=None)
+
+    async def handler():
+        return {"ok": True}
+
+    assert await service.execute(uuid4(), None, "transactions.exchange", {}, handler) == {"ok": True}
+
+
+@pytest.mark.unit
+async def test_concurrent_duplicates_are_coalesced(monkeypatch):
+    """The second request waits for the first and shares its response"""
+    service = IdempotencyService(db=None)
+    calls = []
+
+    async def execute_claimed(user_id, key, scope, request_hash, handler):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return await handler()
+
+    async def handler():
+        return {"transaction_number": "TRX-20250211-00001"}
+
+    monkeypatch.setattr(service, "_execute_claimed", execute_claimed)
+    user_id = uuid4()
+    body = {"from_amount": "100.00"}
+
+    first, second = await asyncio.gather(
+        service.execute(user_id, "retry-1", "transactions.exchange", body, handler),
+        service.execute(user_id, "retry-1", "transactions.exchange", body, handler),
+    )
+
+    assert calls == ["retry-1"]
+    assert first == second == {"transaction_number": "TRX-20250211-00001"}
+    assert IdempotencyService._in_flight == {}
+
+
+@pytest.mark.unit
+async def test_in_flight_key_with_different_body_conflicts(monkeypatch):
+    service = IdempotencyService(db=None)
+
+    async def execute_claimed(user_id, key, scope, request_hash, handler):
+        await asyncio.sleep(0.01)
+        return {}
+
+    monkeypatch.setattr(service, "_execute_claimed", execute_claimed)
+    user_id = uuid4()
+
+    results = await asyncio.gather(
+        service.execute(user_id, "retry-2", "transactions.exchange", {"from_amount": "1"}, None),
+        service.execute(user_id, "retry-2", "transactions.exchange", {"from_amount": "2"}, None),
+        return_exceptions=True,
+    )
+
+    assert results[0] == {}
+    assert isinstance(results[1], ResourceConflictError)
+
+
+@pytest.mark.unit
+async def test_replay_returns_stored_response(fakes):
+    request_hash = IdempotencyService.request_hash("vault.transfer_to_branch", {"amount": "5"})
+    record = SimpleNamespace(
+        request_hash=request_hash,
+        status=IdempotencyRecord.STATUS_COMPLETED,
+        response_body={"transfer_number": "VTR-1"},
+    )
+    service = IdempotencyService(fakes.session(default=fakes.result(record)))
+
+    assert await service._replay(uuid4(), "retry-3", request_hash) == {"transfer_number": "VTR-1"}
+
+
+@pytest.mark.unit
+async def test_replay_of_request_still_running_elsewhere_conflicts(fakes):
+    record = SimpleNamespace(request_hash="h", status=IdempotencyRecord.STATUS_IN_PROGRESS, response_body=None)
+    service = IdempotencyService(fakes.session(default=fakes.result(record)))
+
+    with pytest.raises(ResourceConflictError):
+        await service._replay(uuid4(), "retry-4", "h")
+
+
+def statuses(statements):
+    return [statement.compile().params["status"] for statement in statements]
+
+
+@pytest.mark.unit
+async def test_claim_is_marked_executed_in_the_handlers_commit(fakes, monkeypatch):
+    """The executed marker commits with the business change, before the response is stored"""
+    db = fakes.session()
+    db.sync_session = Session()                   # fires the before_commit hook
+    db.sync_session.execute = lambda statement, *args, **kwargs: db.statements.append(statement)
+    service = IdempotencyService(db)
+
+    async def claim(*args):
+        return True
+
+    async def handler():
+        db.sync_session.commit()              # the service commits its transfer
+        return {"transfer_number": "VTR-1"}
+
+    monkeypatch.setattr(service, "_claim", claim)
+
+    await service._execute_claimed(uuid4(), "retry-5", "vault.transfer", "h", handler)
+
+    assert statuses(db.statements) == [
+        IdempotencyRecord.STATUS_EXECUTED, IdempotencyRecord.STATUS_COMPLETED
+    ]
+    # The hook is gone once the handler returned
+    db.sync_session.commit()
+    assert len(statuses(db.statements)) == 2
+
+
+@pytest.mark.unit
+async def test_executed_claim_without_response_is_not_run_again(fakes):
+    record = SimpleNamespace(request_hash="h", status=IdempotencyRecord.STATUS_EXECUTED, response_body=None)
+    service = IdempotencyService(fakes.session(default=fakes.result(record)))
+
+    with pytest.raises(ResourceConflictError, match="already executed"):
+        await service._replay(uuid4(), "retry-6", "h")
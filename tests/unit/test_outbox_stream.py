@@ -0,0 +1,99 @@
+"""
+Unit Tests for outbox publishing to the Redis stream
+Uses fake sessions and a fake Redis client, no database or Redis required
+"""
+
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.outbox_service import OutboxRelay, RedisStreamPublisher
+
+
+class FakePublisher:
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    async def publish(self, events):
+        if self.error:
+            raise self.error
+        self.batches.append([event.id for event in events])
+
+
+def outbox_row(event_id, event_type="balance.changed"):
+    return SimpleNamespace(
+        id=event_id, event_type=event_type, aggregate_id=uuid4(), payload={"balance": "10.00"}
+    )
+
+
+@pytest.mark.unit
+async def test_publish_sends_unpublished_batch_and_marks_it(fakes):
+    db = fakes.session(fakes.result(value=True), fakes.result(rows=[outbox_row(7), outbox_row(8)]))
+    publisher = FakePublisher()
+    relay = OutboxRelay(session_factory=lambda: db, batch_size=100, publisher=publisher)
+
+    assert await relay.publish_pending() == 2
+
+    assert publisher.batches == [[7, 8]]
+    assert "pg_try_advisory_xact_lock" in fakes.sql(db.statements[0])
+    assert "published_at IS NULL" in fakes.sql(db.statements[1])
+    assert fakes.sql(db.statements[2]).startswith("UPDATE outbox_events SET published_at=")
+    assert db.commits == 1
+    assert relay.stats()["published"] == 2
+
+
+@pytest.mark.unit
+async def test_publish_skips_while_another_worker_holds_the_lock(fakes):
+    db = fakes.session(fakes.result(value=False))
+    publisher = FakePublisher()
+    relay = OutboxRelay(session_factory=lambda: db, publisher=publisher)
+
+    assert await relay.publish_pending() == 0
+    assert publisher.batches == [] and len(db.statements) == 1
+
+
+@pytest.mark.unit
+async def test_failed_publish_leaves_events_unpublished(fakes):
+    db = fakes.session(fakes.result(value=True), fakes.result(rows=[outbox_row(1)]))
+    relay = OutboxRelay(session_factory=lambda: db, publisher=FakePublisher(ConnectionError("down")))
+
+    with pytest.raises(ConnectionError):
+        await relay.publish_pending()
+    assert len(db.statements) == 2 and db.commits == 0
+
+
+@pytest.mark.unit
+async def test_purge_keeps_unpublished_events_when_publishing(fakes):
+    db = fakes.session(fakes.result())
+    db.results[0].rowcount = 0
+    relay = OutboxRelay(session_factory=lambda: db, publisher=FakePublisher())
+
+    await relay.purge()
+
+    assert "outbox_events.published_at IS NOT NULL" in fakes.sql(db.statements[0])
+
+
+@pytest.mark.unit
+async def test_stream_publisher_pipelines_capped_xadds():
+    calls = []
+
+    class FakePipeline:
+        def xadd(self, stream, fields, maxlen=None, approximate=False):
+            calls.append((stream, fields, maxlen, approximate))
+
+        async def execute(self):
+            calls.append("execute")
+
+    client = SimpleNamespace(pipeline=lambda transaction: FakePipeline())
+    publisher = RedisStreamPublisher(client=client, stream="events", maxlen=1000)
+
+    await publisher.publish([outbox_row(1), outbox_row(2, "transaction.created")])
+
+    (stream, fields, maxlen, approximate), second, done = calls
+    assert (stream, maxlen, approximate) == ("events", 1000, True)
+    assert fields["id"] == "1" and json.loads(fields["payload"]) == {"balance": "10.00"}
+    assert second[1]["type"] == "transaction.created"
+    assert done == "execute"
@@ -0,0 +1,145 @@
+"""
+Unit Tests for PDF report rendering
+No database required
+"""
+
+import multiprocessing
+import os
+import time
+from io import BytesIO
+
+import pytest
+
+from app.services import pdf_render_service as pdf_module
+from app.services.pdf_render_service import (
+    _detail_tables,
+    build_pdf,
+    render_pdf_file,
+    shape_text,
+    shutdown_pdf_render_pool,
+)
+
+
+def report(rows: int):
+    return {
+        "title": "Daily Summary",
+        "date_range": {"start": "2025-02-01", "end": "2025-02-10"},
+        "summary": {"total_transactions": rows, "total_revenue": 1250.5},
+        "transactions": [
+            {"transaction_number": f"TXN-{i:05d}", "type": "income", "amount": float(i)}
+            for i in range(rows)
+        ],
+    }
+
+
+@pytest.mark.unit
+def test_detail_rows_are_split_into_chunked_tables_with_repeated_header(monkeypatch):
+    monkeypatch.setattr(pdf_module.settings, "PDF_TABLE_CHUNK_ROWS", 500)
+
+    tables = _detail_tables(["transaction_number", "amount"], report(1200)["transactions"])
+
+    assert [len(table._cellvalues) for table in tables] == [501, 501, 201]
+    assert all(table._cellvalues[0] == ["Transaction Number", "Amount"] for table in tables)
+    assert all(table.repeatRows == 1 for table in tables)
+
+
+@pytest.mark.unit
+def test_build_pdf_renders_into_a_buffer():
+    buffer = BytesIO()
+
+    build_pdf(report(30), buffer)
+
+    assert buffer.getvalue().startswith(b"%PDF")
+
+
+@pytest.mark.unit
+def test_in_process_render_writes_a_temp_file(monkeypatch):
+    monkeypatch.setattr(pdf_module.settings, "PDF_RENDER_WORKERS", 0)
+
+    path = render_pdf_file(report(10))
+    try:
+        with open(path, "rb") as f:
+            assert f.read(4) == b"%PDF"
+    finally:
+        os.remove(path)
+
+
+@pytest.mark.unit
+def test_pool_render_writes_a_temp_file(monkeypatch):
+    monkeypatch.setattr(pdf_module.settings, "PDF_RENDER_WORKERS", 1)
+
+    try:
+        path = render_pdf_file(report(600))
+        try:
+            assert os.path.getsize(path) > 0
+        finally:
+            os.remove(path)
+    finally:
+        shutdown_pdf_render_pool()
+
+
+@pytest.mark.unit
+def test_failed_render_removes_its_temp_file(monkeypatch):
+    monkeypatch.setattr(pdf_module.settings, "PDF_RENDER_WORKERS", 0)
+    created = []
+
+    def failing_render(report_data, path):
+        created.append(path)
+        raise ValueError("layout failed")
+
+    monkeypatch.setattr(pdf_module, "_render_to_path", failing_render)
+
+    with pytest.raises(ValueError):
+        render_pdf_file(report(1))
+    assert not os.path.exists(created[0])
+
+
+def running_pids():
+    return {process.pid for process in multiprocessing.active_children()}
+
+
+def hanging_render(report_data, path):
+    with open(path, "wb") as f:
+        f.write(b"%PDF partial")
+    time.sleep(60)
+
+
+@pytest.mark.unit
+def test_timed_out_render_recycles_the_pool_and_removes_its_file(monkeypatch):
+    monkeypatch.setattr(pdf_module.settings, "PDF_RENDER_WORKERS", 1)
+    monkeypatch.setattr(pdf_module.settings, "PDF_RENDER_TIMEOUT_SECONDS", 1)
+    monkeypatch.setattr(pdf_module, "_render_to_path", hanging_render)
+    created = []
+    real_mkstemp = pdf_module.tempfile.mkstemp
+
+    def mkstemp(**kwargs):
+        fd, path = real_mkstemp(**kwargs)
+        created.append(path)
+        return fd, path
+
+    monkeypatch.setattr(pdf_module.tempfile, "mkstemp", mkstemp)
+    shutdown_pdf_render_pool()
+    hung_pool = pdf_module._get_pdf_pool()
+
+    try:
+        with pytest.raises(TimeoutError):
+            render_pdf_file(report(1))
+
+        assert pdf_module._pdf_pool is None          # a fresh pool serves the next render
+        deadline = time.monotonic() + 10
+        while os.path.exists(created[0]) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not os.path.exists(created[0])
+        workers = hung_pool.worker_pids()
+        assert workers
+        while workers & running_pids() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not workers & running_pids()
+    finally:
+        shutdown_pdf_render_pool()
+
+
+@pytest.mark.unit
+def test_latin_text_is_not_reshaped():
+    assert shape_text("Main Branch") == "Main Branch"
+    assert shape_text(12.5) == "12.5"
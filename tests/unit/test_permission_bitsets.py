@@ -0,0 +1,74 @@
+"""
+Unit Tests for compiled permission bitsets
+No database required
+"""
+
+import pytest
+
+from app.core.permissions import (
+    compile_permissions,
+    has_compiled_permission,
+    permission_bit,
+    permission_id,
+    validate_permission,
+    ROLE_PERMISSIONS,
+)
+from app.db.models.role import Role
+from app.db.models.user import User
+
+
+def make_user(*permission_lists):
+    user = User(username="u", email="u@example.com", hashed_password="x", full_name="U")
+    for index, permissions in enumerate(permission_lists):
+        user.roles.append(Role(name=f"role{index}", display_name_ar="دور", permissions=permissions))
+    return user
+
+
+@pytest.mark.unit
+def test_permission_ids_are_stable_and_extend_for_unknown_strings():
+    """Catalog permissions have fixed IDs; unknown strings get new ones"""
+    assert permission_id("users:create") == permission_id("users:create")
+    assert permission_id("custom:thing") != permission_id("users:create")
+    assert permission_bit("users:read") != permission_bit("users:create")
+
+
+@pytest.mark.unit
+def test_compiled_mask_matches_hierarchy():
+    """Compiled bitsets grant the same implied actions as the hierarchy"""
+    mask = compile_permissions(frozenset({"users:update", "transactions:view_all"}))
+
+    assert has_compiled_permission(mask, "users:update")
+    assert has_compiled_permission(mask, "users:read")
+    assert has_compiled_permission(mask, "transactions:view_branch")
+    assert not has_compiled_permission(mask, "users:delete")
+
+
+@pytest.mark.unit
+def test_wildcards_expand_to_catalog():
+    """'*' grants everything, 'category:*' grants the whole category"""
+    everything = compile_permissions(frozenset({"*"}))
+    users_only = compile_permissions(frozenset({"users:*"}))
+
+    assert has_compiled_permission(everything, "system:backup")
+    assert has_compiled_permission(users_only, "users:assign_roles")
+    assert not has_compiled_permission(users_only, "vault:read")
+
+
+@pytest.mark.unit
+def test_user_mask_is_union_of_roles_and_tracks_role_changes():
+    """User checks are one AND against the union of role bitsets"""
+    user = make_user(["users:read"], ["vault:transfer"])
+
+    assert user.has_permission("users:read")
+    assert user.has_permission("vault:transfer")
+    assert not user.has_permission("vault:approve")
+
+    user.roles[1].add_permission("vault:approve")
+    assert user.has_permission("vault:approve")
+
+
+@pytest.mark.unit
+def test_catalog_has_single_reports_entry():
+    """reports:schedule survives catalog compilation"""
+    assert validate_permission("reports:schedule")
+    assert all(validate_permission(p) for p in ROLE_PERMISSIONS["admin"])
@@ -0,0 +1,106 @@
+"""
+Unit Tests for the watermark-validated report cache
+Uses fake sessions, no database required
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.services.report_cache_service import ReportResultCache, report_watermark
+
+
+def watermark_session(fakes, row=(3, datetime(2025, 2, 10, 9, 0))):
+    """Session answering every watermark query with row"""
+    return fakes.sync_session(default=fakes.result(row))
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"run": self.calls}
+
+
+TODAY = date.today()
+
+
+def fetch(cache, db, compute, day=TODAY, **kwargs):
+    return cache.get_or_compute(
+        db, "daily_summary", {"target_date": day}, compute,
+        period_start=day, period_end=day + timedelta(days=1), **kwargs
+    )
+
+
+@pytest.mark.unit
+def test_open_period_is_served_until_the_watermark_moves(fakes):
+    cache, db, compute = ReportResultCache(ttl=60, max_entries=10, closed_recheck=60), watermark_session(fakes), Counter()
+
+    assert fetch(cache, db, compute) == {"run": 1}
+    assert fetch(cache, db, compute) == {"run": 1}
+    assert len(db.statements) == 2               # validated on every read
+
+    db.default = fakes.result((4, datetime(2025, 2, 10, 9, 5)))     # a new transaction
+    assert fetch(cache, db, compute) == {"run": 2}
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2}
+
+
+@pytest.mark.unit
+def test_closed_period_skips_validation_until_recheck(fakes):
+    cache, db, compute = ReportResultCache(ttl=60, max_entries=10, closed_recheck=60), watermark_session(fakes), Counter()
+    past = TODAY - timedelta(days=30)
+
+    fetch(cache, db, compute, day=past)
+    fetch(cache, db, compute, day=past)
+
+    assert compute.calls == 1 and len(db.statements) == 1
+
+
+@pytest.mark.unit
+def test_scope_params_and_fresh_bypass(fakes):
+    cache, db, compute = ReportResultCache(ttl=60, max_entries=10, closed_recheck=60), watermark_session(fakes), Counter()
+
+    fetch(cache, db, compute, branch_id="branch-a")
+    fetch(cache, db, compute, branch_id="branch-b")
+    fetch(cache, db, compute, branch_id="branch-a", fresh=True)
+
+    assert compute.calls == 3
+    assert ReportResultCache.make_key("r", {"d": TODAY, "x": None}, None) == (
+        "r", (("d", TODAY.isoformat()),), "all"
+    )
+
+
+@pytest.mark.unit
+def test_least_recently_used_entry_is_evicted(fakes):
+    cache, db, compute = ReportResultCache(ttl=60, max_entries=2, closed_recheck=60), watermark_session(fakes), Counter()
+    days = [TODAY - timedelta(days=n) for n in (1, 2, 3)]
+
+    for day in days:
+        fetch(cache, db, compute, day=day)
+    fetch(cache, db, compute, day=days[0])
+
+    assert compute.calls == 4
+
+
+@pytest.mark.unit
+def test_zero_ttl_disables_the_cache(fakes):
+    cache, db, compute = ReportResultCache(ttl=0, max_entries=10, closed_recheck=60), watermark_session(fakes), Counter()
+
+    fetch(cache, db, compute)
+    fetch(cache, db, compute)
+
+    assert compute.calls == 2 and db.statements == []
+
+
+@pytest.mark.unit
+def test_watermark_covers_branch_scope_and_branch_list(fakes):
+    db = watermark_session(fakes, (1, None))
+
+    watermark = report_watermark(db, date(2025, 2, 1), date(2025, 3, 1), "branch-a", include_branches=True)
+
+    assert watermark == (1, None, 1, None)
+    transactions, branches = (fakes.sql(s) for s in db.statements)
+    assert "max(transactions.updated_at)" in transactions and "transactions.branch_id" in transactions
+    assert "branches.is_active" in branches
@@ -0,0 +1,174 @@
+"""
+Unit Tests for scheduled reports
+Uses fake sessions, no database required
+"""
+
+import asyncio
+import json
+import os
+from datetime import date, datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.services import report_schedule_service
+from app.services.report_schedule_service import (
+    ReportScheduler,
+    resolve_report_run,
+    run_report_schedule,
+)
+from app.utils.cron import CronExpression
+
+
+# ==================== Cron ====================
+
+@pytest.mark.unit
+@pytest.mark.parametrize("expression,after,expected", [
+    ("0 2 1 * *", datetime(2025, 1, 15, 10, 0), datetime(2025, 2, 1, 2, 0)),
+    ("*/15 * * * *", datetime(2025, 1, 15, 10, 7, 30), datetime(2025, 1, 15, 10, 15)),
+    ("30 18 * * 1-5", datetime(2025, 1, 17, 19, 0), datetime(2025, 1, 20, 18, 30)),  # Fri -> Mon
+    ("0 0 29 2 *", datetime(2025, 3, 1), datetime(2028, 2, 29, 0, 0)),
+    ("0 6 1 * 0", datetime(2025, 1, 2), datetime(2025, 1, 5, 6, 0)),  # 1st of month OR Sunday
+])
+def test_cron_next_run(expression, after, expected):
+    assert CronExpression(expression).next_after(after) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("expression", ["0 2 1 *", "61 * * * *", "0 0 31 2 *", "*/0 * * * *", "a * * * *"])
+def test_invalid_cron_is_rejected(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression).next_after(datetime(2025, 1, 1))
+
+
+# ==================== Report Runs ====================
+
+@pytest.mark.unit
+def test_runs_default_to_the_previous_period():
+    run_at = datetime(2025, 3, 1, 2, 0)
+    branch_id = uuid4()
+
+    daily = resolve_report_run("daily_summary", {}, branch_id, run_at)
+    monthly = resolve_report_run("monthly_revenue", {}, branch_id, run_at)
+    performance = resolve_report_run("branch_performance", {}, branch_id, run_at)
+
+    assert daily.kwargs == {"branch_id": branch_id, "target_date": date(2025, 2, 28)}
+    assert (monthly.cache_params, monthly.period_start, monthly.period_end) == (
+        {"year": 2025, "month": 2}, date(2025, 2, 1), date(2025, 3, 1)
+    )
+    assert performance.kwargs == {"start_date": date(2025, 2, 1), "end_date": date(2025, 2, 28)}
+    assert performance.branch_id is None and performance.include_branches
+
+
+@pytest.mark.unit
+def test_fixed_params_override_the_default_period():
+    run = resolve_report_run("monthly_revenue", {"year": 2024, "month": 12}, None, datetime(2025, 3, 1))
+
+    assert (run.period_start, run.period_end) == (date(2024, 12, 1), date(2025, 1, 1))
+    with pytest.raises(ValueError):
+        resolve_report_run("audit_trail", {}, None, datetime(2025, 3, 1))
+
+
+# ==================== Scheduler ====================
+
+@pytest.mark.unit
+def test_claim_advances_due_schedules_and_disables_broken_ones(fakes):
+    good = SimpleNamespace(id=uuid4(), cron_expression="0 2 * * *", is_active=True)
+    broken = SimpleNamespace(id=uuid4(), cron_expression="0 2 31 2 *", is_active=True)
+    session = fakes.session(fakes.result(rows=[good, broken]))
+    scheduler = ReportScheduler(session_factory=lambda: session, poll_seconds=60, workers=1)
+
+    claimed = asyncio.run(scheduler.claim_due(datetime(2025, 1, 15, 2, 0)))
+
+    assert claimed == [good.id]
+    assert good.next_run_at == datetime(2025, 1, 16, 2, 0)
+    assert broken.is_active is False and broken.last_status == "failed"
+    sql = fakes.sql(session.statements[0])
+    assert "FOR UPDATE SKIP LOCKED" in sql and session.commits == 1
+
+
+# ==================== Run & Delivery ====================
+
+def make_schedule(**overrides):
+    values = dict(
+        id=uuid4(), name="Daily summary", report_type="daily_summary", params={},
+        branch_id=None, output_format="json", delivery_method="file", recipients=[],
+        last_output_path=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture
+def report_stub(monkeypatch, tmp_path):
+    """Serve report data without a database and write into tmp_path"""
+    calls = []
+
+    def get_or_compute(db, report_type, params, compute, **kwargs):
+        calls.append((report_type, params, kwargs))
+        return {"report_type": report_type, "generated_at": "2025-01-15T02:00:00"}
+
+    monkeypatch.setattr(report_schedule_service.report_result_cache, "get_or_compute", get_or_compute)
+    monkeypatch.setattr(settings, "REPORT_OUTPUT_DIR", str(tmp_path))
+    return calls
+
+
+@pytest.mark.unit
+def test_run_writes_the_report_file(fakes, report_stub):
+    schedule = make_schedule()
+    db = fakes.sync_session(objects={schedule.id: schedule})
+
+    status = run_report_schedule(schedule.id, datetime(2025, 1, 15, 2, 0), session_factory=lambda: db)
+
+    assert status == "success" and db.commits == 1 and db.closed
+    assert schedule.last_output_path.endswith("daily_summary_20250115_0200.json")
+    with open(schedule.last_output_path) as f:
+        assert json.load(f)["title"] == "Daily summary"
+    assert report_stub[0][:2] == ("daily_summary", {"target_date": date(2025, 1, 14)})
+
+
+@pytest.mark.unit
+def test_email_delivery_attaches_the_report(fakes, report_stub, monkeypatch):
+    sent = []
+
+    class FakeSMTP:
+        def __init__(self, host, port, timeout=None):
+            self.host = host
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def send_message(self, message):
+            sent.append(message)
+
+    monkeypatch.setattr(report_schedule_service.smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(settings, "EMAILS_ENABLED", True)
+    monkeypatch.setattr(settings, "SMTP_HOST", "localhost")
+    monkeypatch.setattr(settings, "SMTP_USER", None)
+    schedule = make_schedule(delivery_method="email", recipients=["finance@cems.co"])
+    db = fakes.sync_session(objects={schedule.id: schedule})
+
+    status = run_report_schedule(schedule.id, datetime(2025, 1, 15, 2, 0), session_factory=lambda: db)
+
+    assert status == "success"
+    attachment = next(sent[0].iter_attachments())
+    assert sent[0]["To"] == "finance@cems.co"
+    assert attachment.get_filename() == os.path.basename(schedule.last_output_path)
+
+
+@pytest.mark.unit
+def test_failed_delivery_is_recorded(fakes, report_stub, monkeypatch):
+    monkeypatch.setattr(settings, "EMAILS_ENABLED", False)
+    schedule = make_schedule(delivery_method="email", recipients=["finance@cems.co"])
+    db = fakes.sync_session(objects={schedule.id: schedule})
+
+    status = run_report_schedule(schedule.id, datetime(2025, 1, 15, 2, 0), session_factory=lambda: db)
+
+    assert status == "failed" and db.rollbacks == 1 and db.commits == 1
+    assert "not configured" in schedule.last_error
+    assert os.path.exists(schedule.last_output_path)   # the file drop is kept
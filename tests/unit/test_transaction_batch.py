@@ -0,0 +1,146 @@
+"""
+Unit Tests for back-office transaction batch posting
+Uses fake sessions and repositories, no database required
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.db.models.branch import BalanceChangeType
+from app.schemas.transaction import TransactionBatchCreate
+from app.services.balance_service import BalanceService
+from app.services.transaction_service import TransactionService
+
+
+BRANCH = uuid4()
+USD = uuid4()
+
+
+def make_balance(amount, reserved="0"):
+    return SimpleNamespace(
+        branch_id=BRANCH, currency_id=USD, last_updated=None,
+        balance=Decimal(amount), reserved_balance=Decimal(reserved)
+    )
+
+
+def make_service(fakes, monkeypatch, balances):
+    service = TransactionService(fakes.session())
+    applied = []
+
+    async def active_ids(model, ids):
+        return {BRANCH, USD} & ids
+
+    async def existing_references(references):
+        return {"USED-REF"} & references
+
+    async def lock(pairs):
+        list(pairs)
+        return balances
+
+    async def generate_block(session, count):
+        return [f"TRX-20250101-{n:05d}" for n in range(1, count + 1)]
+
+    async def apply(changes, locked):
+        applied.append(changes)
+        return locked
+
+    monkeypatch.setattr(service, "_get_active_ids", active_ids)
+    monkeypatch.setattr(service, "_get_existing_references", existing_references)
+    monkeypatch.setattr(service.balance_service.repo, "lock_branch_balances", lock)
+    monkeypatch.setattr(service.transaction_generator, "generate_block", generate_block)
+    monkeypatch.setattr(service.balance_service, "apply_balance_changes", apply)
+    return service, applied
+
+
+def expense(amount, **overrides):
+    item = {
+        "transaction_type": "expense", "amount": amount, "branch_id": str(BRANCH),
+        "currency_id": str(USD), "expense_category": "rent", "expense_to": "Landlord LLC",
+    }
+    item.update(overrides)
+    return item
+
+
+def income(amount, **overrides):
+    item = {
+        "transaction_type": "income", "amount": amount, "branch_id": str(BRANCH),
+        "currency_id": str(USD), "income_category": "service_fee",
+    }
+    item.update(overrides)
+    return item
+
+
+@pytest.mark.unit
+async def test_batch_checks_running_balance_and_reports_items(fakes, monkeypatch):
+    """Per-item mode posts valid items in one insert, one balance batch and one counter upsert"""
+    service, applied = make_service(fakes, monkeypatch, {(BRANCH, USD): make_balance("100")})
+    batch = TransactionBatchCreate(all_or_nothing=False, items=[
+        expense(80),
+        expense(50),                                  # only 20 left
+        income(40),
+        expense(50),                                  # 60 available again
+        expense(10, reference_number="USED-REF"),     # reference already used
+        income(5, currency_id=str(uuid4())),          # unknown currency
+    ])
+
+    results = await service.create_transactions_batch(batch.items, uuid4(), all_or_nothing=False)
+
+    assert results["successful"] == 3
+    assert [error["index"] for error in results["errors"]] == [1, 4, 5]
+    assert "Insufficient balance" in results["errors"][0]["error"]
+    assert [created["index"] for created in results["created"]] == [0, 2, 3]
+
+    (table, rows), (counter_table, _) = service.db.inserts()
+    assert table == "transactions" and len(rows) == 3
+    assert counter_table == "transaction_limit_counters"
+    assert [change["amount"] for change in applied[0]] == [Decimal("-80"), Decimal("40"), Decimal("-50")]
+    assert service.db.commits == 1
+
+    events = service.db.added
+    assert [event.event_type for event in events] == ["transaction.created"] * 3
+    assert [event.payload["transaction_number"] for event in events] == [
+        row["transaction_number"] for row in rows
+    ]
+    assert events[0].payload["amount"] == "80.00" and events[0].payload["transaction_type"] == "expense"
+    assert events[0].aggregate_id == rows[0]["id"]
+
+
+@pytest.mark.unit
+async def test_all_or_nothing_posts_nothing(fakes, monkeypatch):
+    """One failing item rejects the whole batch"""
+    service, applied = make_service(fakes, monkeypatch, {(BRANCH, USD): make_balance("100")})
+    batch = TransactionBatchCreate(items=[income(10), expense(500)])
+
+    results = await service.create_transactions_batch(batch.items, uuid4())
+
+    assert results["successful"] == 0
+    assert results["failed"] == 1
+    assert service.db.inserts() == [] and applied == []
+    assert service.db.rollbacks == 1
+
+
+@pytest.mark.unit
+async def test_apply_balance_changes_updates_once_and_writes_running_history(fakes, monkeypatch):
+    """Each balance row is updated once; history carries running balances"""
+    service = BalanceService(fakes.session())
+    balance = make_balance("100", reserved="10")
+    changes = [
+        {"branch_id": BRANCH, "currency_id": USD, "amount": Decimal("-30"),
+         "change_type": BalanceChangeType.TRANSACTION},
+        {"branch_id": BRANCH, "currency_id": USD, "amount": Decimal("5"),
+         "change_type": BalanceChangeType.TRANSACTION},
+    ]
+
+    await service.apply_balance_changes(changes, {(BRANCH, USD): balance})
+
+    assert balance.balance == Decimal("75")
+    (table, rows), = service.db.inserts()
+    assert table == "branch_balance_history"
+    assert [(row["balance_before"], row["balance_after"]) for row in rows] == [
+        (Decimal("100"), Decimal("70")), (Decimal("70"), Decimal("75"))
+    ]
+    (event,) = service.db.added
+    assert event.event_type == "balance.changed" and event.payload["balance"] == "75"
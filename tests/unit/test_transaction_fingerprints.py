@@ -0,0 +1,81 @@
+"""
+Unit Tests for duplicate fingerprints and idempotent transaction creation
+No database required
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.db.models.transaction import (
+    Transaction, IncomeTransaction, ExchangeTransaction, IncomeCategory
+)
+from app.services.transaction_service import TransactionService
+from app.services.transaction_validation_service import TransactionValidationService
+
+
+BRANCH = uuid4()
+USD = uuid4()
+CUSTOMER = uuid4()
+
+
+def fingerprint(amount="100", customer=CUSTOMER, moment=datetime(2025, 2, 10, 9, 30, 5)):
+    return Transaction.compute_fingerprint(BRANCH, USD, Decimal(amount), customer, moment)
+
+
+@pytest.mark.unit
+def test_fingerprint_groups_by_minute():
+    """Same minute and normalized amount share a fingerprint"""
+    assert fingerprint() == fingerprint(amount="100.00", moment=datetime(2025, 2, 10, 9, 30, 59))
+    assert fingerprint() == fingerprint(
+        moment=datetime(2025, 2, 10, 9, 30, 1, tzinfo=timezone.utc)
+    )
+    assert fingerprint() != fingerprint(moment=datetime(2025, 2, 10, 9, 31))
+    assert fingerprint() != fingerprint(customer=None)
+    assert len(fingerprint()) == 32
+
+
+@pytest.mark.unit
+def test_window_fingerprints_cover_each_minute():
+    """A 5 minute window probes six minute buckets ending now"""
+    now = datetime(2025, 2, 10, 9, 30, 5)
+    prints = TransactionValidationService.window_fingerprints(
+        BRANCH, USD, Decimal("100"), CUSTOMER, 5, now=now
+    )
+    assert len(prints) == 6
+    assert prints[0] == fingerprint(moment=now)
+    assert fingerprint(moment=datetime(2025, 2, 10, 9, 25)) in prints
+
+
+@pytest.mark.unit
+async def test_retried_request_returns_original_transaction(fakes, monkeypatch):
+    """A known idempotency key short-circuits creation"""
+    original_id = uuid4()
+    original = SimpleNamespace(id=original_id, transaction_type="income")
+    service = TransactionService(fakes.session(default=fakes.result(original)))
+
+    async def load(transaction_id, model):
+        return SimpleNamespace(id=transaction_id, model=model)
+
+    monkeypatch.setattr(service, "_load_transaction_with_relationships", load)
+
+    result = await service.create_income(
+        branch_id=BRANCH, amount=Decimal("10"), currency_id=USD,
+        category=IncomeCategory.SERVICE_FEE, user_id=uuid4(), idempotency_key="retry-1"
+    )
+
+    assert result.id == original_id
+    assert result.model is IncomeTransaction
+
+
+@pytest.mark.unit
+async def test_idempotency_key_reused_for_other_type_is_rejected(fakes):
+    original = SimpleNamespace(id=uuid4(), transaction_type="income")
+    service = TransactionService(fakes.session(default=fakes.result(original)))
+
+    with pytest.raises(ValidationError):
+        await service._get_idempotent_replay(uuid4(), "retry-1", ExchangeTransaction)
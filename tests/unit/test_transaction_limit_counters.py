@@ -0,0 +1,90 @@
+"""
+Unit Tests for the running daily limit counters
+Uses a fake session, no database required
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from app.core.constants import TransactionType
+from app.core.exceptions import BusinessRuleViolationError
+from app.services.transaction_validation_service import TransactionValidationService
+
+
+BRANCH = uuid4()
+CUSTOMER = uuid4()
+
+
+def counter_session(fakes, row=(Decimal("0"), 0)):
+    """Session answering every counter query with a (total, count) row"""
+    return fakes.session(default=fakes.result(row))
+
+
+@pytest.mark.unit
+def test_limit_bucket_truncates_to_utc_hour():
+    """Aware timestamps are converted to naive UTC hour buckets"""
+    moment = datetime(2025, 2, 9, 14, 37, 12, tzinfo=timezone.utc)
+    assert TransactionValidationService.limit_bucket(moment) == datetime(2025, 2, 9, 14)
+
+
+@pytest.mark.unit
+def test_limit_window_start():
+    """Calendar day starts at midnight, rolling window 24 hours back"""
+    now = datetime(2025, 2, 9, 14, 37)
+    start = TransactionValidationService.limit_window_start
+    assert start(now, "calendar_day") == datetime(2025, 2, 9, 0)
+    assert start(now, "rolling_24h") == datetime(2025, 2, 8, 14)
+
+
+@pytest.mark.unit
+async def test_record_completed_transactions_aggregates_one_upsert(fakes):
+    """Rows are summed per counter key and written in a single statement"""
+    session = counter_session(fakes)
+    service = TransactionValidationService(session)
+    when = datetime(2025, 2, 9, 10, 5)
+
+    touched = await service.record_completed_transactions([
+        {"branch_id": BRANCH, "customer_id": CUSTOMER, "transaction_type": TransactionType.EXCHANGE,
+         "amount": Decimal("100.00"), "transaction_date": when},
+        {"branch_id": BRANCH, "customer_id": None, "transaction_type": TransactionType.EXCHANGE,
+         "amount": Decimal("50.00"), "transaction_date": when.replace(minute=45)},
+        {"branch_id": BRANCH, "customer_id": None, "transaction_type": "income",
+         "amount": Decimal("10.00"), "transaction_date": when},
+    ])
+
+    assert touched == 3
+    assert len(session.statements) == 1
+    params = session.statements[0].compile().params
+    totals = sorted(value for key, value in params.items() if key.startswith("total_amount"))
+    assert totals == [Decimal("10.00"), Decimal("100.00"), Decimal("150.00")]
+
+
+@pytest.mark.unit
+async def test_record_nothing_skips_database(fakes):
+    session = counter_session(fakes)
+    assert await TransactionValidationService(session).record_completed_transactions([]) == 0
+    assert session.statements == []
+
+
+@pytest.mark.unit
+async def test_branch_daily_limit_reads_counters(fakes):
+    """The daily limit is checked against the counter total"""
+    service = TransactionValidationService(counter_session(fakes, (Decimal("4999000.00"), 12)))
+
+    info = await service.validate_transaction_limits(BRANCH, Decimal("1000.00"), TransactionType.INCOME)
+    assert info["today_total"] == 4999000.0
+    assert info["remaining_today"] == 0.0
+
+    with pytest.raises(BusinessRuleViolationError):
+        await service.validate_transaction_limits(BRANCH, Decimal("1000.01"), TransactionType.INCOME)
+
+
+@pytest.mark.unit
+async def test_customer_exchange_limit_reads_counters(fakes):
+    service = TransactionValidationService(counter_session(fakes, (Decimal("0"), 10)))
+
+    with pytest.raises(BusinessRuleViolationError):
+        await service.validate_customer_exchange_limit(CUSTOMER)
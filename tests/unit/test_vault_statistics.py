@@ -0,0 +1,100 @@
+"""
+Unit Tests for SQL-aggregated vault statistics and transfer summaries
+Uses fake sessions, no database required
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.db.models.vault import VaultTransferType
+from app.services.vault_service import VaultService, VaultStatisticsCache
+from app.services import vault_service as vault_module
+
+
+def summary_row(currency_id, code, transfer_type, total, completed, pending, cancelled, amount):
+    return SimpleNamespace(
+        currency_id=currency_id, currency_code=code, transfer_type=transfer_type,
+        total=total, completed=completed, pending=pending, cancelled=cancelled,
+        amount=Decimal(amount),
+    )
+
+
+@pytest.mark.unit
+async def test_transfer_summary_is_one_filtered_group_by_query(fakes):
+    usd, eur = uuid4(), uuid4()
+    db = fakes.session(fakes.result(rows=[
+        summary_row(usd, "USD", VaultTransferType.VAULT_TO_BRANCH, 5, 3, 1, 1, "600.00"),
+        summary_row(usd, "USD", VaultTransferType.VAULT_TO_VAULT, 2, 2, 0, 0, "400.00"),
+        summary_row(eur, "EUR", VaultTransferType.VAULT_TO_BRANCH, 1, 0, 1, 0, "0"),
+    ]))
+
+    summary = await VaultService(db).get_transfer_summary(vault_id=uuid4())
+
+    (statement,) = db.statements
+    query = fakes.sql(statement)
+    assert "count(*) FILTER (WHERE vault_transfers.status = %(status_1)s)" in query
+    assert "sum(vault_transfers.amount) FILTER (WHERE" in query
+    assert "GROUP BY vault_transfers.currency_id" in query
+    assert (summary["total_transfers"], summary["completed_transfers"]) == (8, 5)
+    assert (summary["pending_transfers"], summary["cancelled_transfers"]) == (2, 1)
+    assert summary["total_amount_transferred"] == Decimal("1000.00")
+    assert summary["average_transfer_amount"] == Decimal("200.00")
+    eur_totals, usd_totals = summary["by_currency"]
+    assert usd_totals["total_transfers"] == 7 and eur_totals["completed_transfers"] == 0
+    assert summary["by_type"][0] == {
+        "transfer_type": "vault_to_branch", "total_transfers": 6, "completed_transfers": 3
+    }
+
+
+@pytest.mark.unit
+async def test_vault_statistics_use_one_query_and_a_cached_snapshot(fakes, monkeypatch):
+    vault = SimpleNamespace(id=uuid4(), vault_code="VLT-MAIN", name="Main Vault")
+    row = SimpleNamespace(
+        currency_count=3, total_usd=Decimal("1234.50"),
+        pending_in=1, pending_out=2, last_transfer_date=datetime(2025, 1, 1)
+    )
+    db = fakes.session(fakes.result(row), fakes.result(row))
+    service = VaultService(db)
+
+    async def get_vault_by_id(vault_id):
+        return vault
+
+    monkeypatch.setattr(service, "get_vault_by_id", get_vault_by_id)
+    monkeypatch.setattr(vault_module, "vault_statistics_cache", VaultStatisticsCache(ttl=60))
+
+    stats = await service.get_vault_statistics(vault.id)
+    assert await service.get_vault_statistics(vault.id) is stats
+
+    (statement,) = db.statements
+    query = fakes.sql(statement)
+    assert "count(*) FILTER (WHERE vault_transfers.to_vault_id" in query
+    assert "max(vault_transfers.initiated_at)" in query
+    assert "exchange_rates.rate" in query
+    assert stats["total_balance_usd_equivalent"] == Decimal("1234.50")
+    assert (stats["pending_transfers_in"], stats["pending_transfers_out"]) == (1, 2)
+
+    vault_module.vault_statistics_cache.invalidate(vault.id, None)
+    await service.get_vault_statistics(vault.id)
+    assert len(db.statements) == 2
+
+
+@pytest.mark.unit
+def test_statistics_cache_expires_and_can_be_disabled(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(vault_module.time, "monotonic", lambda: clock[0])
+    vault_id = uuid4()
+
+    cache = VaultStatisticsCache(ttl=60)
+    cache.set(vault_id, {"currency_count": 1})
+    clock[0] += 59
+    assert cache.get(vault_id) == {"currency_count": 1}
+    clock[0] += 2
+    assert cache.get(vault_id) is None
+
+    disabled = VaultStatisticsCache(ttl=0)
+    disabled.set(vault_id, {"currency_count": 1})
+    assert disabled.get(vault_id) is None
@@ -0,0 +1,115 @@
+"""
+Unit Tests for single-transaction vault transfer execution
+Uses fake sessions, no database required
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.models.branch import BalanceChangeType
+from app.db.models.vault import VaultTransfer, VaultTransferStatus, VaultTransferType
+from app.schemas.vault import TransferApproval
+from app.services.balance_service import BalanceService
+from app.services.vault_service import VaultService
+
+
+def make_transfer(**values):
+    transfer = VaultTransfer(
+        id=uuid4(), transfer_number="VTR-20250101-00001", currency_id=uuid4(),
+        amount=Decimal("500.00"), from_vault_id=UUID(int=2), approved_by=uuid4(),
+        status=VaultTransferStatus.IN_TRANSIT, transfer_type=VaultTransferType.VAULT_TO_VAULT,
+    )
+    for key, value in values.items():
+        setattr(transfer, key, value)
+    return transfer
+
+
+@pytest.mark.unit
+async def test_vault_to_vault_legs_are_ordered_single_statements_and_one_commit(fakes):
+    # Destination sorts first: its credit runs before the source debit
+    transfer = make_transfer(to_vault_id=UUID(int=1))
+    db = fakes.session(fakes.result(value=SimpleNamespace(balance=Decimal("500"))),
+                       fakes.result(value=SimpleNamespace(balance=Decimal("0"))))
+
+    await VaultService(db)._save_transfer(transfer, execute=True)
+
+    credit, debit = map(fakes.sql, db.statements)
+    assert credit.startswith("UPDATE vault_balances SET balance=(vault_balances.balance +")
+    assert "vault_balances.vault_id = %(vault_id_1)s" in debit
+    assert "vault_balances.balance + %(balance_2)s >= %(param_1)s" in debit
+    assert db.statements[0].compile().params["vault_id_1"] == UUID(int=1)
+    assert db.statements[1].compile().params["balance_1"] == Decimal("-500.00")
+    assert db.commits == 1 and db.rollbacks == 0
+
+
+@pytest.mark.unit
+async def test_insufficient_source_rolls_the_whole_transfer_back(fakes):
+    transfer = make_transfer(to_vault_id=UUID(int=3))
+    db = fakes.session(fakes.result(value=None))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await VaultService(db)._save_transfer(transfer, execute=True)
+
+    assert exc_info.value.status_code == 400
+    assert len(db.statements) == 1
+    assert db.commits == 0 and db.rollbacks == 1
+
+
+@pytest.mark.unit
+async def test_first_credit_upserts_the_vault_balance(fakes):
+    transfer = make_transfer(to_vault_id=UUID(int=3))
+    db = fakes.session(fakes.result(value=SimpleNamespace(balance=Decimal("0"))), fakes.result(value=None))
+
+    await VaultService(db)._save_transfer(transfer, execute=True)
+
+    upsert = fakes.sql(db.statements[2])
+    assert upsert.startswith("INSERT INTO vault_balances")
+    assert "ON CONFLICT ON CONSTRAINT uq_vault_currency DO UPDATE" in upsert
+
+
+@pytest.mark.unit
+async def test_branch_leg_goes_through_batched_balance_changes(fakes, monkeypatch):
+    applied = []
+
+    async def apply_balance_changes(self, changes, balances=None):
+        applied.append(changes)
+
+    monkeypatch.setattr(BalanceService, "apply_balance_changes", apply_balance_changes)
+    branch_id = uuid4()
+    transfer = make_transfer(to_branch_id=branch_id, transfer_type=VaultTransferType.VAULT_TO_BRANCH)
+    db = fakes.session(fakes.result(value=SimpleNamespace(balance=Decimal("0"))))
+
+    await VaultService(db)._save_transfer(transfer, execute=True)
+    await VaultService(db)._save_transfer(transfer, reverse=True)
+
+    (executed,), (reversed_,) = applied
+    assert executed["branch_id"] == branch_id and executed["amount"] == Decimal("500.00")
+    assert executed["change_type"] == BalanceChangeType.TRANSFER_IN
+    assert reversed_["amount"] == Decimal("-500.00")
+    assert reversed_["change_type"] == BalanceChangeType.TRANSFER_OUT
+    assert fakes.sql(db.statements[1]).startswith("UPDATE vault_balances")   # source refunded
+    assert db.commits == 2
+
+
+@pytest.mark.unit
+async def test_approval_executes_with_the_status_change(fakes, monkeypatch):
+    transfer = make_transfer(to_vault_id=UUID(int=1), status=VaultTransferStatus.PENDING)
+    db = fakes.session(fakes.result(value=transfer))
+    service = VaultService(db)
+    executed = []
+
+    async def apply_legs(transfers, reverse=False):
+        executed.extend(transfers)
+
+    monkeypatch.setattr(service, "_can_approve_transfer", lambda user: True)
+    monkeypatch.setattr(service, "_apply_transfer_legs", apply_legs)
+
+    result = await service.approve_transfer(transfer.id, TransferApproval(approved=True), SimpleNamespace(id=uuid4()))
+
+    assert result.status == VaultTransferStatus.IN_TRANSIT
+    assert executed == [transfer]
+    assert db.commits == 1